@@ -8,7 +8,16 @@ from . import models  # noqa
 from . import models_assemblies_shopify  # noqa
 from . import qb_models  # noqa
 from .base import Base, metadata
-from .session import create_tables, drop_tables, get_db, get_engine, get_session
+from .session import (
+    create_tables,
+    drop_tables,
+    get_db,
+    get_engine,
+    get_read_db,
+    get_read_engine,
+    get_read_session,
+    get_session,
+)
 
 __all__ = [
     "Base",
@@ -16,6 +25,9 @@ __all__ = [
     "get_engine",
     "get_session",
     "get_db",
+    "get_read_engine",
+    "get_read_session",
+    "get_read_db",
     "create_tables",
     "drop_tables",
 ]
@@ -257,9 +257,7 @@ class Product(Base, AuditMixin):
     pricebook_items = relationship("PricebookItem", back_populates="product")
 
     __table_args__ = (
-        Index("ix_products_sku", "sku"),
-        Index("ix_products_product_type", "product_type"),
-        Index("ix_products_raw_material_code", "raw_material_code"),
+        # sku, product_type and raw_material_code are indexed on their columns
         # Index for raw_material_group_id removed - field deprecated
         Index("ix_products_is_purchase", "is_purchase"),
         Index("ix_products_is_sell", "is_sell"),
@@ -392,6 +390,9 @@ class InventoryLot(Base, AuditMixin):
     __table_args__ = (
         UniqueConstraint("product_id", "lot_code", name="uq_lot_code"),
         Index("ix_lot_product_code", "product_id", "lot_code"),
+        Index(
+            "ix_lot_product_active_received", "product_id", "is_active", "received_at"
+        ),
     )
 
 
@@ -422,6 +423,26 @@ class InventoryTxn(Base, AuditMixin):
     __table_args__ = (Index("ix_txn_lot_ts", "lot_id", "created_at"),)
 
 
+class InventoryStockSummary(Base):
+    """Per-product on-hand and reserved totals, refreshed on every lot write."""
+
+    __tablename__ = "inventory_stock_summary"
+
+    product_id = Column(
+        String(36),
+        ForeignKey("products.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    on_hand_qty = Column(Numeric(14, 3), nullable=False, default=0)  # Active lots
+    reserved_qty = Column(
+        Numeric(18, 6), nullable=False, default=0
+    )  # ACTIVE reservations
+    active_lot_count = Column(Integer, nullable=False, default=0)
+    refreshed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    # Note: No AuditMixin - derived data maintained from inventory_lots and
+    # inventory_reservations
+
+
 # Work Order Models
 class WorkOrder(Base, AuditMixin):
     __tablename__ = "work_orders"
@@ -1212,9 +1233,11 @@ class SalesOrder(Base, AuditMixin):
 
     __table_args__ = (
         Index("ix_sales_orders_order_date", "order_date"),
+        Index("ix_sales_orders_order_date_id", "order_date", "id"),
         Index("ix_sales_orders_channel", "channel_id"),
         Index("ix_sales_orders_customer", "customer_id"),
         Index("ix_sales_orders_pricebook", "pricebook_id"),
+        Index("ix_sales_orders_updated_at", "updated_at"),
         sa.CheckConstraint(
             "status IN ('draft','confirmed','fulfilled','cancelled')",
             name="ck_sales_orders_status",
@@ -1226,6 +1249,105 @@ class SalesOrder(Base, AuditMixin):
     )
 
 
+class CustomerFirstOrder(Base):
+    """Materialized first non-cancelled order per customer for analytics."""
+
+    __tablename__ = "customer_first_order"
+
+    customer_id = Column(
+        String(36),
+        ForeignKey("customers.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    first_order_date = Column(DateTime, nullable=False)
+    refreshed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    # Note: No AuditMixin - derived data maintained from sales_orders
+
+    __table_args__ = (Index("ix_customer_first_order_date", "first_order_date"),)
+
+
+class SalesDailyRollup(Base):
+    """Pre-aggregated sales lines per day x customer x product x channel x pricebook."""
+
+    __tablename__ = "sales_daily_rollup"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    day = Column(Date, nullable=False)
+    customer_id = Column(String(36), ForeignKey("customers.id"), nullable=False)
+    product_id = Column(String(36), ForeignKey("products.id"), nullable=False)
+    channel_id = Column(String(36), nullable=True)
+    pricebook_id = Column(String(36), nullable=True)
+    is_archived = Column(Boolean, nullable=False, default=False)
+    order_count = Column(Integer, nullable=False, default=0)
+    qty = Column(Numeric(14, 3), nullable=False, default=0)
+    revenue_ex_gst = Column(Numeric(14, 2), nullable=False, default=0)
+    revenue_inc_gst = Column(Numeric(14, 2), nullable=False, default=0)
+    # Note: No AuditMixin - derived data maintained from sales_order_lines
+
+    __table_args__ = (
+        Index("ix_sales_daily_rollup_day_customer", "day", "customer_id"),
+        Index("ix_sales_daily_rollup_product_day", "product_id", "day"),
+        # One row per slice; NULL channel/pricebook compare equal via coalesce.
+        Index(
+            "ux_sales_daily_rollup_slice",
+            day,
+            customer_id,
+            product_id,
+            sa.func.coalesce(channel_id, sa.literal_column("''")),
+            sa.func.coalesce(pricebook_id, sa.literal_column("''")),
+            is_archived,
+            unique=True,
+        ),
+    )
+
+
+class SalesDailyOrderRollup(Base):
+    """Pre-aggregated order totals per day x customer x channel x pricebook.
+
+    Order totals include freight and order discounts, which cannot be split
+    by product, so they are kept beside the line-level ``sales_daily_rollup``.
+    """
+
+    __tablename__ = "sales_daily_order_rollup"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    day = Column(Date, nullable=False)
+    customer_id = Column(String(36), ForeignKey("customers.id"), nullable=False)
+    channel_id = Column(String(36), nullable=True)
+    pricebook_id = Column(String(36), nullable=True)
+    is_archived = Column(Boolean, nullable=False, default=False)
+    order_count = Column(Integer, nullable=False, default=0)
+    total_ex_gst = Column(Numeric(14, 2), nullable=False, default=0)
+    total_inc_gst = Column(Numeric(14, 2), nullable=False, default=0)
+    last_order_at = Column(DateTime, nullable=False)
+    # Note: No AuditMixin - derived data maintained from sales_orders
+
+    __table_args__ = (
+        Index("ix_sales_daily_order_rollup_day_customer", "day", "customer_id"),
+        Index(
+            "ux_sales_daily_order_rollup_slice",
+            day,
+            customer_id,
+            sa.func.coalesce(channel_id, sa.literal_column("''")),
+            sa.func.coalesce(pricebook_id, sa.literal_column("''")),
+            is_archived,
+            unique=True,
+        ),
+    )
+
+
+class SalesRollupState(Base):
+    """Freshness watermark for materialized sales aggregates."""
+
+    __tablename__ = "sales_rollup_state"
+
+    name = Column(String(50), primary_key=True)
+    rebuilt_at = Column(DateTime, nullable=True)
+    refreshed_at = Column(DateTime, nullable=True)
+    # max(sales_orders.updated_at) covered by the aggregate
+    source_watermark = Column(DateTime, nullable=True)
+
+
 class SalesChannel(Base, AuditMixin):
     __tablename__ = "sales_channels"
 
@@ -1441,6 +1563,9 @@ class Invoice(Base, AuditMixin):
     generated_document_id = Column(
         String(36), ForeignKey("generated_documents.id"), nullable=True, index=True
     )
+    generated_document = relationship(
+        "GeneratedDocument", foreign_keys=[generated_document_id]
+    )
     lines = relationship("InvoiceLine", back_populates="invoice")
 
     __table_args__ = (Index("ix_invoice_code", "invoice_number"),)
@@ -1884,7 +2009,6 @@ class GeneratedDocument(Base, TimestampMixin):
         String(20),
         nullable=False,
         default=GeneratedDocumentStatus.PENDING.value,
-        index=True,
     )
     template_name = Column(String(200), nullable=False)
     pdf_path = Column(String(500), nullable=True)  # Relative or absolute path to PDF
@@ -1905,6 +2029,15 @@ class GeneratedDocument(Base, TimestampMixin):
     )
     # Job id when using queue (e.g. RQ job id)
     job_id = Column(String(100), nullable=True, index=True)
+    # Render caches: hash of template + context, and whether the PDF was reused
+    # (output cache) / the parsed template came from memory (template cache)
+    content_hash = Column(String(64), nullable=True, index=True)
+    cache_hit = Column(Boolean, nullable=True)
+    template_cache_hit = Column(Boolean, nullable=True)
+    # PDF present on disk: set on completion, re-checked by
+    # scripts/verify_generated_documents.py so order lists need not stat files
+    pdf_exists = Column(Boolean, nullable=True)
+    file_checked_at = Column(DateTime, nullable=True)
     # Note: created_at, updated_at from TimestampMixin
 
     contact = relationship("Contact", foreign_keys=[contact_id])
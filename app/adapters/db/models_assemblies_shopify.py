@@ -104,6 +104,32 @@ class AssemblyCostDependency(Base):
     consumed_txn = relationship("InventoryTxn", foreign_keys=[consumed_txn_id])
     produced_txn = relationship("InventoryTxn", foreign_keys=[produced_txn_id])
 
+    # Both directions are walked: consumed -> produced for revaluation fan-out,
+    # produced -> consumed to recompute a produced lot from all of its inputs.
+    __table_args__ = (
+        Index("ix_assembly_cost_dep_consumed", "consumed_lot_id", "produced_lot_id"),
+        Index("ix_assembly_cost_dep_produced", "produced_lot_id"),
+    )
+
+
+class CostRevaluationQueue(Base):
+    """Lots whose cost changed and still need downstream propagation."""
+
+    __tablename__ = "cost_revaluation_queue"
+
+    id = uuid_column()
+    source_lot_id = Column(
+        String(36),
+        ForeignKey("inventory_lots.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    reason = Column(Text, nullable=False)
+    revalued_by = Column(String(100), nullable=False)
+    queued_at = Column(DateTime, nullable=False)
+    # Note: No AuditMixin - work queue rows are deleted once propagated
+
+    __table_args__ = (Index("ix_cost_revaluation_queue_queued", "queued_at"),)
+
 
 class QualityTestDefinition(Base, AuditMixin):
     """Quality test definitions - reusable test templates."""
@@ -177,6 +203,10 @@ class ProductChannelLink(Base, AuditMixin):
     shopify_product_id = Column(String(64), nullable=True)
     shopify_variant_id = Column(String(64), nullable=True)
     shopify_location_id = Column(String(64), nullable=True)
+    # Push state: reconcile only sends levels that differ from the last push
+    shopify_inventory_item_id = Column(String(64), nullable=True)
+    last_pushed_available = Column(Integer, nullable=True)
+    last_pushed_at = Column(DateTime, nullable=True)
 
     product = relationship("Product")
     # Note: created_at, updated_at, deleted_at, deleted_by, version, versioned_at,
@@ -199,3 +229,59 @@ class InventoryReservation(Base, AuditMixin):
     # Note: created_at, updated_at, deleted_at, deleted_by, version, versioned_at,
     # versioned_by, previous_version_id, archived_at, archived_by are provided by AuditMixin
     product = relationship("Product")
+
+
+class ShopifyWebhookInbox(Base):
+    """Verified Shopify webhooks awaiting (or done with) background processing."""
+
+    __tablename__ = "shopify_webhook_inbox"
+
+    id = uuid_column()
+    # X-Shopify-Webhook-Id, or topic/order id/body hash when the header is absent
+    idempotency_key = Column(String(128), nullable=False, unique=True)
+    topic = Column(String(64), nullable=False)
+    order_id = Column(String(64), nullable=False)
+    payload = Column(Text, nullable=False)
+    status = Column(
+        String(16), nullable=False, default="PENDING"
+    )  # PENDING|PROCESSING|DONE|COALESCED|FAILED
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    claimed_by = Column(String(36), nullable=True)
+    received_at = Column(DateTime, nullable=False)
+    claimed_at = Column(DateTime, nullable=True)
+    processed_at = Column(DateTime, nullable=True)
+    # Note: No AuditMixin - processed rows are purged after the retention window
+
+    __table_args__ = (
+        Index("ix_shopify_webhook_inbox_status_received", "status", "received_at"),
+        Index("ix_shopify_webhook_inbox_order_received", "order_id", "received_at"),
+    )
+
+
+class ShopifyImportCheckpoint(Base):
+    """Progress of a paged Shopify order import, so an interrupted run resumes."""
+
+    __tablename__ = "shopify_import_checkpoints"
+
+    id = uuid_column()
+    job_key = Column(String(128), nullable=False, unique=True)  # e.g. historical:*:*
+    since_date = Column(DateTime, nullable=True)
+    until_date = Column(DateTime, nullable=True)
+    # Link-header page_info of the next page still to import (NULL: from the start)
+    next_page_info = Column(Text, nullable=True)
+    status = Column(
+        String(16), nullable=False, default="RUNNING"
+    )  # RUNNING|COMPLETED|FAILED
+    pages = Column(Integer, nullable=False, default=0)
+    orders_seen = Column(Integer, nullable=False, default=0)
+    created_count = Column(Integer, nullable=False, default=0)
+    existing_count = Column(Integer, nullable=False, default=0)
+    error_count = Column(Integer, nullable=False, default=0)
+    last_order_id = Column(String(64), nullable=True)
+    # JSON list of Shopify order ids that failed to import, retried next run
+    failed_order_ids = Column(Text, nullable=True)
+    last_error = Column(Text, nullable=True)
+    started_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+    completed_at = Column(DateTime, nullable=True)
@@ -1,38 +1,107 @@
 # app/adapters/db/session.py
-"""Database engine & session management."""
+"""Database engine & session management.
+
+Two engines share one configuration: the read/write engine behind ``get_db`` /
+``get_session`` and a read-only engine behind ``get_read_db`` /
+``get_read_session`` for reporting queries. SQLite file databases run in WAL mode,
+so readers on the read-only pool never wait on a writer.
+"""
 
 from __future__ import annotations
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import QueuePool, StaticPool
 
 from app.adapters.db.base import Base
 from app.settings import settings
 
 
-def get_engine(echo: bool | None = None):
-    url = settings.database.database_url
+def _is_sqlite_memory(url: str) -> bool:
+    parsed = make_url(url)
+    database = parsed.database or ""
+    return database in ("", ":memory:") or "mode=memory" in str(parsed)
+
+
+def _sqlite_pragmas(read_only: bool) -> list[str]:
+    cfg = settings.database
+    pragmas = [f"PRAGMA busy_timeout={cfg.sqlite_busy_timeout_ms}"]
+    if cfg.sqlite_wal:
+        pragmas.append("PRAGMA journal_mode=WAL")
+    pragmas += [
+        f"PRAGMA synchronous={cfg.sqlite_synchronous}",
+        # Negative cache_size is in KiB rather than pages.
+        f"PRAGMA cache_size=-{cfg.sqlite_cache_size_kib}",
+        f"PRAGMA mmap_size={cfg.sqlite_mmap_size}",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only=ON")
+    return pragmas
+
+
+def _install_connect_hook(engine, statements: list[str]) -> None:
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+
+def get_engine(
+    echo: bool | None = None, url: str | None = None, read_only: bool = False
+):
+    """Create an engine for ``url`` (default: ``settings.database.database_url``).
+
+    SQLite file databases get a thread-safe connection pool and the WAL /
+    synchronous / busy_timeout / cache / mmap pragmas from DatabaseSettings;
+    in-memory SQLite keeps a single shared connection. Other backends use every
+    pool setting. ``read_only`` connections reject writes.
+    """
+    cfg = settings.database
+    url = url or cfg.database_url
     kw = {
         "echo": False if echo is None else echo,
         "pool_pre_ping": True,
     }
+    pool_kw = {
+        "pool_size": cfg.pool_size,
+        "max_overflow": cfg.max_overflow,
+        "pool_timeout": cfg.pool_timeout,
+        "pool_recycle": cfg.pool_recycle,
+    }
     if url.startswith("sqlite"):
-        kw.update(
-            {"poolclass": StaticPool, "connect_args": {"check_same_thread": False}}
-        )
-    else:
-        kw.update(
-            {
-                "pool_size": settings.database.pool_size,
-                "max_overflow": settings.database.max_overflow,
-            }
-        )
-    return create_engine(url, **kw)
+        kw["connect_args"] = {"check_same_thread": False}
+        if _is_sqlite_memory(url):
+            # Every connection to :memory: is a separate database; share one.
+            kw["poolclass"] = StaticPool
+            engine = create_engine(url, **kw)
+            if read_only:
+                _install_connect_hook(engine, ["PRAGMA query_only=ON"])
+            return engine
+        kw["poolclass"] = QueuePool
+        kw.update(pool_kw)
+        engine = create_engine(url, **kw)
+        _install_connect_hook(engine, _sqlite_pragmas(read_only))
+        return engine
+
+    kw.update(pool_kw)
+    engine = create_engine(url, **kw)
+    if read_only and engine.dialect.name == "postgresql":
+        # The dialect sets the driver's read-only flag on every checkout; a SET
+        # in the connect hook would run inside the driver's implicit
+        # transaction and be undone by the pool's reset-on-return rollback.
+        engine.update_execution_options(postgresql_readonly=True)
+    return engine
 
 
 _engine = None
 _SessionLocal = None
+_read_engine = None
+_ReadSessionLocal = None
 
 
 def _lazy_init():
@@ -43,6 +112,28 @@ def _lazy_init():
         _SessionLocal = sessionmaker(bind=_engine, autoflush=False, autocommit=False)
 
 
+def _lazy_init_read():
+    global _read_engine, _ReadSessionLocal
+    if _read_engine is None:
+        url = settings.database.read_database_url or settings.database.database_url
+        if url.startswith("sqlite") and _is_sqlite_memory(url):
+            # A second in-memory engine would be a different, empty database.
+            _lazy_init()
+            _read_engine = _engine
+        else:
+            _read_engine = get_engine(url=url, read_only=True)
+    if _ReadSessionLocal is None:
+        _ReadSessionLocal = sessionmaker(
+            bind=_read_engine, autoflush=False, autocommit=False
+        )
+
+
+def get_read_engine():
+    """Engine for read-only reporting queries."""
+    _lazy_init_read()
+    return _read_engine
+
+
 def get_session():
     """
     Create and return a database session.
@@ -64,6 +155,12 @@ def get_session():
     return _SessionLocal()
 
 
+def get_read_session():
+    """Create a session on the read-only engine (see get_session for cleanup)."""
+    _lazy_init_read()
+    return _ReadSessionLocal()
+
+
 def get_db():
     _lazy_init()
     db = _SessionLocal()
@@ -73,6 +170,16 @@ def get_db():
         db.close()
 
 
+def get_read_db():
+    """FastAPI dependency for report endpoints that never write."""
+    _lazy_init_read()
+    db = _ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
 def create_tables():
     _lazy_init()
     Base.metadata.create_all(bind=_engine)
@@ -0,0 +1,54 @@
+# app/adapters/db/upsert.py
+"""INSERT ... ON CONFLICT DO UPDATE for the dialects the app runs on."""
+
+from __future__ import annotations
+
+from typing import Any, Optional, Sequence
+
+from sqlalchemy import Table
+from sqlalchemy.orm import Session
+
+
+def _dialect_insert(bind):
+    engine = bind.get_bind() if isinstance(bind, Session) else bind
+    name = engine.dialect.name
+    if name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"upsert is not supported on {name}")
+    return insert
+
+
+def upsert(
+    bind,
+    table: Table,
+    index_elements: Sequence[Any],
+    *,
+    rows: Optional[list[dict]] = None,
+    columns: Optional[Sequence[str]] = None,
+    select=None,
+) -> None:
+    """Insert ``rows`` (or ``select`` into ``columns``), updating on key conflict.
+
+    ``index_elements`` must match a primary key or unique index of ``table``;
+    every other inserted column is overwritten on conflict, so concurrent
+    writers to the same key serialize on the row instead of colliding.
+    """
+    if select is None and not rows:
+        return
+    stmt = _dialect_insert(bind)(table)
+    if select is not None:
+        stmt = stmt.from_select(list(columns), select)
+    else:
+        columns = list(rows[0])
+    keys = {getattr(el, "name", el) for el in index_elements}
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(index_elements),
+        set_={name: stmt.excluded[name] for name in columns if name not in keys},
+    )
+    if rows:
+        bind.execute(stmt, rows)
+    else:
+        bind.execute(stmt)
@@ -1,16 +1,29 @@
+import asyncio
 import time
 from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, urlparse
 
+import httpx
 import requests
 
 from app.settings import settings
 
+API_VERSION = "2024-10"
+CALL_LIMIT_HEADER = "X-Shopify-Shop-Api-Call-Limit"
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def _link_page_info(link: Dict[str, str]) -> Optional[str]:
+    """page_info cursor of a parsed Link header entry (``response.links``)."""
+    values = parse_qs(urlparse(link.get("url", "")).query).get("page_info")
+    return values[0] if values else None
+
 
 class ShopifyClient:
     def __init__(self, store: str | None = None, token: str | None = None):
         self.store = store or str(settings.shopify.store).rstrip("/")
         self.token = token or settings.shopify.access_token
-        self.base_url = f"{self.store}/admin/api/2024-10"
+        self.base_url = f"{self.store}/admin/api/{API_VERSION}"
 
     def _headers(self) -> Dict[str, str]:
         return {
@@ -88,6 +101,7 @@ class ShopifyClient:
         status: Optional[str] = None,
         limit: int = 250,
         since_id: Optional[str] = None,
+        page_info: Optional[str] = None,
     ) -> Dict[str, Any]:
         """
         Fetch orders from Shopify REST API.
@@ -98,30 +112,38 @@ class ShopifyClient:
             status: Order status filter (open, closed, cancelled, any)
             limit: Number of orders per page (max 250)
             since_id: Fetch orders with ID greater than this value (for pagination)
+            page_info: Cursor from a previous page's ``next_page_info``; the
+                filters of the first request are carried in it and ignored here
 
         Returns:
-            Dictionary with 'orders' list and pagination info
+            Dictionary with 'orders' list and pagination info ('next_page_info'
+            from the Link header, None on the last page)
         """
         url = f"{self.base_url}/orders.json"
         params: Dict[str, Any] = {"limit": min(limit, 250)}
 
-        if created_at_min:
-            params["created_at_min"] = created_at_min
-        if created_at_max:
-            params["created_at_max"] = created_at_max
-        if status:
-            params["status"] = status
-        if since_id:
-            params["since_id"] = since_id
+        if page_info:
+            params["page_info"] = page_info
+        else:
+            if created_at_min:
+                params["created_at_min"] = created_at_min
+            if created_at_max:
+                params["created_at_max"] = created_at_max
+            if status:
+                params["status"] = status
+            if since_id:
+                params["since_id"] = since_id
 
         response = requests.get(url, headers=self._headers(), params=params)
 
         if response.status_code == 200:
             data = response.json()
+            next_page_info = _link_page_info(response.links.get("next", {}))
             return {
                 "ok": True,
                 "orders": data.get("orders", []),
-                "has_next": len(data.get("orders", [])) == limit,
+                "has_next": next_page_info is not None,
+                "next_page_info": next_page_info,
             }
         else:
             return {
@@ -148,3 +170,166 @@ class ShopifyClient:
             data = response.json()
             return data.get("order")
         return None
+
+
+class ShopifyCallLimiter:
+    """Client-side mirror of Shopify's REST leaky bucket.
+
+    Each request takes one slot; slots leak at ``leak_rate`` per second. The
+    fill Shopify reports in ``X-Shopify-Shop-Api-Call-Limit`` ("used/size")
+    corrects the local estimate, and a 429 pauses every caller for its
+    Retry-After. ``headroom`` slots are left free for other apps and webhooks.
+    """
+
+    def __init__(self, size: int, leak_rate: float, headroom: int = 2):
+        self.size = size
+        self.leak_rate = leak_rate
+        self.headroom = headroom
+        self._used = 0.0
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _leak(self) -> float:
+        now = time.monotonic()
+        self._used = max(0.0, self._used - (now - self._updated) * self.leak_rate)
+        self._updated = now
+        return now
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = self._leak()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                capacity = max(1, self.size - self.headroom)
+                if self._used + 1 <= capacity:
+                    self._used += 1
+                    return
+                await asyncio.sleep((self._used + 1 - capacity) / self.leak_rate)
+
+    def observe(self, header: Optional[str]) -> None:
+        """Sync with the bucket fill Shopify reported on a response."""
+        try:
+            used, size = (int(part) for part in (header or "").split("/"))
+        except ValueError:
+            return
+        self._leak()
+        self.size = size
+        self._used = max(self._used, float(used))
+
+    def pause(self, seconds: float) -> None:
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class AsyncShopifyInventoryClient:
+    """Pooled async client for bulk inventory pushes.
+
+    One keep-alive connection pool is shared by all requests, which are paced
+    by a :class:`ShopifyCallLimiter` and retried on 429/5xx. Use as an async
+    context manager.
+    """
+
+    def __init__(
+        self,
+        store: str | None = None,
+        token: str | None = None,
+        *,
+        max_connections: Optional[int] = None,
+        limiter: Optional[ShopifyCallLimiter] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        config = settings.shopify
+        self.store = store or str(config.store).rstrip("/")
+        self.token = token or config.access_token
+        self.base_url = f"{self.store}/admin/api/{API_VERSION}"
+        self.max_connections = max_connections or config.push_concurrency
+        self.max_retries = config.api_max_retries
+        self.limiter = limiter or ShopifyCallLimiter(
+            config.api_bucket_size, config.api_leak_rate
+        )
+        self.request_count = 0
+        self.throttled_count = 0
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def __aenter__(self) -> "AsyncShopifyInventoryClient":
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={
+                "X-Shopify-Access-Token": self.token,
+                "Content-Type": "application/json",
+                "Accept": "application/json",
+            },
+            timeout=settings.shopify.api_timeout_seconds,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+            ),
+            transport=self._transport,
+        )
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire()
+            self.request_count += 1
+            try:
+                response = await self._client.request(method, path, **kwargs)
+            except httpx.TransportError:
+                if attempt >= self.max_retries:
+                    raise
+                await asyncio.sleep(min(1.0 * (2**attempt), 10.0))
+                continue
+            self.limiter.observe(response.headers.get(CALL_LIMIT_HEADER))
+            if (
+                response.status_code not in _RETRY_STATUSES
+                or attempt >= self.max_retries
+            ):
+                return response
+            delay = min(1.0 * (2**attempt), 10.0)
+            if response.status_code == 429:
+                self.throttled_count += 1
+                try:
+                    delay = float(response.headers.get("Retry-After", delay))
+                except ValueError:
+                    pass
+                self.limiter.pause(delay)
+            else:
+                await asyncio.sleep(delay)
+        return response
+
+    async def get_inventory_item_id(self, variant_id: str) -> Optional[str]:
+        response = await self._request("GET", f"/variants/{variant_id}.json")
+        if response.status_code == 200:
+            item_id = response.json().get("variant", {}).get("inventory_item_id")
+            return str(item_id) if item_id else None
+        return None
+
+    async def set_inventory_level(
+        self, inventory_item_id: str, location_id: str, available: int
+    ) -> Dict[str, Any]:
+        payload = {
+            "location_id": location_id,
+            "inventory_item_id": inventory_item_id,
+            "available": available,
+        }
+        try:
+            response = await self._request(
+                "POST", "/inventory_levels/set.json", json=payload
+            )
+        except httpx.TransportError as exc:
+            return {"ok": False, "error": str(exc)}
+        if response.status_code in [200, 201]:
+            return {"ok": True, "response": response.json()}
+        return {
+            "ok": False,
+            "error": response.text,
+            "status_code": response.status_code,
+        }
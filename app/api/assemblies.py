@@ -35,7 +35,7 @@ class AssembleReq(BaseModel):
 
 
 @router.get("/", response_model=List[AssemblyResponse])
-async def list_assemblies(
+def list_assemblies(
     product_id: Optional[str] = Query(None, description="Filter by parent product ID"),
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
     db: Session = Depends(get_db),
@@ -58,7 +58,7 @@ def batch_to_response(batch: Batch) -> BatchResponse:
 
 
 @router.post("/", response_model=BatchResponse, status_code=status.HTTP_201_CREATED)
-async def create_batch(batch_data: BatchCreate, db: Session = Depends(get_db)):
+def create_batch(batch_data: BatchCreate, db: Session = Depends(get_db)):
     """Create a new batch."""
     # Validate work order exists
     work_order = db.get(WorkOrder, batch_data.work_order_id)
@@ -101,7 +101,7 @@ async def create_batch(batch_data: BatchCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/{batch_id}", response_model=BatchResponse)
-async def get_batch(batch_id: str, db: Session = Depends(get_db)):
+def get_batch(batch_id: str, db: Session = Depends(get_db)):
     """Get batch by ID."""
     batch = db.get(Batch, batch_id)
     if not batch:
@@ -117,7 +117,7 @@ async def get_batch(batch_id: str, db: Session = Depends(get_db)):
     response_model=BatchComponentResponse,
     status_code=status.HTTP_201_CREATED,
 )
-async def add_batch_component(
+def add_batch_component(
     batch_id: str, component_data: BatchComponentCreate, db: Session = Depends(get_db)
 ):
     """Add a component to a batch."""
@@ -195,7 +195,7 @@ async def add_batch_component(
 
 
 @router.post("/{batch_id}/finish", response_model=BatchResponse)
-async def finish_batch(
+def finish_batch(
     batch_id: str, finish_data: BatchFinishRequest, db: Session = Depends(get_db)
 ):
     """Finish a batch (create FG or WIP lot and mark as COMPLETED)."""
@@ -232,7 +232,7 @@ async def finish_batch(
 
 
 @router.get("/{batch_id}/print", response_model=PrintResponse)
-async def print_batch(
+def print_batch(
     batch_id: str,
     format: str = Query("text", regex="^(text|pdf)$"),
     db: Session = Depends(get_db),
@@ -260,7 +260,7 @@ async def print_batch(
 
 
 @router.put("/{batch_id}/record-actual", response_model=BatchResponse)
-async def record_actual_batch(
+def record_actual_batch(
     batch_id: str, actual_data: dict, db: Session = Depends(get_db)
 ):
     """
@@ -292,7 +292,7 @@ async def record_actual_batch(
 
 
 @router.put("/{batch_id}/qc-results", response_model=BatchResponse)
-async def record_qc_results(
+def record_qc_results(
     batch_id: str, qc_data: dict, db: Session = Depends(get_db)
 ):
     """
@@ -324,7 +324,7 @@ async def record_qc_results(
 
 
 @router.get("/history/", response_model=List[BatchResponse])
-async def get_batch_history(
+def get_batch_history(
     year: Optional[str] = None,
     formula_code: Optional[str] = None,
     status: Optional[str] = None,
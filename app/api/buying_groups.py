@@ -53,7 +53,7 @@ def _to_response(group: BuyingGroup) -> BuyingGroupResponse:
 
 
 @router.get("/", response_model=List[BuyingGroupResponse])
-async def list_buying_groups(
+def list_buying_groups(
     skip: int = 0,
     limit: int = 200,
     query: Optional[str] = None,
@@ -73,7 +73,7 @@ async def list_buying_groups(
 
 
 @router.get("/{group_id}", response_model=BuyingGroupResponse)
-async def get_buying_group(group_id: str, db: Session = Depends(get_db)):
+def get_buying_group(group_id: str, db: Session = Depends(get_db)):
     group = db.get(BuyingGroup, group_id)
     if not group or group.deleted_at is not None:
         raise HTTPException(
@@ -85,7 +85,7 @@ async def get_buying_group(group_id: str, db: Session = Depends(get_db)):
 @router.post(
     "/", response_model=BuyingGroupResponse, status_code=status.HTTP_201_CREATED
 )
-async def create_buying_group(data: BuyingGroupCreate, db: Session = Depends(get_db)):
+def create_buying_group(data: BuyingGroupCreate, db: Session = Depends(get_db)):
     existing = db.execute(
         select(BuyingGroup).where(
             BuyingGroup.code == data.code, BuyingGroup.deleted_at.is_(None)
@@ -110,7 +110,7 @@ async def create_buying_group(data: BuyingGroupCreate, db: Session = Depends(get
 
 
 @router.put("/{group_id}", response_model=BuyingGroupResponse)
-async def update_buying_group(
+def update_buying_group(
     group_id: str, data: BuyingGroupUpdate, db: Session = Depends(get_db)
 ):
     group = db.get(BuyingGroup, group_id)
@@ -146,7 +146,7 @@ async def update_buying_group(
 
 
 @router.delete("/{group_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_buying_group(group_id: str, db: Session = Depends(get_db)):
+def delete_buying_group(group_id: str, db: Session = Depends(get_db)):
     from app.services.audit import soft_delete
 
     group = db.get(BuyingGroup, group_id)
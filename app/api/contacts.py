@@ -199,7 +199,7 @@ def contact_to_response(c: Contact) -> ContactResponse:
 
 
 @router.get("/", response_model=List[ContactResponse])
-async def list_contacts(
+def list_contacts(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     code: Optional[str] = None,
@@ -240,7 +240,7 @@ async def list_contacts(
 
 
 @router.get("/{contact_id}", response_model=ContactResponse)
-async def get_contact(contact_id: str, db: Session = Depends(get_db)):
+def get_contact(contact_id: str, db: Session = Depends(get_db)):
     """Get contact by ID."""
     contact = db.get(Contact, contact_id)
     if not contact or contact.deleted_at is not None:
@@ -252,7 +252,7 @@ async def get_contact(contact_id: str, db: Session = Depends(get_db)):
 
 
 @router.post("/", response_model=ContactResponse, status_code=status.HTTP_201_CREATED)
-async def create_contact(contact_data: ContactCreate, db: Session = Depends(get_db)):
+def create_contact(contact_data: ContactCreate, db: Session = Depends(get_db)):
     """Create a new contact."""
     import uuid
 
@@ -317,7 +317,7 @@ async def create_contact(contact_data: ContactCreate, db: Session = Depends(get_
 
 
 @router.put("/{contact_id}", response_model=ContactResponse)
-async def update_contact(
+def update_contact(
     contact_id: str, contact_data: ContactUpdate, db: Session = Depends(get_db)
 ):
     """Update contact."""
@@ -410,7 +410,7 @@ async def update_contact(
 
 
 @router.delete("/{contact_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_contact(contact_id: str, db: Session = Depends(get_db)):
+def delete_contact(contact_id: str, db: Session = Depends(get_db)):
     """Soft delete contact (marks as deleted, does not remove from database)."""
     from app.services.audit import soft_delete
 
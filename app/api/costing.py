@@ -27,6 +27,11 @@ class RevaluationRequest(BaseModel):
     propagate: bool = Field(
         True, description="Whether to propagate to downstream assemblies"
     )
+    defer_propagation: bool = Field(
+        False,
+        description="Queue downstream propagation for the revaluation job "
+        "instead of running it in the request",
+    )
 
 
 class RevaluationResponse(BaseModel):
@@ -74,12 +79,41 @@ class COGSInspectionResponse(BaseModel):
     breakdown: COGSBreakdownItem
 
 
+class CostRollupRequest(BaseModel):
+    """Request to roll up costs for many products."""
+
+    product_ids: List[str] = Field(..., min_length=1, description="Products to cost")
+    as_of_date: Optional[datetime] = Field(
+        None, description="Point-in-time date for historical costing"
+    )
+
+
+class CostRollupItem(BaseModel):
+    """Rolled-up unit cost for one product."""
+
+    item_id: str
+    sku: str
+    name: str
+    product_type: str
+    unit_cost: Decimal
+    cost_source: str
+    has_estimate: bool
+    estimate_reason: Optional[str] = None
+
+
+class CostRollupResponse(BaseModel):
+    """Response from a bulk cost roll-up."""
+
+    items: List[CostRollupItem]
+    missing: List[str] = []
+
+
 # Allow forward references
 COGSBreakdownItem.model_rebuild()
 
 
 @router.get("/inspect/{item_id}", response_model=COGSInspectionResponse)
-async def inspect_cogs(
+def inspect_cogs(
     item_id: str,
     as_of_date: Optional[datetime] = Query(
         None, description="Point-in-time date for historical costing"
@@ -122,7 +156,7 @@ async def inspect_cogs(
 
 
 @router.get("/breakdown/{item_id}", response_model=COGSBreakdownItem)
-async def get_cogs_breakdown(
+def get_cogs_breakdown(
     item_id: str,
     as_of_date: Optional[datetime] = Query(
         None, description="Point-in-time date for historical costing"
@@ -164,10 +198,38 @@ async def get_cogs_breakdown(
         )
 
 
+@router.post("/rollup", response_model=CostRollupResponse)
+def rollup_costs(request: CostRollupRequest, db: Session = Depends(get_db)):
+    """
+    Roll up unit costs for many products in one pass over the assembly graph.
+
+    Returns:
+        Costs in request order plus any product IDs that were not found
+    """
+    try:
+        service = CostingService(db)
+        costs = service.rollup_costs(request.product_ids, request.as_of_date)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to roll up costs: {str(e)}",
+        )
+
+    ids = list(dict.fromkeys(request.product_ids))
+    return CostRollupResponse(
+        items=[CostRollupItem(**costs[pid]) for pid in ids if pid in costs],
+        missing=[pid for pid in ids if pid not in costs],
+    )
+
+
 @router.post(
     "/revalue", response_model=RevaluationResponse, status_code=status.HTTP_201_CREATED
 )
-async def revalue_lot(request: RevaluationRequest, db: Session = Depends(get_db)):
+def revalue_lot(request: RevaluationRequest, db: Session = Depends(get_db)):
     """
     Revalue a lot and optionally propagate to downstream assemblies.
 
@@ -182,6 +244,7 @@ async def revalue_lot(request: RevaluationRequest, db: Session = Depends(get_db)
             reason=request.reason,
             revalued_by=request.revalued_by,
             propagate=request.propagate,
+            defer=request.defer_propagation,
         )
 
         db.commit()
@@ -213,7 +276,7 @@ async def revalue_lot(request: RevaluationRequest, db: Session = Depends(get_db)
 
 
 @router.get("/current/{item_id}")
-async def get_current_cost(item_id: str, db: Session = Depends(get_db)):
+def get_current_cost(item_id: str, db: Session = Depends(get_db)):
     """
     Get current cost for a product.
 
@@ -240,7 +303,7 @@ async def get_current_cost(item_id: str, db: Session = Depends(get_db)):
 
 
 @router.get("/historical/{item_id}")
-async def get_historical_cost(
+def get_historical_cost(
     item_id: str,
     as_of_date: datetime = Query(
         ..., description="Point-in-time date for historical costing"
@@ -273,7 +336,7 @@ async def get_historical_cost(
 
 
 @router.get("/tree/{item_id}")
-async def print_cogs_tree(
+def print_cogs_tree(
     item_id: str,
     as_of_date: Optional[datetime] = Query(
         None, description="Point-in-time date for historical costing"
@@ -266,7 +266,7 @@ def register_crm_extra_routes(router: APIRouter) -> None:
         response_model=AttachmentResponse,
         status_code=status.HTTP_201_CREATED,
     )
-    async def upload_attachment(
+    def upload_attachment(
         customer_id: str,
         file: UploadFile = File(...),
         activity_id: Optional[str] = Form(None),
@@ -279,7 +279,7 @@ def register_crm_extra_routes(router: APIRouter) -> None:
             act = db.get(CrmActivity, activity_id)
             if not act or act.deleted_at is not None:
                 raise HTTPException(status_code=400, detail="Invalid activity")
-        data = await file.read()
+        data = file.file.read()
         if not data:
             raise HTTPException(status_code=400, detail="Empty file")
         ext = Path(file.filename or "upload").suffix or ".jpg"
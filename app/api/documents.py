@@ -14,7 +14,7 @@ from app.adapters.db import get_db
 from app.adapters.db.models import GeneratedDocument
 from app.documents.contracts import DocumentOverrides
 from app.documents.repository import get_document
-from app.documents.service import DocumentGenerationService
+from app.documents.service import BatchDocumentRequest, DocumentGenerationService
 
 router = APIRouter(prefix="/documents", tags=["documents"])
 
@@ -103,6 +103,9 @@ class DocumentMetadataResponse(BaseModel):
     sales_order_id: Optional[str]
     delivery_docket_id: Optional[str]
     job_id: Optional[str]
+    content_hash: Optional[str] = None
+    cache_hit: Optional[bool] = None
+    template_cache_hit: Optional[bool] = None
     created_at: datetime
 
     class Config:
@@ -135,6 +138,57 @@ class JobStatusResponse(BaseModel):
     error_message: Optional[str] = None
 
 
+class BatchItemSchema(BaseModel):
+    """One document in POST /documents/batch."""
+
+    template_name: str = Field(
+        ..., description="Template filename or key (e.g. Delivery_Docket.docx)"
+    )
+    doc_type: str = Field(
+        default="delivery_docket", description="doc_type for naming and context"
+    )
+    doc_number: Optional[str] = Field(
+        None, description="Override doc number; otherwise from quote/docket"
+    )
+    quote_id: Optional[str] = Field(None, description="SalesOrder id to use as quote")
+    delivery_docket_id: Optional[str] = Field(None, description="DeliveryDocket id")
+
+
+class BatchGenerateRequest(BaseModel):
+    """Request body for POST /documents/batch."""
+
+    items: List[BatchItemSchema] = Field(..., min_length=1, max_length=500)
+    overrides: Optional[DocumentOverridesSchema] = None
+    merge: bool = Field(
+        default=False, description="Also produce one merged, print-ready PDF"
+    )
+    output_docx: Optional[bool] = Field(
+        None, description="Also save DOCX; default from settings"
+    )
+
+
+class BatchDocumentResponse(BaseModel):
+    """Outcome for one batch item; document is None when no record was created."""
+
+    delivery_docket_id: Optional[str] = None
+    quote_id: Optional[str] = None
+    document: Optional[DocumentMetadataResponse] = None
+    download_url: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BatchGenerateResponse(BaseModel):
+    """Response for POST /documents/batch."""
+
+    batch_id: str
+    completed: int
+    failed: int
+    documents: List[BatchDocumentResponse]
+    merged: Optional[DocumentMetadataResponse] = None
+    merged_download_url: Optional[str] = None
+    merge_error: Optional[str] = None
+
+
 def _overrides_from_schema(
     s: Optional[DocumentOverridesSchema],
 ) -> Optional[DocumentOverrides]:
@@ -165,6 +219,9 @@ def _doc_to_metadata(doc: GeneratedDocument) -> DocumentMetadataResponse:
         sales_order_id=doc.sales_order_id,
         delivery_docket_id=doc.delivery_docket_id,
         job_id=doc.job_id,
+        content_hash=doc.content_hash,
+        cache_hit=doc.cache_hit,
+        template_cache_hit=doc.template_cache_hit,
         created_at=doc.created_at,
     )
 
@@ -175,7 +232,7 @@ def _doc_to_metadata(doc: GeneratedDocument) -> DocumentMetadataResponse:
 
 
 @router.post("/generate", response_model=GenerateResponse | JobEnqueueResponse)
-async def generate_document(
+def generate_document(
     body: GenerateRequest,
     db: Session = Depends(get_db),
 ):
@@ -246,8 +303,68 @@ async def generate_document(
     )
 
 
+@router.post("/batch", response_model=BatchGenerateResponse)
+def generate_documents_batch(
+    body: BatchGenerateRequest,
+    db: Session = Depends(get_db),
+):
+    """
+    Generate documents for many delivery dockets / quotes in one call.
+    Each item gets its own GeneratedDocument (job_id = batch_id) and its own error;
+    one failing item does not fail the batch. merge=true also returns a single
+    merged PDF, downloadable via GET /documents/{merged.id}/download.
+    """
+    svc = DocumentGenerationService(db)
+    batch = svc.generate_batch(
+        [
+            BatchDocumentRequest(
+                template_name=item.template_name,
+                doc_type=item.doc_type,
+                delivery_docket_id=item.delivery_docket_id,
+                quote_id=item.quote_id,
+                doc_number=item.doc_number,
+            )
+            for item in body.items
+        ],
+        overrides=_overrides_from_schema(body.overrides),
+        merge=body.merge,
+        output_docx=body.output_docx,
+    )
+    documents = []
+    for result in batch.results:
+        doc = result.document
+        documents.append(
+            BatchDocumentResponse(
+                delivery_docket_id=result.request.delivery_docket_id,
+                quote_id=result.request.quote_id,
+                document=_doc_to_metadata(doc) if doc else None,
+                download_url=(
+                    f"/api/v1/documents/{doc.id}/download"
+                    if doc and not result.error
+                    else None
+                ),
+                error=result.error or None,
+            )
+        )
+    completed = sum(1 for d in documents if d.error is None)
+    merged = batch.merged
+    return BatchGenerateResponse(
+        batch_id=batch.batch_id,
+        completed=completed,
+        failed=len(documents) - completed,
+        documents=documents,
+        merged=_doc_to_metadata(merged) if merged else None,
+        merged_download_url=(
+            f"/api/v1/documents/{merged.id}/download"
+            if merged and not batch.merge_error
+            else None
+        ),
+        merge_error=batch.merge_error or None,
+    )
+
+
 @router.get("/{document_id}", response_model=DocumentMetadataResponse)
-async def get_document_metadata(
+def get_document_metadata(
     document_id: str,
     db: Session = Depends(get_db),
 ):
@@ -262,7 +379,7 @@ async def get_document_metadata(
 
 
 @router.get("/{document_id}/download")
-async def download_document(
+def download_document(
     document_id: str,
     inline: bool = Query(
         False, description="Display in browser (inline) instead of download"
@@ -299,7 +416,7 @@ async def download_document(
 
 
 @router.get("/jobs/{job_id}", response_model=JobStatusResponse)
-async def get_job_status(
+def get_job_status(
     job_id: str,
     db: Session = Depends(get_db),
 ):
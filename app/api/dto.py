@@ -725,6 +725,12 @@ class WorkOrderIssueRequest(BaseModel):
     uom: Optional[str] = None
 
 
+class WorkOrderBulkIssueRequest(BaseModel):
+    """Issue several materials in one request."""
+
+    issues: List[WorkOrderIssueRequest] = Field(..., min_length=1)
+
+
 class WorkOrderQcRequest(BaseModel):
     """Record QC test request."""
 
@@ -67,7 +67,7 @@ def excise_rate_to_response(rate: ExciseRate) -> ExciseRateResponse:
 
 
 @router.get("/", response_model=List[ExciseRateResponse])
-async def list_excise_rates(
+def list_excise_rates(
     skip: int = 0,
     limit: int = 100,
     as_of_date: Optional[datetime] = None,
@@ -101,7 +101,7 @@ async def list_excise_rates(
 
 
 @router.get("/current", response_model=ExciseRateResponse)
-async def get_current_excise_rate(
+def get_current_excise_rate(
     as_of_date: Optional[datetime] = None, db: Session = Depends(get_db)
 ):
     """
@@ -138,7 +138,7 @@ async def get_current_excise_rate(
 
 
 @router.get("/{rate_id}", response_model=ExciseRateResponse)
-async def get_excise_rate(rate_id: str, db: Session = Depends(get_db)):
+def get_excise_rate(rate_id: str, db: Session = Depends(get_db)):
     """Get excise rate by ID."""
     rate = db.get(ExciseRate, rate_id)
     if not rate:
@@ -152,7 +152,7 @@ async def get_excise_rate(rate_id: str, db: Session = Depends(get_db)):
 @router.post(
     "/", response_model=ExciseRateResponse, status_code=status.HTTP_201_CREATED
 )
-async def create_excise_rate(data: ExciseRateCreate, db: Session = Depends(get_db)):
+def create_excise_rate(data: ExciseRateCreate, db: Session = Depends(get_db)):
     """Create a new excise rate."""
     try:
         # Check for duplicate date_active_from
@@ -205,7 +205,7 @@ async def create_excise_rate(data: ExciseRateCreate, db: Session = Depends(get_d
 
 
 @router.put("/{rate_id}", response_model=ExciseRateResponse)
-async def update_excise_rate(
+def update_excise_rate(
     rate_id: str, data: ExciseRateUpdate, db: Session = Depends(get_db)
 ):
     """Update an excise rate."""
@@ -247,7 +247,7 @@ async def update_excise_rate(
 
 
 @router.delete("/{rate_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_excise_rate(rate_id: str, db: Session = Depends(get_db)):
+def delete_excise_rate(rate_id: str, db: Session = Depends(get_db)):
     """Soft delete an excise rate (marks as deleted, does not remove from database)."""
     from app.services.audit import soft_delete
 
@@ -124,7 +124,7 @@ def formula_to_response(f: Formula, db: Session) -> FormulaResponse:
 
 
 @router.get("/", response_model=List[FormulaResponse])
-async def list_formulas(
+def list_formulas(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     product_id: Optional[str] = None,
@@ -158,7 +158,7 @@ async def list_formulas(
 
 
 @router.get("/{formula_id}", response_model=FormulaResponse)
-async def get_formula(formula_id: str, db: Session = Depends(get_db)):
+def get_formula(formula_id: str, db: Session = Depends(get_db)):
     """Get formula by ID."""
     formula = db.get(Formula, formula_id)
     if not formula:
@@ -170,7 +170,7 @@ async def get_formula(formula_id: str, db: Session = Depends(get_db)):
 
 
 @router.get("/code/{code}/versions", response_model=List[FormulaResponse])
-async def get_formula_versions(code: str, db: Session = Depends(get_db)):
+def get_formula_versions(code: str, db: Session = Depends(get_db)):
     """Get all versions of a formula."""
     stmt = (
         select(Formula)
@@ -188,7 +188,7 @@ async def get_formula_versions(code: str, db: Session = Depends(get_db)):
 
 
 @router.get("/code/{code}/version/{version}", response_model=FormulaResponse)
-async def get_formula_version(code: str, version: int, db: Session = Depends(get_db)):
+def get_formula_version(code: str, version: int, db: Session = Depends(get_db)):
     """Get specific version of a formula."""
     stmt = select(Formula).where(
         Formula.formula_code == code,
@@ -207,7 +207,7 @@ async def get_formula_version(code: str, version: int, db: Session = Depends(get
 
 
 @router.post("/", response_model=FormulaResponse, status_code=status.HTTP_201_CREATED)
-async def create_formula(formula_data: FormulaCreate, db: Session = Depends(get_db)):
+def create_formula(formula_data: FormulaCreate, db: Session = Depends(get_db)):
     """Create a new formula with lines."""
     # Validate product exists
     product = db.get(Product, formula_data.product_id)
@@ -283,7 +283,7 @@ async def create_formula(formula_data: FormulaCreate, db: Session = Depends(get_
     response_model=FormulaResponse,
     status_code=status.HTTP_201_CREATED,
 )
-async def create_formula_revision(
+def create_formula_revision(
     formula_id: str, revision_data: Optional[dict] = None, db: Session = Depends(get_db)
 ):
     """Clone formula as new revision."""
@@ -357,7 +357,7 @@ async def create_formula_revision(
 
 
 @router.put("/{formula_id}", response_model=FormulaResponse)
-async def update_formula(
+def update_formula(
     formula_id: str, formula_data: dict, db: Session = Depends(get_db)
 ):
     """Update formula (header only; lines managed separately)."""
@@ -382,7 +382,7 @@ async def update_formula(
 
 
 @router.put("/{formula_id}/lines", response_model=FormulaResponse)
-async def replace_formula_lines(
+def replace_formula_lines(
     formula_id: str, lines_data: List[FormulaLineCreate], db: Session = Depends(get_db)
 ):
     """Replace all lines in a formula."""
@@ -455,7 +455,7 @@ async def replace_formula_lines(
 
 
 @router.delete("/{formula_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_formula(formula_id: str, db: Session = Depends(get_db)):
+def delete_formula(formula_id: str, db: Session = Depends(get_db)):
     """Soft delete formula (and its lines)."""
     from app.services.audit import soft_delete
 
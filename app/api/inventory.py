@@ -1,10 +1,13 @@
 # app/api/inventory.py
 """Inventory API router for stock on hand queries and adjustments."""
 
+import csv
+import io
 from datetime import datetime
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
@@ -68,7 +71,7 @@ def _adjustment_response(
 
 
 @router.get("/lots", response_model=List[InventoryLotResponse])
-async def list_inventory_lots(
+def list_inventory_lots(
     product_id: Optional[str] = Query(None),
     active_only: bool = Query(True),
     db: Session = Depends(get_db),
@@ -89,7 +92,7 @@ async def list_inventory_lots(
 
 
 @router.get("/product/{product_id}/lots", response_model=List[InventoryLotResponse])
-async def get_product_lots(product_id: str, db: Session = Depends(get_db)):
+def get_product_lots(product_id: str, db: Session = Depends(get_db)):
     """List active lots for a single product (FIFO order)."""
     product = db.get(Product, product_id)
     if not product:
@@ -103,7 +106,7 @@ async def get_product_lots(product_id: str, db: Session = Depends(get_db)):
 
 
 @router.get("/product/{product_id}/soh")
-async def get_product_soh(product_id: str, db: Session = Depends(get_db)):
+def get_product_soh(product_id: str, db: Session = Depends(get_db)):
     """Get stock on hand in the product's inventory unit."""
     inventory_service = InventoryService(db)
     try:
@@ -113,22 +116,36 @@ async def get_product_soh(product_id: str, db: Session = Depends(get_db)):
 
 
 @router.get("/products/soh")
-async def get_products_soh(
-    product_ids: str = Query(..., description="Comma-separated product IDs"),
+def get_products_soh(
+    product_ids: Optional[str] = Query(
+        None, description="Comma-separated product IDs (all products when omitted)"
+    ),
     db: Session = Depends(get_db),
 ):
-    """Get stock on hand for multiple products."""
-    product_id_list = [pid.strip() for pid in product_ids.split(",") if pid.strip()]
-
-    if not product_id_list:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="No product IDs provided"
+    """Get stock on hand, reserved and available quantities for many products."""
+    stmt = select(Product)
+    if product_ids is None:
+        stmt = stmt.where(Product.deleted_at.is_(None))
+        product_id_list = None
+    else:
+        product_id_list = list(
+            dict.fromkeys(pid.strip() for pid in product_ids.split(",") if pid.strip())
         )
+        if not product_id_list:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="No product IDs provided",
+            )
+        stmt = stmt.where(Product.id.in_(product_id_list))
+
+    products = {str(product.id): product for product in db.execute(stmt).scalars()}
+    if product_id_list is None:
+        product_id_list = list(products)
+    levels = InventoryService(db).get_stock_levels(products.keys())
 
-    inventory_service = InventoryService(db)
     soh_results = []
     for product_id in product_id_list:
-        product = db.get(Product, product_id)
+        product = products.get(product_id)
         if not product:
             soh_results.append(
                 {
@@ -141,59 +158,104 @@ async def get_products_soh(
             )
             continue
 
-        soh = inventory_service.get_stock_on_hand(product_id)
+        level = levels[product_id]
         inv_unit = inventory_uom_for_product(product)
         soh_results.append(
             {
                 "product_id": product_id,
                 "product_sku": product.sku,
                 "product_name": product.name,
-                "stock_on_hand": float(soh),
+                "stock_on_hand": float(level["on_hand_qty"]),
+                "reserved": float(level["reserved_qty"]),
+                "available": float(level["available_qty"]),
                 "inventory_unit": inv_unit,
-                "stock_on_hand_kg": float(soh),
+                "stock_on_hand_kg": float(level["on_hand_qty"]),
             }
         )
 
     return {"results": soh_results}
 
 
-@router.get("/stocktake/sheet")
-async def get_stocktake_sheet(
-    is_purchase: bool = Query(True),
-    db: Session = Depends(get_db),
-):
-    """Return products with current system SOH for stocktake entry."""
+STOCKTAKE_COLUMNS = (
+    "product_id",
+    "code",
+    "desc1",
+    "inventory_unit",
+    "system_soh",
+    "physical_count",
+    "variance",
+    "variance_pct",
+)
+
+
+def _stocktake_rows(
+    db: Session, is_purchase: bool, chunk_size: int = 500
+) -> Iterator[dict]:
+    """Stocktake sheet rows, reading products and their SOH a chunk at a time."""
     stmt = (
         select(Product)
         .where(Product.deleted_at.is_(None))
         .order_by(Product.sku.asc(), Product.name.asc())
+        .execution_options(yield_per=chunk_size)
     )
-    products = db.execute(stmt).scalars().all()
     if is_purchase:
-        products = [p for p in products if getattr(p, "is_purchase", False)]
-
-    inventory_service = InventoryService(db)
-    rows = []
-    for product in products:
-        soh = inventory_service.get_stock_on_hand(product.id)
-        inv_unit = inventory_uom_for_product(product)
-        rows.append(
-            {
+        stmt = stmt.where(Product.is_purchase.is_(True))
+    inventory = InventoryService(db)
+    for products in db.execute(stmt).scalars().partitions():
+        levels = inventory.get_stock_levels(str(p.id) for p in products)
+        for product in products:
+            soh = levels[str(product.id)]["on_hand_qty"]
+            yield {
                 "product_id": product.id,
                 "code": product.raw_material_code or product.sku,
                 "desc1": product.name,
-                "inventory_unit": inv_unit,
+                "inventory_unit": inventory_uom_for_product(product),
                 "system_soh": float(soh),
                 "physical_count": float(soh),
                 "variance": 0.0,
                 "variance_pct": 0.0,
             }
+
+
+def _stocktake_csv(rows: Iterable[dict], chunk_size: int = 500) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=STOCKTAKE_COLUMNS)
+    writer.writeheader()
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if count % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+@router.get("/stocktake/sheet")
+def get_stocktake_sheet(
+    is_purchase: bool = Query(True),
+    format: str = Query("json", pattern="^(json|csv)$"),
+    db: Session = Depends(get_db),
+):
+    """Return products with current system SOH for stocktake entry.
+
+    The CSV is streamed from a server-side cursor, so the sheet is never held
+    in memory whole.
+    """
+    rows = _stocktake_rows(db, is_purchase)
+    if format == "csv":
+        filename = f"stocktake_{datetime.utcnow():%Y%m%d}.csv"
+        return StreamingResponse(
+            _stocktake_csv(rows),
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
         )
-    return {"items": rows, "count": len(rows)}
+    items = list(rows)
+    return {"items": items, "count": len(items)}
 
 
 @router.get("/product/{product_id}/summary", response_model=InventorySummaryResponse)
-async def get_product_inventory_summary(product_id: str, db: Session = Depends(get_db)):
+def get_product_inventory_summary(product_id: str, db: Session = Depends(get_db)):
     """Get comprehensive inventory summary for a product."""
     product = db.get(Product, product_id)
     if not product:
@@ -219,7 +281,7 @@ async def get_product_inventory_summary(product_id: str, db: Session = Depends(g
     response_model=InventoryAdjustmentResponse,
     status_code=status.HTTP_201_CREATED,
 )
-async def adjust_inventory(
+def adjust_inventory(
     adjustment: InventoryAdjustmentRequest, db: Session = Depends(get_db)
 ):
     """
@@ -278,7 +340,7 @@ async def adjust_inventory(
     response_model=WriteOffResponse,
     status_code=status.HTTP_201_CREATED,
 )
-async def write_off_inventory(payload: WriteOffRequest, db: Session = Depends(get_db)):
+def write_off_inventory(payload: WriteOffRequest, db: Session = Depends(get_db)):
     """Write off damaged, lost, or shrinkage stock."""
     if payload.reason.upper() not in WRITE_OFF_REASONS:
         raise HTTPException(
@@ -334,7 +396,7 @@ async def write_off_inventory(payload: WriteOffRequest, db: Session = Depends(ge
     response_model=StocktakeResponse,
     status_code=status.HTTP_201_CREATED,
 )
-async def run_stocktake(payload: StocktakeRequest, db: Session = Depends(get_db)):
+def run_stocktake(payload: StocktakeRequest, db: Session = Depends(get_db)):
     """Calculate stocktake variances and optionally apply SOH updates."""
     if not payload.counts:
         raise HTTPException(
@@ -76,7 +76,7 @@ def generate_invoice_number(db: Session) -> str:
 
 
 @router.post("/", response_model=InvoiceResponse, status_code=status.HTTP_201_CREATED)
-async def create_invoice(invoice_data: InvoiceCreate, db: Session = Depends(get_db)):
+def create_invoice(invoice_data: InvoiceCreate, db: Session = Depends(get_db)):
     """Create a new invoice."""
     # Validate customer exists
     customer = db.get(Customer, invoice_data.customer_id)
@@ -165,7 +165,7 @@ async def create_invoice(invoice_data: InvoiceCreate, db: Session = Depends(get_
 
 
 @router.get("/{invoice_id}", response_model=InvoiceResponse)
-async def get_invoice(invoice_id: str, db: Session = Depends(get_db)):
+def get_invoice(invoice_id: str, db: Session = Depends(get_db)):
     """Get invoice by ID."""
     invoice = db.get(Invoice, invoice_id)
     if not invoice:
@@ -177,7 +177,7 @@ async def get_invoice(invoice_id: str, db: Session = Depends(get_db)):
 
 
 @router.post("/{invoice_id}/issue", response_model=InvoiceResponse)
-async def issue_invoice(
+def issue_invoice(
     invoice_id: str, issue_data: InvoiceIssueRequest, db: Session = Depends(get_db)
 ):
     """Issue an invoice (change status from DRAFT to SENT)."""
@@ -204,7 +204,7 @@ async def issue_invoice(
 
 
 @router.get("/{invoice_id}/print", response_model=PrintResponse)
-async def print_invoice(
+def print_invoice(
     invoice_id: str,
     format: str = Query("text", regex="^(text|pdf)$"),
     db: Session = Depends(get_db),
@@ -1,5 +1,7 @@
 """Main FastAPI application with logging, settings, and error handling."""
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -8,6 +10,7 @@ from app.api import (
     batches,
     buying_groups,
     contacts,
+    costing,
     crm,
     documents,
     excise_rates,
@@ -34,10 +37,27 @@ from app.error_handlers import (
     business_exception_handler,
     register_error_handlers,
 )
-from app.logging_config import RequestIDMiddleware, logger
+from app.logging_config import (
+    QueryMetricsMiddleware,
+    RequestIDMiddleware,
+    logger,
+    query_metrics_snapshot,
+)
+from app.services.shopify_webhooks import start_webhook_worker, stop_webhook_worker
 from app.settings import settings
 
 
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    """Run the Shopify webhook drainer alongside the API when enabled."""
+    if settings.shopify.webhook_worker_enabled:
+        start_webhook_worker()
+    try:
+        yield
+    finally:
+        stop_webhook_worker()
+
+
 def create_app() -> FastAPI:
     """Create and configure the FastAPI application."""
 
@@ -49,9 +69,12 @@ def create_app() -> FastAPI:
         debug=settings.api.debug,
         docs_url="/docs" if settings.api.debug else None,
         redoc_url="/redoc" if settings.api.debug else None,
+        lifespan=_lifespan,
     )
 
-    # Add middleware
+    # Add middleware (RequestIDMiddleware last so it wraps the metrics one)
+    if settings.logging.query_metrics_enabled:
+        app.add_middleware(QueryMetricsMiddleware)
     app.add_middleware(RequestIDMiddleware)
 
     # Add CORS middleware
@@ -80,6 +103,7 @@ def create_app() -> FastAPI:
     app.include_router(suppliers.router, prefix="/api/v1")
     app.include_router(contacts.router, prefix="/api/v1")
     app.include_router(assemblies.router, prefix="/api/v1")
+    app.include_router(costing.router, prefix="/api/v1")
     app.include_router(shopify.router, prefix="/api/v1")
     app.include_router(units.router, prefix="/api/v1")
     app.include_router(excise_rates.router, prefix="/api/v1")
@@ -103,6 +127,14 @@ def create_app() -> FastAPI:
             "environment": settings.environment,
         }
 
+    # Per-request SQL metrics, development only
+    if settings.environment == "development" or settings.api.debug:
+
+        @app.get("/debug/metrics")
+        def debug_metrics():
+            """Query counts and DB time for recent requests, grouped by route."""
+            return query_metrics_snapshot()
+
     # Root endpoint
     @app.get("/")
     def root():
@@ -16,7 +16,7 @@ router = APIRouter(prefix="/pack", tags=["packing"])
 
 
 @router.get("/convert", response_model=PackConversionResponse)
-async def convert_pack_units(
+def convert_pack_units(
     product_id: str = Query(..., description="Product ID"),
     qty: Decimal = Query(..., gt=0, description="Quantity to convert"),
     from_unit: str = Query(..., description="Source unit"),
@@ -23,7 +23,7 @@ router = APIRouter(prefix="/pricing", tags=["pricing"])
 
 
 @router.get("/resolve", response_model=PricingResolutionResponse)
-async def resolve_pricing(
+def resolve_pricing(
     customer_id: str = Query(..., description="Customer ID"),
     product_id: str = Query(..., description="Product ID"),
     pack_unit: Optional[str] = Query(None, description="Pack unit for conversion"),
@@ -140,7 +140,7 @@ def product_to_response(product: Product) -> ProductResponse:
 
 
 @router.get("/", response_model=List[ProductResponse])
-async def list_products(
+def list_products(
     skip: int = 0,
     limit: Optional[int] = 10000,  # Default to 10,000 for non-soft-deleted products
     query: Optional[str] = None,
@@ -209,7 +209,7 @@ async def list_products(
 
 
 @router.get("/{product_id}", response_model=ProductResponse)
-async def get_product(product_id: str, db: Session = Depends(get_db)):
+def get_product(product_id: str, db: Session = Depends(get_db)):
     """Get product by ID."""
     stmt = (
         select(Product)
@@ -227,7 +227,7 @@ async def get_product(product_id: str, db: Session = Depends(get_db)):
 
 
 @router.get("/sku/{sku}", response_model=ProductResponse)
-async def get_product_by_sku(sku: str, db: Session = Depends(get_db)):
+def get_product_by_sku(sku: str, db: Session = Depends(get_db)):
     """Get product by SKU."""
     stmt = select(Product).where(Product.sku == sku, Product.deleted_at.is_(None))
     product = db.execute(stmt).scalar_one_or_none()
@@ -241,7 +241,7 @@ async def get_product_by_sku(sku: str, db: Session = Depends(get_db)):
 
 
 @router.post("/", response_model=ProductResponse, status_code=status.HTTP_201_CREATED)
-async def create_product(product_data: ProductCreate, db: Session = Depends(get_db)):
+def create_product(product_data: ProductCreate, db: Session = Depends(get_db)):
     """Create a new product."""
     # Check if SKU already exists (excluding soft-deleted)
     existing = db.execute(
@@ -355,7 +355,7 @@ async def create_product(product_data: ProductCreate, db: Session = Depends(get_
 
 
 @router.put("/{product_id}", response_model=ProductResponse)
-async def update_product(
+def update_product(
     product_id: str, product_data: ProductUpdate, db: Session = Depends(get_db)
 ):
     """Update product."""
@@ -558,7 +558,7 @@ async def update_product(
 
 
 @router.delete("/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_product(product_id: str, db: Session = Depends(get_db)):
+def delete_product(product_id: str, db: Session = Depends(get_db)):
     """Soft delete product (marks as deleted, does not remove from database)."""
     from app.services.audit import soft_delete
 
@@ -579,7 +579,7 @@ async def delete_product(product_id: str, db: Session = Depends(get_db)):
     response_model=ProductVariantResponse,
     status_code=status.HTTP_201_CREATED,
 )
-async def create_product_variant(
+def create_product_variant(
     product_id: str, variant_data: ProductVariantCreate, db: Session = Depends(get_db)
 ):
     """Create a new product variant."""
@@ -632,7 +632,7 @@ async def create_product_variant(
 
 
 @router.get("/{product_id}/variants", response_model=List[ProductVariantResponse])
-async def list_product_variants(product_id: str, db: Session = Depends(get_db)):
+def list_product_variants(product_id: str, db: Session = Depends(get_db)):
     """List variants for a product."""
     # Check if product exists
     product = db.get(Product, product_id)
@@ -59,7 +59,7 @@ def purchase_format_to_response(format: PurchaseFormat) -> PurchaseFormatRespons
 
 
 @router.get("/", response_model=List[PurchaseFormatResponse])
-async def list_purchase_formats(
+def list_purchase_formats(
     skip: int = 0,
     limit: int = 100,
     query: Optional[str] = None,
@@ -84,7 +84,7 @@ async def list_purchase_formats(
 
 
 @router.get("/{format_id}", response_model=PurchaseFormatResponse)
-async def get_purchase_format(format_id: str, db: Session = Depends(get_db)):
+def get_purchase_format(format_id: str, db: Session = Depends(get_db)):
     """Get a purchase format by ID."""
     format = db.get(PurchaseFormat, format_id)
     if not format:
@@ -99,7 +99,7 @@ async def get_purchase_format(format_id: str, db: Session = Depends(get_db)):
     response_model=PurchaseFormatResponse,
     status_code=status.HTTP_201_CREATED,
 )
-async def create_purchase_format(
+def create_purchase_format(
     format_data: PurchaseFormatCreate, db: Session = Depends(get_db)
 ):
     """Create a new purchase format."""
@@ -126,7 +126,7 @@ async def create_purchase_format(
 
 
 @router.put("/{format_id}", response_model=PurchaseFormatResponse)
-async def update_purchase_format(
+def update_purchase_format(
     format_id: str, format_data: PurchaseFormatUpdate, db: Session = Depends(get_db)
 ):
     """Update a purchase format."""
@@ -163,7 +163,7 @@ async def update_purchase_format(
 
 
 @router.delete("/{format_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_purchase_format(format_id: str, db: Session = Depends(get_db)):
+def delete_purchase_format(format_id: str, db: Session = Depends(get_db)):
     """Delete a purchase format."""
     purchase_format = db.get(PurchaseFormat, format_id)
     if not purchase_format:
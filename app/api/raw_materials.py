@@ -65,7 +65,7 @@ def raw_material_to_response(rm: RawMaterial) -> RawMaterialResponse:
 
 
 @router.get("/", response_model=List[RawMaterialResponse])
-async def list_raw_materials(
+def list_raw_materials(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     status: Optional[str] = Query(None, regex="^(A|S|R|M|all)$"),
@@ -102,7 +102,7 @@ async def list_raw_materials(
 
 
 @router.get("/groups", response_model=List[RawMaterialGroupResponse])
-async def list_raw_material_groups(db: Session = Depends(get_db)):
+def list_raw_material_groups(db: Session = Depends(get_db)):
     """List all raw material groups."""
     groups = (
         db.query(RawMaterialGroup)
@@ -124,7 +124,7 @@ async def list_raw_material_groups(db: Session = Depends(get_db)):
 
 
 @router.get("/{raw_material_id}", response_model=RawMaterialResponse)
-async def get_raw_material(raw_material_id: str, db: Session = Depends(get_db)):
+def get_raw_material(raw_material_id: str, db: Session = Depends(get_db)):
     """Get raw material by ID."""
     raw_material = db.get(RawMaterial, raw_material_id)
     if not raw_material:
@@ -136,7 +136,7 @@ async def get_raw_material(raw_material_id: str, db: Session = Depends(get_db)):
 
 
 @router.get("/code/{code}", response_model=RawMaterialResponse)
-async def get_raw_material_by_code(code: int, db: Session = Depends(get_db)):
+def get_raw_material_by_code(code: int, db: Session = Depends(get_db)):
     """Get raw material by code."""
     stmt = select(RawMaterial).where(RawMaterial.code == code)
     raw_material = db.execute(stmt).scalar_one_or_none()
@@ -152,7 +152,7 @@ async def get_raw_material_by_code(code: int, db: Session = Depends(get_db)):
 @router.post(
     "/", response_model=RawMaterialResponse, status_code=status.HTTP_201_CREATED
 )
-async def create_raw_material(
+def create_raw_material(
     material: RawMaterialCreate, db: Session = Depends(get_db)
 ):
     """Create a new raw material."""
@@ -213,7 +213,7 @@ async def create_raw_material(
 
 
 @router.put("/{raw_material_id}", response_model=RawMaterialResponse)
-async def update_raw_material(
+def update_raw_material(
     raw_material_id: str, material: RawMaterialUpdate, db: Session = Depends(get_db)
 ):
     """Update a raw material."""
@@ -285,7 +285,7 @@ async def update_raw_material(
 
 
 @router.delete("/{raw_material_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_raw_material(raw_material_id: str, db: Session = Depends(get_db)):
+def delete_raw_material(raw_material_id: str, db: Session = Depends(get_db)):
     """Soft delete a raw material (marks as deleted, does not remove from database)."""
     from app.services.audit import soft_delete
 
@@ -302,7 +302,7 @@ async def delete_raw_material(raw_material_id: str, db: Session = Depends(get_db
 
 # Supplier relationship endpoints
 @router.post("/{raw_material_id}/suppliers")
-async def add_raw_material_supplier(
+def add_raw_material_supplier(
     raw_material_id: str, supplier_data: dict, db: Session = Depends(get_db)
 ):
     """Add supplier to raw material."""
@@ -355,7 +355,7 @@ async def add_raw_material_supplier(
 
 
 @router.delete("/{raw_material_id}/suppliers/{supplier_id}")
-async def remove_raw_material_supplier(
+def remove_raw_material_supplier(
     raw_material_id: str, supplier_id: str, db: Session = Depends(get_db)
 ):
     """Remove supplier from raw material."""
@@ -382,7 +382,7 @@ async def remove_raw_material_supplier(
 
 
 @router.get("/{raw_material_id}/suppliers")
-async def get_raw_material_suppliers(
+def get_raw_material_suppliers(
     raw_material_id: str, db: Session = Depends(get_db)
 ):
     """Get suppliers for a raw material."""
@@ -8,7 +8,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy import and_, func, select
 from sqlalchemy.orm import Session
 
-from app.adapters.db import get_db
+from app.adapters.db import get_read_db
 from app.adapters.db.models import Batch, BatchComponent, Formula, FormulaLine
 from app.adapters.db.qb_models import RawMaterial
 
@@ -16,11 +16,11 @@ router = APIRouter(prefix="/reports", tags=["reports"])
 
 
 @router.get("/raw-materials/usage")
-async def raw_material_usage_report(
+def raw_material_usage_report(
     start_date: date = Query(..., description="Start date"),
     end_date: date = Query(..., description="End date"),
     material_id: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """
     Raw material usage report with YTD usage and costs.
@@ -74,8 +74,10 @@ async def raw_material_usage_report(
 
 
 @router.get("/formulas/cost-analysis")
-async def formula_cost_analysis(
-    formula_code: str, revision: Optional[int] = None, db: Session = Depends(get_db)
+def formula_cost_analysis(
+    formula_code: str,
+    revision: Optional[int] = None,
+    db: Session = Depends(get_read_db),
 ):
     """
     Formula cost analysis - raw cost breakdown per line.
@@ -137,11 +139,11 @@ async def formula_cost_analysis(
 
 
 @router.get("/batch-history")
-async def batch_history_report(
+def batch_history_report(
     formula_code: Optional[str] = None,
     year: Optional[str] = None,
     status: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """
     Batch history report with variance analysis.
@@ -183,8 +185,8 @@ async def batch_history_report(
 
 
 @router.get("/stock-valuation")
-async def stock_valuation_report(
-    active_only: bool = Query(True), db: Session = Depends(get_db)
+def stock_valuation_report(
+    active_only: bool = Query(True), db: Session = Depends(get_read_db)
 ):
     """
     Stock valuation report showing SOH value per raw material.
@@ -225,7 +227,7 @@ async def stock_valuation_report(
 
 
 @router.get("/reorder-analysis")
-async def reorder_analysis_report(db: Session = Depends(get_db)):
+def reorder_analysis_report(db: Session = Depends(get_read_db)):
     """
     Report on raw materials below reorder level.
     """
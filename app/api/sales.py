@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import base64
 from datetime import date, datetime
 from decimal import Decimal
 from pathlib import Path
@@ -14,12 +15,13 @@ from fastapi import (
     Form,
     HTTPException,
     Query,
+    Response,
     UploadFile,
     status,
 )
 from pydantic import BaseModel, Field, model_validator, validator
-from sqlalchemy import Select, func, select
-from sqlalchemy.orm import Session
+from sqlalchemy import Select, false, func, select, true
+from sqlalchemy.orm import Session, selectinload
 
 from app.adapters.db import get_db
 from app.adapters.db.models import (
@@ -64,6 +66,7 @@ from apps.vndmanuf_sales.services.customer_pricing import (
     list_tier_prices_for_customer,
     list_tier_prices_for_level,
     resolve_customer_product_price,
+    resolve_customer_product_prices,
 )
 from apps.vndmanuf_sales.services.import_sales_csv import SalesCSVImporter
 from apps.vndmanuf_sales.services.pricing import PriceComputationError, PricingService
@@ -1086,6 +1089,10 @@ class PriceResolveResponse(BaseModel):
     special_price_id: Optional[str] = None
 
 
+class PriceResolveBatchRow(PriceResolveResponse):
+    product_id: str
+
+
 class TierPriceCatalogRow(BaseModel):
     product_id: str
     product: str
@@ -1404,6 +1411,30 @@ def resolve_order_line_price(
     return PriceResolveResponse(**result)
 
 
+@router.get("/pricing/resolve-batch", response_model=List[PriceResolveBatchRow])
+def resolve_order_line_prices(
+    customer_id: str = Query(...),
+    product_ids: List[str] = Query(...),
+    as_of: Optional[date] = Query(None),
+    db: Session = Depends(get_db),
+):
+    """Resolve unit prices for several order lines in one round trip."""
+    _get_sales_customer(db, customer_id)
+    try:
+        results = resolve_customer_product_prices(
+            db, customer_id, product_ids, as_of or datetime.utcnow().date()
+        )
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)
+        ) from exc
+    return [
+        PriceResolveBatchRow(product_id=product_id, **results[product_id])
+        for product_id in dict.fromkeys(product_ids)
+        if product_id in results
+    ]
+
+
 @router.get("/pricing/tier-catalog", response_model=List[TierPriceCatalogRow])
 def get_tier_price_catalog(
     pricing_level: str = Query(..., min_length=1),
@@ -1737,12 +1768,17 @@ def _build_order_response(order: SalesOrder) -> SalesOrderResponse:
     )
 
 
+def _first_live_invoice(order: SalesOrder) -> Optional[Invoice]:
+    """Oldest non-deleted invoice; the one the list's paid flag and filter use."""
+    invoices = [i for i in (order.invoices or []) if i.deleted_at is None]
+    return min(invoices, key=lambda i: (i.created_at, i.id), default=None)
+
+
 def _build_order_list_response(order: SalesOrder) -> SalesOrderListResponse:
     """Build list item with delivery/invoice flags from first linked docket and invoice."""
     dockets = list(order.delivery_dockets) if order.delivery_dockets else []
-    invoices = list(order.invoices) if order.invoices else []
     first_docket = dockets[0] if dockets else None
-    first_invoice = invoices[0] if invoices else None
+    first_invoice = _first_live_invoice(order)
     return SalesOrderListResponse.model_validate(
         {
             **order.__dict__,
@@ -1763,8 +1799,7 @@ def _build_order_list_response(order: SalesOrder) -> SalesOrderListResponse:
     )
 
 
-def _get_filtered_orders(
-    db: Session,
+def _filtered_orders_stmt(
     *,
     customer_id: Optional[str] = None,
     channel_id: Optional[str] = None,
@@ -1776,8 +1811,9 @@ def _get_filtered_orders(
     end_date: Optional[date] = None,
     include_deleted: bool = False,
     include_archived: bool = False,
-) -> List[SalesOrder]:
-    """Shared order filters for list and product-summary endpoints."""
+) -> Select:
+    """Shared order filters for list and product-summary endpoints.
+    Delivery/invoice/paid filters run in SQL so results can be paged."""
     stmt = select(SalesOrder)
     if customer_id:
         stmt = stmt.where(SalesOrder.customer_id == customer_id)
@@ -1789,35 +1825,73 @@ def _get_filtered_orders(
         stmt = stmt.where(SalesOrder.order_date >= _as_datetime_start(start_date))
     if end_date:
         stmt = stmt.where(SalesOrder.order_date <= _as_datetime_end(end_date))
-    stmt = _apply_filters(stmt, include_deleted, include_archived, SalesOrder)
-    orders = (
+    if has_delivery is not None:
+        docket_exists = (
+            select(DeliveryDocket.id)
+            .where(
+                DeliveryDocket.sales_order_id == SalesOrder.id,
+                DeliveryDocket.deleted_at.is_(None),
+            )
+            .exists()
+        )
+        stmt = stmt.where(docket_exists if has_delivery else ~docket_exists)
+    if has_invoice is not None:
+        invoice_exists = (
+            select(Invoice.id)
+            .where(Invoice.sales_order_id == SalesOrder.id, Invoice.deleted_at.is_(None))
+            .exists()
+        )
+        stmt = stmt.where(invoice_exists if has_invoice else ~invoice_exists)
+    if paid is not None:
+        # Paid status of the first live invoice, as _first_live_invoice picks it
+        first_paid = (
+            select(Invoice.paid)
+            .where(Invoice.sales_order_id == SalesOrder.id, Invoice.deleted_at.is_(None))
+            .order_by(Invoice.created_at, Invoice.id)
+            .limit(1)
+            .correlate(SalesOrder)
+            .scalar_subquery()
+        )
+        stmt = stmt.where(
+            func.coalesce(first_paid, false()) == (true() if paid else false())
+        )
+    return _apply_filters(stmt, include_deleted, include_archived, SalesOrder)
+
+
+def _get_filtered_orders(db: Session, **filters) -> List[SalesOrder]:
+    """Orders matching _filtered_orders_stmt filters, newest first."""
+    stmt = _filtered_orders_stmt(**filters)
+    return (
         db.execute(stmt.order_by(SalesOrder.order_date.desc())).scalars().unique().all()
     )
-    if has_delivery is not None or has_invoice is not None or paid is not None:
-        filtered = []
-        for order in orders:
-            dockets = [
-                d
-                for d in (order.delivery_dockets or [])
-                if getattr(d, "deleted_at", None) is None
-            ]
-            invoices = [
-                i
-                for i in (order.invoices or [])
-                if getattr(i, "deleted_at", None) is None
-            ]
-            if has_delivery is not None and (len(dockets) > 0) != has_delivery:
-                continue
-            if has_invoice is not None and (len(invoices) > 0) != has_invoice:
-                continue
-            if paid is not None:
-                first_invoice = invoices[0] if invoices else None
-                is_paid = bool(first_invoice and getattr(first_invoice, "paid", False))
-                if is_paid != paid:
-                    continue
-            filtered.append(order)
-        orders = filtered
-    return orders
+
+
+def _encode_order_cursor(order: SalesOrder) -> str:
+    raw = f"{order.order_date.isoformat()}|{order.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_order_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        order_date, order_id = raw.split("|", 1)
+        return datetime.fromisoformat(order_date), order_id
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        ) from exc
+
+
+def _linked_document(
+    gd: Optional[GeneratedDocument], check_file: bool = False
+) -> Optional[dict]:
+    """Open-button payload for a completed generated PDF, else None.
+    Lists trust gd.pdf_exists (see scripts/verify_generated_documents.py);
+    check_file stats the PDF instead."""
+    if gd is None or gd.status != "completed" or not gd.pdf_path:
+        return None
+    present = Path(gd.pdf_path).exists() if check_file else bool(gd.pdf_exists)
+    return {"id": str(gd.id), "pdf_path": gd.pdf_path} if present else None
 
 
 def _apply_order_lines(
@@ -1855,6 +1929,7 @@ def _apply_order_lines(
 
 @router.get("/orders", response_model=List[SalesOrderListResponse])
 def list_orders(
+    response: Response,
     customer_id: Optional[str] = None,
     channel_id: Optional[str] = None,
     status_filter: Optional[SalesOrderStatus] = None,
@@ -1867,10 +1942,17 @@ def list_orders(
     end_date: Optional[date] = Query(None, description="Order date to (inclusive)"),
     include_deleted: bool = Query(False),
     include_archived: bool = Query(False),
+    limit: Optional[int] = Query(
+        None, ge=1, le=1000, description="Page size; omit for all orders"
+    ),
+    cursor: Optional[str] = Query(
+        None, description="X-Next-Cursor header value from the previous page"
+    ),
     db: Session = Depends(get_db),
 ):
-    orders = _get_filtered_orders(
-        db,
+    """List orders newest first (order_date, id). With limit, the response carries
+    X-Next-Cursor while more orders remain; pass it back as cursor."""
+    stmt = _filtered_orders_stmt(
         customer_id=customer_id,
         channel_id=channel_id,
         status_filter=status_filter,
@@ -1882,42 +1964,40 @@ def list_orders(
         include_deleted=include_deleted,
         include_archived=include_archived,
     )
+    if cursor:
+        after_date, after_id = _decode_order_cursor(cursor)
+        stmt = stmt.where(
+            (SalesOrder.order_date < after_date)
+            | ((SalesOrder.order_date == after_date) & (SalesOrder.id < after_id))
+        )
+    stmt = stmt.options(
+        selectinload(SalesOrder.lines),
+        selectinload(SalesOrder.delivery_dockets).selectinload(
+            DeliveryDocket.generated_document
+        ),
+        selectinload(SalesOrder.invoices).selectinload(Invoice.generated_document),
+    ).order_by(SalesOrder.order_date.desc(), SalesOrder.id.desc())
+    if limit:
+        stmt = stmt.limit(limit + 1)
+    orders = db.execute(stmt).scalars().unique().all()
+    if limit and len(orders) > limit:
+        orders = orders[:limit]
+        response.headers["X-Next-Cursor"] = _encode_order_cursor(orders[-1])
+
     result = []
     for order in orders:
         d = _build_order_list_response(order).model_dump()
         dockets = list(order.delivery_dockets) if order.delivery_dockets else []
-        invoices = list(order.invoices) if order.invoices else []
         first_docket = dockets[0] if dockets else None
-        first_invoice = invoices[0] if invoices else None
-        if first_docket and getattr(first_docket, "generated_document_id", None):
-            gd = db.get(GeneratedDocument, first_docket.generated_document_id)
-            if (
-                gd
-                and getattr(gd, "status", None) == "completed"
-                and getattr(gd, "pdf_path", None)
-                and Path(gd.pdf_path).exists()
-            ):
-                d["delivery_docket_document"] = {
-                    "id": str(gd.id),
-                    "pdf_path": gd.pdf_path,
-                }
-            else:
-                d["delivery_docket_document"] = None
-        else:
-            d["delivery_docket_document"] = None
-        if first_invoice and getattr(first_invoice, "generated_document_id", None):
-            gd = db.get(GeneratedDocument, first_invoice.generated_document_id)
-            if (
-                gd
-                and getattr(gd, "status", None) == "completed"
-                and getattr(gd, "pdf_path", None)
-                and Path(gd.pdf_path).exists()
-            ):
-                d["invoice_document"] = {"id": str(gd.id), "pdf_path": gd.pdf_path}
-            else:
-                d["invoice_document"] = None
-        else:
-            d["invoice_document"] = None
+        first_invoice = _first_live_invoice(order)
+        d["delivery_docket_document"] = (
+            _linked_document(first_docket.generated_document) if first_docket else None
+        )
+        d["invoice_document"] = (
+            _linked_document(first_invoice.generated_document)
+            if first_invoice
+            else None
+        )
         d["picking_slip_document"] = None
         result.append(SalesOrderListResponse.model_validate(d))
     return result
@@ -2036,9 +2116,8 @@ def get_order(order_id: str, db: Session = Depends(get_db)):
         "lines": lines_data,
     }
     dockets = list(order.delivery_dockets) if order.delivery_dockets else []
-    invoices = list(order.invoices) if order.invoices else []
     first_docket = dockets[0] if dockets else None
-    first_invoice = invoices[0] if invoices else None
+    first_invoice = _first_live_invoice(order)
     d["delivery_docket_id"] = str(first_docket.id) if first_docket else None
     d["delivery_docket_number"] = first_docket.docket_number if first_docket else None
     d["delivery_date"] = first_docket.delivery_date if first_docket else None
@@ -2052,32 +2131,16 @@ def get_order(order_id: str, db: Session = Depends(get_db)):
     else:
         d["invoice_date"] = None
     # Linked generated documents (for Open vs Create in UI); only include when file exists
-    if first_docket and getattr(first_docket, "generated_document_id", None):
-        gd = db.get(GeneratedDocument, first_docket.generated_document_id)
-        if (
-            gd
-            and getattr(gd, "status", None) == "completed"
-            and getattr(gd, "pdf_path", None)
-            and Path(gd.pdf_path).exists()
-        ):
-            d["delivery_docket_document"] = {"id": str(gd.id), "pdf_path": gd.pdf_path}
-        else:
-            d["delivery_docket_document"] = None
-    else:
-        d["delivery_docket_document"] = None
-    if first_invoice and getattr(first_invoice, "generated_document_id", None):
-        gd = db.get(GeneratedDocument, first_invoice.generated_document_id)
-        if (
-            gd
-            and getattr(gd, "status", None) == "completed"
-            and getattr(gd, "pdf_path", None)
-            and Path(gd.pdf_path).exists()
-        ):
-            d["invoice_document"] = {"id": str(gd.id), "pdf_path": gd.pdf_path}
-        else:
-            d["invoice_document"] = None
-    else:
-        d["invoice_document"] = None
+    d["delivery_docket_document"] = (
+        _linked_document(first_docket.generated_document, check_file=True)
+        if first_docket
+        else None
+    )
+    d["invoice_document"] = (
+        _linked_document(first_invoice.generated_document, check_file=True)
+        if first_invoice
+        else None
+    )
     d["picking_slip_document"] = None  # TODO when picking slip generation exists
     return SalesOrderResponse.model_validate(d)
 
@@ -2147,11 +2210,9 @@ def update_order(order_id: str, data: SalesOrderUpdate, db: Session = Depends(ge
         order.payment_reference = data.payment_reference or None
     if "invoice_date" in fields_set:
         order.invoice_date = data.invoice_date
-        invoices = [
-            i for i in (order.invoices or []) if getattr(i, "deleted_at", None) is None
-        ]
-        if invoices:
-            invoices[0].invoice_date = data.invoice_date
+        first_invoice = _first_live_invoice(order)
+        if first_invoice:
+            first_invoice.invoice_date = data.invoice_date
     if "delivery_date" in fields_set:
         dockets = [
             d
@@ -2161,11 +2222,8 @@ def update_order(order_id: str, data: SalesOrderUpdate, db: Session = Depends(ge
         if dockets:
             dockets[0].delivery_date = data.delivery_date
     if "paid" in fields_set:
-        invoices = [
-            i for i in (order.invoices or []) if getattr(i, "deleted_at", None) is None
-        ]
-        if invoices:
-            inv = invoices[0]
+        inv = _first_live_invoice(order)
+        if inv:
             inv.paid = bool(data.paid)
             if data.paid:
                 inv.status = "PAID"
@@ -2897,7 +2955,7 @@ def enrich_customer_locations(
 
 
 @router.post("/import/csv", response_model=SalesImportCSVResponse)
-async def import_sales_csv(
+def import_sales_csv(
     file: UploadFile = File(...),
     allow_create: bool = Form(False),
     create_delivery_docket: bool = Form(True),
@@ -2910,7 +2968,7 @@ async def import_sales_csv(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Upload a .csv file",
         )
-    raw = await file.read()
+    raw = file.file.read()
     try:
         text = raw.decode("utf-8-sig")
     except UnicodeDecodeError as exc:
@@ -53,7 +53,7 @@ def _to_response(rep: SalesRep) -> SalesRepResponse:
 
 
 @router.get("/", response_model=List[SalesRepResponse])
-async def list_sales_reps(
+def list_sales_reps(
     skip: int = 0,
     limit: int = 200,
     query: Optional[str] = None,
@@ -71,7 +71,7 @@ async def list_sales_reps(
 
 
 @router.get("/{rep_id}", response_model=SalesRepResponse)
-async def get_sales_rep(rep_id: str, db: Session = Depends(get_db)):
+def get_sales_rep(rep_id: str, db: Session = Depends(get_db)):
     rep = db.get(SalesRep, rep_id)
     if not rep or rep.deleted_at is not None:
         raise HTTPException(
@@ -81,7 +81,7 @@ async def get_sales_rep(rep_id: str, db: Session = Depends(get_db)):
 
 
 @router.post("/", response_model=SalesRepResponse, status_code=status.HTTP_201_CREATED)
-async def create_sales_rep(data: SalesRepCreate, db: Session = Depends(get_db)):
+def create_sales_rep(data: SalesRepCreate, db: Session = Depends(get_db)):
     existing = db.execute(
         select(SalesRep).where(
             SalesRep.code == data.code, SalesRep.deleted_at.is_(None)
@@ -106,7 +106,7 @@ async def create_sales_rep(data: SalesRepCreate, db: Session = Depends(get_db)):
 
 
 @router.put("/{rep_id}", response_model=SalesRepResponse)
-async def update_sales_rep(
+def update_sales_rep(
     rep_id: str, data: SalesRepUpdate, db: Session = Depends(get_db)
 ):
     rep = db.get(SalesRep, rep_id)
@@ -142,7 +142,7 @@ async def update_sales_rep(
 
 
 @router.delete("/{rep_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_sales_rep(rep_id: str, db: Session = Depends(get_db)):
+def delete_sales_rep(rep_id: str, db: Session = Depends(get_db)):
     from app.services.audit import soft_delete
 
     rep = db.get(SalesRep, rep_id)
@@ -8,115 +8,116 @@ from app.adapters.db import get_db
 from app.adapters.shopify_hmac import verify_webhook_hmac
 from app.services.shopify_order_import import ShopifyOrderImportService
 from app.services.shopify_sync import ShopifySyncService
+from app.services.shopify_webhooks import (
+    enqueue_webhook,
+    notify_webhook_worker,
+    webhook_inbox_metrics,
+)
 from app.settings import settings
 
 router = APIRouter(prefix="/shopify", tags=["shopify"])
 
 
-async def _read_body_bytes(request: Request):
-    body = await request.body()
-    request._body_bytes = body
-    return body
+async def _read_body_bytes(request: Request) -> bytes:
+    """Raw webhook body, read on the event loop so the handlers can stay sync
+    (FastAPI runs them, and their DB work, in its threadpool)."""
+    return await request.body()
+
+
+def _enqueue_webhook(
+    topic: str,
+    raw: bytes,
+    signature: str,
+    webhook_id: Optional[str],
+    db: Session,
+):
+    """Verify and queue a webhook, acknowledging Shopify before it is applied."""
+    secret = settings.shopify.webhook_secret
+    if not secret:
+        # An empty key would accept any body signed with an empty key.
+        raise HTTPException(status_code=503, detail="Webhook secret not configured")
+    # Verify HMAC signature (raises 401 on mismatch)
+    verify_webhook_hmac(raw, signature, secret)
+
+    try:
+        _, created = enqueue_webhook(db, topic, raw, webhook_id=webhook_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid webhook payload")
+    if created:
+        notify_webhook_worker()
+    return {"ok": True, "queued": created, "duplicate": not created}
 
 
 @router.post("/webhooks/orders_create")
-async def orders_create(
-    request: Request,
+def orders_create(
+    raw: bytes = Depends(_read_body_bytes),
     x_shopify_hmac_sha256: str = Header(...),
+    x_shopify_webhook_id: Optional[str] = Header(None),
     db: Session = Depends(get_db),
 ):
     """
     Handle Shopify orders/create webhook.
-    Creates inventory reservations for order line items.
+    Queued; the drainer creates reservations for its line items.
     """
-    raw = await request.body()
-
-    # Verify HMAC signature
-    if not verify_webhook_hmac(
-        raw, x_shopify_hmac_sha256, settings.shopify.webhook_secret
-    ):
-        raise HTTPException(status_code=401, detail="Invalid HMAC signature")
-
-    payload = await request.json()
-    svc = ShopifySyncService(db)
-    result = svc.apply_shopify_order(payload)
-
-    return result
+    return _enqueue_webhook(
+        "orders_create", raw, x_shopify_hmac_sha256, x_shopify_webhook_id, db
+    )
 
 
 @router.post("/webhooks/fulfillments_create")
-async def fulfillments_create(
-    request: Request,
+def fulfillments_create(
+    raw: bytes = Depends(_read_body_bytes),
     x_shopify_hmac_sha256: str = Header(...),
+    x_shopify_webhook_id: Optional[str] = Header(None),
     db: Session = Depends(get_db),
 ):
     """
     Handle Shopify fulfillments/create webhook.
-    Commits reservations and updates inventory.
+    Queued; the drainer commits reservations and updates inventory.
     """
-    raw = await request.body()
-
-    # Verify HMAC signature
-    if not verify_webhook_hmac(
-        raw, x_shopify_hmac_sha256, settings.shopify.webhook_secret
-    ):
-        raise HTTPException(status_code=401, detail="Invalid HMAC signature")
-
-    payload = await request.json()
-    svc = ShopifySyncService(db)
-    result = svc.apply_shopify_fulfillment(payload)
-
-    return result
+    return _enqueue_webhook(
+        "fulfillments_create", raw, x_shopify_hmac_sha256, x_shopify_webhook_id, db
+    )
 
 
 @router.post("/webhooks/orders_cancelled")
-async def orders_cancelled(
-    request: Request,
+def orders_cancelled(
+    raw: bytes = Depends(_read_body_bytes),
     x_shopify_hmac_sha256: str = Header(...),
+    x_shopify_webhook_id: Optional[str] = Header(None),
     db: Session = Depends(get_db),
 ):
     """
     Handle Shopify orders/cancelled webhook.
-    Releases inventory reservations.
+    Queued; the drainer releases inventory reservations.
     """
-    raw = await request.body()
-
-    # Verify HMAC signature
-    if not verify_webhook_hmac(
-        raw, x_shopify_hmac_sha256, settings.shopify.webhook_secret
-    ):
-        raise HTTPException(status_code=401, detail="Invalid HMAC signature")
-
-    payload = await request.json()
-    svc = ShopifySyncService(db)
-    result = svc.apply_shopify_cancel(payload)
-
-    return result
+    return _enqueue_webhook(
+        "orders_cancelled", raw, x_shopify_hmac_sha256, x_shopify_webhook_id, db
+    )
 
 
 @router.post("/webhooks/refunds_create")
-async def refunds_create(
-    request: Request,
+def refunds_create(
+    raw: bytes = Depends(_read_body_bytes),
     x_shopify_hmac_sha256: str = Header(...),
+    x_shopify_webhook_id: Optional[str] = Header(None),
     db: Session = Depends(get_db),
 ):
     """
     Handle Shopify refunds/create webhook.
-    Handles inventory restocking if applicable.
+    Queued; the drainer handles inventory restocking if applicable.
     """
-    raw = await request.body()
+    return _enqueue_webhook(
+        "refunds_create", raw, x_shopify_hmac_sha256, x_shopify_webhook_id, db
+    )
 
-    # Verify HMAC signature
-    if not verify_webhook_hmac(
-        raw, x_shopify_hmac_sha256, settings.shopify.webhook_secret
-    ):
-        raise HTTPException(status_code=401, detail="Invalid HMAC signature")
 
-    payload = await request.json()
-    svc = ShopifySyncService(db)
-    result = svc.apply_shopify_refund(payload)
-
-    return result
+@router.get("/webhooks/metrics")
+def webhook_metrics(db: Session = Depends(get_db)):
+    """
+    Webhook inbox depth and processing lag.
+    """
+    return webhook_inbox_metrics(db)
 
 
 @router.post("/sync/push/{product_id}")
@@ -130,12 +131,17 @@ def push_one(product_id: str, db: Session = Depends(get_db)):
 
 
 @router.post("/sync/push-all")
-def push_all(db: Session = Depends(get_db)):
+def push_all(
+    force: bool = Query(
+        False, description="Push every mapped product, not only drifted levels"
+    ),
+    db: Session = Depends(get_db),
+):
     """
-    Manually reconcile and push all mapped products to Shopify.
+    Manually reconcile and push drifted mapped products to Shopify.
     """
     svc = ShopifySyncService(db)
-    result = svc.reconcile_all()
+    result = svc.reconcile_all(force=force)
     return result
 
 
@@ -143,14 +149,20 @@ def push_all(db: Session = Depends(get_db)):
 def import_historical_orders(
     since_date: Optional[str] = Query(None, description="ISO 8601 date string"),
     until_date: Optional[str] = Query(None, description="ISO 8601 date string"),
+    restart: bool = Query(
+        False, description="Ignore an unfinished checkpoint and start from page one"
+    ),
     db: Session = Depends(get_db),
 ):
     """
     Import all historical orders from Shopify (one-time operation).
 
+    Resumes an interrupted import for the same date range from its checkpoint.
+
     Args:
         since_date: Start date (ISO 8601 format, optional)
         until_date: End date (ISO 8601 format, optional)
+        restart: Start again instead of resuming (optional)
 
     Returns:
         Summary with import counts
@@ -175,7 +187,9 @@ def import_historical_orders(
                 status_code=400, detail="Invalid until_date format. Use ISO 8601."
             )
 
-    result = svc.import_historical_orders(since_date=since_dt, until_date=until_dt)
+    result = svc.import_historical_orders(
+        since_date=since_dt, until_date=until_dt, resume=not restart
+    )
     return result
 
 
@@ -72,7 +72,7 @@ def supplier_to_response(s: Supplier) -> SupplierResponse:
 
 
 @router.get("/", response_model=List[SupplierResponse])
-async def list_suppliers(
+def list_suppliers(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     code: Optional[str] = None,
@@ -102,7 +102,7 @@ async def list_suppliers(
 
 
 @router.get("/{supplier_id}", response_model=SupplierResponse)
-async def get_supplier(supplier_id: str, db: Session = Depends(get_db)):
+def get_supplier(supplier_id: str, db: Session = Depends(get_db)):
     """Get supplier by ID."""
     supplier = db.get(Supplier, supplier_id)
     if not supplier:
@@ -114,7 +114,7 @@ async def get_supplier(supplier_id: str, db: Session = Depends(get_db)):
 
 
 @router.post("/", response_model=SupplierResponse, status_code=status.HTTP_201_CREATED)
-async def create_supplier(supplier_data: SupplierCreate, db: Session = Depends(get_db)):
+def create_supplier(supplier_data: SupplierCreate, db: Session = Depends(get_db)):
     """Create a new supplier."""
     # Create supplier with auto-generated code
     import uuid
@@ -138,7 +138,7 @@ async def create_supplier(supplier_data: SupplierCreate, db: Session = Depends(g
 
 
 @router.put("/{supplier_id}", response_model=SupplierResponse)
-async def update_supplier(
+def update_supplier(
     supplier_id: str, supplier_data: SupplierUpdate, db: Session = Depends(get_db)
 ):
     """Update supplier."""
@@ -171,7 +171,7 @@ async def update_supplier(
 
 
 @router.delete("/{supplier_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_supplier(supplier_id: str, db: Session = Depends(get_db)):
+def delete_supplier(supplier_id: str, db: Session = Depends(get_db)):
     """Soft delete supplier (marks as deleted, does not remove from database)."""
     from app.services.audit import soft_delete
 
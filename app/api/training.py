@@ -558,7 +558,7 @@ def training_ask(payload: AskRequest, db: Session = Depends(get_db)):
 
 
 @router.post("/media/upload", status_code=status.HTTP_201_CREATED)
-async def upload_training_media(file: UploadFile = File(...)):
+def upload_training_media(file: UploadFile = File(...)):
     """Upload image or video for embedding in rich training content."""
     content_type = (file.content_type or "").lower()
     if content_type not in _ALLOWED_MEDIA:
@@ -566,7 +566,7 @@ async def upload_training_media(file: UploadFile = File(...)):
             status_code=400,
             detail=f"Unsupported file type: {content_type or 'unknown'}",
         )
-    raw = await file.read()
+    raw = file.file.read()
     if len(raw) > _MAX_MEDIA_BYTES:
         raise HTTPException(status_code=400, detail="File exceeds 80 MB limit")
 
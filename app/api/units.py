@@ -81,7 +81,7 @@ def unit_to_response(unit: Unit) -> UnitResponse:
 
 
 @router.get("/", response_model=List[UnitResponse])
-async def list_units(
+def list_units(
     skip: int = 0,
     limit: int = 100,
     query: Optional[str] = None,
@@ -104,7 +104,7 @@ async def list_units(
 
 
 @router.get("/{unit_id}", response_model=UnitResponse)
-async def get_unit(unit_id: str, db: Session = Depends(get_db)):
+def get_unit(unit_id: str, db: Session = Depends(get_db)):
     """Get a unit by ID."""
     unit = db.get(Unit, unit_id)
     if not unit:
@@ -115,7 +115,7 @@ async def get_unit(unit_id: str, db: Session = Depends(get_db)):
 
 
 @router.post("/", response_model=UnitResponse, status_code=status.HTTP_201_CREATED)
-async def create_unit(unit_data: UnitCreate, db: Session = Depends(get_db)):
+def create_unit(unit_data: UnitCreate, db: Session = Depends(get_db)):
     """Create a new unit."""
     # Check if code already exists (excluding soft-deleted)
     existing = db.execute(
@@ -143,7 +143,7 @@ async def create_unit(unit_data: UnitCreate, db: Session = Depends(get_db)):
 
 
 @router.put("/{unit_id}", response_model=UnitResponse)
-async def update_unit(
+def update_unit(
     unit_id: str, unit_data: UnitUpdate, db: Session = Depends(get_db)
 ):
     """Update a unit."""
@@ -186,7 +186,7 @@ async def update_unit(
 
 
 @router.delete("/{unit_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_unit(unit_id: str, db: Session = Depends(get_db)):
+def delete_unit(unit_id: str, db: Session = Depends(get_db)):
     """Soft delete a unit (marks as deleted, does not remove from database)."""
     from app.services.audit import soft_delete
 
@@ -249,7 +249,7 @@ class AlcoholConversionResponse(BaseModel):
 
 
 @router.post("/convert", response_model=UnitConversionResponse)
-async def convert_units_endpoint(
+def convert_units_endpoint(
     request: UnitConversionRequest, db: Session = Depends(get_db)
 ):
     """
@@ -284,7 +284,7 @@ async def convert_units_endpoint(
 
 
 @router.post("/convert/alcohol", response_model=AlcoholConversionResponse)
-async def convert_alcohol_endpoint(
+def convert_alcohol_endpoint(
     request: AlcoholConversionRequest, db: Session = Depends(get_db)
 ):
     """
@@ -320,7 +320,7 @@ async def convert_alcohol_endpoint(
 
 
 @router.get("/convert/concentration", response_model=dict)
-async def convert_concentration_endpoint(
+def convert_concentration_endpoint(
     value: Decimal = Query(..., ge=0, description="Concentration value to convert"),
     from_type: str = Query(
         ..., description="Source concentration type (ABV_VOL_VOL, WT_PCT, SOLIDS_PCT)"
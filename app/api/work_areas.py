@@ -59,7 +59,7 @@ def work_area_to_response(work_area: WorkArea) -> WorkAreaResponse:
 
 
 @router.get("/", response_model=List[WorkAreaResponse])
-async def list_work_areas(
+def list_work_areas(
     skip: int = 0,
     limit: int = 100,
     query: Optional[str] = None,
@@ -82,7 +82,7 @@ async def list_work_areas(
 
 
 @router.get("/{work_area_id}", response_model=WorkAreaResponse)
-async def get_work_area(work_area_id: str, db: Session = Depends(get_db)):
+def get_work_area(work_area_id: str, db: Session = Depends(get_db)):
     """Get a work area by ID."""
     work_area = db.get(WorkArea, work_area_id)
     if not work_area or work_area.deleted_at is not None:
@@ -93,7 +93,7 @@ async def get_work_area(work_area_id: str, db: Session = Depends(get_db)):
 
 
 @router.post("/", response_model=WorkAreaResponse, status_code=status.HTTP_201_CREATED)
-async def create_work_area(
+def create_work_area(
     work_area_data: WorkAreaCreate, db: Session = Depends(get_db)
 ):
     """Create a new work area."""
@@ -122,7 +122,7 @@ async def create_work_area(
 
 
 @router.put("/{work_area_id}", response_model=WorkAreaResponse)
-async def update_work_area(
+def update_work_area(
     work_area_id: str, work_area_data: WorkAreaUpdate, db: Session = Depends(get_db)
 ):
     """Update a work area."""
@@ -162,7 +162,7 @@ async def update_work_area(
 
 
 @router.delete("/{work_area_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_work_area(work_area_id: str, db: Session = Depends(get_db)):
+def delete_work_area(work_area_id: str, db: Session = Depends(get_db)):
     """Soft delete a work area."""
     from app.services.audit import soft_delete
 
@@ -22,6 +22,7 @@ from app.adapters.db.models import (
 from app.api.dto import (
     GenealogyResponse,
     QcTestTypeResponse,
+    WorkOrderBulkIssueRequest,
     WorkOrderCompleteRequest,
     WorkOrderCostMaterialLine,
     WorkOrderCostResponse,
@@ -42,7 +43,7 @@ from app.api.dto import (
     WorkOrderVoidRequest,
 )
 from app.domain.rules import round_money
-from app.services.work_orders import WorkOrderService
+from app.services.work_orders import MaterialIssue, WorkOrderService
 
 router = APIRouter(prefix="/work-orders", tags=["work-orders"])
 
@@ -135,7 +136,7 @@ def work_order_to_response(work_order: WorkOrder) -> WorkOrderResponse:
 
 
 @router.post("/", response_model=WorkOrderResponse, status_code=status.HTTP_201_CREATED)
-async def create_work_order(
+def create_work_order(
     wo_data: WorkOrderCreate,
     db: Session = Depends(get_db),
 ):
@@ -166,7 +167,7 @@ async def create_work_order(
 
 
 @router.patch("/{work_order_id}", response_model=WorkOrderResponse)
-async def update_work_order(
+def update_work_order(
     work_order_id: str,
     update_data: WorkOrderUpdateRequest,
     db: Session = Depends(get_db),
@@ -201,7 +202,7 @@ async def update_work_order(
 
 
 @router.get("/", response_model=List[WorkOrderResponse])
-async def list_work_orders(
+def list_work_orders(
     status_filter: Optional[str] = Query(None, alias="status"),
     product_id: Optional[str] = Query(None),
     date_from: Optional[str] = Query(None),
@@ -231,7 +232,7 @@ async def list_work_orders(
 
 
 @router.get("/qc-test-types", response_model=List[QcTestTypeResponse])
-async def list_qc_test_types(
+def list_qc_test_types(
     include_inactive: bool = False, db: Session = Depends(get_db)
 ):
     """List available QC test types."""
@@ -241,7 +242,7 @@ async def list_qc_test_types(
 
 
 @router.get("/{work_order_id}", response_model=WorkOrderResponse)
-async def get_work_order(
+def get_work_order(
     work_order_id: str,
     db: Session = Depends(get_db),
 ):
@@ -256,7 +257,7 @@ async def get_work_order(
 
 
 @router.post("/{work_order_id}/release", response_model=WorkOrderResponse)
-async def release_work_order(
+def release_work_order(
     work_order_id: str,
     request: WorkOrderReleaseRequest,
     db: Session = Depends(get_db),
@@ -281,7 +282,7 @@ async def release_work_order(
 
 
 @router.post("/{work_order_id}/start", response_model=WorkOrderResponse)
-async def start_work_order(
+def start_work_order(
     work_order_id: str,
     request: WorkOrderStartRequest,
     db: Session = Depends(get_db),
@@ -306,7 +307,7 @@ async def start_work_order(
 
 
 @router.post("/{work_order_id}/reopen", response_model=WorkOrderResponse)
-async def reopen_work_order(
+def reopen_work_order(
     work_order_id: str,
     request: WorkOrderReopenRequest,
     db: Session = Depends(get_db),
@@ -335,7 +336,7 @@ async def reopen_work_order(
     response_model=WorkOrderInputResponse,
     status_code=status.HTTP_201_CREATED,
 )
-async def add_work_order_input_line(
+def add_work_order_input_line(
     work_order_id: str,
     input_data: WorkOrderInputCreate,
     db: Session = Depends(get_db),
@@ -380,7 +381,7 @@ async def add_work_order_input_line(
 
 
 @router.post("/{work_order_id}/issues", status_code=status.HTTP_201_CREATED)
-async def issue_material(
+def issue_material(
     work_order_id: str,
     issue_data: WorkOrderIssueRequest,
     db: Session = Depends(get_db),
@@ -410,12 +411,51 @@ async def issue_material(
         )
 
 
+@router.post("/{work_order_id}/issues/bulk", status_code=status.HTTP_201_CREATED)
+def issue_materials(
+    work_order_id: str,
+    issue_data: WorkOrderBulkIssueRequest,
+    db: Session = Depends(get_db),
+):
+    """Issue several materials for a work order in one transaction."""
+    try:
+        service = WorkOrderService(db)
+        move_ids = service.issue_materials(
+            work_order_id,
+            [
+                MaterialIssue(
+                    component_product_id=item.component_product_id,
+                    qty=item.qty,
+                    source_batch_id=item.source_batch_id,
+                    uom=item.uom,
+                )
+                for item in issue_data.issues
+            ],
+        )
+        db.commit()
+        return {
+            "move_ids": move_ids,
+            "message": f"{len(move_ids)} material movements posted",
+        }
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)
+        )
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to issue materials: {str(e)}",
+        )
+
+
 @router.post(
     "/{work_order_id}/qc",
     response_model=WorkOrderQcResponse,
     status_code=status.HTTP_201_CREATED,
 )
-async def record_qc(
+def record_qc(
     work_order_id: str,
     qc_data: WorkOrderQcRequest,
     db: Session = Depends(get_db),
@@ -465,7 +505,7 @@ async def record_qc(
     response_model=WorkOrderQcResponse,
     status_code=status.HTTP_200_OK,
 )
-async def update_qc_result(
+def update_qc_result(
     work_order_id: str,
     qc_test_id: str,
     qc_data: WorkOrderQcUpdateRequest,
@@ -515,7 +555,7 @@ async def update_qc_result(
     "/{work_order_id}/qc/{qc_test_id}",
     status_code=status.HTTP_204_NO_CONTENT,
 )
-async def delete_qc_result(
+def delete_qc_result(
     work_order_id: str,
     qc_test_id: str,
     db: Session = Depends(get_db),
@@ -539,7 +579,7 @@ async def delete_qc_result(
 
 
 @router.post("/{work_order_id}/overheads", status_code=status.HTTP_201_CREATED)
-async def apply_overhead(
+def apply_overhead(
     work_order_id: str,
     overhead_data: WorkOrderOverheadRequest,
     db: Session = Depends(get_db),
@@ -568,7 +608,7 @@ async def apply_overhead(
 
 
 @router.post("/{work_order_id}/complete", status_code=status.HTTP_200_OK)
-async def complete_work_order(
+def complete_work_order(
     work_order_id: str,
     complete_data: WorkOrderCompleteRequest,
     db: Session = Depends(get_db),
@@ -606,7 +646,7 @@ async def complete_work_order(
 
 
 @router.post("/{work_order_id}/void", response_model=WorkOrderResponse)
-async def void_work_order(
+def void_work_order(
     work_order_id: str,
     void_data: WorkOrderVoidRequest,
     db: Session = Depends(get_db),
@@ -633,7 +673,7 @@ async def void_work_order(
 
 
 @router.get("/{work_order_id}/costs", response_model=WorkOrderCostResponse)
-async def get_work_order_costs(
+def get_work_order_costs(
     work_order_id: str,
     db: Session = Depends(get_db),
 ):
@@ -735,7 +775,7 @@ async def get_work_order_costs(
 
 
 @router.get("/{work_order_id}/genealogy", response_model=GenealogyResponse)
-async def get_work_order_genealogy(
+def get_work_order_genealogy(
     work_order_id: str,
     db: Session = Depends(get_db),
 ):
@@ -315,20 +315,16 @@ def compute_totals(
     return subtotal, tax, total, total_ordered, total_delivered
 
 
-def build_context_from_delivery_docket(
-    session: Session,
-    docket: "DeliveryDocket",
-    doc_type: str = "delivery_docket",
-    overrides: Optional[DocumentOverrides] = None,
-) -> "DocumentContext":
-    """Build full DocumentContext from a DeliveryDocket."""
-    # Load customer including delivery/billing address when columns exist
+def _load_docket_customers(session: Session, customer_ids) -> dict:
+    """Load customers (address columns only) for docket contexts, keyed by id."""
     from sqlalchemy import select
     from sqlalchemy.orm import load_only
 
     from app.adapters.db.models import Customer
-    from app.documents.contracts import DocumentContext
 
+    ids = [cid for cid in set(customer_ids) if cid]
+    if not ids:
+        return {}
     load_columns = [
         Customer.id,
         Customer.name,
@@ -362,16 +358,30 @@ def build_context_from_delivery_docket(
         )
     if hasattr(Customer, "abn"):
         load_columns.append(Customer.abn)
-    customer = (
-        session.execute(
-            select(Customer)
-            .options(load_only(*load_columns))
-            .where(Customer.id == docket.customer_id)
-            .limit(1)
-        )
-        .scalars()
-        .first()
-    )
+    customers = session.execute(
+        select(Customer).options(load_only(*load_columns)).where(Customer.id.in_(ids))
+    ).scalars()
+    return {customer.id: customer for customer in customers}
+
+
+def build_context_from_delivery_docket(
+    session: Session,
+    docket: "DeliveryDocket",
+    doc_type: str = "delivery_docket",
+    overrides: Optional[DocumentOverrides] = None,
+    customers: Optional[dict] = None,
+) -> "DocumentContext":
+    """Build full DocumentContext from a DeliveryDocket.
+
+    ``customers`` is a pre-loaded id -> Customer map (see
+    build_contexts_from_delivery_dockets); loaded on demand when omitted.
+    """
+    from app.documents.contracts import DocumentContext
+
+    # Load customer including delivery/billing address when columns exist
+    if customers is None:
+        customers = _load_docket_customers(session, [docket.customer_id])
+    customer = customers.get(docket.customer_id)
     if customer:
         # Collected contact address (single block) and delivery address (single block)
         addr = getattr(customer, "address", None) or ""
@@ -527,6 +537,80 @@ def build_context_from_sales_order(
     )
 
 
+def build_contexts_from_delivery_dockets(
+    session: Session,
+    docket_ids: List[str],
+    doc_type: str = "delivery_docket",
+    overrides: Optional[DocumentOverrides] = None,
+) -> dict[str, "DocumentContext"]:
+    """Build contexts for many dockets: dockets, lines, products and customers
+    are loaded with one query each. Unknown ids are left out of the result."""
+    from sqlalchemy import select
+    from sqlalchemy.orm import selectinload
+
+    from app.adapters.db.models import DeliveryDocket, DeliveryDocketLine
+
+    ids = list(dict.fromkeys(str(i) for i in docket_ids if i))
+    if not ids:
+        return {}
+    dockets = (
+        session.execute(
+            select(DeliveryDocket)
+            .options(
+                selectinload(DeliveryDocket.lines).selectinload(
+                    DeliveryDocketLine.product
+                )
+            )
+            .where(DeliveryDocket.id.in_(ids))
+        )
+        .scalars()
+        .all()
+    )
+    customers = _load_docket_customers(session, [d.customer_id for d in dockets])
+    return {
+        str(docket.id): build_context_from_delivery_docket(
+            session, docket, doc_type=doc_type, overrides=overrides, customers=customers
+        )
+        for docket in dockets
+    }
+
+
+def build_contexts_from_sales_orders(
+    session: Session,
+    order_ids: List[str],
+    doc_type: str = "quote",
+    overrides: Optional[DocumentOverrides] = None,
+) -> dict[str, "DocumentContext"]:
+    """Build contexts for many sales orders with customers, lines and products
+    loaded in bulk. Unknown ids are left out of the result."""
+    from sqlalchemy import select
+    from sqlalchemy.orm import selectinload
+
+    from app.adapters.db.models import SalesOrder, SalesOrderLine
+
+    ids = list(dict.fromkeys(str(i) for i in order_ids if i))
+    if not ids:
+        return {}
+    orders = (
+        session.execute(
+            select(SalesOrder)
+            .options(
+                selectinload(SalesOrder.customer),
+                selectinload(SalesOrder.lines).selectinload(SalesOrderLine.product),
+            )
+            .where(SalesOrder.id.in_(ids))
+        )
+        .scalars()
+        .all()
+    )
+    return {
+        str(order.id): build_context_from_sales_order(
+            session, order, doc_type=doc_type, overrides=overrides
+        )
+        for order in orders
+    }
+
+
 def build_context_from_contact_and_lines(
     session: Session,
     contact_id: Optional[str],
@@ -1,9 +1,14 @@
-"""DOCX to PDF: docx2pdf (Word) primary, LibreOffice fallback. Timeouts and retries."""
+"""DOCX to PDF: docx2pdf (Word) primary, LibreOffice (pooled) fallback. Timeouts and retries."""
 
 import logging
+import shutil
 import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional, Sequence
+
+from app.documents.soffice_pool import PoolUnavailable, get_libreoffice_pool
 
 logger = logging.getLogger(__name__)
 
@@ -67,6 +72,8 @@ def convert_docx2pdf(
                 except ImportError:
                     pass
             docx2pdf_convert(str(docx_path), str(pdf_path))
+            if sys.platform == "win32":
+                _time.sleep(0.5)  # Let Word release the file on Windows
             return True, ""
         except BaseException as e:
             last_err = str(e)
@@ -78,11 +85,26 @@ def convert_libreoffice(
     output_dir: Path,
     timeout_seconds: int = 120,
     soffice_path: Optional[str] = None,
+    use_pool: bool = True,
 ) -> tuple[Optional[Path], str]:
-    """Convert using LibreOffice headless. Returns (pdf_path, error_message). PDF is output_dir/<docx_stem>.pdf."""
+    """Convert using LibreOffice headless. Returns (pdf_path, error_message). PDF is output_dir/<docx_stem>.pdf.
+
+    Uses the pooled long-lived listeners when available (see soffice_pool), else
+    starts a one-shot soffice process.
+    """
     docx_path = docx_path.resolve()
     output_dir = output_dir.resolve()
     output_dir.mkdir(parents=True, exist_ok=True)
+    pdf_path = output_dir / f"{docx_path.stem}.pdf"
+    if use_pool:
+        pool = get_libreoffice_pool(soffice_path)
+        if pool is not None:
+            try:
+                ok, err = pool.convert(docx_path, pdf_path, timeout_seconds)
+            except PoolUnavailable as e:
+                logger.warning("LibreOffice pool unavailable, running soffice: %s", e)
+            else:
+                return (pdf_path, "") if ok else (None, err)
     exe = soffice_path or "soffice"
     cmd = [
         exe,
@@ -96,7 +118,6 @@ def convert_libreoffice(
     ok, err = _run_with_timeout(cmd, timeout_seconds=timeout_seconds)
     if not ok:
         return None, err
-    pdf_path = output_dir / f"{docx_path.stem}.pdf"
     if not pdf_path.exists():
         return None, "LibreOffice did not produce PDF"
     return pdf_path, ""
@@ -151,3 +172,132 @@ def convert_to_pdf(
     if result_path != pdf_path and result_path.exists():
         result_path.rename(pdf_path)
     return True, ""
+
+
+def _convert_many_libreoffice(
+    pairs: List[tuple[Path, Path]],
+    timeout_seconds: int,
+    soffice_path: Optional[str],
+) -> List[tuple[bool, str]]:
+    """Spread conversions over the pooled listeners, or run one soffice for all files."""
+    pool = get_libreoffice_pool(soffice_path)
+    if pool is not None:
+        with ThreadPoolExecutor(max_workers=pool.size) as executor:
+            return list(
+                executor.map(
+                    lambda pair: convert_to_pdf(
+                        pair[0],
+                        pair[1],
+                        backend="libreoffice",
+                        timeout_seconds=timeout_seconds,
+                        libreoffice_path=soffice_path,
+                    ),
+                    pairs,
+                )
+            )
+
+    stems = [docx.stem for docx, _ in pairs]
+    if len(set(stems)) != len(stems):
+        # soffice names outputs by stem; fall back to one run per file.
+        return [
+            convert_to_pdf(
+                docx,
+                pdf,
+                backend="libreoffice",
+                timeout_seconds=timeout_seconds,
+                libreoffice_path=soffice_path,
+            )
+            for docx, pdf in pairs
+        ]
+    with tempfile.TemporaryDirectory(prefix="docgen_pdf_") as tmpdir:
+        out_dir = Path(tmpdir)
+        cmd = [
+            soffice_path or "soffice",
+            "--headless",
+            "--convert-to",
+            "pdf",
+            "--outdir",
+            str(out_dir),
+        ] + [str(docx) for docx, _ in pairs]
+        _, err = _run_with_timeout(
+            cmd, timeout_seconds=max(timeout_seconds, 120) * len(pairs)
+        )
+        results = []
+        for docx, pdf in pairs:
+            produced = out_dir / f"{docx.stem}.pdf"
+            if produced.exists():
+                pdf.parent.mkdir(parents=True, exist_ok=True)
+                shutil.move(str(produced), str(pdf))
+                results.append((True, ""))
+            else:
+                results.append((False, err or "LibreOffice did not produce PDF"))
+        return results
+
+
+def convert_many_to_pdf(
+    pairs: Sequence[tuple[Path, Path]],
+    backend: str = "auto",
+    timeout_seconds: int = 60,
+    libreoffice_path: Optional[str] = None,
+) -> List[tuple[bool, str]]:
+    """
+    Convert several DOCX files to PDF. pairs: (docx_path, pdf_path).
+    Returns (success, error_message) per pair, in order.
+
+    LibreOffice converts concurrently across the pooled listeners, or all files in
+    a single soffice run when pooling is off. docx2pdf (Word) converts one file at
+    a time; with backend=auto, the rest of the batch goes to LibreOffice as soon as
+    docx2pdf fails.
+    """
+    pairs = [(Path(docx).resolve(), Path(pdf).resolve()) for docx, pdf in pairs]
+    if not pairs:
+        return []
+    if backend == "libreoffice":
+        return _convert_many_libreoffice(pairs, timeout_seconds, libreoffice_path)
+
+    results: List[tuple[bool, str]] = []
+    for index, (docx, pdf) in enumerate(pairs):
+        pdf.parent.mkdir(parents=True, exist_ok=True)
+        ok, err = convert_docx2pdf(docx, pdf, timeout_seconds=timeout_seconds)
+        if ok:
+            results.append((True, ""))
+            continue
+        if backend == "docx2pdf":
+            results.append((False, err))
+            continue
+        logger.warning(
+            "docx2pdf failed, converting rest of batch with LibreOffice: %s", err
+        )
+        rest = _convert_many_libreoffice(
+            pairs[index:], timeout_seconds, libreoffice_path
+        )
+        results.extend(
+            (
+                ok_lo,
+                (
+                    ""
+                    if ok_lo
+                    else f"docx2pdf failed: {err}; LibreOffice failed: {err_lo}"
+                ),
+            )
+            for ok_lo, err_lo in rest
+        )
+        break
+    return results
+
+
+def merge_pdfs(pdf_paths: Sequence[Path], output_path: Path) -> None:
+    """Concatenate PDFs into output_path (requires pypdf)."""
+    try:
+        from pypdf import PdfWriter
+    except ImportError as e:
+        raise RuntimeError("pypdf not installed; cannot merge PDFs") from e
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    writer = PdfWriter()
+    try:
+        for path in pdf_paths:
+            writer.append(str(path))
+        with open(output_path, "wb") as fh:
+            writer.write(fh)
+    finally:
+        writer.close()
@@ -1,18 +1,156 @@
-"""Render DOCX from template + docxtpl context."""
+"""Render DOCX from template + docxtpl context.
 
+Templates are cached per process, keyed by path and mtime: the .docx bytes and the
+compiled Jinja templates of the body, headers and footers are reused, so a render only
+re-opens the package and evaluates the templates. Compiled templates are reused
+through the ``jinja_env`` argument of ``DocxTemplate.render``, so no docxtpl
+internals are overridden.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
+from typing import Dict, List, Optional, Sequence
 
 from docxtpl import DocxTemplate
+from jinja2 import Environment, Template
 
 from app.documents.contracts import DocumentContext
 
+logger = logging.getLogger(__name__)
+
+RenderJob = tuple[Path, DocumentContext, Path]
+
+
+class _CompilingCacheEnvironment(Environment):
+    """Jinja environment that compiles each distinct source string once.
+
+    docxtpl hands every body/header/footer part to ``jinja_env.from_string``;
+    a template file always yields the same part sources, so later renders
+    reuse the compiled templates.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._compiled: Dict[str, Template] = {}
+
+    def from_string(self, source, globals=None, template_class=None):
+        if (
+            globals is not None
+            or template_class is not None
+            or not isinstance(source, str)
+        ):
+            return super().from_string(source, globals, template_class)
+        template = self._compiled.get(source)
+        if template is None:
+            template = super().from_string(source)
+            self._compiled[source] = template
+        return template
+
+
+class _TemplateEntry:
+    """Cached template file: raw bytes, digest and compiled Jinja parts."""
+
+    def __init__(self, stamp: tuple, data: bytes):
+        self.stamp = stamp
+        self.data = data
+        self.digest = hashlib.sha256(data).hexdigest()
+        self.jinja_env = _CompilingCacheEnvironment()
+
+
+_cache: "OrderedDict[str, _TemplateEntry]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _cache_size() -> int:
+    from app.settings import settings
+
+    return settings.docgen.template_cache_size
+
+
+def _template_entry(template_path: Path) -> tuple[_TemplateEntry, bool]:
+    """Return (entry, cache_hit) for template_path, reloading it when the file changed."""
+    key = str(Path(template_path).resolve())
+    stat = os.stat(key)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None and entry.stamp == stamp:
+            _cache.move_to_end(key)
+            return entry, True
+    with open(key, "rb") as fh:
+        entry = _TemplateEntry(stamp, fh.read())
+    size = _cache_size()
+    if size > 0:
+        with _cache_lock:
+            _cache[key] = entry
+            _cache.move_to_end(key)
+            while len(_cache) > size:
+                _cache.popitem(last=False)
+    return entry, False
+
+
+def clear_template_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
+
+
+def output_cache_key(template_path: Path, context: DocumentContext) -> str:
+    """Hash of template content + context; equal keys render identical documents."""
+    entry, _ = _template_entry(template_path)
+    payload = json.dumps(context.to_dict(), sort_keys=True, default=str)
+    digest = hashlib.sha256(entry.digest.encode())
+    digest.update(payload.encode())
+    return digest.hexdigest()
+
 
 def render_docx(
     template_path: Path, context: DocumentContext, output_path: Path
-) -> None:
-    """Render template with context and write DOCX to output_path."""
-    doc = DocxTemplate(str(template_path))
+) -> bool:
+    """Render template with context and write DOCX to output_path.
+    Returns True when the parsed template came from the in-process cache."""
+    entry, cache_hit = _template_entry(template_path)
+    doc = DocxTemplate(io.BytesIO(entry.data))
     ctx = context.to_dict()
-    doc.render(ctx)
+    doc.render(ctx, jinja_env=entry.jinja_env)
     output_path.parent.mkdir(parents=True, exist_ok=True)
     doc.save(str(output_path))
+    return cache_hit
+
+
+def _render_job(job: RenderJob) -> tuple[str, Optional[bool]]:
+    """Render one (template_path, context, output_path) job.
+    Returns (error, template_cache_hit); error is '' on success."""
+    template_path, context, output_path = job
+    try:
+        return "", render_docx(template_path, context, output_path)
+    except Exception as e:
+        return str(e) or type(e).__name__, None
+
+
+def render_many_docx(
+    jobs: Sequence[RenderJob], workers: int = 0
+) -> List[tuple[str, Optional[bool]]]:
+    """Render several DOCX files, in a process pool when workers > 0.
+    Returns (error, template_cache_hit) per job, in order (error '' = rendered)."""
+    jobs = list(jobs)
+    if workers < 1 or len(jobs) < 2:
+        return [_render_job(job) for job in jobs]
+    workers = min(workers, len(jobs))
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(
+                executor.map(
+                    _render_job, jobs, chunksize=max(1, len(jobs) // (workers * 4))
+                )
+            )
+    except (BrokenProcessPool, OSError) as e:
+        logger.warning("Render process pool failed, rendering in-process: %s", e)
+        return [_render_job(job) for job in jobs]
@@ -2,8 +2,11 @@
 
 from __future__ import annotations
 
-from typing import Optional
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, List, Optional
 
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 
 from app.adapters.db.models import GeneratedDocument, GeneratedDocumentStatus
@@ -19,6 +22,8 @@ def create_document_record(
     sales_order_id: Optional[str] = None,
     delivery_docket_id: Optional[str] = None,
     job_id: Optional[str] = None,
+    content_hash: Optional[str] = None,
+    cache_hit: Optional[bool] = None,
 ) -> GeneratedDocument:
     """Create a pending GeneratedDocument record."""
     doc = GeneratedDocument(
@@ -31,17 +36,76 @@ def create_document_record(
         sales_order_id=sales_order_id,
         delivery_docket_id=delivery_docket_id,
         job_id=job_id,
+        content_hash=content_hash,
+        cache_hit=cache_hit,
     )
     session.add(doc)
     session.flush()
     return doc
 
 
+def create_document_records(
+    session: Session, rows: Iterable[dict]
+) -> List[GeneratedDocument]:
+    """Create pending GeneratedDocument records in one flush (batch generation).
+    Each row takes the keyword arguments of create_document_record."""
+    docs = [
+        GeneratedDocument(status=GeneratedDocumentStatus.PENDING.value, **row)
+        for row in rows
+    ]
+    session.add_all(docs)
+    session.flush()
+    return docs
+
+
 def get_document(session: Session, document_id: str) -> Optional[GeneratedDocument]:
     """Get GeneratedDocument by id."""
     return session.get(GeneratedDocument, document_id)
 
 
+def find_cached_outputs(
+    session: Session, content_hashes: Iterable[str]
+) -> dict[str, GeneratedDocument]:
+    """Latest completed document per content hash, for the output cache.
+
+    A document is skipped when a later completed document with a different hash
+    wrote the same pdf_path (e.g. the docket was edited and reprinted), since the
+    file no longer holds its output.
+    """
+    hashes = list({h for h in content_hashes if h})
+    if not hashes:
+        return {}
+    completed = GeneratedDocumentStatus.COMPLETED.value
+    candidates: dict[str, GeneratedDocument] = {}
+    for doc in session.execute(
+        select(GeneratedDocument)
+        .where(
+            GeneratedDocument.content_hash.in_(hashes),
+            GeneratedDocument.status == completed,
+            GeneratedDocument.pdf_path.isnot(None),
+        )
+        .order_by(GeneratedDocument.created_at)
+    ).scalars():
+        candidates[doc.content_hash] = doc
+    if not candidates:
+        return {}
+    latest_hash_by_path = {}
+    for pdf_path, content_hash in session.execute(
+        select(GeneratedDocument.pdf_path, GeneratedDocument.content_hash)
+        .where(
+            GeneratedDocument.pdf_path.in_({d.pdf_path for d in candidates.values()}),
+            GeneratedDocument.status == completed,
+        )
+        .order_by(GeneratedDocument.created_at)
+    ):
+        latest_hash_by_path[pdf_path] = content_hash
+    return {
+        content_hash: doc
+        for content_hash, doc in candidates.items()
+        if latest_hash_by_path.get(doc.pdf_path) == content_hash
+    }
+
+
 def mark_running(session: Session, document_id: str) -> None:
     """Set status to running."""
     doc = session.get(GeneratedDocument, document_id)
@@ -50,11 +114,23 @@ def mark_running(session: Session, document_id: str) -> None:
         session.flush()
 
 
+def mark_running_many(session: Session, document_ids: List[str]) -> None:
+    """Set status to running for several documents in one statement."""
+    if not document_ids:
+        return
+    session.execute(
+        update(GeneratedDocument)
+        .where(GeneratedDocument.id.in_(document_ids))
+        .values(status=GeneratedDocumentStatus.RUNNING.value)
+    )
+
+
 def mark_completed(
     session: Session,
     document_id: str,
     pdf_path: str,
     docx_path: Optional[str] = None,
+    template_cache_hit: Optional[bool] = None,
 ) -> None:
     """Set status to completed and store paths."""
     doc = session.get(GeneratedDocument, document_id)
@@ -63,6 +139,10 @@ def mark_completed(
         doc.pdf_path = pdf_path
         doc.docx_path = docx_path
         doc.error_message = None
+        doc.pdf_exists = True
+        doc.file_checked_at = datetime.utcnow()
+        if template_cache_hit is not None:
+            doc.template_cache_hit = template_cache_hit
         session.flush()
 
 
@@ -73,3 +153,53 @@ def mark_failed(session: Session, document_id: str, error_message: str) -> None:
         doc.status = GeneratedDocumentStatus.FAILED.value
         doc.error_message = error_message
         session.flush()
+
+
+def verify_document_files(
+    session: Session, batch_size: int = 500, limit: Optional[int] = None
+) -> dict:
+    """Re-check pdf_exists for completed documents, in id order and batches.
+    Returns counts: checked, missing (PDF gone) and restored (PDF back)."""
+    summary = {"checked": 0, "missing": 0, "restored": 0}
+    last_id = None
+    while limit is None or summary["checked"] < limit:
+        size = (
+            batch_size if limit is None else min(batch_size, limit - summary["checked"])
+        )
+        stmt = (
+            select(
+                GeneratedDocument.id,
+                GeneratedDocument.pdf_path,
+                GeneratedDocument.pdf_exists,
+            )
+            .where(
+                GeneratedDocument.status == GeneratedDocumentStatus.COMPLETED.value,
+                GeneratedDocument.pdf_path.isnot(None),
+            )
+            .order_by(GeneratedDocument.id)
+            .limit(size)
+        )
+        if last_id is not None:
+            stmt = stmt.where(GeneratedDocument.id > last_id)
+        rows = session.execute(stmt).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        now = datetime.utcnow()
+        present, absent = [], []
+        for row in rows:
+            exists = Path(row.pdf_path).exists()
+            (present if exists else absent).append(row.id)
+            if row.pdf_exists is not False and not exists:
+                summary["missing"] += 1
+            elif row.pdf_exists is False and exists:
+                summary["restored"] += 1
+        for ids, exists in ((present, True), (absent, False)):
+            if ids:
+                session.execute(
+                    update(GeneratedDocument)
+                    .where(GeneratedDocument.id.in_(ids))
+                    .values(pdf_exists=exists, file_checked_at=now)
+                )
+        summary["checked"] += len(rows)
+    return summary
@@ -3,11 +3,14 @@
 from __future__ import annotations
 
 import logging
+import shutil
 import tempfile
+import uuid
+from dataclasses import dataclass, field
 from datetime import date
 from decimal import Decimal
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 from sqlalchemy.orm import Session
 
@@ -17,21 +20,58 @@ from app.documents.context_builder import (
     build_context_from_delivery_docket,
     build_context_from_order_product_summary,
     build_context_from_sales_order,
+    build_contexts_from_delivery_dockets,
+    build_contexts_from_sales_orders,
     safe_slug_for_filename,
 )
 from app.documents.contracts import DocumentContext, DocumentOverrides
-from app.documents.converter import convert_to_pdf
-from app.documents.renderer import render_docx
+from app.documents.converter import convert_many_to_pdf, convert_to_pdf, merge_pdfs
+from app.documents.renderer import output_cache_key, render_docx, render_many_docx
 from app.documents.repository import (
     create_document_record,
+    create_document_records,
+    find_cached_outputs,
     mark_completed,
     mark_failed,
     mark_running,
+    mark_running_many,
 )
 from app.settings import settings
 
 logger = logging.getLogger(__name__)
 
+BATCH_MERGE_DOC_TYPE = "batch_merge"
+
+
+@dataclass
+class BatchDocumentRequest:
+    """One document in a batch: a delivery docket or a sales order (quote_id)."""
+
+    template_name: str
+    doc_type: str = "delivery_docket"
+    delivery_docket_id: Optional[str] = None
+    quote_id: Optional[str] = None
+    doc_number: Optional[str] = None
+
+
+@dataclass
+class BatchDocumentResult:
+    request: BatchDocumentRequest
+    document: Optional[GeneratedDocument] = None
+    pdf_path: Optional[Path] = None
+    docx_path: Optional[Path] = None
+    error: str = ""
+    cache_hit: bool = False
+    template_cache_hit: Optional[bool] = None
+
+
+@dataclass
+class BatchGenerationResult:
+    batch_id: str
+    results: List[BatchDocumentResult] = field(default_factory=list)
+    merged: Optional[GeneratedDocument] = None
+    merge_error: str = ""
+
 
 class DocumentGenerationService:
     """Generate PDF (and optional DOCX) from template + DB data."""
@@ -45,6 +85,7 @@ class DocumentGenerationService:
         conversion_backend: Optional[str] = None,
         conversion_timeout: Optional[int] = None,
         libreoffice_path: Optional[str] = None,
+        output_cache: Optional[bool] = None,
     ):
         self.session = session
         cfg = settings.docgen
@@ -54,6 +95,9 @@ class DocumentGenerationService:
         self.conversion_backend = conversion_backend or cfg.conversion_backend
         self.conversion_timeout = conversion_timeout or cfg.conversion_timeout_seconds
         self.libreoffice_path = libreoffice_path or cfg.libreoffice_path
+        self.output_cache = (
+            output_cache if output_cache is not None else cfg.output_cache_enabled
+        )
 
     def _template_path(self, template_name: str) -> Path:
         """Resolve template file. template_name can be filename or path relative to template_dir."""
@@ -64,6 +108,49 @@ class DocumentGenerationService:
             p = self.template_dir / p
         return p
 
+    def _cached_outputs(
+        self, content_hashes: List[str], output_docx: bool
+    ) -> dict[str, GeneratedDocument]:
+        """Earlier documents whose files can be reused for these content hashes."""
+        if not self.output_cache:
+            return {}
+        return {
+            content_hash: doc
+            for content_hash, doc in find_cached_outputs(
+                self.session, content_hashes
+            ).items()
+            if Path(doc.pdf_path).exists()
+            and (not output_docx or (doc.docx_path and Path(doc.docx_path).exists()))
+        }
+
+    def _complete_from_cache(
+        self,
+        doc_record: GeneratedDocument,
+        cached: GeneratedDocument,
+        output_docx: bool,
+        delivery_docket_id: Optional[str] = None,
+    ) -> tuple[Optional[GeneratedDocument], Optional[Path], Optional[Path], str]:
+        """Point a new record at the files of an identical earlier document."""
+        docx_path = cached.docx_path if output_docx else None
+        mark_completed(self.session, doc_record.id, cached.pdf_path, docx_path)
+        if delivery_docket_id:
+            docket = self.session.get(DeliveryDocket, delivery_docket_id)
+            if docket:
+                docket.generated_document_id = doc_record.id
+        self.session.commit()
+        logger.info(
+            "Reused %s for %s %s (output cache)",
+            cached.pdf_path,
+            doc_record.doc_type,
+            doc_record.doc_number,
+        )
+        return (
+            doc_record,
+            Path(cached.pdf_path),
+            Path(docx_path) if docx_path else None,
+            "",
+        )
+
     def generate(
         self,
         template_name: str,
@@ -153,6 +240,8 @@ class DocumentGenerationService:
             )
 
         slug = safe_slug_for_filename(context.contact, doc_number, doc_type)
+        content_hash = output_cache_key(template_path, context)
+        cached = self._cached_outputs([content_hash], output_docx).get(content_hash)
         doc_record = create_document_record(
             self.session,
             doc_type=doc_type,
@@ -162,8 +251,14 @@ class DocumentGenerationService:
             customer_id=customer_id,
             sales_order_id=quote_id,
             delivery_docket_id=delivery_docket_id,
+            content_hash=content_hash,
+            cache_hit=cached is not None,
         )
         self.session.commit()
+        if cached is not None:
+            return self._complete_from_cache(
+                doc_record, cached, output_docx, delivery_docket_id
+            )
         document_id = doc_record.id
 
         try:
@@ -178,12 +273,11 @@ class DocumentGenerationService:
         tmpdir = None
         try:
             import shutil
-            import time
 
             tmpdir = tempfile.mkdtemp(prefix="docgen_")
             tmp = Path(tmpdir)
             docx_temp = tmp / "output.docx"
-            render_docx(template_path, context, docx_temp)
+            template_cache_hit = render_docx(template_path, context, docx_temp)
             ok, err = convert_to_pdf(
                 docx_temp,
                 pdf_path,
@@ -206,7 +300,6 @@ class DocumentGenerationService:
                 mark_failed(self.session, document_id, err)
                 self.session.commit()
                 return doc_record, None, None, err
-            time.sleep(0.5)  # Let Word release the file on Windows
             if output_docx:
                 docx_path_temp = self.output_dir / f"{slug}.docx"
                 docx_path_temp.parent.mkdir(parents=True, exist_ok=True)
@@ -227,7 +320,13 @@ class DocumentGenerationService:
 
         pdf_str = str(pdf_path.resolve())
         docx_str = str(docx_path_temp.resolve()) if docx_path_temp else None
-        mark_completed(self.session, document_id, pdf_str, docx_str)
+        mark_completed(
+            self.session,
+            document_id,
+            pdf_str,
+            docx_str,
+            template_cache_hit=template_cache_hit,
+        )
         if delivery_docket_id:
             docket = self.session.get(DeliveryDocket, delivery_docket_id)
             if docket:
@@ -257,6 +356,8 @@ class DocumentGenerationService:
 
         doc_number = doc_number or context.document.doc_number
         slug = safe_slug_for_filename(context.contact, doc_number, doc_type)
+        content_hash = output_cache_key(template_path, context)
+        cached = self._cached_outputs([content_hash], output_docx).get(content_hash)
         doc_record = create_document_record(
             self.session,
             doc_type=doc_type,
@@ -264,8 +365,12 @@ class DocumentGenerationService:
             doc_number=doc_number,
             contact_id=contact_id,
             customer_id=customer_id,
+            content_hash=content_hash,
+            cache_hit=cached is not None,
         )
         self.session.commit()
+        if cached is not None:
+            return self._complete_from_cache(doc_record, cached, output_docx)
         document_id = doc_record.id
 
         try:
@@ -280,12 +385,11 @@ class DocumentGenerationService:
         tmpdir = None
         try:
             import shutil
-            import time
 
             tmpdir = tempfile.mkdtemp(prefix="docgen_")
             tmp = Path(tmpdir)
             docx_temp = tmp / "output.docx"
-            render_docx(template_path, context, docx_temp)
+            template_cache_hit = render_docx(template_path, context, docx_temp)
             ok, err = convert_to_pdf(
                 docx_temp,
                 pdf_path,
@@ -297,7 +401,6 @@ class DocumentGenerationService:
                 mark_failed(self.session, document_id, err)
                 self.session.commit()
                 return doc_record, None, None, err
-            time.sleep(0.5)
             if output_docx:
                 docx_path_temp = self.output_dir / f"{slug}.docx"
                 docx_path_temp.parent.mkdir(parents=True, exist_ok=True)
@@ -318,7 +421,263 @@ class DocumentGenerationService:
 
         pdf_str = str(pdf_path.resolve())
         docx_str = str(docx_path_temp.resolve()) if docx_path_temp else None
-        mark_completed(self.session, document_id, pdf_str, docx_str)
+        mark_completed(
+            self.session,
+            document_id,
+            pdf_str,
+            docx_str,
+            template_cache_hit=template_cache_hit,
+        )
         self.session.commit()
         doc_record = self.session.get(GeneratedDocument, document_id)
         return doc_record, pdf_path, docx_path_temp, ""
+
+    def generate_batch(
+        self,
+        requests: List[BatchDocumentRequest],
+        overrides: Optional[DocumentOverrides] = None,
+        merge: bool = False,
+        output_docx: Optional[bool] = None,
+        batch_id: Optional[str] = None,
+        render_workers: Optional[int] = None,
+    ) -> BatchGenerationResult:
+        """
+        Generate documents for many dockets/quotes in one pass.
+
+        Contexts are built with batched queries, DOCX files are rendered in a process
+        pool (settings.docgen.render_workers) and converted together. Every document
+        gets its own GeneratedDocument with job_id = batch_id; failures are recorded
+        per document and do not stop the batch. With merge=True the completed PDFs
+        are also concatenated, in request order, into one "batch_merge" document.
+        """
+        output_docx = (
+            output_docx if output_docx is not None else settings.docgen.keep_docx
+        )
+        if render_workers is None:
+            render_workers = settings.docgen.render_workers
+        batch = BatchGenerationResult(
+            batch_id=batch_id or uuid.uuid4().hex,
+            results=[BatchDocumentResult(request=r) for r in requests],
+        )
+
+        pending = self._batch_contexts(batch.results, overrides)
+        if pending:
+            cached = self._cached_outputs(
+                [row["content_hash"] for _, _, row in pending], output_docx
+            )
+            docs = create_document_records(
+                self.session,
+                [
+                    dict(
+                        row,
+                        job_id=batch.batch_id,
+                        cache_hit=row["content_hash"] in cached,
+                    )
+                    for _, _, row in pending
+                ],
+            )
+            self.session.commit()
+            mark_running_many(self.session, [doc.id for doc in docs])
+            self.session.commit()
+
+            to_render = []
+            for (result, context, row), doc in zip(pending, docs):
+                result.document = doc
+                hit = cached.get(row["content_hash"])
+                if hit is None:
+                    to_render.append((result, context, row))
+                    continue
+                result.cache_hit = True
+                result.pdf_path = Path(hit.pdf_path)
+                if output_docx:
+                    result.docx_path = Path(hit.docx_path)
+
+            tmpdir = tempfile.mkdtemp(prefix="docgen_batch_")
+            used_slugs: set = set()
+            try:
+                jobs = []
+                targets = []
+                for index, (result, context, row) in enumerate(to_render):
+                    slug = safe_slug_for_filename(
+                        context.contact, row["doc_number"], row["doc_type"]
+                    )
+                    unique = slug
+                    while unique in used_slugs:
+                        unique = f"{slug}_{len(used_slugs)}"
+                    used_slugs.add(unique)
+                    docx_temp = Path(tmpdir) / f"{index:04d}_{unique}.docx"
+                    jobs.append(
+                        (
+                            self._template_path(result.request.template_name),
+                            context,
+                            docx_temp,
+                        )
+                    )
+                    targets.append((result, unique, docx_temp))
+                if jobs:
+                    self._render_and_convert(jobs, targets, render_workers, output_docx)
+            except Exception as e:
+                logger.exception("Batch document generation failed")
+                for result, _, _ in to_render:
+                    if not result.error and result.pdf_path is None:
+                        result.error = str(e)
+            finally:
+                shutil.rmtree(tmpdir, ignore_errors=True)
+
+            for result in batch.results:
+                if result.document is None:
+                    continue
+                document_id = result.document.id
+                if result.error:
+                    mark_failed(self.session, document_id, result.error)
+                    continue
+                mark_completed(
+                    self.session,
+                    document_id,
+                    str(result.pdf_path.resolve()),
+                    str(result.docx_path.resolve()) if result.docx_path else None,
+                    template_cache_hit=result.template_cache_hit,
+                )
+                docket_id = result.request.delivery_docket_id
+                if docket_id:
+                    docket = self.session.get(DeliveryDocket, docket_id)
+                    if docket:
+                        docket.generated_document_id = document_id
+            self.session.commit()
+
+        if merge:
+            self._merge_batch(batch)
+        return batch
+
+    def _batch_contexts(
+        self,
+        results: List[BatchDocumentResult],
+        overrides: Optional[DocumentOverrides],
+    ) -> list:
+        """Build contexts for a batch. Returns (result, context, record_kwargs) for
+        items that can be rendered; sets result.error on the others."""
+        docket_ids: dict = {}
+        quote_ids: dict = {}
+        for result in results:
+            req = result.request
+            template_path = self._template_path(req.template_name)
+            if bool(req.delivery_docket_id) == bool(req.quote_id):
+                result.error = "Provide exactly one of delivery_docket_id or quote_id"
+            elif not template_path.exists():
+                result.error = f"Template not found: {template_path}"
+            elif req.delivery_docket_id:
+                docket_ids.setdefault(req.doc_type, []).append(req.delivery_docket_id)
+            else:
+                quote_ids.setdefault(req.doc_type, []).append(req.quote_id)
+
+        docket_contexts = {
+            (doc_type, key): context
+            for doc_type, ids in docket_ids.items()
+            for key, context in build_contexts_from_delivery_dockets(
+                self.session, ids, doc_type=doc_type, overrides=overrides
+            ).items()
+        }
+        quote_contexts = {
+            (doc_type, key): context
+            for doc_type, ids in quote_ids.items()
+            for key, context in build_contexts_from_sales_orders(
+                self.session, ids, doc_type=doc_type, overrides=overrides
+            ).items()
+        }
+
+        pending = []
+        for result in results:
+            if result.error:
+                continue
+            req = result.request
+            row = {
+                "doc_type": req.doc_type,
+                "template_name": req.template_name,
+                "sales_order_id": req.quote_id,
+                "delivery_docket_id": req.delivery_docket_id,
+            }
+            if req.delivery_docket_id:
+                context = docket_contexts.get((req.doc_type, req.delivery_docket_id))
+                if context is None:
+                    result.error = f"DeliveryDocket not found: {req.delivery_docket_id}"
+                    continue
+                # Already in the identity map from the batched load.
+                docket = self.session.get(DeliveryDocket, req.delivery_docket_id)
+                row["customer_id"] = docket.customer_id
+                row["doc_number"] = req.doc_number or docket.docket_number
+            else:
+                context = quote_contexts.get((req.doc_type, req.quote_id))
+                if context is None:
+                    result.error = f"SalesOrder not found: {req.quote_id}"
+                    continue
+                order = self.session.get(SalesOrder, req.quote_id)
+                row["customer_id"] = order.customer_id
+                row["doc_number"] = req.doc_number or (order.order_ref or str(order.id))
+            row["content_hash"] = output_cache_key(
+                self._template_path(req.template_name), context
+            )
+            pending.append((result, context, row))
+        return pending
+
+    def _render_and_convert(
+        self,
+        jobs: list,
+        targets: list,
+        render_workers: int,
+        output_docx: bool,
+    ) -> None:
+        """Render all DOCX files, convert the rendered ones together, and store
+        pdf_path/docx_path or error on each BatchDocumentResult."""
+        rendered = render_many_docx(jobs, workers=render_workers)
+        to_convert = []
+        for (result, slug, docx_temp), (err, template_hit) in zip(targets, rendered):
+            result.template_cache_hit = template_hit
+            if err:
+                result.error = f"Render failed: {err}"
+            else:
+                to_convert.append((result, slug, docx_temp))
+        outcomes = convert_many_to_pdf(
+            [(docx, self.output_dir / f"{slug}.pdf") for _, slug, docx in to_convert],
+            backend=self.conversion_backend,
+            timeout_seconds=self.conversion_timeout,
+            libreoffice_path=self.libreoffice_path,
+        )
+        for (result, slug, docx_temp), (ok, err) in zip(to_convert, outcomes):
+            if not ok:
+                result.error = err or "Conversion failed"
+                if self.keep_docx:
+                    docx_fallback = self.output_dir / f"{slug}_rendered.docx"
+                    docx_fallback.parent.mkdir(parents=True, exist_ok=True)
+                    shutil.copy(docx_temp, docx_fallback)
+                continue
+            result.pdf_path = self.output_dir / f"{slug}.pdf"
+            if output_docx:
+                result.docx_path = self.output_dir / f"{slug}.docx"
+                shutil.copy(docx_temp, result.docx_path)
+
+    def _merge_batch(self, batch: BatchGenerationResult) -> None:
+        """Concatenate the batch's PDFs into one downloadable GeneratedDocument."""
+        pdfs = [r.pdf_path for r in batch.results if r.pdf_path and not r.error]
+        if not pdfs:
+            batch.merge_error = "No documents completed; nothing to merge"
+            return
+        merged = create_document_record(
+            self.session,
+            doc_type=BATCH_MERGE_DOC_TYPE,
+            template_name=BATCH_MERGE_DOC_TYPE,
+            doc_number=f"BATCH-{batch.batch_id[:8]}",
+            job_id=batch.batch_id,
+        )
+        mark_running(self.session, merged.id)
+        self.session.commit()
+        merged_path = self.output_dir / f"batch_{batch.batch_id}.pdf"
+        try:
+            merge_pdfs(pdfs, merged_path)
+        except Exception as e:
+            logger.exception("Merging batch %s failed", batch.batch_id)
+            batch.merge_error = str(e)
+            mark_failed(self.session, merged.id, batch.merge_error)
+        else:
+            mark_completed(self.session, merged.id, str(merged_path.resolve()))
+        self.session.commit()
+        batch.merged = self.session.get(GeneratedDocument, merged.id)
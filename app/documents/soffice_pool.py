@@ -0,0 +1,312 @@
+"""Pool of long-lived LibreOffice listeners for DOCX -> PDF conversion.
+
+Each listener is a ``soffice --headless --accept=socket,...`` process with its
+own user profile. Conversions connect over UNO, load the DOCX hidden and store
+it with the writer_pdf_Export filter, so the office start-up cost is paid once
+per listener instead of once per document. Listeners are health-checked when
+borrowed, recycled after ``max_conversions`` documents, and killed when a
+conversion exceeds its timeout.
+
+The pool belongs to the process that created it. A forked child (e.g. an RQ
+work horse) gets ``None`` from ``get_libreoffice_pool`` and falls back to a
+one-shot ``soffice --convert-to``.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import queue
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+ConvertFn = Callable[[int, Path, Path], None]
+
+
+class PoolUnavailable(RuntimeError):
+    """The pool cannot serve conversions (listeners failed to start)."""
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _port_open(port: int, timeout: float = 0.5) -> bool:
+    try:
+        with socket.create_connection(("127.0.0.1", port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def uno_convert(port: int, docx_path: Path, pdf_path: Path) -> None:
+    """Convert through the listener on ``port`` using the UNO bridge."""
+    import uno
+    from com.sun.star.beans import PropertyValue
+
+    def _prop(name, value):
+        prop = PropertyValue()
+        prop.Name = name
+        prop.Value = value
+        return prop
+
+    local = uno.getComponentContext()
+    resolver = local.ServiceManager.createInstanceWithContext(
+        "com.sun.star.bridge.UnoUrlResolver", local
+    )
+    ctx = resolver.resolve(
+        f"uno:socket,host=127.0.0.1,port={port};urp;StarOffice.ComponentContext"
+    )
+    desktop = ctx.ServiceManager.createInstanceWithContext(
+        "com.sun.star.frame.Desktop", ctx
+    )
+    doc = desktop.loadComponentFromURL(
+        uno.systemPathToFileUrl(str(docx_path)),
+        "_blank",
+        0,
+        (_prop("Hidden", True), _prop("ReadOnly", True)),
+    )
+    if doc is None:
+        raise RuntimeError("LibreOffice could not load the document")
+    try:
+        doc.storeToURL(
+            uno.systemPathToFileUrl(str(pdf_path)),
+            (_prop("FilterName", "writer_pdf_Export"),),
+        )
+    finally:
+        doc.close(True)
+
+
+def uno_available() -> bool:
+    try:
+        import uno  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class _Listener:
+    """One soffice process accepting UNO connections on a local port."""
+
+    def __init__(self, command: List[str], start_timeout: float):
+        self.port = _free_port()
+        self.profile_dir = Path(tempfile.mkdtemp(prefix="soffice_pool_"))
+        self.conversions = 0
+        cmd = list(command) + [
+            f"--accept=socket,host=127.0.0.1,port={self.port};urp;"
+            "StarOffice.ComponentContext",
+            f"-env:UserInstallation={self.profile_dir.as_uri()}",
+        ]
+        try:
+            self.process = subprocess.Popen(
+                cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+        except OSError as e:
+            shutil.rmtree(self.profile_dir, ignore_errors=True)
+            raise PoolUnavailable(f"Cannot start LibreOffice: {e}") from e
+        deadline = time.monotonic() + start_timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                break
+            if _port_open(self.port):
+                return
+            time.sleep(0.1)
+        self.stop()
+        raise PoolUnavailable(
+            f"LibreOffice listener did not start within {start_timeout:g}s"
+        )
+
+    def healthy(self) -> bool:
+        return self.process.poll() is None and _port_open(self.port)
+
+    def stop(self) -> None:
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait(timeout=5)
+        shutil.rmtree(self.profile_dir, ignore_errors=True)
+
+
+class LibreOfficePool:
+    """Fixed-size pool of LibreOffice listeners with a bounded wait queue."""
+
+    def __init__(
+        self,
+        size: int = 2,
+        soffice_path: Optional[str] = None,
+        max_conversions: int = 200,
+        max_queue: int = 32,
+        start_timeout: float = 30,
+        convert_fn: Optional[ConvertFn] = None,
+        command: Optional[List[str]] = None,
+    ):
+        if size < 1:
+            raise ValueError("LibreOffice pool size must be at least 1")
+        self.size = size
+        self.max_conversions = max_conversions
+        self.start_timeout = start_timeout
+        self.command = command or [
+            soffice_path or "soffice",
+            "--headless",
+            "--invisible",
+            "--nologo",
+            "--norestore",
+            "--nodefault",
+            "--nolockcheck",
+        ]
+        self.convert_fn = convert_fn or uno_convert
+        self.pid = os.getpid()
+        # Callers beyond size + max_queue are rejected instead of piling up.
+        self._admission = threading.BoundedSemaphore(size + max_queue)
+        self._idle: "queue.Queue[Optional[_Listener]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._listeners: List[_Listener] = []
+        self._closed = False
+        for _ in range(size):
+            self._idle.put(None)  # started lazily on first borrow
+
+    def _start(self) -> _Listener:
+        listener = _Listener(self.command, self.start_timeout)
+        with self._lock:
+            self._listeners.append(listener)
+        return listener
+
+    def _retire(self, listener: _Listener) -> None:
+        listener.stop()
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def convert(
+        self, docx_path: Path, pdf_path: Path, timeout_seconds: float = 120
+    ) -> tuple[bool, str]:
+        """Convert ``docx_path`` to ``pdf_path``. Returns (success, error_message)."""
+        if self._closed:
+            return False, "LibreOffice pool is shut down"
+        if not self._admission.acquire(blocking=False):
+            return False, "LibreOffice conversion queue is full"
+        try:
+            try:
+                listener = self._idle.get(timeout=timeout_seconds)
+            except queue.Empty:
+                return False, f"No LibreOffice listener free after {timeout_seconds}s"
+            try:
+                if listener is not None and not listener.healthy():
+                    logger.warning(
+                        "LibreOffice listener on port %s unhealthy; restarting",
+                        listener.port,
+                    )
+                    self._retire(listener)
+                    listener = None
+                if listener is None:
+                    listener = self._start()
+                ok, err = self._convert_on(
+                    listener, docx_path, pdf_path, timeout_seconds
+                )
+                listener.conversions += 1
+                if (
+                    listener.conversions >= self.max_conversions
+                    or not listener.healthy()
+                ):
+                    self._retire(listener)
+                    listener = None
+                return ok, err
+            except PoolUnavailable:
+                listener = None
+                raise
+            finally:
+                self._idle.put(None if self._closed else listener)
+        finally:
+            self._admission.release()
+
+    def _convert_on(
+        self,
+        listener: _Listener,
+        docx_path: Path,
+        pdf_path: Path,
+        timeout_seconds: float,
+    ) -> tuple[bool, str]:
+        errors: List[BaseException] = []
+
+        def _run():
+            try:
+                self.convert_fn(listener.port, docx_path, pdf_path)
+            except BaseException as e:  # noqa: BLE001
+                errors.append(e)
+
+        worker = threading.Thread(target=_run, daemon=True)
+        worker.start()
+        worker.join(timeout_seconds)
+        if worker.is_alive():
+            # Killing the listener unblocks the UNO call; it is replaced afterwards.
+            listener.stop()
+            worker.join(5)
+            return False, f"Timeout after {timeout_seconds}s"
+        if errors:
+            return False, str(errors[0]) or type(errors[0]).__name__
+        if not pdf_path.exists():
+            return False, "LibreOffice did not produce PDF"
+        return True, ""
+
+    def shutdown(self) -> None:
+        self._closed = True
+        with self._lock:
+            listeners, self._listeners = self._listeners, []
+        for listener in listeners:
+            listener.stop()
+
+
+_pool: Optional[LibreOfficePool] = None
+_pool_lock = threading.Lock()
+
+
+def get_libreoffice_pool(
+    soffice_path: Optional[str] = None,
+) -> Optional[LibreOfficePool]:
+    """Return the process-wide pool, or None when pooling is disabled or unsupported."""
+    global _pool
+    from app.settings import settings
+
+    cfg = settings.docgen
+    if cfg.libreoffice_pool_size < 1:
+        return None
+    with _pool_lock:
+        if _pool is not None:
+            return _pool if _pool.pid == os.getpid() else None
+        if not uno_available():
+            logger.info("Python UNO bridge not available; LibreOffice pool disabled")
+            return None
+        _pool = LibreOfficePool(
+            size=cfg.libreoffice_pool_size,
+            soffice_path=soffice_path or cfg.libreoffice_path,
+            max_conversions=cfg.libreoffice_pool_max_conversions,
+            max_queue=cfg.libreoffice_pool_max_queue,
+            start_timeout=cfg.libreoffice_pool_start_timeout_seconds,
+        )
+        return _pool
+
+
+def shutdown_libreoffice_pool() -> None:
+    """Stop all pooled listeners owned by this process."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None and pool.pid == os.getpid():
+        pool.shutdown()
+
+
+atexit.register(shutdown_libreoffice_pool)
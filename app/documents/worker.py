@@ -8,10 +8,28 @@ from typing import Any, Dict
 from app.adapters.db import get_session
 from app.documents.contracts import DocumentOverrides
 from app.documents.service import DocumentGenerationService
+from app.documents.soffice_pool import get_libreoffice_pool
 
 logger = logging.getLogger(__name__)
 
 
+def prepare_worker_process() -> bool:
+    """
+    Create the LibreOffice pool in the long-running worker process so every job
+    converts through the same listeners. Returns True when a pool is in use.
+    """
+    from app.settings import settings
+
+    if settings.docgen.conversion_backend == "docx2pdf":
+        return False
+    pool = get_libreoffice_pool()
+    if pool is None:
+        logger.info("Document worker running without LibreOffice pool")
+        return False
+    logger.info("Document worker using LibreOffice pool (size %s)", pool.size)
+    return True
+
+
 def run_document_generation_job(payload: Dict[str, Any]) -> str | None:
     """
     RQ job entrypoint. payload: template_name, doc_type, doc_number, contact_id,
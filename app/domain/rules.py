@@ -671,6 +671,95 @@ def fifo_peek_cost(
     return None
 
 
+class CostSource(str, Enum):
+    """Where a unit cost came from."""
+
+    FIFO_ACTUAL = "fifo_actual"
+    STANDARD = "standard"
+    ESTIMATED = "estimated"
+    SUPPLIER_INVOICE = "supplier_invoice"
+    UNKNOWN = "unknown"
+
+
+@dataclass
+class CostResolution:
+    """Resolved unit cost for a product."""
+
+    unit_cost: Decimal
+    cost_source: str
+    has_estimate: bool
+    estimate_reason: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "unit_cost": self.unit_cost,
+            "cost_source": self.cost_source,
+            "has_estimate": self.has_estimate,
+            "estimate_reason": self.estimate_reason,
+        }
+
+
+def resolve_cost_for_product(
+    product, as_of_date=None, lots: Optional[List[InventoryLot]] = None
+) -> CostResolution:
+    """
+    Resolve a product's unit cost: FIFO actual → standard → estimated.
+
+    Args:
+        product: Product ORM instance
+        as_of_date: Ignore lots received after this date
+        lots: Pre-loaded lots for the product (defaults to ``product.inventory_lots``)
+
+    Returns:
+        CostResolution (zero cost with UNKNOWN source when nothing is known)
+    """
+    if lots is None:
+        lots = product.inventory_lots or []
+    candidates = [
+        lot
+        for lot in lots
+        if lot.is_active is not False
+        and (lot.quantity_kg or 0) > 0
+        and not (as_of_date and lot.received_at and lot.received_at > as_of_date)
+    ]
+    candidates.sort(key=lambda lot: (lot.received_at is None, lot.received_at))
+    for lot in candidates:
+        lot_cost = lot.current_unit_cost
+        if lot_cost is None:
+            lot_cost = lot.unit_cost
+        if lot_cost is not None:
+            return CostResolution(
+                Decimal(str(lot_cost)), CostSource.FIFO_ACTUAL.value, False
+            )
+
+    if product.standard_cost is not None:
+        return CostResolution(
+            Decimal(str(product.standard_cost)), CostSource.STANDARD.value, False
+        )
+
+    if product.estimated_cost is not None:
+        return CostResolution(
+            Decimal(str(product.estimated_cost)),
+            CostSource.ESTIMATED.value,
+            True,
+            product.estimate_reason,
+        )
+
+    return CostResolution(
+        Decimal("0"),
+        CostSource.UNKNOWN.value,
+        True,
+        "No lot, standard or estimated cost",
+    )
+
+
+def get_item_cost(
+    product, as_of_date=None, lots: Optional[List[InventoryLot]] = None
+) -> Dict[str, object]:
+    """Resolve a product's unit cost as a dict (see ``resolve_cost_for_product``)."""
+    return resolve_cost_for_product(product, as_of_date=as_of_date, lots=lots).as_dict()
+
+
 # Valid work order status transitions
 VALID_WO_STATUS_TRANSITIONS = {
     "draft": ["released", "void"],
@@ -1,15 +1,24 @@
-"""JSON logging configuration with request IDs."""
+"""JSON logging configuration with request IDs and per-request SQL metrics."""
 
 import json
 import logging
 import sys
+import threading
+import time
 import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from starlette.middleware.base import BaseHTTPMiddleware
 
+from app.settings import settings
+
 
 class JSONFormatter(logging.Formatter):
     """Custom JSON formatter for structured logging."""
@@ -70,6 +79,238 @@ class RequestIDMiddleware(BaseHTTPMiddleware):
         return response
 
 
+class QueryStats:
+    """SQL statements executed while a collector is active."""
+
+    def __init__(self, keep_slowest: int = 5):
+        self.count = 0
+        self.total_ms = 0.0
+        self.rows = 0
+        self.keep_slowest = keep_slowest
+        self.statements: List[str] = []
+        self.slowest: List[Dict[str, Any]] = []
+
+    def record(self, statement: str, duration_ms: float, rowcount: int) -> None:
+        self.count += 1
+        self.total_ms += duration_ms
+        # Drivers report -1 for SELECTs they have not counted (e.g. sqlite3).
+        if rowcount > 0:
+            self.rows += rowcount
+        self.statements.append(statement)
+        if self.keep_slowest:
+            self.slowest.append(
+                {"statement": statement, "duration_ms": round(duration_ms, 3)}
+            )
+            self.slowest.sort(key=lambda q: q["duration_ms"], reverse=True)
+            del self.slowest[self.keep_slowest :]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "query_count": self.count,
+            "db_ms": round(self.total_ms, 3),
+            "rows": self.rows,
+            "slowest": list(self.slowest),
+        }
+
+
+# Collectors for the current request / count_queries() block, plus collectors
+# bound to one engine (which see statements from every thread).
+_active_stats: ContextVar[tuple] = ContextVar("query_stats", default=())
+_engine_stats: Dict[Engine, List[QueryStats]] = {}
+_listener_lock = threading.Lock()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append((context, time.perf_counter()))
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _, started = conn.info["query_start"].pop()
+    collectors = _active_stats.get() + tuple(_engine_stats.get(conn.engine, ()))
+    if not collectors:
+        return
+    duration_ms = (time.perf_counter() - started) * 1000
+    rowcount = getattr(cursor, "rowcount", -1) or 0
+    for stats in collectors:
+        stats.record(statement, duration_ms, rowcount)
+    cfg = settings.logging
+    if duration_ms >= cfg.slow_query_ms:
+        fields: Dict[str, Any] = {
+            "statement": statement,
+            "duration_ms": round(duration_ms, 3),
+        }
+        explain = cfg.explain_slow_queries
+        if explain is None:
+            explain = settings.environment == "development"
+        if explain and not executemany:
+            plan = _explain(conn, statement, parameters)
+            if plan:
+                fields["plan"] = plan
+        logger.warning("slow query", **fields)
+
+
+def _explain(conn, statement: str, parameters) -> Optional[List[str]]:
+    """Query plan for a slow SELECT, or None for other statements / dialects."""
+    if not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+        return None
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        prefix = "EXPLAIN QUERY PLAN "
+    elif dialect in ("postgresql", "mysql"):
+        prefix = "EXPLAIN "
+    else:
+        return None
+    # A raw DBAPI cursor: bypasses these listeners and leaves the original
+    # cursor's pending rows untouched.
+    dbapi_connection = conn.connection.dbapi_connection
+    # A failed statement aborts the whole transaction on Postgres, so EXPLAIN
+    # runs inside a savepoint that is rolled back if it fails.
+    savepoint = dialect == "postgresql" and not getattr(
+        dbapi_connection, "autocommit", False
+    )
+    cursor = dbapi_connection.cursor()
+    try:
+        if savepoint:
+            cursor.execute("SAVEPOINT query_metrics_explain")
+        try:
+            cursor.execute(prefix + statement, parameters)
+            plan = [" ".join(str(col) for col in row) for row in cursor.fetchall()]
+        except Exception as exc:  # noqa: BLE001 - diagnostics must not break the query
+            if savepoint:
+                cursor.execute("ROLLBACK TO SAVEPOINT query_metrics_explain")
+            plan = [f"EXPLAIN failed: {exc}"]
+        if savepoint:
+            cursor.execute("RELEASE SAVEPOINT query_metrics_explain")
+        return plan
+    except Exception as exc:  # noqa: BLE001
+        return [f"EXPLAIN failed: {exc}"]
+    finally:
+        cursor.close()
+
+
+def _handle_error(context) -> None:
+    """Drop the start time pushed for a statement that raised."""
+    conn = context.connection
+    if conn is None:
+        return
+    starts = conn.info.get("query_start")
+    if starts and starts[-1][0] is context.execution_context:
+        starts.pop()
+
+
+def install_query_listeners() -> None:
+    """Attach the timing listeners to every Engine (idempotent)."""
+    with _listener_lock:
+        if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+            event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+            event.listen(Engine, "handle_error", _handle_error)
+
+
+@contextmanager
+def count_queries(engine: Optional[Engine] = None) -> Iterator[QueryStats]:
+    """Collect the SQL run inside the block.
+
+    Without ``engine`` only statements from the current context are counted (the
+    calling thread, or the request for middleware). With ``engine`` every
+    statement on that engine is counted, whichever thread runs it, which is what
+    tests driving a TestClient need.
+    """
+    install_query_listeners()
+    stats = QueryStats(keep_slowest=settings.logging.slowest_queries)
+    if engine is None:
+        token = _active_stats.set(_active_stats.get() + (stats,))
+        try:
+            yield stats
+        finally:
+            _active_stats.reset(token)
+        return
+    with _listener_lock:
+        _engine_stats.setdefault(engine, []).append(stats)
+    try:
+        yield stats
+    finally:
+        with _listener_lock:
+            _engine_stats[engine].remove(stats)
+            if not _engine_stats[engine]:
+                del _engine_stats[engine]
+
+
+@contextmanager
+def query_budget(max_queries: int, engine: Optional[Engine] = None):
+    """Fail with the executed statements when the block runs more than max_queries.
+
+    with query_budget(6, engine=session.get_bind()):
+        client.get("/api/v1/sales/orders")
+    """
+    with count_queries(engine) as stats:
+        yield stats
+    if stats.count > max_queries:
+        listing = "\n".join(
+            f"  {i}. {sql}" for i, sql in enumerate(stats.statements, 1)
+        )
+        raise AssertionError(
+            f"Expected at most {max_queries} queries, ran {stats.count}:\n{listing}"
+        )
+
+
+_recent_requests: deque = deque(maxlen=settings.logging.query_metrics_history)
+
+
+def query_metrics_snapshot() -> Dict[str, Any]:
+    """Recent per-request SQL metrics plus totals per route, for /debug/metrics."""
+    recent = list(_recent_requests)
+    routes: Dict[str, Dict[str, Any]] = {}
+    for item in recent:
+        route = routes.setdefault(
+            f"{item['method']} {item['path']}",
+            {"requests": 0, "query_count": 0, "db_ms": 0.0, "max_query_count": 0},
+        )
+        route["requests"] += 1
+        route["query_count"] += item["query_count"]
+        route["db_ms"] = round(route["db_ms"] + item["db_ms"], 3)
+        route["max_query_count"] = max(route["max_query_count"], item["query_count"])
+    return {"recent": recent, "routes": routes}
+
+
+class QueryMetricsMiddleware(BaseHTTPMiddleware):
+    """Record query count, DB time, rows and slowest statements per request.
+
+    Results are logged, returned as a Server-Timing header and kept for
+    query_metrics_snapshot().
+    """
+
+    def __init__(self, app):
+        super().__init__(app)
+        install_query_listeners()
+
+    async def dispatch(self, request: Request, call_next):
+        started = time.perf_counter()
+        with count_queries() as stats:
+            response = await call_next(request)
+        total_ms = (time.perf_counter() - started) * 1000
+
+        response.headers["Server-Timing"] = (
+            f'db;dur={stats.total_ms:.1f};desc="{stats.count} queries", '
+            f"app;dur={total_ms:.1f}"
+        )
+        metrics = {
+            "method": request.method,
+            "path": request.url.path,
+            "status_code": response.status_code,
+            "duration_ms": round(total_ms, 3),
+            **stats.to_dict(),
+        }
+        _recent_requests.append(metrics)
+        if stats.count:
+            logger.info(
+                "request queries",
+                request_id=getattr(request.state, "request_id", None),
+                **metrics,
+            )
+        return response
+
+
 class StructuredLogger:
     """Structured logger with request context."""
 
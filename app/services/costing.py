@@ -1,22 +1,65 @@
 # app/services/costing.py
 """Service for cost of goods (COGS) inspection, revaluation, and multi-level cost roll-up."""
 
+from dataclasses import dataclass, field
 from datetime import datetime
 from decimal import Decimal
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
-from sqlalchemy import or_
+from sqlalchemy import delete, insert, or_, select
 from sqlalchemy.orm import Session
 
-from app.adapters.db.models import (
+from app.adapters.db.models import InventoryLot, InventoryTxn, Product
+from app.adapters.db.models_assemblies_shopify import Assembly as AssemblyModel
+from app.adapters.db.models_assemblies_shopify import (
     AssemblyCostDependency,
-    InventoryLot,
-    InventoryTxn,
-    Product,
+    AssemblyLine,
+    CostRevaluationQueue,
     Revaluation,
 )
-from app.adapters.db.models_assemblies_shopify import Assembly as AssemblyModel
-from app.domain.rules import CostSource, get_item_cost, round_money, round_quantity
+from app.domain.rules import (
+    CostSource,
+    get_item_cost,
+    round_money,
+    round_quantity,
+)
+
+_IN_CHUNK = 500
+
+
+@dataclass
+class BomEdge:
+    """One component line of the assembly chosen for a parent product."""
+
+    component_id: str
+    quantity: Decimal
+    yield_factor: Decimal
+    is_energy_or_overhead: bool
+
+    @property
+    def qty_per_parent(self) -> Decimal:
+        return self.quantity / self.yield_factor
+
+
+@dataclass
+class BomGraph:
+    """Assembly graph and rolled-up unit costs for a set of root products."""
+
+    products: Dict[str, Product] = field(default_factory=dict)
+    edges: Dict[str, List[BomEdge]] = field(default_factory=dict)
+    costs: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+
+def _product_type(product: Product) -> str:
+    # Determine product type from capabilities for backward compatibility
+    if product.is_assemble:
+        return "FINISHED"
+    return "RAW" if product.is_purchase else "WIP"
+
+
+def _chunks(ids: List[str]) -> Iterable[List[str]]:
+    for i in range(0, len(ids), _IN_CHUNK):
+        yield ids[i : i + _IN_CHUNK]
 
 
 class CostingService:
@@ -71,141 +114,197 @@ class CostingService:
 
         return get_item_cost(product, as_of_date=as_of_date, lots=lots)
 
-    def build_bom_tree(
-        self,
-        item_id: str,
-        as_of_date: Optional[datetime] = None,
-        include_estimates: bool = True,
-        level: int = 0,
-        path: str = "",
-        visited: Optional[set] = None,
-    ) -> Dict[str, Any]:
+    def load_bom_graph(
+        self, product_ids: Iterable[str], as_of_date: Optional[datetime] = None
+    ) -> BomGraph:
         """
-        Recursively build BOM cost tree with multi-level roll-up.
+        Load the active assembly graph below ``product_ids`` and roll up unit costs.
+
+        Assemblies, products and leaf lots are fetched level by level with set
+        queries, every product is costed once in topological order, and cycles
+        are detected in a single pass.
 
         Args:
-            item_id: Product ID to build tree for
-            as_of_date: Optional point-in-time date
-            include_estimates: Whether to include estimated costs
-            level: Current recursion level
-            path: Current path in tree (for cycle detection)
-            visited: Set of visited product IDs (for cycle detection)
+            product_ids: Root product IDs (unknown IDs are skipped)
+            as_of_date: Optional point-in-time date for assemblies and leaf lots
 
         Returns:
-            Dictionary with tree structure: level, sku, name, qty_per_parent, unit_cost,
-            extended_cost, cost_source, has_estimate, estimate_reason, children
-        """
-        if visited is None:
-            visited = set()
-
-        product = self.db.get(Product, item_id)
-        if not product:
-            raise ValueError(f"Product {item_id} not found")
-
-        # Cycle detection
-        if item_id in visited:
-            raise ValueError(f"Circular BOM detected at {product.sku} (path: {path})")
-        visited.add(item_id)
+            BomGraph with products, chosen assembly edges and per-product costs
 
-        # Get active assemblies for this parent
-        assemblies = self.db.query(AssemblyModel).filter(
-            AssemblyModel.parent_product_id == item_id,
-            AssemblyModel.is_active.is_(True),
+        Raises:
+            ValueError: If the graph contains a cycle or a component is missing
+        """
+        graph = BomGraph()
+        roots = list(dict.fromkeys(pid for pid in product_ids if pid))
+        frontier = set(roots)
+        seen = set()
+        while frontier:
+            ids = sorted(frontier)
+            seen.update(ids)
+            for chunk in _chunks(ids):
+                graph.products.update(
+                    (product.id, product)
+                    for product in self.db.execute(
+                        select(Product).where(Product.id.in_(chunk))
+                    ).scalars()
+                )
+            children = self._load_edges(ids, as_of_date, graph.edges)
+            frontier = children - seen
+        for edges in graph.edges.values():
+            for edge in edges:
+                if edge.component_id not in graph.products:
+                    raise ValueError(f"Product {edge.component_id} not found")
+
+        order = self._topological_order(
+            [pid for pid in roots if pid in graph.products], graph
         )
+        leaves = [pid for pid in order if not graph.edges.get(pid)]
+        leaf_lots = self._load_leaf_lots(leaves, as_of_date)
+        for product_id in order:
+            edges = graph.edges.get(product_id)
+            if not edges:
+                graph.costs[product_id] = get_item_cost(
+                    graph.products[product_id],
+                    as_of_date=as_of_date,
+                    lots=leaf_lots.get(product_id, []),
+                )
+            else:
+                graph.costs[product_id] = self._roll_up_parent(graph, edges)
+        return graph
 
-        # Apply effective date filter if provided
-        if as_of_date:
-            assemblies = assemblies.filter(
-                or_(
-                    AssemblyModel.effective_from.is_(None),
-                    AssemblyModel.effective_from <= as_of_date,
-                ),
-                or_(
-                    AssemblyModel.effective_to.is_(None),
-                    AssemblyModel.effective_to >= as_of_date,
-                ),
+    def _load_edges(
+        self,
+        parent_ids: List[str],
+        as_of_date: Optional[datetime],
+        edges: Dict[str, List[BomEdge]],
+    ) -> set:
+        """Pick one assembly per parent and record its lines; return component IDs."""
+        chosen: Dict[str, AssemblyModel] = {}
+        for chunk in _chunks(parent_ids):
+            stmt = select(AssemblyModel).where(
+                AssemblyModel.parent_product_id.in_(chunk),
+                AssemblyModel.is_active.is_(True),
             )
-
-        assemblies = assemblies.all()
-
-        # Leaf node - get direct cost
-        if not assemblies:
-            visited.remove(item_id)
-
             if as_of_date:
-                cost_info = self.get_historical_cost(item_id, as_of_date)
-            else:
-                cost_info = self.get_current_cost(item_id)
-
-            return {
-                "level": level,
-                "sku": product.sku,
-                "name": product.name,
-                # Determine product type from capabilities for backward compatibility
-                "product_type": (
-                    "FINISHED"
-                    if product.is_assemble
-                    else "RAW"
-                    if product.is_purchase
-                    else "WIP"
-                ),
-                "qty_per_parent": Decimal("1"),
-                "unit_cost": cost_info["unit_cost"],
-                "extended_cost": cost_info["unit_cost"],
-                "cost_source": cost_info["cost_source"],
-                "has_estimate": cost_info["has_estimate"],
-                "estimate_reason": cost_info.get("estimate_reason"),
-                "children": [],
-            }
+                stmt = stmt.where(
+                    or_(
+                        AssemblyModel.effective_from.is_(None),
+                        AssemblyModel.effective_from <= as_of_date,
+                    ),
+                    or_(
+                        AssemblyModel.effective_to.is_(None),
+                        AssemblyModel.effective_to >= as_of_date,
+                    ),
+                )
+            for assembly in self.db.execute(stmt).scalars():
+                # Same preference as work order explosion: primary, then newest.
+                current = chosen.get(assembly.parent_product_id)
+                if current is None or self._assembly_rank(
+                    assembly
+                ) > self._assembly_rank(current):
+                    chosen[assembly.parent_product_id] = assembly
+
+        by_assembly = {assembly.id: assembly for assembly in chosen.values()}
+        components = set()
+        for chunk in _chunks(sorted(by_assembly)):
+            lines = self.db.execute(
+                select(AssemblyLine)
+                .where(AssemblyLine.assembly_id.in_(chunk))
+                .order_by(AssemblyLine.assembly_id, AssemblyLine.sequence)
+            ).scalars()
+            for line in lines:
+                assembly = by_assembly[line.assembly_id]
+                yield_factor = assembly.yield_factor or Decimal("1.0")
+                if yield_factor <= 0:
+                    yield_factor = Decimal("1.0")
+                edges.setdefault(assembly.parent_product_id, []).append(
+                    BomEdge(
+                        component_id=line.component_product_id,
+                        quantity=Decimal(str(line.quantity)),
+                        yield_factor=Decimal(str(yield_factor)),
+                        is_energy_or_overhead=bool(line.is_energy_or_overhead),
+                    )
+                )
+                components.add(line.component_product_id)
+        return components
+
+    @staticmethod
+    def _assembly_rank(assembly: AssemblyModel) -> tuple:
+        return (
+            bool(assembly.is_primary),
+            assembly.effective_from is not None,
+            assembly.effective_from or datetime.min,
+        )
 
-        # Parent node - roll up from children
-        children = []
+    @staticmethod
+    def _topological_order(roots: List[str], graph: BomGraph) -> List[str]:
+        """Return products below ``roots`` children-first, raising on a cycle."""
+        done = set()
+        on_path: Dict[str, int] = {}
+        order: List[str] = []
+        for root in roots:
+            if root in done:
+                continue
+            stack = [(root, iter(graph.edges.get(root, ())))]
+            on_path[root] = 0
+            while stack:
+                product_id, pending = stack[-1]
+                edge = next(pending, None)
+                if edge is None:
+                    stack.pop()
+                    del on_path[product_id]
+                    done.add(product_id)
+                    order.append(product_id)
+                    continue
+                child_id = edge.component_id
+                if child_id in done:
+                    continue
+                if child_id in on_path:
+                    path = " → ".join(
+                        graph.products[pid].sku for pid, _ in stack[on_path[child_id] :]
+                    )
+                    raise ValueError(
+                        f"Circular BOM detected at {graph.products[child_id].sku} "
+                        f"(path: {path})"
+                    )
+                on_path[child_id] = len(stack)
+                stack.append((child_id, iter(graph.edges.get(child_id, ()))))
+        return order
+
+    def _load_leaf_lots(
+        self, product_ids: List[str], as_of_date: Optional[datetime]
+    ) -> Dict[str, List[InventoryLot]]:
+        lots: Dict[str, List[InventoryLot]] = {}
+        for chunk in _chunks(sorted(product_ids)):
+            stmt = select(InventoryLot).where(
+                InventoryLot.product_id.in_(chunk),
+                InventoryLot.is_active.is_(True),
+            )
+            if as_of_date:
+                stmt = stmt.where(InventoryLot.received_at <= as_of_date)
+            stmt = stmt.order_by(InventoryLot.received_at, InventoryLot.id)
+            for lot in self.db.execute(stmt).scalars():
+                lots.setdefault(lot.product_id, []).append(lot)
+        return lots
+
+    @staticmethod
+    def _roll_up_parent(graph: BomGraph, edges: List[BomEdge]) -> Dict[str, Any]:
         total_cost = Decimal("0")
         has_any_estimate = False
         estimate_sources = []
-
-        for assembly in assemblies:
-            child_tree = self.build_bom_tree(
-                assembly.child_product_id,
-                as_of_date,
-                include_estimates,
-                level + 1,
-                f"{path} → {product.sku}" if path else product.sku,
-                set(visited),  # Pass copy to children
-            )
-
-            # Calculate quantity needed with loss factor and yield
-            loss_adjusted_ratio = assembly.ratio * (
-                Decimal("1") + (assembly.loss_factor or Decimal("0"))
-            )
-            yield_factor = assembly.yield_factor or Decimal("1.0")
-            qty_needed = loss_adjusted_ratio / yield_factor
-
-            child_extended = child_tree["unit_cost"] * qty_needed
-
-            children.append(
-                {
-                    **child_tree,
-                    "qty_per_parent": round_quantity(qty_needed),
-                    "extended_cost": round_money(child_extended),
-                    "assembly_ratio": assembly.ratio,
-                    "loss_factor": assembly.loss_factor or Decimal("0"),
-                    "yield_factor": yield_factor,
-                    "is_energy_or_overhead": assembly.is_energy_or_overhead or False,
-                }
-            )
-
-            total_cost += child_extended
-
-            if child_tree["has_estimate"]:
+        all_fifo = True
+        for edge in edges:
+            child = graph.costs[edge.component_id]
+            total_cost += child["unit_cost"] * edge.qty_per_parent
+            all_fifo = all_fifo and child["cost_source"] == CostSource.FIFO_ACTUAL.value
+            if child["has_estimate"]:
                 has_any_estimate = True
-                if child_tree.get("estimate_reason"):
+                if child.get("estimate_reason"):
                     estimate_sources.append(
-                        f"{child_tree['sku']}: {child_tree['estimate_reason']}"
+                        f"{graph.products[edge.component_id].sku}: "
+                        f"{child['estimate_reason']}"
                     )
 
-        visited.remove(item_id)
-
         # Determine cost source for parent
         if has_any_estimate:
             cost_source = CostSource.ESTIMATED.value
@@ -214,9 +313,7 @@ class CostingService:
                 if estimate_sources
                 else "Contains estimated components"
             )
-        elif all(
-            child["cost_source"] == CostSource.FIFO_ACTUAL.value for child in children
-        ):
+        elif all_fifo:
             cost_source = CostSource.FIFO_ACTUAL.value
             estimate_reason = None
         else:
@@ -224,23 +321,101 @@ class CostingService:
             estimate_reason = None
 
         return {
-            "level": level,
-            "sku": product.sku,
-            "name": product.name,
-            # Determine product type from capabilities for backward compatibility
-            "product_type": (
-                "FINISHED"
-                if product.is_assemble
-                else "RAW"
-                if product.is_purchase
-                else "WIP"
-            ),
-            "qty_per_parent": Decimal("1"),
             "unit_cost": round_money(total_cost),
-            "extended_cost": round_money(total_cost),
             "cost_source": cost_source,
             "has_estimate": has_any_estimate,
             "estimate_reason": estimate_reason,
+        }
+
+    def rollup_costs(
+        self, product_ids: Iterable[str], as_of_date: Optional[datetime] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Roll up unit costs for many products at once.
+
+        Args:
+            product_ids: Product IDs to cost (unknown IDs are omitted from the result)
+            as_of_date: Optional point-in-time date
+
+        Returns:
+            Mapping of product ID to item_id, sku, name, product_type, unit_cost,
+            cost_source, has_estimate, estimate_reason
+        """
+        ids = list(dict.fromkeys(pid for pid in product_ids if pid))
+        graph = self.load_bom_graph(ids, as_of_date)
+        result = {}
+        for product_id in ids:
+            product = graph.products.get(product_id)
+            if product is None:
+                continue
+            result[product_id] = {
+                "item_id": product_id,
+                "sku": product.sku,
+                "name": product.name,
+                "product_type": _product_type(product),
+                **graph.costs[product_id],
+            }
+        return result
+
+    def build_bom_tree(
+        self,
+        item_id: str,
+        as_of_date: Optional[datetime] = None,
+        include_estimates: bool = True,
+        level: int = 0,
+        graph: Optional[BomGraph] = None,
+    ) -> Dict[str, Any]:
+        """
+        Build BOM cost tree with multi-level roll-up.
+
+        Args:
+            item_id: Product ID to build tree for
+            as_of_date: Optional point-in-time date
+            include_estimates: Whether to include estimated costs
+            level: Level of the root node
+            graph: Pre-loaded graph from ``load_bom_graph`` (loaded when omitted)
+
+        Returns:
+            Dictionary with tree structure: level, sku, name, qty_per_parent, unit_cost,
+            extended_cost, cost_source, has_estimate, estimate_reason, children
+        """
+        if graph is None or item_id not in graph.costs:
+            graph = self.load_bom_graph([item_id], as_of_date)
+        if item_id not in graph.products:
+            raise ValueError(f"Product {item_id} not found")
+        return self._tree_node(graph, item_id, level)
+
+    def _tree_node(
+        self, graph: BomGraph, product_id: str, level: int
+    ) -> Dict[str, Any]:
+        product = graph.products[product_id]
+        cost = graph.costs[product_id]
+        children = []
+        for edge in graph.edges.get(product_id, ()):
+            child_tree = self._tree_node(graph, edge.component_id, level + 1)
+            qty_needed = edge.qty_per_parent
+            children.append(
+                {
+                    **child_tree,
+                    "qty_per_parent": round_quantity(qty_needed),
+                    "extended_cost": round_money(child_tree["unit_cost"] * qty_needed),
+                    "assembly_ratio": edge.quantity,
+                    "loss_factor": Decimal("0"),
+                    "yield_factor": edge.yield_factor,
+                    "is_energy_or_overhead": edge.is_energy_or_overhead,
+                }
+            )
+        return {
+            "level": level,
+            "sku": product.sku,
+            "name": product.name,
+            "product_type": _product_type(product),
+            "qty_per_parent": Decimal("1"),
+            "unit_cost": cost["unit_cost"],
+            "extended_cost": cost["unit_cost"],
+            "cost_source": cost["cost_source"],
+            "has_estimate": cost["has_estimate"],
+            "estimate_reason": cost.get("estimate_reason"),
             "children": children,
         }
 
@@ -265,27 +440,14 @@ class CostingService:
         if not product:
             raise ValueError(f"Product {item_id} not found")
 
-        # Get current or point-in-time cost (not used in BOM tree but available for future use)
-        # if as_of_date:
-        #     cost_data = self.get_historical_cost(item_id, as_of_date)
-        # else:
-        #     cost_data = self.get_current_cost(item_id)
-
-        # Build BOM tree recursively
+        # Build BOM tree from the rolled-up graph
         tree = self.build_bom_tree(item_id, as_of_date, include_estimates)
 
         return {
             "item_id": item_id,
             "sku": product.sku,
             "name": product.name,
-            # Determine product type from capabilities for backward compatibility
-            "product_type": (
-                "FINISHED"
-                if product.is_assemble
-                else "RAW"
-                if product.is_purchase
-                else "WIP"
-            ),
+            "product_type": _product_type(product),
             "unit_cost": tree["unit_cost"],
             "cost_source": tree["cost_source"],
             "has_estimate": tree["has_estimate"],
@@ -300,6 +462,7 @@ class CostingService:
         reason: str,
         revalued_by: str,
         propagate: bool = True,
+        defer: bool = False,
     ) -> Revaluation:
         """
         Revalue a lot and optionally propagate to downstream assemblies.
@@ -310,6 +473,8 @@ class CostingService:
             reason: Reason for revaluation
             revalued_by: User who performed revaluation
             propagate: Whether to propagate revaluation to downstream assemblies
+            defer: Queue the propagation for ``process_revaluation_queue`` instead
+                of running it inline
 
         Returns:
             Revaluation record
@@ -331,8 +496,6 @@ class CostingService:
         if lot.original_unit_cost is None:
             lot.original_unit_cost = old_cost
         lot.current_unit_cost = new_unit_cost
-        # Flush to ensure lot update is visible
-        self.db.flush()
 
         # Create revaluation record
         reval = Revaluation(
@@ -349,107 +512,240 @@ class CostingService:
         self.db.flush()
 
         if propagate:
-            # Find downstream assemblies that consumed this lot
-            dependencies = (
-                self.db.query(AssemblyCostDependency)
-                .filter(AssemblyCostDependency.consumed_lot_id == lot_id)
-                .all()
+            has_consumers = (
+                self.db.execute(
+                    select(AssemblyCostDependency.id)
+                    .where(AssemblyCostDependency.consumed_lot_id == lot_id)
+                    .limit(1)
+                ).first()
+                is not None
             )
+            if has_consumers and defer:
+                self.db.add(
+                    CostRevaluationQueue(
+                        source_lot_id=lot.id,
+                        reason=reason,
+                        revalued_by=revalued_by,
+                        queued_at=datetime.utcnow(),
+                    )
+                )
+                self.db.flush()
+            elif has_consumers:
+                self.propagate_revaluation([lot.id], reason, revalued_by)
+            reval.propagated_to_assemblies = has_consumers
+
+        return reval
 
-            # Refresh lot to ensure we have the latest state
-            self.db.refresh(lot)
+    def propagate_revaluation(
+        self, source_lot_ids: Iterable[str], reason: str, revalued_by: str
+    ) -> int:
+        """
+        Recost lots produced (directly or transitively) from revalued lots.
 
-            # Propagate revaluation
-            for dep in dependencies:
-                produced_lot = self.db.get(InventoryLot, dep.produced_lot_id)
-                if produced_lot:
-                    # Get all consumed issues for this assembly
-                    consumed_issues = self._get_consumed_issues_for_produced_lot(
-                        produced_lot.id
-                    )
+        The downstream closure is found through the consumed -> produced index,
+        produced lots are recomputed in dependency order from the current cost
+        of every input, and only lots with a dirty input are recomputed. A lot
+        whose cost comes out unchanged stops the propagation along that path.
 
-                    # Recalculate with new cost
-                    new_parent_cost = Decimal("0")
-                    for issue in consumed_issues:
-                        if issue["lot_id"] == lot_id:
-                            new_parent_cost += issue["qty"] * new_unit_cost
-                        else:
-                            new_parent_cost += issue["qty"] * issue["unit_cost"]
-
-                    new_parent_unit_cost = (
-                        new_parent_cost / produced_lot.quantity_kg
-                        if produced_lot.quantity_kg > 0
-                        else Decimal("0")
-                    )
+        Args:
+            source_lot_ids: Lots whose unit cost has already been changed
+            reason: Reason recorded on the propagated revaluations
+            revalued_by: User recorded on the propagated revaluations
 
-                    # Update produced lot
-                    old_parent_cost = (
-                        produced_lot.current_unit_cost
-                        or produced_lot.unit_cost
-                        or Decimal("0")
-                    )
-                    produced_lot.current_unit_cost = new_parent_unit_cost
-
-                    # Create revaluation entry for parent
-                    reval_parent = Revaluation(
-                        item_id=produced_lot.product_id,
-                        lot_id=produced_lot.id,
-                        old_unit_cost=old_parent_cost,
-                        new_unit_cost=new_parent_unit_cost,
-                        delta_extended_cost=(new_parent_unit_cost - old_parent_cost)
-                        * produced_lot.quantity_kg,
-                        reason=f"Propagated from lot {lot.lot_code}: {reason}",
-                        revalued_by=revalued_by,
-                        revalued_at=datetime.utcnow(),
-                        propagated_to_assemblies=True,
-                    )
-                    self.db.add(reval_parent)
+        Returns:
+            Number of downstream lots revalued
+        """
+        sources = list(dict.fromkeys(source_lot_ids))
+        downstream = self._downstream_lots(sources)
+        if not downstream:
+            return 0
+        inputs = self._lot_inputs(downstream)
+        lots = self._load_lots(
+            downstream
+            | set(sources)
+            | {row[0] for rows in inputs.values() for row in rows}
+        )
+        source_codes = [lots[lot_id].lot_code for lot_id in sources if lot_id in lots]
+        origin = (
+            f"lot {source_codes[0]}"
+            if len(source_codes) == 1
+            else f"{len(source_codes)} lots"
+        )
 
-            reval.propagated_to_assemblies = len(dependencies) > 0
+        dirty = set(sources)
+        now = datetime.utcnow()
+        rows = []
+        for produced_id in self._dependency_order(downstream, inputs):
+            produced_inputs = inputs.get(produced_id, [])
+            produced = lots.get(produced_id)
+            if produced is None or not any(
+                consumed_id in dirty for consumed_id, _, _ in produced_inputs
+            ):
+                continue
+            new_parent_cost = sum(
+                (
+                    qty * self._current_lot_cost(lots.get(consumed_id), txn_cost)
+                    for consumed_id, qty, txn_cost in produced_inputs
+                ),
+                Decimal("0"),
+            )
+            new_parent_unit_cost = (
+                round_money(new_parent_cost / produced.quantity_kg)
+                if produced.quantity_kg > 0
+                else Decimal("0")
+            )
+            old_parent_cost = (
+                produced.current_unit_cost or produced.unit_cost or Decimal("0")
+            )
+            if new_parent_unit_cost == old_parent_cost:
+                continue
+            produced.current_unit_cost = new_parent_unit_cost
+            dirty.add(produced_id)
+            rows.append(
+                {
+                    "item_id": produced.product_id,
+                    "lot_id": produced.id,
+                    "old_unit_cost": old_parent_cost,
+                    "new_unit_cost": new_parent_unit_cost,
+                    "delta_extended_cost": round_money(
+                        (new_parent_unit_cost - old_parent_cost) * produced.quantity_kg
+                    ),
+                    "reason": f"Propagated from {origin}: {reason}",
+                    "revalued_by": revalued_by,
+                    "revalued_at": now,
+                    "propagated_to_assemblies": True,
+                }
+            )
 
-        return reval
+        if rows:
+            self.db.flush()
+            self.db.execute(insert(Revaluation), rows)
+        return len(rows)
 
-    def _get_consumed_issues_for_produced_lot(
-        self, produced_lot_id: str
-    ) -> List[Dict[str, Any]]:
+    def process_revaluation_queue(self, limit: Optional[int] = None) -> Dict[str, int]:
         """
-        Get all consumed issues for a produced lot (for revaluation recalculation).
+        Propagate queued revaluations (see ``revalue_lot(defer=True)``).
+
+        Entries sharing a reason and user are propagated together so a shared
+        downstream lot is recomputed once per batch.
 
         Args:
-            produced_lot_id: Produced lot ID
+            limit: Maximum number of queue entries to process (oldest first)
 
         Returns:
-            List of issue dictionaries with lot_id, qty, unit_cost (using current lot cost)
+            Dictionary with processed entry and revalued lot counts
         """
-        dependencies = (
-            self.db.query(AssemblyCostDependency)
-            .filter(AssemblyCostDependency.produced_lot_id == produced_lot_id)
-            .all()
+        stmt = select(CostRevaluationQueue).order_by(
+            CostRevaluationQueue.queued_at, CostRevaluationQueue.id
         )
-
-        issues = []
-        for dep in dependencies:
-            consumed_txn = self.db.get(InventoryTxn, dep.consumed_txn_id)
-            if consumed_txn:
-                # Use current lot cost (which may have been revalued)
-                consumed_lot = self.db.get(InventoryLot, consumed_txn.lot_id)
-                current_cost = (
-                    consumed_lot.current_unit_cost
-                    if consumed_lot
-                    else (consumed_txn.unit_cost or Decimal("0"))
+        if limit:
+            stmt = stmt.limit(limit)
+        entries = self.db.execute(stmt).scalars().all()
+
+        groups: Dict[tuple, List[str]] = {}
+        for entry in entries:
+            groups.setdefault((entry.reason, entry.revalued_by), []).append(
+                entry.source_lot_id
+            )
+        revalued = 0
+        for (reason, revalued_by), lot_ids in groups.items():
+            revalued += self.propagate_revaluation(lot_ids, reason, revalued_by)
+
+        entry_ids = [entry.id for entry in entries]
+        for chunk in _chunks(entry_ids):
+            self.db.execute(
+                delete(CostRevaluationQueue).where(CostRevaluationQueue.id.in_(chunk))
+            )
+        return {"processed": len(entries), "revalued_lots": revalued}
+
+    def _downstream_lots(self, lot_ids: List[str]) -> set:
+        """Lots produced, transitively, from ``lot_ids``."""
+        downstream: set = set()
+        frontier = set(lot_ids)
+        while frontier:
+            produced = set()
+            for chunk in _chunks(sorted(frontier)):
+                produced.update(
+                    self.db.execute(
+                        select(AssemblyCostDependency.produced_lot_id).where(
+                            AssemblyCostDependency.consumed_lot_id.in_(chunk)
+                        )
+                    ).scalars()
                 )
-
-                issues.append(
-                    {
-                        "lot_id": consumed_txn.lot_id,
-                        "qty": abs(
-                            consumed_txn.quantity_kg
-                        ),  # Abs because issues are negative
-                        "unit_cost": current_cost,  # Use current lot cost, not transaction cost
-                    }
+            frontier = produced - downstream
+            downstream |= frontier
+        return downstream
+
+    def _lot_inputs(self, produced_lot_ids: set) -> Dict[str, List[tuple]]:
+        """Consumed (lot_id, qty, txn unit cost) rows per produced lot."""
+        inputs: Dict[str, List[tuple]] = {}
+        for chunk in _chunks(sorted(produced_lot_ids)):
+            rows = self.db.execute(
+                select(
+                    AssemblyCostDependency.produced_lot_id,
+                    AssemblyCostDependency.consumed_lot_id,
+                    InventoryTxn.quantity_kg,
+                    InventoryTxn.unit_cost,
                 )
-
-        return issues
+                .join(
+                    InventoryTxn,
+                    InventoryTxn.id == AssemblyCostDependency.consumed_txn_id,
+                )
+                .where(AssemblyCostDependency.produced_lot_id.in_(chunk))
+            ).all()
+            for produced_id, consumed_id, qty, txn_cost in rows:
+                # Abs because issues are negative
+                inputs.setdefault(produced_id, []).append(
+                    (consumed_id, abs(Decimal(str(qty))), txn_cost)
+                )
+        return inputs
+
+    def _load_lots(self, lot_ids: set) -> Dict[str, InventoryLot]:
+        lots = {}
+        for chunk in _chunks(sorted(lot_ids)):
+            lots.update(
+                (lot.id, lot)
+                for lot in self.db.execute(
+                    select(InventoryLot).where(InventoryLot.id.in_(chunk))
+                ).scalars()
+            )
+        return lots
+
+    @staticmethod
+    def _dependency_order(
+        produced_lot_ids: set, inputs: Dict[str, List[tuple]]
+    ) -> List[str]:
+        """Order produced lots so every lot comes after the lots it consumed."""
+        pending = {lot_id: 0 for lot_id in produced_lot_ids}
+        consumers: Dict[str, List[str]] = {}
+        for produced_id, rows in inputs.items():
+            for consumed_id, _, _ in rows:
+                if consumed_id in pending:
+                    pending[produced_id] += 1
+                    consumers.setdefault(consumed_id, []).append(produced_id)
+        ready = sorted(lot_id for lot_id, count in pending.items() if count == 0)
+        order = []
+        while ready:
+            lot_id = ready.pop()
+            order.append(lot_id)
+            for consumer_id in consumers.get(lot_id, ()):
+                pending[consumer_id] -= 1
+                if pending[consumer_id] == 0:
+                    ready.append(consumer_id)
+        if len(order) != len(pending):
+            raise ValueError("Circular lot cost dependency detected")
+        return order
+
+    @staticmethod
+    def _current_lot_cost(
+        lot: Optional[InventoryLot], txn_cost: Optional[Decimal]
+    ) -> Decimal:
+        # Use current lot cost (which may have been revalued), not transaction cost
+        if lot is not None:
+            for cost in (lot.current_unit_cost, lot.unit_cost):
+                if cost is not None:
+                    return Decimal(str(cost))
+        return Decimal(str(txn_cost or 0))
 
     def print_cogs_tree(self, cogs_data: Dict[str, Any], indent: int = 0) -> str:
         """
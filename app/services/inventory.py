@@ -2,10 +2,12 @@
 Inventory Service - Core inventory operations with FIFO and reservations.
 """
 
+from dataclasses import dataclass
 from datetime import datetime
 from decimal import Decimal
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Sequence
 
+from sqlalchemy import insert, select
 from sqlalchemy.orm import Session
 
 from app.adapters.db.models import InventoryLot, InventoryTxn, Product
@@ -18,9 +20,26 @@ from app.domain.rules import (
     round_money,
     round_quantity,
 )
+from app.services.stock_summary import read_stock_summaries, read_stock_summary
 
 WRITE_OFF_REASONS = frozenset({"DAMAGED", "LOST", "SHRINKAGE", "OTHER"})
 
+NEGATIVE_LOT_CODE = "__AUTO_NEGATIVE__"
+
+
+@dataclass
+class FifoRequest:
+    """One product quantity to issue through ``consume_many_fifo``."""
+
+    product_id: str
+    qty_kg: Decimal
+    reason: str
+    ref_type: str
+    ref_id: Optional[str]
+    notes: Optional[str] = None
+    allow_negative: bool = False
+    txn_type: str = "ISSUE"
+
 
 class InventoryService:
     """
@@ -34,43 +53,50 @@ class InventoryService:
         product = self.db.get(Product, product_id)
         return inventory_uom_for_product(product)
 
+    def get_stock_summary(self, product_id: str) -> Dict[str, Any]:
+        """On-hand, reserved and active lot count from the maintained summary row."""
+        return read_stock_summary(self.db, product_id)
+
     def available_to_sell(self, product_id: str) -> Decimal:
         """
         Calculate available quantity in the product's inventory UOM:
         on_hand - reserved.
         """
-        # Get on-hand quantity from all active lots
-        lots = (
-            self.db.query(InventoryLot)
-            .filter(
-                InventoryLot.product_id == product_id, InventoryLot.is_active.is_(True)
-            )
-            .all()
-        )
-
-        on_hand = sum(lot.quantity_kg for lot in lots)
-
-        # Get reserved quantity from active reservations
-        reservations = (
-            self.db.query(InventoryReservation)
-            .filter(
-                InventoryReservation.product_id == product_id,
-                InventoryReservation.status == "ACTIVE",
-            )
-            .all()
-        )
-
-        reserved = sum(res.qty_canonical for res in reservations)
-
         # Quarantine not yet implemented (will be lot flag)
-        available = on_hand - reserved
-
-        return round_quantity(available)
+        summary = self.get_stock_summary(product_id)
+        return round_quantity(summary["on_hand_qty"] - summary["reserved_qty"])
 
     def get_stock_on_hand(self, product_id: str) -> Decimal:
         """Sum active lot quantities in the product's inventory unit."""
-        lots = self.get_lots_fifo(product_id)
-        return round_quantity(sum(lot.quantity_kg for lot in lots))
+        return round_quantity(self.get_stock_summary(product_id)["on_hand_qty"])
+
+    def get_stock_levels(
+        self, product_ids: Optional[Iterable[str]] = None
+    ) -> Dict[str, Dict[str, Decimal]]:
+        """
+        On-hand, reserved and available quantities for many products at once.
+
+        Reads the maintained stock summary in bulk instead of one lookup per
+        product. Every requested product gets an entry (zeros when unstocked);
+        with ``product_ids=None`` only products holding stock or reservations
+        are returned.
+        """
+        ids = None if product_ids is None else list(product_ids)
+        summaries = read_stock_summaries(self.db, ids)
+        zero = {"on_hand_qty": Decimal("0"), "reserved_qty": Decimal("0")}
+        if ids is None:
+            ids = list(summaries)
+        levels: Dict[str, Dict[str, Decimal]] = {}
+        for product_id in ids:
+            summary = summaries.get(product_id, zero)
+            on_hand = round_quantity(summary["on_hand_qty"])
+            reserved = round_quantity(summary["reserved_qty"])
+            levels[product_id] = {
+                "on_hand_qty": on_hand,
+                "reserved_qty": reserved,
+                "available_qty": round_quantity(on_hand - reserved),
+            }
+        return levels
 
     def stock_on_hand_payload(self, product_id: str) -> Dict[str, Any]:
         """Stock on hand with unit for API/UI."""
@@ -110,31 +136,34 @@ class InventoryService:
 
         return lots
 
-    def _get_or_create_negative_lot(self, product_id: str) -> InventoryLot:
-        """Get or create a placeholder lot used to track negative inventory."""
-        lot = (
-            self.db.query(InventoryLot)
-            .filter(
-                InventoryLot.product_id == product_id,
-                InventoryLot.lot_code == "__AUTO_NEGATIVE__",
-                InventoryLot.is_active.is_(True),
-            )
-            .first()
-        )
+    def get_lots_fifo_many(
+        self, product_ids: Iterable[str], lock: bool = False
+    ) -> Dict[str, List[InventoryLot]]:
+        """
+        Load active lots for several products in one query, FIFO-ordered per product.
 
-        if not lot:
-            lot = InventoryLot(
-                product_id=product_id,
-                lot_code="__AUTO_NEGATIVE__",
-                quantity_kg=round_quantity(Decimal("0")),
-                unit_cost=Decimal("0"),
-                received_at=datetime.utcnow(),
-                is_active=True,
-            )
-            self.db.add(lot)
-            self.db.flush()
+        Args:
+            product_ids: Product IDs
+            lock: Take row locks (SELECT ... FOR UPDATE) on PostgreSQL
 
-        return lot
+        Returns:
+            Mapping of product ID to lots ordered by received_at
+        """
+        ids = sorted({pid for pid in product_ids if pid})
+        lots_by_product: Dict[str, List[InventoryLot]] = {pid: [] for pid in ids}
+        if not ids:
+            return lots_by_product
+
+        stmt = (
+            select(InventoryLot)
+            .where(InventoryLot.product_id.in_(ids), InventoryLot.is_active.is_(True))
+            .order_by(InventoryLot.product_id, InventoryLot.received_at.asc())
+        )
+        if lock and self.db.get_bind().dialect.name == "postgresql":
+            stmt = stmt.with_for_update()
+        for lot in self.db.execute(stmt).scalars():
+            lots_by_product[lot.product_id].append(lot)
+        return lots_by_product
 
     def consume_lots_fifo(
         self,
@@ -164,48 +193,142 @@ class InventoryService:
         Raises:
             ValueError: If insufficient stock
         """
-        lots = self.get_lots_fifo(product_id)
+        request = FifoRequest(
+            product_id=product_id,
+            qty_kg=qty_kg,
+            reason=reason,
+            ref_type=ref_type,
+            ref_id=ref_id,
+            notes=notes,
+            allow_negative=allow_negative,
+            txn_type=txn_type,
+        )
+        return self.consume_many_fifo([request])[0]
 
-        # Use domain FIFO logic
-        issues = fifo_issue(lots, qty_kg, override_negative=allow_negative)
-
-        issued_total = sum(issue.quantity_kg for issue in issues)
-        if allow_negative and issued_total < qty_kg:
-            deficit = round_quantity(qty_kg - issued_total)
-            if deficit > 0:
-                negative_lot = self._get_or_create_negative_lot(product_id)
-                if negative_lot not in lots:
-                    lots.append(negative_lot)
-
-                starting_qty = negative_lot.quantity_kg or Decimal("0")
-                remaining_qty = round_quantity(starting_qty - deficit)
-                issues.append(
-                    FifoIssue(
-                        lot_id=negative_lot.id,
-                        quantity_kg=deficit,
-                        unit_cost=negative_lot.unit_cost or Decimal("0"),
-                        remaining_quantity_kg=remaining_qty,
-                    )
-                )
+    def consume_many_fifo(
+        self,
+        requests: Sequence[FifoRequest],
+        lots_by_product: Optional[Dict[str, List[InventoryLot]]] = None,
+    ) -> List[List[FifoIssue]]:
+        """
+        Consume inventory for several products using FIFO in a fixed number of queries.
 
-        # Update lots and write transactions
-        for issue in issues:
-            lot = next(lot for lot in lots if lot.id == issue.lot_id)
-            lot.quantity_kg = issue.remaining_quantity_kg
+        Lots for every product are loaded in one query (row-locked on PostgreSQL),
+        issues are planned in memory, and the InventoryTxn rows are bulk-inserted.
+        Requests for the same product are applied in order. If any request cannot
+        be satisfied, no lot is changed.
 
-            # Write transaction
-            self.write_inventory_txn(
-                lot_id=lot.id,
-                txn_type=txn_type,
-                qty_kg=-abs(issue.quantity_kg),  # Negative for issues
-                unit_cost=issue.unit_cost,
-                ref_type=ref_type,
-                ref_id=ref_id,
-                notes=notes or reason,
-            )
+        Args:
+            requests: Quantities to issue
+            lots_by_product: Lots already loaded via get_lots_fifo_many(lock=True)
 
+        Returns:
+            FifoIssue results per request, in request order
+
+        Raises:
+            ValueError: If stock is insufficient for a request
+        """
+        if not requests:
+            return []
+        if lots_by_product is None:
+            lots_by_product = self.get_lots_fifo_many(
+                (req.product_id for req in requests), lock=True
+            )
+        lots_by_id = {lot.id: lot for lots in lots_by_product.values() for lot in lots}
+        original_qty = {lot_id: lot.quantity_kg for lot_id, lot in lots_by_id.items()}
+        negative_lots: Dict[str, InventoryLot] = {}
+
+        results: List[List[FifoIssue]] = []
+        # (lot, issue, txn values) - new negative lots only get an id on flush
+        postings: List[tuple] = []
+        try:
+            for req in requests:
+                lots = lots_by_product.setdefault(req.product_id, [])
+                # Use domain FIFO logic
+                issues = fifo_issue(
+                    lots, req.qty_kg, override_negative=req.allow_negative
+                )
+                issued = [(lots_by_id[issue.lot_id], issue) for issue in issues]
+
+                issued_total = sum(issue.quantity_kg for issue in issues)
+                if req.allow_negative and issued_total < req.qty_kg:
+                    deficit = round_quantity(req.qty_kg - issued_total)
+                    if deficit > 0:
+                        negative_lot = self._negative_lot_for(
+                            req.product_id, lots, negative_lots
+                        )
+                        starting_qty = negative_lot.quantity_kg or Decimal("0")
+                        issue = FifoIssue(
+                            lot_id=negative_lot.id,
+                            quantity_kg=deficit,
+                            unit_cost=negative_lot.unit_cost or Decimal("0"),
+                            remaining_quantity_kg=round_quantity(
+                                starting_qty - deficit
+                            ),
+                        )
+                        issues.append(issue)
+                        issued.append((negative_lot, issue))
+
+                # Update lots in memory so later requests see remaining stock
+                for lot, issue in issued:
+                    lot.quantity_kg = issue.remaining_quantity_kg
+                    postings.append(
+                        (
+                            lot,
+                            issue,
+                            self._inventory_txn_values(
+                                lot_id=lot.id,
+                                txn_type=req.txn_type,
+                                qty_kg=-abs(issue.quantity_kg),  # Negative for issues
+                                unit_cost=issue.unit_cost,
+                                ref_type=req.ref_type,
+                                ref_id=req.ref_id,
+                                notes=req.notes or req.reason,
+                            ),
+                        )
+                    )
+                results.append(issues)
+        except ValueError:
+            for lot_id, qty in original_qty.items():
+                lots_by_id[lot_id].quantity_kg = qty
+            for lot in negative_lots.values():
+                self.db.expunge(lot)
+            raise
+
+        # Lot updates (and any new negative lots) go first for the txn FKs
         self.db.flush()
-        return issues
+        txn_rows = []
+        for lot, issue, values in postings:
+            issue.lot_id = lot.id
+            values["lot_id"] = lot.id
+            txn_rows.append(values)
+        if txn_rows:
+            self.db.execute(insert(InventoryTxn), txn_rows)
+        return results
+
+    def _negative_lot_for(
+        self,
+        product_id: str,
+        lots: List[InventoryLot],
+        created: Dict[str, InventoryLot],
+    ) -> InventoryLot:
+        """Find the loaded negative-tracking lot for a product or stage a new one."""
+        for lot in lots:
+            if lot.lot_code == NEGATIVE_LOT_CODE:
+                return lot
+        if product_id not in created:
+            lot = InventoryLot(
+                product_id=product_id,
+                lot_code=NEGATIVE_LOT_CODE,
+                quantity_kg=round_quantity(Decimal("0")),
+                unit_cost=Decimal("0"),
+                received_at=datetime.utcnow(),
+                is_active=True,
+            )
+            self.db.add(lot)
+            created[product_id] = lot
+            lots.append(lot)
+        return created[product_id]
 
     def add_lot(
         self,
@@ -284,7 +407,7 @@ class InventoryService:
         lots = [
             lot
             for lot in self.get_lots_fifo(product_id)
-            if lot.lot_code != "__AUTO_NEGATIVE__"
+            if lot.lot_code != NEGATIVE_LOT_CODE
         ]
         soh = sum(lot.quantity_kg for lot in lots)
         soh = round_quantity(soh)
@@ -628,27 +751,50 @@ class InventoryService:
         Returns:
             Created InventoryTxn
         """
-        qty_rounded = round_quantity(qty_kg)
-        extended = None
-        if unit_cost is not None:
-            extended = round_money(abs(qty_rounded) * unit_cost)
-
         txn = InventoryTxn(
-            lot_id=lot_id,
-            transaction_type=txn_type,
-            quantity_kg=qty_rounded,
-            unit_cost=unit_cost,
-            extended_cost=extended,
-            cost_source=cost_source,
-            reference_type=ref_type,
-            reference_id=ref_id,
-            notes=notes,
-            created_at=datetime.utcnow(),
+            **self._inventory_txn_values(
+                lot_id=lot_id,
+                txn_type=txn_type,
+                qty_kg=qty_kg,
+                unit_cost=unit_cost,
+                ref_type=ref_type,
+                ref_id=ref_id,
+                notes=notes,
+                cost_source=cost_source,
+            )
         )
 
         self.db.add(txn)
         return txn
 
+    @staticmethod
+    def _inventory_txn_values(
+        lot_id: str,
+        txn_type: str,
+        qty_kg: Decimal,
+        unit_cost: Optional[Decimal],
+        ref_type: Optional[str],
+        ref_id: Optional[str],
+        notes: Optional[str],
+        cost_source: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        qty_rounded = round_quantity(qty_kg)
+        extended = None
+        if unit_cost is not None:
+            extended = round_money(abs(qty_rounded) * unit_cost)
+        return {
+            "lot_id": lot_id,
+            "transaction_type": txn_type,
+            "quantity_kg": qty_rounded,
+            "unit_cost": unit_cost,
+            "extended_cost": extended,
+            "cost_source": cost_source,
+            "reference_type": ref_type,
+            "reference_id": ref_id,
+            "notes": notes,
+            "created_at": datetime.utcnow(),
+        }
+
     def reserve_inventory(
         self, product_id: str, qty_kg: Decimal, source: str, reference_id: str
     ) -> InventoryReservation:
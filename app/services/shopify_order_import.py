@@ -1,17 +1,26 @@
 """Shopify order import service - imports orders from Shopify and creates SalesOrders."""
 
-from datetime import datetime
+import json
+import queue
+import threading
+import time
+from datetime import datetime, timezone
 from decimal import Decimal
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 from uuid import uuid4
 
-from sqlalchemy import func, select
+from sqlalchemy import func, insert, select
 from sqlalchemy.orm import Session
 
 from app.adapters.db.models import Customer, Product
+from app.adapters.db.models_assemblies_shopify import (
+    ProductChannelLink,
+    ShopifyImportCheckpoint,
+)
 from app.adapters.shopify_client import ShopifyClient
 from app.domain.rules import fifo_peek_cost
 from app.services.inventory import InventoryService
+from app.settings import settings
 from apps.vndmanuf_sales.models import (
     SalesChannel,
     SalesOrder,
@@ -19,6 +28,86 @@ from apps.vndmanuf_sales.models import (
     SalesOrderSource,
     SalesOrderStatus,
 )
+from apps.vndmanuf_sales.services.customer_first_order import (
+    refresh_customer_first_orders,
+)
+from apps.vndmanuf_sales.services.sales_rollup import refresh_sales_rollup
+
+# Checkpoint states
+RUNNING = "RUNNING"
+COMPLETED = "COMPLETED"
+FAILED = "FAILED"
+
+_IN_CHUNK = 500
+# COGS columns are optional on sales_order_lines (added by a later migration)
+_LINE_HAS_COGS = hasattr(SalesOrderLine, "cogs_per_unit") and hasattr(
+    SalesOrderLine, "cogs_total"
+)
+
+
+def _shopify_timestamp(value: datetime) -> str:
+    """ISO 8601 in UTC with a Z suffix, as the orders endpoint expects."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat() + "Z"
+
+
+def _customer_identity(shopify_customer: Dict[str, Any]) -> Tuple[Optional[str], str]:
+    """(email, display name) used to match a Shopify customer."""
+    email = shopify_customer.get("email")
+    first_name = shopify_customer.get("first_name") or ""
+    last_name = shopify_customer.get("last_name") or ""
+    name = f"{first_name} {last_name}".strip() or email or "Unknown Customer"
+    return email, name
+
+
+class _ImportLookups:
+    """Product, variant and customer keys loaded once per import run."""
+
+    def __init__(self, db: Session):
+        self.product_by_sku: Dict[str, str] = {}
+        for product_id, sku in db.execute(
+            select(Product.id, Product.sku).where(Product.deleted_at.is_(None))
+        ):
+            if sku:
+                self.product_by_sku.setdefault(sku.lower(), product_id)
+        self.product_by_variant: Dict[str, str] = {}
+        for variant_id, product_id in db.execute(
+            select(
+                ProductChannelLink.shopify_variant_id, ProductChannelLink.product_id
+            ).where(
+                ProductChannelLink.channel == "shopify",
+                ProductChannelLink.shopify_variant_id.is_not(None),
+            )
+        ):
+            self.product_by_variant.setdefault(str(variant_id), product_id)
+        self.customer_by_email: Dict[str, str] = {}
+        self.customer_by_name: Dict[str, str] = {}
+        self.customer_codes: Dict[str, str] = {}
+        for customer_id, email, name, code in db.execute(
+            select(Customer.id, Customer.email, Customer.name, Customer.code).where(
+                Customer.deleted_at.is_(None)
+            )
+        ):
+            self.add_customer(customer_id, email, name, code)
+        # product_id -> FIFO unit cost (None when no costed stock)
+        self.unit_cost: Dict[str, Optional[Decimal]] = {}
+
+    def add_customer(
+        self, customer_id: str, email: Optional[str], name: Optional[str], code: str
+    ) -> None:
+        if email:
+            self.customer_by_email.setdefault(email.lower(), customer_id)
+        if name:
+            self.customer_by_name.setdefault(name.lower(), customer_id)
+        if code:
+            self.customer_codes.setdefault(code, customer_id)
+
+    def find_product(self, sku: str, variant_id: str) -> Optional[str]:
+        product_id = self.product_by_sku.get(sku.lower()) if sku else None
+        if not product_id and variant_id:
+            product_id = self.product_by_variant.get(variant_id)
+        return product_id
 
 
 class ShopifyOrderImportService:
@@ -92,9 +181,7 @@ class ShopifyOrderImportService:
         Returns:
             Customer model instance
         """
-        email = shopify_customer.get("email")
-        first_name = shopify_customer.get("first_name", "")
-        last_name = shopify_customer.get("last_name", "")
+        email, customer_name = _customer_identity(shopify_customer)
 
         # Try to find by email first
         if email:
@@ -112,9 +199,6 @@ class ShopifyOrderImportService:
                 return customer
 
         # Try to find by name
-        customer_name = (
-            f"{first_name} {last_name}".strip() or email or "Unknown Customer"
-        )
         customer = (
             self.db.execute(
                 select(Customer).where(
@@ -130,19 +214,41 @@ class ShopifyOrderImportService:
             return customer
 
         # Create new customer
-        customer_code = f"SHOPIFY-{shopify_customer.get('id', uuid4())}"
-        customer = Customer(
+        customer = self._new_customer(shopify_customer, email, customer_name)
+        self.db.add(customer)
+        self.db.flush()
+
+        return customer
+
+    def _new_customer(
+        self, shopify_customer: Dict[str, Any], email: Optional[str], name: str
+    ) -> Customer:
+        return Customer(
             id=str(uuid4()),
-            code=customer_code,
-            name=customer_name,
+            code=f"SHOPIFY-{shopify_customer.get('id') or uuid4()}",
+            name=name,
             email=email,
             customer_type="direct_customer",
             is_active=True,
         )
-        self.db.add(customer)
-        self.db.flush()
 
-        return customer
+    def _resolve_customer_id(
+        self, shopify_customer: Dict[str, Any], lookups: _ImportLookups
+    ) -> str:
+        """Customer id from the run's lookup maps, adding (unflushed) new customers."""
+        email, name = _customer_identity(shopify_customer)
+        customer_id = lookups.customer_by_email.get(email.lower()) if email else None
+        customer_id = customer_id or lookups.customer_by_name.get(name.lower())
+        if customer_id:
+            return customer_id
+        customer = self._new_customer(shopify_customer, email, name)
+        # Same Shopify customer id under a new email/name: reuse, codes are unique
+        customer_id = lookups.customer_codes.get(customer.code)
+        if customer_id:
+            return customer_id
+        self.db.add(customer)
+        lookups.add_customer(customer.id, email, name, customer.code)
+        return customer.id
 
     def _find_product_by_sku(self, sku: str) -> Optional[Product]:
         """Find a product by SKU."""
@@ -160,8 +266,6 @@ class ShopifyOrderImportService:
 
     def _find_product_by_variant_id(self, variant_id: str) -> Optional[Product]:
         """Find a product by Shopify variant ID via product_channel_links."""
-        from app.adapters.db.models_assemblies_shopify import ProductChannelLink
-
         link = (
             self.db.query(ProductChannelLink)
             .filter_by(shopify_variant_id=str(variant_id), channel="shopify")
@@ -172,6 +276,101 @@ class ShopifyOrderImportService:
             return self.db.get(Product, link.product_id)
         return None
 
+    def _order_rows(
+        self,
+        shopify_order: Dict[str, Any],
+        customer_id: str,
+        channel_id: str,
+        find_product: Callable[[str, str], Optional[str]],
+        unit_cost: Callable[[str], Optional[Decimal]],
+    ) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Column values for a SalesOrder and its lines from a Shopify order.
+
+        Args:
+            shopify_order: Shopify order dictionary
+            customer_id: Matched customer
+            channel_id: Shopify sales channel
+            find_product: (sku, variant_id) -> product id, or None to skip the item
+            unit_cost: product id -> FIFO unit cost for COGS
+
+        Returns:
+            Tuple of (order row, line rows)
+        """
+        # Parse order date
+        created_at = shopify_order.get("created_at")
+        if created_at:
+            order_date = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
+        else:
+            order_date = datetime.utcnow()
+
+        order = {
+            "id": str(uuid4()),
+            "customer_id": customer_id,
+            "channel_id": channel_id,
+            "order_ref": f"SHOPIFY-{shopify_order.get('id')}",
+            "order_date": order_date,
+            "status": SalesOrderStatus.CONFIRMED.value,
+            "source": SalesOrderSource.API.value,
+        }
+
+        # Process line items
+        lines: List[Dict[str, Any]] = []
+        total_ex_gst = Decimal("0")
+        total_inc_gst = Decimal("0")
+
+        for item in shopify_order.get("line_items", []):
+            variant_id = str(item.get("variant_id") or "")
+            sku = item.get("sku") or ""
+            quantity = Decimal(str(item.get("quantity", 0)))
+            price = Decimal(str(item.get("price", "0")))
+
+            # Find product
+            product_id = find_product(sku, variant_id)
+            if not product_id:
+                # Skip items we can't match
+                continue
+
+            # Calculate prices (Shopify prices are typically inc tax)
+            # For now, assume 10% GST
+            tax_rate = Decimal("10.0")
+            unit_price_inc_gst = price
+            unit_price_ex_gst = unit_price_inc_gst / (1 + tax_rate / 100)
+
+            # Calculate line totals
+            line_total_ex_gst = unit_price_ex_gst * quantity
+            line_total_inc_gst = unit_price_inc_gst * quantity
+
+            # Convert quantity to kg (assuming 1 unit = 1 kg for now, adjust if needed)
+            qty_kg = quantity
+            line = {
+                "id": str(uuid4()),
+                "order_id": order["id"],
+                "product_id": product_id,
+                "qty": qty_kg,
+                "uom": "unit",
+                "unit_price_ex_gst": unit_price_ex_gst,
+                "unit_price_inc_gst": unit_price_inc_gst,
+                "tax_rate": tax_rate,
+                "line_total_ex_gst": line_total_ex_gst,
+                "line_total_inc_gst": line_total_inc_gst,
+                "sequence": len(lines) + 1,
+            }
+
+            # Add COGS fields if they exist (will be added in migration)
+            if _LINE_HAS_COGS:
+                cost = unit_cost(product_id) or Decimal("0")
+                line["cogs_per_unit"] = cost
+                line["cogs_total"] = cost * qty_kg
+
+            lines.append(line)
+            total_ex_gst += line_total_ex_gst
+            total_inc_gst += line_total_inc_gst
+
+        order["total_ex_gst"] = total_ex_gst
+        order["total_inc_gst"] = total_inc_gst
+        return order, lines
+
     def import_order(self, shopify_order: Dict[str, Any]) -> Tuple[SalesOrder, bool]:
         """
         Import a single Shopify order.
@@ -205,183 +404,400 @@ class ShopifyOrderImportService:
         channel = self._get_or_create_shopify_channel()
 
         # Get or create customer
-        customer_data = shopify_order.get("customer", {})
+        customer_data = shopify_order.get("customer") or {}
         customer = self._get_or_create_customer(customer_data)
 
-        # Parse order date
-        created_at = shopify_order.get("created_at")
-        if created_at:
-            order_date = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
-        else:
-            order_date = datetime.utcnow()
+        def find_product(sku: str, variant_id: str) -> Optional[str]:
+            product = self._find_product_by_sku(sku) if sku else None
+            if not product and variant_id:
+                product = self._find_product_by_variant_id(variant_id)
+            return product.id if product else None
 
-        # Create sales order
-        order = SalesOrder(
-            id=str(uuid4()),
-            customer_id=customer.id,
-            channel_id=channel.id,
-            order_ref=order_ref,
-            order_date=order_date,
-            status=SalesOrderStatus.CONFIRMED.value,
-            source=SalesOrderSource.API.value,
-            total_ex_gst=Decimal("0"),
-            total_inc_gst=Decimal("0"),
+        def unit_cost(product_id: str) -> Decimal:
+            return self.calculate_cogs(product_id, Decimal("1"))[0]
+
+        order_row, line_rows = self._order_rows(
+            shopify_order, customer.id, channel.id, find_product, unit_cost
         )
 
+        # Create sales order
+        order = SalesOrder(**order_row)
         self.db.add(order)
         self.db.flush()
 
-        # Process line items
-        line_items = shopify_order.get("line_items", [])
-        sequence = 1
-        total_ex_gst = Decimal("0")
-        total_inc_gst = Decimal("0")
-
-        for item in line_items:
-            variant_id = str(item.get("variant_id", ""))
-            sku = item.get("sku", "")
-            quantity = Decimal(str(item.get("quantity", 0)))
-            price = Decimal(str(item.get("price", "0")))
+        for line_row in line_rows:
+            self.db.add(SalesOrderLine(**line_row))
 
-            # Find product
-            product = None
-            if sku:
-                product = self._find_product_by_sku(sku)
-            if not product and variant_id:
-                product = self._find_product_by_variant_id(variant_id)
-
-            if not product:
-                # Skip items we can't match
-                continue
+        self.db.flush()
 
-            # Calculate prices (Shopify prices are typically inc tax)
-            # For now, assume 10% GST
-            tax_rate = Decimal("10.0")
-            unit_price_inc_gst = price
-            unit_price_ex_gst = unit_price_inc_gst / (1 + tax_rate / 100)
+        return order, True
 
-            # Calculate line totals
-            line_total_ex_gst = unit_price_ex_gst * quantity
-            line_total_inc_gst = unit_price_inc_gst * quantity
+    def _unit_cost(self, product_id: str, lookups: _ImportLookups) -> Optional[Decimal]:
+        """FIFO unit cost, looked up once per product per run."""
+        if product_id not in lookups.unit_cost:
+            lots = self.inventory.get_lots_fifo(product_id)
+            lookups.unit_cost[product_id] = fifo_peek_cost(lots) if lots else None
+        return lookups.unit_cost[product_id]
 
-            # Calculate COGS
-            # Convert quantity to kg (assuming 1 unit = 1 kg for now, adjust if needed)
-            qty_kg = quantity
-            cogs_per_unit, cogs_total = self.calculate_cogs(product.id, qty_kg)
+    def _import_page(
+        self,
+        orders: List[Dict[str, Any]],
+        channel_id: str,
+        lookups: _ImportLookups,
+        seen_refs: Set[str],
+    ) -> Dict[str, Any]:
+        """
+        Insert one page of Shopify orders with bulk statements.
 
-            # Create order line
-            order_line = SalesOrderLine(
-                id=str(uuid4()),
-                order_id=order.id,
-                product_id=product.id,
-                qty=qty_kg,
-                uom="unit",
-                unit_price_ex_gst=unit_price_ex_gst,
-                unit_price_inc_gst=unit_price_inc_gst,
-                tax_rate=tax_rate,
-                line_total_ex_gst=line_total_ex_gst,
-                line_total_inc_gst=line_total_inc_gst,
-                sequence=sequence,
+        Orders whose ``order_ref`` already exists are left as they are (and
+        counted as existing), as ``import_order`` does. Orders that cannot be
+        built are reported in ``errors`` and their Shopify ids in ``failed_ids``.
+        """
+        refs = [f"SHOPIFY-{order.get('id')}" for order in orders]
+        existing_refs: Set[str] = set()
+        for i in range(0, len(refs), _IN_CHUNK):
+            existing_refs.update(
+                self.db.execute(
+                    select(SalesOrder.order_ref).where(
+                        SalesOrder.order_ref.in_(refs[i : i + _IN_CHUNK]),
+                        SalesOrder.deleted_at.is_(None),
+                    )
+                ).scalars()
             )
 
-            # Add COGS fields if they exist (will be added in migration)
-            if hasattr(order_line, "cogs_per_unit"):
-                order_line.cogs_per_unit = cogs_per_unit
-            if hasattr(order_line, "cogs_total"):
-                order_line.cogs_total = cogs_total
-
-            self.db.add(order_line)
-
-            total_ex_gst += line_total_ex_gst
-            total_inc_gst += line_total_inc_gst
-            sequence += 1
+        order_rows: List[Dict[str, Any]] = []
+        line_rows: List[Dict[str, Any]] = []
+        errors: List[str] = []
+        failed_ids: List[str] = []
+        existing = 0
+        for ref, shopify_order in zip(refs, orders):
+            if ref in existing_refs or ref in seen_refs:
+                existing += 1
+                continue
+            try:
+                customer_id = self._resolve_customer_id(
+                    shopify_order.get("customer") or {}, lookups
+                )
+                order_row, lines = self._order_rows(
+                    shopify_order,
+                    customer_id,
+                    channel_id,
+                    lookups.find_product,
+                    lambda product_id: self._unit_cost(product_id, lookups),
+                )
+            except Exception as e:
+                errors.append(
+                    f"Failed to import order {shopify_order.get('id', 'unknown')}: {e}"
+                )
+                if shopify_order.get("id") is not None:
+                    failed_ids.append(str(shopify_order["id"]))
+                continue
+            seen_refs.add(ref)
+            order_rows.append(order_row)
+            line_rows.extend(lines)
 
-        # Update order totals
-        order.total_ex_gst = total_ex_gst
-        order.total_inc_gst = total_inc_gst
+        if order_rows:
+            self.db.flush()  # customers created for this page
+            self.db.execute(insert(SalesOrder), order_rows)
+            if line_rows:
+                self.db.execute(insert(SalesOrderLine), line_rows)
+            self._refresh_sales_analytics(order_rows)
 
-        self.db.flush()
+        return {
+            "created": len(order_rows),
+            "existing": existing,
+            "errors": errors,
+            "failed_ids": failed_ids,
+        }
 
-        return order, True
+    def _refresh_sales_analytics(self, order_rows: List[Dict[str, Any]]) -> None:
+        """Bulk inserts skip the after_flush upkeep of the first-order and daily
+        rollup tables, so refresh the page's customers here."""
+        customer_ids = {row["customer_id"] for row in order_rows}
+        conn = self.db.connection()
+        if settings.sales_analytics.customer_first_order_enabled:
+            refresh_customer_first_orders(conn, customer_ids)
+        if settings.sales_analytics.daily_rollup_enabled:
+            days = [row["order_date"].date() for row in order_rows]
+            refresh_sales_rollup(
+                conn,
+                customer_ids,
+                min(days),
+                max(days),
+                covered_order_ids={row["id"] for row in order_rows},
+            )
 
     def import_historical_orders(
         self,
         since_date: Optional[datetime] = None,
         until_date: Optional[datetime] = None,
+        resume: bool = True,
     ) -> Dict[str, Any]:
         """
         Import all historical orders from Shopify.
 
+        Pages follow the Link-header cursor and are fetched by a background
+        thread while the previous page is written. Each page is bulk inserted
+        and committed together with a checkpoint holding the next cursor, so an
+        interrupted run resumes at the first uncommitted page. Orders that fail
+        to import are recorded on the checkpoint and fetched again by id when
+        the run resumes, or when a finished run is started again with
+        ``resume``.
+
         Args:
             since_date: Start date for import (optional, defaults to all time)
             until_date: End date for import (optional)
+            resume: Continue an unfinished run for the same date range
+                (False starts again from the first page)
 
         Returns:
             Summary dictionary with import results
         """
+        started = time.perf_counter()
         created_count = 0
         updated_count = 0
         error_count = 0
         errors: List[str] = []
 
-        # Format dates for Shopify API
-        created_at_min = None
-        if since_date:
-            created_at_min = since_date.isoformat() + "Z"
-
-        created_at_max = None
-        if until_date:
-            created_at_max = until_date.isoformat() + "Z"
-
-        # Fetch orders with pagination
-        since_id = None
-        has_more = True
-
-        while has_more:
-            result = self.client.get_orders(
-                created_at_min=created_at_min,
-                created_at_max=created_at_max,
-                since_id=since_id,
+        checkpoint, resumed = self._start_checkpoint(since_date, until_date, resume)
+        channel_id = self._get_or_create_shopify_channel().id
+        self.db.commit()
+        lookups = _ImportLookups(self.db)
+        seen_refs: Set[str] = set()
+
+        # Format dates for Shopify API (ignored when resuming from a cursor)
+        first_page = {
+            "created_at_min": _shopify_timestamp(since_date) if since_date else None,
+            "created_at_max": _shopify_timestamp(until_date) if until_date else None,
+            "status": "any",
+        }
+        pages: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(
+            maxsize=settings.shopify.order_import_prefetch_pages
+        )
+        stop = threading.Event()
+        fetcher = threading.Thread(
+            target=self._fetch_order_pages,
+            args=(first_page, checkpoint.next_page_info, pages, stop),
+            name="shopify-order-fetch",
+            daemon=True,
+        )
+        if resumed and checkpoint.failed_order_ids:
+            retried = self._retry_failed_orders(
+                checkpoint, channel_id, lookups, seen_refs
             )
+            created_count += retried["created"]
+            updated_count += retried["existing"]
+            error_count += len(retried["errors"])
+            errors.extend(retried["errors"])
+        if checkpoint.status == RUNNING:
+            fetcher.start()
+        page_count = 0
+        try:
+            while checkpoint.status == RUNNING:
+                result = pages.get()
+                if result is None:
+                    break
+                if not result.get("ok"):
+                    error_count += 1
+                    errors.append(f"Failed to fetch orders: {result.get('error')}")
+                    self._fail_checkpoint(checkpoint, errors[-1])
+                    break
 
-            if not result.get("ok"):
-                error_count += 1
-                errors.append(f"Failed to fetch orders: {result.get('error')}")
-                break
-
-            orders = result.get("orders", [])
-            if not orders:
-                break
-
-            # Process each order
-            for shopify_order in orders:
+                orders = result.get("orders", [])
                 try:
-                    order, created = self.import_order(shopify_order)
-                    if created:
-                        created_count += 1
-                    else:
-                        updated_count += 1
+                    page = self._import_page(orders, channel_id, lookups, seen_refs)
                 except Exception as e:
+                    self.db.rollback()
                     error_count += 1
-                    order_id = shopify_order.get("id", "unknown")
-                    errors.append(f"Failed to import order {order_id}: {str(e)}")
-
-            # Check if there are more orders
-            has_more = result.get("has_next", False)
-            if orders:
-                # Use the last order ID for pagination
-                since_id = str(orders[-1].get("id"))
-
-            self.db.commit()
-
+                    errors.append(f"Failed to write page {checkpoint.pages + 1}: {e}")
+                    self._fail_checkpoint(checkpoint, errors[-1])
+                    break
+
+                page_count += 1
+                created_count += page["created"]
+                updated_count += page["existing"]
+                error_count += len(page["errors"])
+                errors.extend(page["errors"])
+
+                checkpoint.next_page_info = result.get("next_page_info")
+                checkpoint.pages += 1
+                checkpoint.orders_seen += len(orders)
+                checkpoint.created_count += page["created"]
+                checkpoint.existing_count += page["existing"]
+                checkpoint.error_count += len(page["errors"])
+                if page["failed_ids"]:
+                    checkpoint.failed_order_ids = json.dumps(
+                        self._failed_ids(checkpoint) + page["failed_ids"]
+                    )
+                if orders:
+                    checkpoint.last_order_id = str(orders[-1].get("id"))
+                checkpoint.updated_at = datetime.utcnow()
+                if not checkpoint.next_page_info:
+                    checkpoint.status = COMPLETED
+                    checkpoint.completed_at = checkpoint.updated_at
+                self.db.commit()
+        finally:
+            stop.set()
+            if fetcher.is_alive():
+                fetcher.join(timeout=settings.shopify.api_timeout_seconds)
+
+        elapsed = time.perf_counter() - started
         return {
             "ok": True,
             "created": created_count,
             "updated": updated_count,
             "errors": error_count,
             "error_details": errors,
+            "status": checkpoint.status,
+            "failed_order_ids": self._failed_ids(checkpoint),
+            "resumed": resumed,
+            "pages": page_count,
+            "elapsed_seconds": round(elapsed, 3),
         }
 
+    def _start_checkpoint(
+        self,
+        since_date: Optional[datetime],
+        until_date: Optional[datetime],
+        resume: bool,
+    ) -> Tuple[ShopifyImportCheckpoint, bool]:
+        """Load (or reset) the checkpoint for this date range; True when resuming."""
+        job_key = "historical:{}:{}".format(
+            since_date.isoformat() if since_date else "*",
+            until_date.isoformat() if until_date else "*",
+        )
+        checkpoint = (
+            self.db.execute(
+                select(ShopifyImportCheckpoint).where(
+                    ShopifyImportCheckpoint.job_key == job_key
+                )
+            )
+            .scalars()
+            .first()
+        )
+        now = datetime.utcnow()
+        resumed = bool(
+            checkpoint
+            and resume
+            and (
+                (checkpoint.status != COMPLETED and checkpoint.next_page_info)
+                or checkpoint.failed_order_ids
+            )
+        )
+        if checkpoint is None:
+            checkpoint = ShopifyImportCheckpoint(id=str(uuid4()), job_key=job_key)
+            self.db.add(checkpoint)
+        if not resumed:
+            checkpoint.since_date = since_date
+            checkpoint.until_date = until_date
+            checkpoint.next_page_info = None
+            checkpoint.pages = 0
+            checkpoint.orders_seen = 0
+            checkpoint.created_count = 0
+            checkpoint.existing_count = 0
+            checkpoint.error_count = 0
+            checkpoint.last_order_id = None
+            checkpoint.failed_order_ids = None
+            checkpoint.started_at = now
+            checkpoint.completed_at = None
+        # A finished run resumed only to retry its failed orders stays finished
+        if not (resumed and checkpoint.status == COMPLETED):
+            checkpoint.status = RUNNING
+        checkpoint.last_error = None
+        checkpoint.updated_at = now
+        return checkpoint, resumed
+
+    @staticmethod
+    def _failed_ids(checkpoint: ShopifyImportCheckpoint) -> List[str]:
+        return json.loads(checkpoint.failed_order_ids or "[]")
+
+    def _retry_failed_orders(
+        self,
+        checkpoint: ShopifyImportCheckpoint,
+        channel_id: str,
+        lookups: _ImportLookups,
+        seen_refs: Set[str],
+    ) -> Dict[str, Any]:
+        """Fetch the checkpoint's failed orders by id and import them again.
+
+        Orders that still fail, or cannot be fetched, stay on the checkpoint.
+        """
+        orders: List[Dict[str, Any]] = []
+        unfetched: List[str] = []
+        errors: List[str] = []
+        for order_id in self._failed_ids(checkpoint):
+            order = self.client.get_order_by_id(order_id)
+            if order:
+                orders.append(order)
+            else:
+                unfetched.append(order_id)
+                errors.append(f"Failed to fetch order {order_id} for retry")
+        try:
+            page = self._import_page(orders, channel_id, lookups, seen_refs)
+        except Exception as e:
+            self.db.rollback()
+            return {
+                "created": 0,
+                "existing": 0,
+                "errors": errors + [f"Failed to retry orders: {e}"],
+            }
+        still_failed = unfetched + page["failed_ids"]
+        checkpoint.failed_order_ids = json.dumps(still_failed) if still_failed else None
+        checkpoint.created_count += page["created"]
+        checkpoint.existing_count += page["existing"]
+        checkpoint.updated_at = datetime.utcnow()
+        self.db.commit()
+        return {
+            "created": page["created"],
+            "existing": page["existing"],
+            "errors": errors + page["errors"],
+        }
+
+    def _fail_checkpoint(self, checkpoint: ShopifyImportCheckpoint, error: str) -> None:
+        checkpoint.status = FAILED
+        checkpoint.last_error = error
+        checkpoint.updated_at = datetime.utcnow()
+        self.db.commit()
+
+    def _fetch_order_pages(
+        self,
+        first_page: Dict[str, Any],
+        page_info: Optional[str],
+        pages: queue.Queue,
+        stop: threading.Event,
+    ) -> None:
+        """Fetch pages ahead of the writer (runs in the prefetch thread).
+
+        Puts each ``get_orders`` result on ``pages`` and a final None; stops
+        after a failed request, the last page, or when ``stop`` is set.
+        """
+
+        def put(item: Optional[Dict[str, Any]]) -> bool:
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        limit = settings.shopify.order_import_page_size
+        try:
+            while not stop.is_set():
+                if page_info:
+                    result = self.client.get_orders(limit=limit, page_info=page_info)
+                else:
+                    result = self.client.get_orders(limit=limit, **first_page)
+                if not put(result):
+                    return
+                page_info = result.get("next_page_info")
+                if not result.get("ok") or not page_info:
+                    return
+        except Exception as e:  # noqa: BLE001
+            put({"ok": False, "error": str(e), "orders": []})
+        finally:
+            put(None)
+
     def import_orders_since(
         self, last_order_id: Optional[str] = None
     ) -> Dict[str, Any]:
@@ -1,16 +1,26 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
 from decimal import Decimal
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+import httpx
 from sqlalchemy.orm import Session
 
 from app.adapters.db.models_assemblies_shopify import (
     InventoryReservation,
     ProductChannelLink,
 )
-from app.adapters.shopify_client import ShopifyClient
+from app.adapters.shopify_client import AsyncShopifyInventoryClient, ShopifyClient
 from app.services.inventory import InventoryService
 from app.settings import settings
 
+logger = logging.getLogger(__name__)
+
+# (link id, variant id, cached inventory item id, location id, available)
+_Push = Tuple[str, str, Optional[str], str, int]
+
 
 class ShopifySyncService:
     def __init__(self, db: Session, client: Optional[ShopifyClient] = None):
@@ -44,8 +54,12 @@ class ShopifySyncService:
         # TODO: Add pack unit conversion if needed
         sellable_qty = int(available_kg)
 
-        # Get inventory item ID from variant ID
-        inventory_item_id = self.client.get_inventory_item_id(link.shopify_variant_id)
+        # Get inventory item ID from variant ID (cached on the link)
+        inventory_item_id = link.shopify_inventory_item_id
+        if not inventory_item_id:
+            inventory_item_id = self.client.get_inventory_item_id(
+                link.shopify_variant_id
+            )
         if not inventory_item_id:
             return {"ok": False, "error": "failed_to_get_inventory_item_id"}
 
@@ -56,6 +70,12 @@ class ShopifySyncService:
             available=sellable_qty,
         )
 
+        if result.get("ok"):
+            link.shopify_inventory_item_id = str(inventory_item_id)
+            link.last_pushed_available = sellable_qty
+            link.last_pushed_at = datetime.utcnow()
+            self.db.commit()
+
         return result
 
     def apply_shopify_order(self, payload: Dict[str, Any]) -> Dict[str, Any]:
@@ -216,22 +236,125 @@ class ShopifySyncService:
             "note": "Refund logged - restocking logic to be implemented",
         }
 
-    def reconcile_all(self) -> Dict[str, Any]:
+    def reconcile_all(
+        self,
+        force: bool = False,
+        push_client: Optional[AsyncShopifyInventoryClient] = None,
+    ) -> Dict[str, Any]:
         """
-        Compare VND available_to_sell vs Shopify per mapped product and fix drift (push).
+        Compare VND available_to_sell vs the last level pushed per mapped product
+        and fix drift (push).
+
+        Availability is read in bulk, and only products whose sellable quantity
+        differs from ``last_pushed_available`` are sent (all of them with
+        ``force``). Pushes run concurrently over one connection pool, paced by
+        Shopify's call-limit bucket.
         """
+        started = time.perf_counter()
         mapped = self.db.query(ProductChannelLink).filter_by(channel="shopify").all()
-        results = []
+        levels = self.inventory.get_stock_levels({link.product_id for link in mapped})
 
+        results: List[Dict[str, Any]] = []
+        pushes: List[_Push] = []
+        links = {}
         for link in mapped:
-            result = self.push_inventory(link.product_id)
-            results.append({"product_id": link.product_id, "result": result})
+            location_id = link.shopify_location_id or settings.shopify.location_id
+            if not link.shopify_variant_id:
+                error = "no_shopify_mapping"
+            elif not location_id:
+                error = "no_location_id"
+            else:
+                error = None
+            if error:
+                results.append(
+                    {
+                        "product_id": link.product_id,
+                        "result": {"ok": False, "error": error},
+                    }
+                )
+                continue
+            # Convert to sellable units (assume 1kg = 1 unit for now)
+            available = int(levels[link.product_id]["available_qty"])
+            if not force and link.last_pushed_available == available:
+                continue
+            links[link.id] = link
+            pushes.append(
+                (
+                    link.id,
+                    link.shopify_variant_id,
+                    link.shopify_inventory_item_id,
+                    location_id,
+                    available,
+                )
+            )
 
-        successful = sum(1 for r in results if r["result"].get("ok"))
+        client = push_client or AsyncShopifyInventoryClient()
+        outcomes = asyncio.run(self._push_levels(client, pushes)) if pushes else []
+
+        pushed_at = datetime.utcnow()
+        for (link_id, _, _, _, available), (inventory_item_id, result) in zip(
+            pushes, outcomes
+        ):
+            link = links[link_id]
+            if inventory_item_id:
+                link.shopify_inventory_item_id = inventory_item_id
+            if result.get("ok"):
+                link.last_pushed_available = available
+                link.last_pushed_at = pushed_at
+            results.append({"product_id": link.product_id, "result": result})
+        self.db.commit()
 
-        return {
+        elapsed = time.perf_counter() - started
+        successful = sum(1 for _, result in outcomes if result.get("ok"))
+        summary = {
             "ok": True,
             "total_mapped": len(mapped),
+            "unchanged": len(mapped) - len(results),
+            "pushed": len(pushes),
             "successful": successful,
+            "failed": len(results) - successful,
+            "http_requests": client.request_count,
+            "throttled": client.throttled_count,
+            "elapsed_seconds": round(elapsed, 3),
+            "pushes_per_second": round(len(pushes) / elapsed, 2) if elapsed else None,
             "results": results,
         }
+        logger.info(
+            "Shopify reconcile: %s mapped, %s pushed (%s ok) in %.2fs",
+            len(mapped),
+            len(pushes),
+            successful,
+            elapsed,
+        )
+        return summary
+
+    async def _push_levels(
+        self, client: AsyncShopifyInventoryClient, pushes: List[_Push]
+    ) -> List[Tuple[Optional[str], Dict[str, Any]]]:
+        """Push levels concurrently; returns (inventory item id, result) per push."""
+        async with client:
+            semaphore = asyncio.Semaphore(client.max_connections)
+
+            async def push(item: _Push) -> Tuple[Optional[str], Dict[str, Any]]:
+                _, variant_id, inventory_item_id, location_id, available = item
+                async with semaphore:
+                    if not inventory_item_id:
+                        try:
+                            inventory_item_id = await client.get_inventory_item_id(
+                                variant_id
+                            )
+                        except httpx.TransportError as exc:
+                            return None, {"ok": False, "error": str(exc)}
+                    if not inventory_item_id:
+                        return None, {
+                            "ok": False,
+                            "error": "failed_to_get_inventory_item_id",
+                        }
+                    result = await client.set_inventory_level(
+                        inventory_item_id=inventory_item_id,
+                        location_id=location_id,
+                        available=available,
+                    )
+                    return inventory_item_id, result
+
+            return await asyncio.gather(*(push(item) for item in pushes))
@@ -0,0 +1,504 @@
+"""
+Shopify webhook inbox: durable enqueue on receipt, background application.
+
+Webhook handlers verify the HMAC, insert one ``shopify_webhook_inbox`` row and
+return, so Shopify gets its 200 however busy the database is.
+``ShopifyWebhookProcessor.drain`` applies queued events through
+``ShopifySyncService``: each order id is handled by one worker thread in
+receipt order, and repeated deliveries of an identical event (same topic and
+body) for an order are coalesced into a single application.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.adapters.db import get_session
+from app.adapters.db.models_assemblies_shopify import ShopifyWebhookInbox
+from app.services.shopify_sync import ShopifySyncService
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+PENDING = "PENDING"
+PROCESSING = "PROCESSING"
+DONE = "DONE"
+COALESCED = "COALESCED"
+FAILED = "FAILED"
+
+# Webhook topic -> (ShopifySyncService method, payload field holding the order id)
+TOPIC_HANDLERS: Dict[str, Tuple[str, str]] = {
+    "orders_create": ("apply_shopify_order", "id"),
+    "fulfillments_create": ("apply_shopify_fulfillment", "order_id"),
+    "orders_cancelled": ("apply_shopify_cancel", "id"),
+    "refunds_create": ("apply_shopify_refund", "order_id"),
+}
+
+_CLAIM_CHUNK = 500
+
+
+def webhook_order_id(topic: str, payload: Dict[str, Any]) -> str:
+    value = payload.get(TOPIC_HANDLERS[topic][1])
+    return str(value) if value is not None else ""
+
+
+def webhook_idempotency_key(
+    topic: str, raw: bytes, order_id: str, webhook_id: Optional[str] = None
+) -> str:
+    """X-Shopify-Webhook-Id when sent (stable across Shopify retries), else
+    topic, order id and a body hash."""
+    if webhook_id and webhook_id.strip():
+        return webhook_id.strip()[:128]
+    digest = hashlib.sha256(raw).hexdigest()[:32]
+    return f"{topic}:{order_id}:{digest}"[:128]
+
+
+def enqueue_webhook(
+    db: Session, topic: str, raw: bytes, webhook_id: Optional[str] = None
+) -> Tuple[Optional[ShopifyWebhookInbox], bool]:
+    """
+    Store a verified webhook for background processing.
+
+    Returns ``(entry, True)`` for a new event and ``(None, False)`` when the
+    idempotency key was already queued (a Shopify redelivery).
+
+    Raises:
+        ValueError: If the body is not JSON or the topic is unknown
+    """
+    if topic not in TOPIC_HANDLERS:
+        raise ValueError(f"Unsupported webhook topic {topic}")
+    payload = json.loads(raw)
+    if not isinstance(payload, dict):
+        raise ValueError("Webhook payload must be a JSON object")
+    order_id = webhook_order_id(topic, payload)
+    entry = ShopifyWebhookInbox(
+        idempotency_key=webhook_idempotency_key(topic, raw, order_id, webhook_id),
+        topic=topic,
+        order_id=order_id,
+        payload=raw.decode("utf-8"),
+        status=PENDING,
+        attempts=0,
+        received_at=datetime.utcnow(),
+    )
+    db.add(entry)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return None, False
+    return entry, True
+
+
+class ShopifyWebhookProcessor:
+    """
+    Apply queued webhooks with a thread pool, one order id per worker.
+
+    Claims are taken per order id, and orders that still have an event in
+    flight are skipped, so events for one order never run concurrently or
+    out of order. Several drainers (one per API worker process) may share a
+    database: a claim only takes rows still PENDING, and an order claimed by
+    two drainers at once is kept by the one holding its oldest event.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = get_session,
+        *,
+        client_factory: Optional[Callable[[], Any]] = None,
+        max_workers: Optional[int] = None,
+        batch_orders: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+    ):
+        config = settings.shopify
+        self.session_factory = session_factory
+        self.client_factory = client_factory
+        self.max_workers = max_workers or config.webhook_workers
+        self.batch_orders = batch_orders or config.webhook_batch_orders
+        self.max_attempts = max_attempts or config.webhook_max_attempts
+
+    def drain(self, max_orders: Optional[int] = None) -> Dict[str, int]:
+        """
+        Claim up to ``max_orders`` order ids with pending events and apply them.
+
+        Returns:
+            Counts of orders claimed and events done, coalesced, failed, retried
+        """
+        token = str(uuid.uuid4())
+        order_ids = self._claim(token, max_orders or self.batch_orders)
+        stats: Counter = Counter()
+        if len(order_ids) > 1 and self.max_workers > 1:
+            with ThreadPoolExecutor(
+                max_workers=min(self.max_workers, len(order_ids)),
+                thread_name_prefix="shopify-webhook",
+            ) as pool:
+                for result in pool.map(
+                    lambda order_id: self._process_order(order_id, token), order_ids
+                ):
+                    stats.update(result)
+        else:
+            for order_id in order_ids:
+                stats.update(self._process_order(order_id, token))
+        return {
+            "orders": len(order_ids),
+            **{key: stats[key] for key in ("done", "coalesced", "failed", "retried")},
+        }
+
+    # ------------------------------------------------------------------ #
+    # Internal helpers
+    # ------------------------------------------------------------------ #
+    def _claim(self, token: str, limit: int) -> List[str]:
+        now = datetime.utcnow()
+        stale = now - timedelta(seconds=settings.shopify.webhook_claim_timeout_seconds)
+        db = self.session_factory()
+        try:
+            # Claims left behind by a crashed drainer go back to the queue
+            db.execute(
+                update(ShopifyWebhookInbox)
+                .where(
+                    ShopifyWebhookInbox.status == PROCESSING,
+                    ShopifyWebhookInbox.claimed_at < stale,
+                )
+                .values(status=PENDING, claimed_by=None, claimed_at=None)
+                .execution_options(synchronize_session=False)
+            )
+            in_flight = select(ShopifyWebhookInbox.order_id).where(
+                ShopifyWebhookInbox.status == PROCESSING
+            )
+            first_received = func.min(ShopifyWebhookInbox.received_at)
+            order_ids = list(
+                db.execute(
+                    select(ShopifyWebhookInbox.order_id)
+                    .where(
+                        ShopifyWebhookInbox.status == PENDING,
+                        ShopifyWebhookInbox.order_id.not_in(in_flight),
+                    )
+                    .group_by(ShopifyWebhookInbox.order_id)
+                    .order_by(first_received)
+                    .limit(limit)
+                ).scalars()
+            )
+            for i in range(0, len(order_ids), _CLAIM_CHUNK):
+                db.execute(
+                    update(ShopifyWebhookInbox)
+                    .where(
+                        ShopifyWebhookInbox.status == PENDING,
+                        ShopifyWebhookInbox.order_id.in_(
+                            order_ids[i : i + _CLAIM_CHUNK]
+                        ),
+                    )
+                    .values(status=PROCESSING, claimed_by=token, claimed_at=now)
+                    .execution_options(synchronize_session=False)
+                )
+            db.commit()
+            return self._settle_claims(db, token, order_ids)
+        finally:
+            db.close()
+
+    def _settle_claims(
+        self, db: Session, token: str, order_ids: List[str]
+    ) -> List[str]:
+        """
+        Orders this drainer really holds, in order of their first event.
+
+        Another drainer may have claimed some of ``order_ids`` first (our
+        update then matched no rows), or, racing with us, claimed earlier
+        events of the same order. Each contested order stays with whoever
+        holds its oldest event; the others put their rows back.
+        """
+        holders: Dict[str, Dict[str, datetime]] = {}
+        for i in range(0, len(order_ids), _CLAIM_CHUNK):
+            rows = db.execute(
+                select(
+                    ShopifyWebhookInbox.order_id,
+                    ShopifyWebhookInbox.claimed_by,
+                    func.min(ShopifyWebhookInbox.received_at),
+                )
+                .where(
+                    ShopifyWebhookInbox.status == PROCESSING,
+                    ShopifyWebhookInbox.order_id.in_(order_ids[i : i + _CLAIM_CHUNK]),
+                )
+                .group_by(ShopifyWebhookInbox.order_id, ShopifyWebhookInbox.claimed_by)
+            )
+            for order_id, claimed_by, first_received in rows:
+                holders.setdefault(order_id, {})[claimed_by] = first_received
+
+        mine: List[Tuple[datetime, str]] = []
+        released: List[str] = []
+        for order_id, claims in holders.items():
+            if token not in claims:
+                continue
+            owner = min(claims, key=lambda holder: (claims[holder], holder))
+            if owner == token:
+                mine.append((claims[token], order_id))
+            else:
+                released.append(order_id)
+        for i in range(0, len(released), _CLAIM_CHUNK):
+            db.execute(
+                update(ShopifyWebhookInbox)
+                .where(
+                    ShopifyWebhookInbox.claimed_by == token,
+                    ShopifyWebhookInbox.status == PROCESSING,
+                    ShopifyWebhookInbox.order_id.in_(released[i : i + _CLAIM_CHUNK]),
+                )
+                .values(status=PENDING, claimed_by=None, claimed_at=None)
+                .execution_options(synchronize_session=False)
+            )
+        db.commit()
+        return [order_id for _, order_id in sorted(mine)]
+
+    def _process_order(self, order_id: str, token: str) -> Counter:
+        stats: Counter = Counter()
+        db = self.session_factory()
+        try:
+            entries = (
+                db.execute(
+                    select(ShopifyWebhookInbox)
+                    .where(
+                        ShopifyWebhookInbox.order_id == order_id,
+                        ShopifyWebhookInbox.claimed_by == token,
+                        ShopifyWebhookInbox.status == PROCESSING,
+                    )
+                    .order_by(ShopifyWebhookInbox.received_at, ShopifyWebhookInbox.id)
+                )
+                .scalars()
+                .all()
+            )
+            client = self.client_factory() if self.client_factory else None
+            sync = ShopifySyncService(db, client=client)
+            applied: set = set()
+            for index, entry in enumerate(entries):
+                event = (entry.topic, entry.payload)
+                if event in applied:
+                    self._finish(db, entry, COALESCED)
+                    stats["coalesced"] += 1
+                    continue
+                method = TOPIC_HANDLERS[entry.topic][0]
+                try:
+                    result = getattr(sync, method)(json.loads(entry.payload))
+                except Exception as exc:  # noqa: BLE001
+                    db.rollback()
+                    logger.exception(
+                        "Shopify webhook %s for order %s failed", entry.topic, order_id
+                    )
+                    stats.update(self._requeue(db, entries[index:], exc))
+                    break
+                applied.add(event)
+                if result.get("ok"):
+                    self._finish(db, entry, DONE)
+                    stats["done"] += 1
+                else:
+                    self._finish(db, entry, FAILED, error=str(result.get("error")))
+                    stats["failed"] += 1
+        finally:
+            db.close()
+        return stats
+
+    def _finish(
+        self,
+        db: Session,
+        entry: ShopifyWebhookInbox,
+        status: str,
+        error: Optional[str] = None,
+    ) -> None:
+        entry.status = status
+        entry.attempts += 1
+        entry.last_error = error
+        entry.processed_at = datetime.utcnow()
+        db.commit()
+
+    def _requeue(
+        self, db: Session, entries: List[ShopifyWebhookInbox], exc: Exception
+    ) -> Counter:
+        """Retry the failed event later and release the order's remaining events."""
+        failed, rest = entries[0], entries[1:]
+        failed.attempts += 1
+        failed.last_error = f"{type(exc).__name__}: {exc}"
+        if failed.attempts >= self.max_attempts:
+            failed.status = FAILED
+            failed.processed_at = datetime.utcnow()
+            outcome = Counter(failed=1)
+        else:
+            failed.status = PENDING
+            outcome = Counter(retried=1)
+        for entry in rest:
+            entry.status = PENDING
+        for entry in entries:
+            entry.claimed_by = None
+            entry.claimed_at = None
+        db.commit()
+        return outcome
+
+
+def webhook_inbox_metrics(db: Session) -> Dict[str, Any]:
+    """Queue depth, oldest waiting event and receipt-to-applied lag (last hour)."""
+    now = datetime.utcnow()
+    counts = dict(
+        db.execute(
+            select(ShopifyWebhookInbox.status, func.count()).group_by(
+                ShopifyWebhookInbox.status
+            )
+        ).all()
+    )
+    oldest = db.execute(
+        select(func.min(ShopifyWebhookInbox.received_at)).where(
+            ShopifyWebhookInbox.status.in_([PENDING, PROCESSING])
+        )
+    ).scalar()
+    lags = sorted(
+        (processed_at - received_at).total_seconds()
+        for received_at, processed_at in db.execute(
+            select(
+                ShopifyWebhookInbox.received_at, ShopifyWebhookInbox.processed_at
+            ).where(
+                ShopifyWebhookInbox.status.in_([DONE, COALESCED]),
+                ShopifyWebhookInbox.processed_at >= now - timedelta(hours=1),
+            )
+        )
+    )
+
+    def _percentile(fraction: float) -> Optional[float]:
+        if not lags:
+            return None
+        return round(lags[min(len(lags) - 1, int(len(lags) * fraction))], 3)
+
+    return {
+        **{
+            status.lower(): int(counts.get(status, 0))
+            for status in (PENDING, PROCESSING, DONE, COALESCED, FAILED)
+        },
+        "oldest_pending_age_seconds": (
+            round((now - oldest).total_seconds(), 3) if oldest else None
+        ),
+        "processed_last_hour": len(lags),
+        "lag_p50_seconds": _percentile(0.5),
+        "lag_p95_seconds": _percentile(0.95),
+        "lag_max_seconds": round(lags[-1], 3) if lags else None,
+    }
+
+
+def purge_webhook_inbox(db: Session, retention_days: Optional[int] = None) -> int:
+    """Delete applied or coalesced events older than the retention window."""
+    days = retention_days or settings.shopify.webhook_retention_days
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    result = db.execute(
+        delete(ShopifyWebhookInbox)
+        .where(
+            ShopifyWebhookInbox.status.in_([DONE, COALESCED]),
+            ShopifyWebhookInbox.processed_at < cutoff,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount or 0
+
+
+class ShopifyWebhookWorker:
+    """Background thread draining the inbox on a timer and whenever notified."""
+
+    def __init__(
+        self,
+        processor: Optional[ShopifyWebhookProcessor] = None,
+        poll_interval: Optional[float] = None,
+    ):
+        self.processor = processor or ShopifyWebhookProcessor()
+        self.poll_interval = (
+            poll_interval or settings.shopify.webhook_poll_interval_seconds
+        )
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_purge = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="shopify-webhook-drainer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def notify(self) -> None:
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                while not self._stop.is_set():
+                    stats = self.processor.drain()
+                    # Stop on a short batch, or back off after a failure
+                    if (
+                        stats["orders"] < self.processor.batch_orders
+                        or stats["retried"]
+                    ):
+                        break
+                self._purge_hourly()
+            except Exception:  # noqa: BLE001
+                logger.exception("Shopify webhook drain failed")
+
+    def _purge_hourly(self) -> None:
+        if time.monotonic() - self._last_purge < 3600:
+            return
+        self._last_purge = time.monotonic()
+        db = self.processor.session_factory()
+        try:
+            purge_webhook_inbox(db)
+            db.commit()
+        finally:
+            db.close()
+
+
+_worker: Optional[ShopifyWebhookWorker] = None
+_worker_lock = threading.Lock()
+
+
+def start_webhook_worker() -> ShopifyWebhookWorker:
+    """Start the process-wide drainer (idempotent)."""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = ShopifyWebhookWorker()
+        _worker.start()
+        return _worker
+
+
+def stop_webhook_worker() -> None:
+    global _worker
+    with _worker_lock:
+        if _worker is not None:
+            _worker.stop()
+            _worker = None
+
+
+def notify_webhook_worker() -> None:
+    """Wake the drainer after an enqueue; a no-op when none is running."""
+    worker = _worker
+    if worker is not None:
+        worker.notify()
@@ -19,7 +19,7 @@ from app.adapters.db.models import (
 )
 from app.domain.inventory_uom import inventory_uom_for_product
 from app.domain.rules import round_quantity
-from app.services.inventory import InventoryService
+from app.services.inventory import FifoRequest, InventoryService
 
 
 def reserve_materials(batch_id: str, db: Session) -> Dict[str, any]:
@@ -40,6 +40,8 @@ def reserve_materials(batch_id: str, db: Session) -> Dict[str, any]:
     issues = []
     inventory_service = InventoryService(db)
 
+    requests = []
+    skus = []
     for component in components:
         # Get product
         product = db.get(Product, component.ingredient_product_id)
@@ -47,28 +49,34 @@ def reserve_materials(batch_id: str, db: Session) -> Dict[str, any]:
             issues.append(f"Product {component.ingredient_product_id} not found")
             continue
 
-        allow_negative = bool(getattr(product, "allow_negative_inventory", False))
-
-        try:
-            fifo_issues = inventory_service.consume_lots_fifo(
+        requests.append(
+            FifoRequest(
                 product_id=product.id,
                 qty_kg=component.quantity_kg,
                 reason=f"Batch {batch.batch_code}",
                 ref_type="BATCH",
                 ref_id=batch.id,
                 notes=f"Batch {batch.batch_code}",
-                allow_negative=allow_negative,
+                allow_negative=bool(
+                    getattr(product, "allow_negative_inventory", False)
+                ),
             )
-        except ValueError as e:
-            issues.append(str(e))
-            db.rollback()
-            return {"success": False, "issues": issues}
+        )
+        skus.append(product.sku)
+
+    try:
+        fifo_results = inventory_service.consume_many_fifo(requests)
+    except ValueError as e:
+        issues.append(str(e))
+        db.rollback()
+        return {"success": False, "issues": issues}
 
+    for sku, fifo_issues in zip(skus, fifo_results):
         for issue in fifo_issues:
             reservations.append(
                 {
                     "lot_id": issue.lot_id,
-                    "material_id": product.sku,
+                    "material_id": sku,
                     "qty_issued": issue.quantity_kg,
                 }
             )
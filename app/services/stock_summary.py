@@ -0,0 +1,218 @@
+"""
+Per-product stock summary maintenance.
+
+``inventory_stock_summary`` holds on-hand (active lots) and reserved (ACTIVE
+reservations) totals per product so stock checks are a single primary-key
+read. Rows are recomputed inside the flush that changes the underlying lots
+or reservations, so they commit or roll back with the inventory write.
+"""
+
+from datetime import datetime
+from decimal import Decimal
+from itertools import chain
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import delete, event, func, inspect, select
+from sqlalchemy.orm import Session
+
+from app.adapters.db.models import InventoryLot, InventoryStockSummary
+from app.adapters.db.models_assemblies_shopify import InventoryReservation
+from app.adapters.db.upsert import upsert
+
+_REFRESH_CHUNK = 500
+
+_LOT_ATTRS = ("product_id", "quantity_kg", "is_active")
+_RESERVATION_ATTRS = ("product_id", "qty_canonical", "status")
+
+
+def _lot_totals(bind, product_ids: Optional[list]) -> Dict[str, tuple]:
+    stmt = select(
+        InventoryLot.product_id,
+        func.coalesce(func.sum(InventoryLot.quantity_kg), 0),
+        func.count(InventoryLot.id),
+    ).where(InventoryLot.is_active.is_(True))
+    if product_ids is not None:
+        stmt = stmt.where(InventoryLot.product_id.in_(product_ids))
+    rows = bind.execute(stmt.group_by(InventoryLot.product_id)).all()
+    return {row[0]: (Decimal(str(row[1])), int(row[2])) for row in rows}
+
+
+def _reserved_totals(bind, product_ids: Optional[list]) -> Dict[str, Decimal]:
+    stmt = select(
+        InventoryReservation.product_id,
+        func.coalesce(func.sum(InventoryReservation.qty_canonical), 0),
+    ).where(InventoryReservation.status == "ACTIVE")
+    if product_ids is not None:
+        stmt = stmt.where(InventoryReservation.product_id.in_(product_ids))
+    rows = bind.execute(stmt.group_by(InventoryReservation.product_id)).all()
+    return {row[0]: Decimal(str(row[1])) for row in rows}
+
+
+def compute_stock_totals(
+    bind, product_ids: Optional[Iterable[str]] = None
+) -> Dict[str, dict]:
+    """Aggregate on-hand and reserved quantities straight from the source tables."""
+    ids = None if product_ids is None else sorted({pid for pid in product_ids if pid})
+    lots: Dict[str, tuple] = {}
+    reserved: Dict[str, Decimal] = {}
+    chunks = (
+        [None]
+        if ids is None
+        else [ids[i : i + _REFRESH_CHUNK] for i in range(0, len(ids), _REFRESH_CHUNK)]
+    )
+    for chunk in chunks:
+        lots.update(_lot_totals(bind, chunk))
+        reserved.update(_reserved_totals(bind, chunk))
+    totals = {}
+    for product_id in set(lots) | set(reserved):
+        on_hand, lot_count = lots.get(product_id, (Decimal("0"), 0))
+        totals[product_id] = {
+            "on_hand_qty": on_hand,
+            "reserved_qty": reserved.get(product_id, Decimal("0")),
+            "active_lot_count": lot_count,
+        }
+    return totals
+
+
+def refresh_stock_summary(bind, product_ids: Optional[Iterable[str]] = None) -> int:
+    """Recompute summary rows for ``product_ids`` (all products when None).
+
+    Rows are upserted, so two transactions refreshing the same product
+    serialize on its row rather than colliding on the primary key. Products
+    left with no stock lose their row. Returns the number of rows written.
+    """
+    table = InventoryStockSummary.__table__
+    ids = None if product_ids is None else sorted({pid for pid in product_ids if pid})
+    if ids is not None and not ids:
+        return 0
+    totals = compute_stock_totals(bind, ids)
+    now = datetime.utcnow()
+    rows = [
+        {"product_id": product_id, "refreshed_at": now, **values}
+        for product_id, values in sorted(totals.items())
+    ]
+    upsert(bind, table, [table.c.product_id], rows=rows)
+    if ids is None:
+        stale = [
+            pid
+            for pid in bind.execute(select(table.c.product_id)).scalars()
+            if pid not in totals
+        ]
+    else:
+        stale = [pid for pid in ids if pid not in totals]
+    for i in range(0, len(stale), _REFRESH_CHUNK):
+        bind.execute(
+            delete(table).where(table.c.product_id.in_(stale[i : i + _REFRESH_CHUNK]))
+        )
+    return len(rows)
+
+
+def _flush_pending_stock(db: Session) -> None:
+    """Flush unflushed lot/reservation changes so the summary includes them.
+
+    Sessions run with ``autoflush=False``; flushing runs the after_flush
+    listener that brings the summary rows up to date.
+    """
+    pending = chain(db.new, db.dirty, db.deleted)
+    if any(isinstance(obj, (InventoryLot, InventoryReservation)) for obj in pending):
+        db.flush()
+
+
+def read_stock_summary(db: Session, product_id: str) -> dict:
+    """Return on-hand/reserved totals for one product.
+
+    Products without a summary row (never stocked, or written outside the ORM)
+    fall back to an indexed aggregate over their active lots. Pending lot and
+    reservation changes in ``db`` are flushed first.
+    """
+    _flush_pending_stock(db)
+    table = InventoryStockSummary.__table__
+    row = db.execute(
+        select(
+            table.c.on_hand_qty, table.c.reserved_qty, table.c.active_lot_count
+        ).where(table.c.product_id == product_id)
+    ).first()
+    if row is not None:
+        return {
+            "on_hand_qty": Decimal(str(row.on_hand_qty)),
+            "reserved_qty": Decimal(str(row.reserved_qty)),
+            "active_lot_count": row.active_lot_count,
+        }
+    return compute_stock_totals(db, [product_id]).get(
+        product_id,
+        {
+            "on_hand_qty": Decimal("0"),
+            "reserved_qty": Decimal("0"),
+            "active_lot_count": 0,
+        },
+    )
+
+
+def read_stock_summaries(
+    db: Session, product_ids: Optional[Iterable[str]] = None
+) -> Dict[str, dict]:
+    """Bulk :func:`read_stock_summary`, one summary-table read per 500 products.
+
+    With ``product_ids=None`` every summary row is returned; products without
+    one hold no stock. Requested products missing a summary row fall back to
+    one grouped aggregate over their lots and reservations.
+    """
+    _flush_pending_stock(db)
+    table = InventoryStockSummary.__table__
+    columns = select(
+        table.c.product_id,
+        table.c.on_hand_qty,
+        table.c.reserved_qty,
+        table.c.active_lot_count,
+    )
+    if product_ids is None:
+        statements = [columns]
+        ids = None
+    else:
+        ids = sorted({pid for pid in product_ids if pid})
+        statements = [
+            columns.where(table.c.product_id.in_(ids[i : i + _REFRESH_CHUNK]))
+            for i in range(0, len(ids), _REFRESH_CHUNK)
+        ]
+    summaries: Dict[str, dict] = {}
+    for stmt in statements:
+        for row in db.execute(stmt):
+            summaries[row.product_id] = {
+                "on_hand_qty": Decimal(str(row.on_hand_qty)),
+                "reserved_qty": Decimal(str(row.reserved_qty)),
+                "active_lot_count": row.active_lot_count,
+            }
+    if ids:
+        missing = [pid for pid in ids if pid not in summaries]
+        if missing:
+            summaries.update(compute_stock_totals(db, missing))
+    return summaries
+
+
+def _touched_products(session: Session) -> set:
+    product_ids = set()
+    for obj in list(session.new) + list(session.deleted):
+        if isinstance(obj, (InventoryLot, InventoryReservation)):
+            product_ids.add(obj.product_id)
+    for obj in session.dirty:
+        if isinstance(obj, InventoryLot):
+            attrs = _LOT_ATTRS
+        elif isinstance(obj, InventoryReservation):
+            attrs = _RESERVATION_ATTRS
+        else:
+            continue
+        state = inspect(obj)
+        if not any(state.attrs[attr].history.has_changes() for attr in attrs):
+            continue
+        product_ids.add(obj.product_id)
+        product_ids.update(state.attrs["product_id"].history.deleted)
+    product_ids.discard(None)
+    return product_ids
+
+
+@event.listens_for(Session, "after_flush")
+def _maintain_stock_summary(session: Session, flush_context) -> None:
+    """Refresh summary rows for products whose lots or reservations changed."""
+    product_ids = _touched_products(session)
+    if product_ids:
+        refresh_stock_summary(session.connection(), product_ids)
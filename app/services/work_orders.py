@@ -2,18 +2,21 @@
 """Work Order Service - Core manufacturing work order lifecycle operations."""
 
 import json
+from dataclasses import dataclass
 from datetime import date, datetime
 from decimal import Decimal, InvalidOperation
-from typing import Dict, List, Optional
+from itertools import groupby
+from typing import Dict, List, Optional, Sequence
 from uuid import uuid4
 
-from sqlalchemy import select
+from sqlalchemy import or_, select
 from sqlalchemy.orm import Session
 
 from app.adapters.db.models import (
     Batch,
     Formula,
     FormulaLine,
+    InventoryLot,
     InventoryMovement,
     Product,
     ProductCostRate,
@@ -35,14 +38,24 @@ from app.domain.inventory_uom import (
     unit_kind,
 )
 from app.domain.rules import (
-    fifo_peek_cost,
+    FifoIssue,
     round_money,
     round_quantity,
     to_kg,
     validate_wo_status_transition,
 )
 from app.services.batch_codes import BatchCodeGenerator
-from app.services.inventory import InventoryService
+from app.services.inventory import FifoRequest, InventoryService
+
+
+@dataclass
+class MaterialIssue:
+    """One component issue (positive qty) or return (negative qty) for a work order."""
+
+    component_product_id: str
+    qty: Decimal
+    source_batch_id: Optional[str] = None
+    uom: Optional[str] = None
 
 
 class WorkOrderService:
@@ -775,11 +788,14 @@ class WorkOrderService:
             .all()
         )
 
+        lots_by_product = self.inventory_service.get_lots_fifo_many(
+            line.component_product_id for line in input_lines
+        )
         for line in input_lines:
             if not line.component_product_id:
                 continue
 
-            lots = self.inventory_service.get_lots_fifo(line.component_product_id)
+            lots = lots_by_product[line.component_product_id]
             available = sum(lot.quantity_kg for lot in lots if lot.quantity_kg > 0)
 
             required_qty = line.required_quantity_kg or Decimal("0")
@@ -1008,6 +1024,134 @@ class WorkOrderService:
         Returns:
             Move ID
 
+        Raises:
+            ValueError: If work order not found, invalid status, or insufficient stock
+        """
+        return self.issue_materials(
+            work_order_id,
+            [
+                MaterialIssue(
+                    component_product_id=component_product_id,
+                    qty=qty,
+                    source_batch_id=source_batch_id,
+                    uom=uom,
+                )
+            ],
+        )[0]
+
+    @staticmethod
+    def _sequential_fifo_costs(
+        issued: Sequence[tuple],
+        consumed: Sequence[Sequence[FifoIssue]],
+        lots_by_id: Dict[str, InventoryLot],
+        qty_before: Dict[str, Decimal],
+    ) -> List[Decimal]:
+        """
+        Unit cost of each planned issue, peeked at the lots as they stood just
+        before it (as fifo_peek_cost would see them).
+
+        Args:
+            issued: Planned (issue, line, product, uom, qty_kg) entries, in order
+            consumed: FifoIssue results per entry from consume_many_fifo
+            lots_by_id: Lots loaded for the batch
+            qty_before: Lot quantities before the batch was consumed
+
+        Returns:
+            Unit cost per entry, falling back to the product's usage or purchase
+            cost when no stocked lot priced it
+        """
+        qty_now = dict(qty_before)
+        costs = []
+        for (issue, _line, product, _uom, _qty), lot_issues in zip(issued, consumed):
+            unit_cost = None
+            if issue.source_batch_id:
+                lot = lots_by_id.get(issue.source_batch_id)
+                if lot is not None and qty_now.get(lot.id, Decimal("0")) > 0:
+                    unit_cost = lot.unit_cost or Decimal("0")
+            else:
+                unit_cost = next(
+                    (
+                        lot_issue.unit_cost
+                        for lot_issue in lot_issues
+                        if qty_now.get(lot_issue.lot_id, Decimal("0")) > 0
+                    ),
+                    None,
+                )
+            for lot_issue in lot_issues:
+                qty_now[lot_issue.lot_id] = lot_issue.remaining_quantity_kg
+
+            if unit_cost is None or unit_cost == Decimal("0"):
+                fallback_cost = (
+                    (product.usage_cost_ex_gst or product.purchase_cost_ex_gst)
+                    if product
+                    else Decimal("0")
+                )
+                unit_cost = fallback_cost or Decimal("0")
+            costs.append(unit_cost)
+        return costs
+
+    def _consume_issues(
+        self, work_order: WorkOrder, issued: Sequence[tuple]
+    ) -> List[Decimal]:
+        """
+        Consume a run of planned issues from one (locked) lot query.
+
+        Args:
+            work_order: Work order the materials are issued to
+            issued: Planned (issue, line, product, uom, qty_kg) entries, in order
+
+        Returns:
+            FIFO unit cost per entry
+        """
+        # Returns earlier in the batch add lots; make them visible to the lot query
+        self.db.flush()
+        lots_by_product = self.inventory_service.get_lots_fifo_many(
+            (issue.component_product_id for issue, *_ in issued),
+            lock=True,
+        )
+        lots_by_id = {lot.id: lot for lots in lots_by_product.values() for lot in lots}
+        qty_before = {lot_id: lot.quantity_kg for lot_id, lot in lots_by_id.items()}
+        consumed = self.inventory_service.consume_many_fifo(
+            [
+                FifoRequest(
+                    product_id=issue.component_product_id,
+                    qty_kg=qty_kg_abs,
+                    reason=f"Work order {work_order.code} material issue",
+                    ref_type="work_orders",
+                    ref_id=work_order.id,
+                    allow_negative=bool(
+                        getattr(product, "allow_negative_inventory", False)
+                        if product
+                        else False
+                    ),
+                )
+                for issue, _line, product, _uom, qty_kg_abs in issued
+            ],
+            lots_by_product,
+        )
+
+        # FIFO cost of each issue as its turn came: a repeated component is
+        # costed at the lot left after the earlier issues in this batch.
+        return self._sequential_fifo_costs(issued, consumed, lots_by_id, qty_before)
+
+    def issue_materials(
+        self, work_order_id: str, issues: Sequence[MaterialIssue]
+    ) -> List[str]:
+        """
+        Issue or return several components in one pass.
+
+        Input lines and products are loaded once for all components. Each run of
+        consecutive issues loads its FIFO lots once and is consumed through
+        InventoryService.consume_many_fifo, so a large BOM posts in a fixed
+        number of round trips. Returns are applied in input order between runs.
+
+        Args:
+            work_order_id: Work order ID
+            issues: Components to issue (positive qty) or return (negative qty)
+
+        Returns:
+            Move IDs in the same order as ``issues``
+
         Raises:
             ValueError: If work order not found, invalid status, or insufficient stock
         """
@@ -1019,154 +1163,173 @@ class WorkOrderService:
             raise ValueError(
                 f"Cannot issue materials when work order status is '{work_order.status}'"
             )
+        if not issues:
+            return []
+
+        component_ids = {issue.component_product_id for issue in issues}
 
-        # Find input line (check both component_product_id and ingredient_product_id for compatibility)
-        input_line = (
+        # Find input lines (check both component_product_id and ingredient_product_id for compatibility)
+        input_lines: Dict[str, WorkOrderLine] = {}
+        candidate_lines = (
             self.db.execute(
                 select(WorkOrderLine).where(
                     WorkOrderLine.work_order_id == work_order_id,
-                    (
-                        (WorkOrderLine.component_product_id == component_product_id)
-                        | (WorkOrderLine.ingredient_product_id == component_product_id)
+                    or_(
+                        WorkOrderLine.component_product_id.in_(component_ids),
+                        WorkOrderLine.ingredient_product_id.in_(component_ids),
                     ),
                 )
             )
             .scalars()
-            .first()
-        )
-
-        if not input_line:
-            raise ValueError(
-                f"Input line not found for component {component_product_id} in work order {work_order_id}"
-            )
-
-        # Get UOM
-        issue_uom = (uom or input_line.uom or "KG").upper()
-
-        # Convert to kg (use absolute quantity for conversion)
-        product = self.db.get(Product, component_product_id)
-        density = product.density_kg_per_l if product else None
-        allow_negative_inventory = bool(
-            getattr(product, "allow_negative_inventory", False) if product else False
+            .all()
         )
-
-        if qty == 0:
-            raise ValueError("Quantity must not be zero")
-
-        is_return = qty < 0
-        qty_abs = abs(qty)
-
-        if issue_uom in ["L", "ML", "LITRE", "LITER"]:
-            conversion_density = density or Decimal("1")
-            conversion_result = to_kg(qty_abs, issue_uom, conversion_density)
-            qty_kg_abs = conversion_result.quantity_kg
-        else:
-            # Assume mass unit
-            qty_kg_abs = round_quantity(qty_abs)
-
-        qty_kg_abs = round_quantity(qty_kg_abs)
-        if qty_kg_abs <= 0:
-            raise ValueError("Quantity is too small after unit conversion.")
-        qty_kg_signed = qty_kg_abs if not is_return else -qty_kg_abs
-
-        if is_return:
-            current_actual = round_quantity(input_line.actual_qty or Decimal("0"))
-            if qty_kg_abs > current_actual:
+        for line in candidate_lines:
+            for product_id in (line.component_product_id, line.ingredient_product_id):
+                if product_id in component_ids:
+                    input_lines.setdefault(product_id, line)
+
+        products = {
+            product.id: product
+            for product in self.db.execute(
+                select(Product).where(Product.id.in_(component_ids))
+            ).scalars()
+        }
+
+        planned = []
+        # Issued kg per component so far in this batch, starting from the line
+        running_actual: Dict[str, Decimal] = {}
+        for issue in issues:
+            component_product_id = issue.component_product_id
+            input_line = input_lines.get(component_product_id)
+            if not input_line:
                 raise ValueError(
-                    "Cannot return more material than has been issued for this line."
+                    f"Input line not found for component {component_product_id} in work order {work_order_id}"
                 )
 
-            unit_cost = self._handle_material_return(
-                component_product_id=component_product_id,
-                qty_kg=qty_kg_abs,
-                work_order=work_order,
-                source_batch_id=source_batch_id,
-                input_line=input_line,
-            )
+            # Get UOM
+            issue_uom = (issue.uom or input_line.uom or "KG").upper()
 
-            input_line.unit_cost = unit_cost
+            # Convert to kg (use absolute quantity for conversion)
+            product = products.get(component_product_id)
+            density = product.density_kg_per_l if product else None
 
-            move = InventoryMovement(
-                id=str(uuid4()),
-                ts=datetime.utcnow(),
-                timestamp=datetime.utcnow(),
-                date=datetime.utcnow().strftime("%Y-%m-%d"),
-                product_id=component_product_id,
-                batch_id=source_batch_id,
-                qty=qty_kg_abs,
-                unit=issue_uom or input_line.uom or "KG",
-                uom=issue_uom or input_line.uom or "KG",
-                direction="IN",
-                move_type="wo_return",
-                ref_table="work_orders",
-                ref_id=work_order_id,
-                unit_cost=unit_cost,
-                note=f"Material return for WO {work_order.code}",
-            )
-            self.db.add(move)
-        else:
-            # Get FIFO cost
-            lots = self.inventory_service.get_lots_fifo(component_product_id)
-            if source_batch_id:
-                unit_cost = fifo_peek_cost(lots, source_batch_id)
+            if issue.qty == 0:
+                raise ValueError("Quantity must not be zero")
+
+            is_return = issue.qty < 0
+            qty_abs = abs(issue.qty)
+
+            if issue_uom in ["L", "ML", "LITRE", "LITER"]:
+                conversion_density = density or Decimal("1")
+                conversion_result = to_kg(qty_abs, issue_uom, conversion_density)
+                qty_kg_abs = conversion_result.quantity_kg
             else:
-                unit_cost = fifo_peek_cost(lots)
+                # Assume mass unit
+                qty_kg_abs = round_quantity(qty_abs)
 
-            if unit_cost is None or unit_cost == Decimal("0"):
-                fallback_cost = (
-                    (product.usage_cost_ex_gst or product.purchase_cost_ex_gst)
-                    if product
-                    else Decimal("0")
-                )
-                unit_cost = fallback_cost or Decimal("0")
+            qty_kg_abs = round_quantity(qty_kg_abs)
+            if qty_kg_abs <= 0:
+                raise ValueError("Quantity is too small after unit conversion.")
 
-            self.inventory_service.consume_lots_fifo(
-                product_id=component_product_id,
-                qty_kg=qty_kg_abs,
-                reason=f"Work order {work_order.code} material issue",
-                ref_type="work_orders",
-                ref_id=work_order_id,
-                allow_negative=allow_negative_inventory,
+            current_actual = running_actual.get(
+                component_product_id,
+                round_quantity(input_line.actual_qty or Decimal("0")),
             )
-
-            move = InventoryMovement(
-                id=str(uuid4()),
-                ts=datetime.utcnow(),
-                timestamp=datetime.utcnow(),
-                date=datetime.utcnow().strftime("%Y-%m-%d"),
-                product_id=component_product_id,
-                batch_id=source_batch_id,
-                qty=-qty_kg_abs,
-                unit=issue_uom or input_line.uom or "KG",
-                uom=issue_uom or input_line.uom or "KG",
-                direction="OUT",
-                move_type="wo_issue",
-                ref_table="work_orders",
-                ref_id=work_order_id,
-                unit_cost=unit_cost,
-                note=f"Material issue for WO {work_order.code}",
+            if is_return:
+                if qty_kg_abs > current_actual:
+                    raise ValueError(
+                        "Cannot return more material than has been issued for this line."
+                    )
+                running_actual[component_product_id] = current_actual - qty_kg_abs
+            else:
+                running_actual[component_product_id] = current_actual + qty_kg_abs
+            planned.append((issue, input_line, product, issue_uom, qty_kg_abs))
+
+        move_ids = []
+        # Post consecutive issues together but keep input order between issues
+        # and returns, so returned stock is back on hand before a later issue.
+        for is_issue, run in groupby(planned, key=lambda entry: entry[0].qty > 0):
+            run = list(run)
+            unit_costs = (
+                self._consume_issues(work_order, run) if is_issue else [None] * len(run)
             )
-            self.db.add(move)
-
-            input_line.unit_cost = unit_cost or input_line.unit_cost
-            if source_batch_id:
-                input_line.source_batch_id = source_batch_id
+            for (issue, input_line, _product, issue_uom, qty_kg_abs), unit_cost in zip(
+                run, unit_costs
+            ):
+                component_product_id = issue.component_product_id
+                source_batch_id = issue.source_batch_id
+                is_return = issue.qty < 0
+                qty_kg_signed = qty_kg_abs if not is_return else -qty_kg_abs
+
+                if is_return:
+                    unit_cost = self._handle_material_return(
+                        component_product_id=component_product_id,
+                        qty_kg=qty_kg_abs,
+                        work_order=work_order,
+                        source_batch_id=source_batch_id,
+                        input_line=input_line,
+                    )
 
-        # Update input line (applies to both issue and return)
-        if input_line.actual_qty is None:
-            input_line.actual_qty = Decimal("0")
-        updated_actual = round_quantity(input_line.actual_qty + qty_kg_signed)
-        if updated_actual < 0:
-            updated_actual = Decimal("0")
-        input_line.actual_qty = updated_actual
-        input_line.allocated_quantity_kg = updated_actual
+                    input_line.unit_cost = unit_cost
+
+                    move = InventoryMovement(
+                        id=str(uuid4()),
+                        ts=datetime.utcnow(),
+                        timestamp=datetime.utcnow(),
+                        date=datetime.utcnow().strftime("%Y-%m-%d"),
+                        product_id=component_product_id,
+                        batch_id=source_batch_id,
+                        qty=qty_kg_abs,
+                        unit=issue_uom or input_line.uom or "KG",
+                        uom=issue_uom or input_line.uom or "KG",
+                        direction="IN",
+                        move_type="wo_return",
+                        ref_table="work_orders",
+                        ref_id=work_order_id,
+                        unit_cost=unit_cost,
+                        note=f"Material return for WO {work_order.code}",
+                    )
+                    self.db.add(move)
+                else:
+                    move = InventoryMovement(
+                        id=str(uuid4()),
+                        ts=datetime.utcnow(),
+                        timestamp=datetime.utcnow(),
+                        date=datetime.utcnow().strftime("%Y-%m-%d"),
+                        product_id=component_product_id,
+                        batch_id=source_batch_id,
+                        qty=-qty_kg_abs,
+                        unit=issue_uom or input_line.uom or "KG",
+                        uom=issue_uom or input_line.uom or "KG",
+                        direction="OUT",
+                        move_type="wo_issue",
+                        ref_table="work_orders",
+                        ref_id=work_order_id,
+                        unit_cost=unit_cost,
+                        note=f"Material issue for WO {work_order.code}",
+                    )
+                    self.db.add(move)
+
+                    input_line.unit_cost = unit_cost or input_line.unit_cost
+                    if source_batch_id:
+                        input_line.source_batch_id = source_batch_id
+
+                # Update input line (applies to both issue and return)
+                if input_line.actual_qty is None:
+                    input_line.actual_qty = Decimal("0")
+                updated_actual = round_quantity(input_line.actual_qty + qty_kg_signed)
+                if updated_actual < 0:
+                    updated_actual = Decimal("0")
+                input_line.actual_qty = updated_actual
+                input_line.allocated_quantity_kg = updated_actual
+                move_ids.append(move.id)
 
         self.db.flush()
 
         self._recalculate_actual_cost(work_order_id)
         self.db.flush()
 
-        return move.id
+        return move_ids
 
     def record_qc(
         self,
@@ -1496,6 +1659,22 @@ class WorkOrderService:
             .all()
         )
 
+        line_product_ids = {
+            line.component_product_id
+            for line in input_lines
+            if line.component_product_id
+        }
+        line_products = (
+            {
+                product.id: product
+                for product in self.db.execute(
+                    select(Product).where(Product.id.in_(line_product_ids))
+                ).scalars()
+            }
+            if line_product_ids
+            else {}
+        )
+
         material_cost = Decimal("0")
         for line in input_lines:
             actual_qty = Decimal(
@@ -1505,7 +1684,7 @@ class WorkOrderService:
             if actual_qty == 0:
                 continue
 
-            line_product = self.db.get(Product, line.component_product_id)
+            line_product = line_products.get(line.component_product_id)
             unit_cost_value = line.unit_cost or (
                 (line_product.usage_cost_ex_gst or line_product.purchase_cost_ex_gst)
                 if line_product
@@ -21,6 +21,16 @@ class DatabaseSettings(BaseSettings):
     pool_timeout: int = Field(default=30, ge=1, le=300)
     pool_recycle: int = Field(default=3600, ge=300, le=7200)
 
+    # Read-only engine for reports; defaults to database_url (e.g. a replica)
+    read_database_url: Optional[str] = Field(default=None)
+
+    # SQLite connection pragmas (file databases only)
+    sqlite_wal: bool = Field(default=True)
+    sqlite_synchronous: str = Field(default="NORMAL", pattern="^(OFF|NORMAL|FULL)$")
+    sqlite_busy_timeout_ms: int = Field(default=5000, ge=0, le=600000)
+    sqlite_cache_size_kib: int = Field(default=65536, ge=0)
+    sqlite_mmap_size: int = Field(default=268435456, ge=0)
+
     # Migration settings
     alembic_config_path: str = Field(default="alembic.ini")
 
@@ -75,6 +85,14 @@ class LoggingSettings(BaseSettings):
     include_user_id: bool = Field(default=True)
     include_entity_info: bool = Field(default=True)
 
+    # Per-request SQL metrics (QueryMetricsMiddleware)
+    query_metrics_enabled: bool = Field(default=True)
+    slow_query_ms: float = Field(default=200.0, ge=0)
+    # None: EXPLAIN slow queries in development only
+    explain_slow_queries: Optional[bool] = Field(default=None)
+    slowest_queries: int = Field(default=5, ge=0, le=50)
+    query_metrics_history: int = Field(default=200, ge=1, le=10000)
+
     class Config:
         env_prefix = "LOG_"
 
@@ -90,6 +108,13 @@ class UISettings(BaseSettings):
     # API connection
     api_base_url: str = Field(default="http://127.0.0.1:8000")
     api_timeout: int = Field(default=30, ge=1, le=300)
+    api_transport: str = Field(
+        default="http",
+        description="http (pooled keep-alive) or inprocess (call the API app directly)",
+    )
+    api_pool_size: int = Field(default=10, ge=1, le=100)
+    api_coalesce_gets: bool = Field(default=True)
+    api_slow_call_ms: int = Field(default=1000, ge=1)
 
     # UI features
     enable_demo_mode: bool = Field(default=True)
@@ -139,6 +164,10 @@ class BusinessSettings(BaseSettings):
     # Pricing settings
     enable_dynamic_pricing: bool = Field(default=False)
     price_rounding_precision: int = Field(default=2, ge=0, le=6)
+    # Resolved prices kept per database in the in-process price cache (0 = off)
+    price_cache_size: int = Field(default=10000, ge=0)
+    # Other processes' price changes are seen once cached entries expire
+    price_cache_ttl_seconds: float = Field(default=300.0, gt=0)
 
     # Batch settings
     require_qc_for_completion: bool = Field(default=True)
@@ -167,6 +196,28 @@ class ShopifySettings(BaseSettings):
         default=None, description="Shopify webhook secret for HMAC verification"
     )
 
+    # Webhook inbox: handlers only enqueue; a background pool applies events
+    webhook_worker_enabled: bool = Field(
+        default=True, description="Drain the webhook inbox inside the API process"
+    )
+    webhook_workers: int = Field(default=4, ge=1, le=32)
+    webhook_poll_interval_seconds: float = Field(default=2.0, gt=0)
+    webhook_batch_orders: int = Field(default=200, ge=1)
+    webhook_max_attempts: int = Field(default=5, ge=1)
+    webhook_claim_timeout_seconds: int = Field(default=300, ge=10)
+    webhook_retention_days: int = Field(default=14, ge=1)
+
+    # Inventory reconcile: concurrent pushes paced by Shopify's call-limit bucket
+    push_concurrency: int = Field(default=8, ge=1, le=64)
+    api_bucket_size: int = Field(default=40, ge=1)
+    api_leak_rate: float = Field(default=2.0, gt=0, description="Calls per second")
+    api_max_retries: int = Field(default=3, ge=0)
+    api_timeout_seconds: float = Field(default=30.0, gt=0)
+
+    # Historical order import: cursor pages, fetched ahead of the DB writer
+    order_import_page_size: int = Field(default=250, ge=1, le=250)
+    order_import_prefetch_pages: int = Field(default=2, ge=1, le=10)
+
     class Config:
         env_prefix = "SHOPIFY_"
 
@@ -221,6 +272,38 @@ class DocumentGeneratorSettings(BaseSettings):
         default=None,
         description="Path to LibreOffice executable (e.g. C:\\Program Files\\LibreOffice\\program\\soffice.exe)",
     )
+    libreoffice_pool_size: int = Field(
+        default=2,
+        ge=0,
+        le=16,
+        description="Long-lived LibreOffice listeners for conversion (0 = start soffice per document)",
+    )
+    libreoffice_pool_max_conversions: int = Field(
+        default=200,
+        ge=1,
+        description="Recycle a pooled LibreOffice listener after this many conversions",
+    )
+    libreoffice_pool_max_queue: int = Field(
+        default=32,
+        ge=0,
+        description="Conversions allowed to wait for a free listener before rejecting",
+    )
+    libreoffice_pool_start_timeout_seconds: int = Field(default=30, ge=5, le=300)
+    render_workers: int = Field(
+        default=4,
+        ge=0,
+        le=32,
+        description="Processes rendering DOCX for batch generation (0 = render in-process)",
+    )
+    template_cache_size: int = Field(
+        default=32,
+        ge=0,
+        description="Parsed templates kept in memory per process (0 = no cache)",
+    )
+    output_cache_enabled: bool = Field(
+        default=True,
+        description="Reuse the PDF of an earlier document with identical template and data",
+    )
     redis_url: str = Field(
         default="redis://localhost:6379/0",
         description="Redis URL for RQ job queue",
@@ -239,6 +322,49 @@ class DocumentGeneratorSettings(BaseSettings):
         env_prefix = "DOCGEN_"
 
 
+class SalesAnalyticsSettings(BaseSettings):
+    """Sales analytics and dashboard aggregation settings."""
+
+    # Read new/repeat/inactive classification from customer_first_order
+    # instead of grouping the full sales_orders history on every request.
+    customer_first_order_enabled: bool = Field(default=False)
+    # Maintain sales_daily_rollup on order writes and serve dashboards from it
+    # while its watermark is current.
+    daily_rollup_enabled: bool = Field(default=False)
+
+    class Config:
+        env_prefix = "SALES_ANALYTICS_"
+
+
+class GeocodingSettings(BaseSettings):
+    """Nominatim geocoding used by customer location enrichment."""
+
+    nominatim_url: str = Field(default="https://nominatim.openstreetmap.org/search")
+    user_agent: str = Field(
+        default="VNDManuf-Sales/1.0 (customer location enrichment)"
+    )
+    timeout_seconds: float = Field(default=20.0, gt=0, le=120)
+    # Nominatim's public usage policy allows at most one request per second.
+    requests_per_second: float = Field(default=0.9, gt=0, le=50)
+    burst: int = Field(default=1, ge=1, le=50)
+    max_concurrency: int = Field(default=2, ge=1, le=32)
+    max_retries: int = Field(default=3, ge=0, le=10)
+    retry_backoff_seconds: float = Field(default=2.0, ge=0)
+    cache_path: Optional[Path] = Field(
+        default_factory=lambda: Path(__file__).parent.parent
+        / "data"
+        / "geocode_cache.sqlite3",
+        description="SQLite file caching geocode results (unset = no cache)",
+    )
+    cache_ttl_days: float = Field(default=180, ge=0)
+    negative_cache_ttl_days: float = Field(
+        default=14, ge=0, description="How long a query with no match is remembered"
+    )
+
+    class Config:
+        env_prefix = "GEOCODE_"
+
+
 class Settings(BaseSettings):
     """Main application settings."""
 
@@ -259,6 +385,10 @@ class Settings(BaseSettings):
     shopify: ShopifySettings = Field(default_factory=ShopifySettings)
     openai: OpenAISettings = Field(default_factory=OpenAISettings)
     docgen: DocumentGeneratorSettings = Field(default_factory=DocumentGeneratorSettings)
+    sales_analytics: SalesAnalyticsSettings = Field(
+        default_factory=SalesAnalyticsSettings
+    )
+    geocoding: GeocodingSettings = Field(default_factory=GeocodingSettings)
 
     # File paths
     project_root: Path = Field(default_factory=lambda: Path(__file__).parent.parent)
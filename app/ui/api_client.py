@@ -0,0 +1,293 @@
+"""Shared client for Dash UI calls to the FastAPI backend.
+
+Every UI request goes through one :class:`ApiClient` instead of a fresh
+``requests`` connection per call. The transport is pluggable:
+
+* ``http`` (default): a keep-alive connection pool to ``UI_API_BASE_URL``.
+* ``inprocess``: the FastAPI app is called directly over ASGI, with no socket
+  or server, when the UI and API run in the same process.
+
+Identical GETs issued while one is already in flight share its response, and
+each call is timed (DEBUG log, WARNING above ``UI_API_SLOW_CALL_MS``).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Dict, Optional, Protocol, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+API_PREFIX = "/api/v1"
+
+
+class ApiTransport(Protocol):
+    # Origin of the API this transport reaches (absolute URLs are matched on it)
+    base_url: str
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: Optional[Dict[str, Any]] = None,
+        json: Any = None,
+        timeout: Optional[float] = None,
+    ) -> httpx.Response: ...
+
+    def close(self) -> None: ...
+
+
+class PooledHttpTransport:
+    """Keep-alive HTTP connection pool to the API server."""
+
+    def __init__(self, base_url: Optional[str] = None, pool_size: Optional[int] = None):
+        pool_size = pool_size or settings.ui.api_pool_size
+        self.base_url = (base_url or settings.ui.api_base_url).rstrip("/")
+        self._client = httpx.Client(
+            base_url=self.base_url,
+            timeout=settings.ui.api_timeout,
+            limits=httpx.Limits(
+                max_connections=pool_size, max_keepalive_connections=pool_size
+            ),
+        )
+
+    def request(self, method, path, *, params=None, json=None, timeout=None):
+        return self._client.request(
+            method,
+            path,
+            params=params,
+            json=json,
+            timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+        )
+
+    def close(self) -> None:
+        self._client.close()
+
+
+class InProcessAsgiTransport:
+    """Call an ASGI app (the FastAPI API by default) without a network hop.
+
+    Requests run on a private event-loop thread; FastAPI still executes sync
+    endpoints in its threadpool, so concurrent UI callbacks stay concurrent.
+    The app's lifespan is not run, so background workers started there (e.g.
+    the Shopify webhook drainer) stay with the real API server. It stands in
+    for the API at ``UI_API_BASE_URL``.
+
+    ASGITransport ignores httpx timeouts, so each call is bounded by waiting
+    on its result instead.
+    """
+
+    def __init__(self, asgi_app: Any = None):
+        self.base_url = settings.ui.api_base_url.rstrip("/")
+        if asgi_app is None:
+            from app.api.main import create_app
+
+            asgi_app = create_app()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="ui-api-inprocess", daemon=True
+        )
+        self._thread.start()
+
+        async def _make_client() -> httpx.AsyncClient:
+            return httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=asgi_app),
+                base_url="http://inprocess",
+                timeout=settings.ui.api_timeout,
+            )
+
+        self._client = self._run(_make_client())
+
+    def _run(self, coro, timeout: Optional[float] = None):
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise httpx.ReadTimeout(
+                f"In-process API call exceeded {timeout}s"
+            ) from None
+
+    def request(self, method, path, *, params=None, json=None, timeout=None):
+        return self._run(
+            self._client.request(method, path, params=params, json=json),
+            timeout if timeout is not None else settings.ui.api_timeout,
+        )
+
+    def close(self) -> None:
+        self._run(self._client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+
+class ApiClient:
+    """requests-style ``get``/``post``/... over an :class:`ApiTransport`.
+
+    ``url`` may be an endpoint under ``/api/v1`` ("/products/") or an absolute
+    URL. Absolute URLs on the configured transport's host use it; other hosts
+    get their own pooled HTTP transport. Responses are ``httpx.Response``
+    objects (``status_code``, ``json()``, ``text``).
+    """
+
+    def __init__(
+        self,
+        transport: ApiTransport,
+        *,
+        coalesce_gets: Optional[bool] = None,
+        slow_call_ms: Optional[int] = None,
+    ):
+        self.transport = transport
+        self.coalesce_gets = (
+            settings.ui.api_coalesce_gets if coalesce_gets is None else coalesce_gets
+        )
+        self.slow_call_ms = (
+            settings.ui.api_slow_call_ms if slow_call_ms is None else slow_call_ms
+        )
+        self.stats: Counter = Counter()
+        self._inflight: Dict[Tuple[str, str, str], Future] = {}
+        self._other_hosts: Dict[str, ApiTransport] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _origin(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}".lower()
+
+    @classmethod
+    def _split(cls, url: str) -> Tuple[Optional[str], str]:
+        """(origin, path) for an absolute URL; (None, path) for an endpoint."""
+        if url.startswith(("http://", "https://")):
+            parts = urlsplit(url)
+            path = parts.path + (f"?{parts.query}" if parts.query else "")
+            return cls._origin(url), path
+        return None, f"{API_PREFIX}{url}"
+
+    def _transport_for(self, origin: Optional[str]) -> ApiTransport:
+        if origin is None or origin == self._origin(self.transport.base_url):
+            return self.transport
+        with self._lock:
+            transport = self._other_hosts.get(origin)
+            if transport is None:
+                transport = self._other_hosts[origin] = PooledHttpTransport(origin)
+            return transport
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        params: Optional[Dict[str, Any]] = None,
+        json: Any = None,
+        timeout: Optional[float] = None,
+    ) -> httpx.Response:
+        method = method.upper()
+        origin, path = self._split(url)
+        transport = self._transport_for(origin)
+        # requests drops None-valued params; httpx would send them empty
+        if params:
+            params = {k: v for k, v in params.items() if v is not None}
+        if method != "GET" or not self.coalesce_gets:
+            return self._send(transport, method, path, params, json, timeout)
+
+        key = (transport.base_url, path, repr(sorted((params or {}).items())))
+        with self._lock:
+            pending = self._inflight.get(key)
+            if pending is None:
+                pending = self._inflight[key] = Future()
+                leader = True
+            else:
+                leader = False
+        if not leader:
+            self.stats["coalesced"] += 1
+            logger.debug("UI API GET %s joined an in-flight request", path)
+            return pending.result()
+        try:
+            response = self._send(transport, method, path, params, json, timeout)
+        except BaseException as exc:
+            pending.set_exception(exc)
+            raise
+        else:
+            pending.set_result(response)
+            return response
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _send(self, transport, method, path, params, json, timeout) -> httpx.Response:
+        started = time.perf_counter()
+        response = transport.request(
+            method, path, params=params, json=json, timeout=timeout
+        )
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.stats["requests"] += 1
+        log = logger.warning if elapsed_ms >= self.slow_call_ms else logger.debug
+        log(
+            "UI API %s %s -> %s in %.1f ms",
+            method,
+            path,
+            response.status_code,
+            elapsed_ms,
+        )
+        return response
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, **kwargs):
+        return self.request("GET", url, params=params, **kwargs)
+
+    def post(self, url: str, json: Any = None, **kwargs):
+        return self.request("POST", url, json=json, **kwargs)
+
+    def put(self, url: str, json: Any = None, **kwargs):
+        return self.request("PUT", url, json=json, **kwargs)
+
+    def patch(self, url: str, json: Any = None, **kwargs):
+        return self.request("PATCH", url, json=json, **kwargs)
+
+    def delete(self, url: str, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+    def close(self) -> None:
+        self.transport.close()
+        with self._lock:
+            others, self._other_hosts = list(self._other_hosts.values()), {}
+        for transport in others:
+            transport.close()
+
+
+_client: Optional[ApiClient] = None
+_client_lock = threading.Lock()
+
+
+def _default_transport() -> ApiTransport:
+    if settings.ui.api_transport == "inprocess":
+        return InProcessAsgiTransport()
+    return PooledHttpTransport()
+
+
+def get_api_client() -> ApiClient:
+    """The process-wide UI client, built from UI settings on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = ApiClient(_default_transport())
+        return _client
+
+
+def set_api_client(client: Optional[ApiClient]) -> None:
+    """Replace the shared client (closing the old one); None rebuilds lazily."""
+    global _client
+    with _client_lock:
+        previous, _client = _client, client
+    if previous is not None and previous is not client:
+        previous.close()
@@ -12,8 +12,8 @@ from typing import Any, Dict, Optional
 # third-party
 import dash
 import dash_bootstrap_components as dbc
+import httpx
 import pandas as pd
-import requests
 
 # (…rest of your file…)
 # stdlib/third-party imports first
@@ -51,6 +51,7 @@ from apps.vndmanuf_sales.ui.sales_tab import (
     register_callbacks as register_sales_tab_callbacks,
 )
 
+from .api_client import get_api_client  # noqa: E402
 from .contacts_callbacks import register_contacts_callbacks  # noqa: E402
 from .excise_rates_callbacks import register_excise_rates_callbacks  # noqa: E402
 from .formulas_callbacks import register_formulas_callbacks  # noqa: E402
@@ -245,18 +246,19 @@ def make_api_request(
 ) -> Dict[str, Any]:
     """Make API request and return response."""
     try:
-        url = f"{API_BASE_URL}{endpoint}"
+        # Shared pooled (or in-process) client; endpoint is under /api/v1
+        client = get_api_client()
 
         if method.upper() == "GET":
-            response = requests.get(url, params=data)
+            response = client.get(endpoint, params=data)
         elif method.upper() == "POST":
-            response = requests.post(url, json=data)
+            response = client.post(endpoint, json=data)
         elif method.upper() == "PUT":
-            response = requests.put(url, json=data)
+            response = client.put(endpoint, json=data)
         elif method.upper() == "PATCH":
-            response = requests.patch(url, json=data)
+            response = client.patch(endpoint, json=data)
         elif method.upper() == "DELETE":
-            response = requests.delete(url)
+            response = client.delete(endpoint)
         else:
             return {"error": f"Unsupported method: {method}"}
 
@@ -286,7 +288,7 @@ def make_api_request(
                 )
             }
 
-    except requests.exceptions.ConnectionError:
+    except httpx.ConnectError:
         # Return sample data when API is not available
         print(f"API not available, using sample data for {endpoint}")
         return get_sample_data(endpoint)
@@ -461,7 +463,7 @@ def check_api_connectivity(active_tab):
     """Check API connectivity and update alert."""
     try:
         # Try to connect to API health endpoint
-        response = requests.get("http://127.0.0.1:8000/health", timeout=2)
+        response = get_api_client().get("http://127.0.0.1:8000/health", timeout=2)
         if response.status_code == 200:
             return (
                 "",
@@ -474,7 +476,7 @@ def check_api_connectivity(active_tab):
                 "warning",
                 {"display": "block"},
             )
-    except requests.exceptions.ConnectionError:
+    except httpx.ConnectError:
         return (
             "Demo Mode: API server not available. Using sample data.",
             "info",
@@ -820,6 +822,18 @@ def load_products_table(
 
         print(f"[load_products_table] Unique products: {len(unique_products)}")
 
+        # Stock for every row from one bulk SOH request
+        soh_response = make_api_request("GET", "/inventory/products/soh")
+        if isinstance(soh_response, dict) and "results" in soh_response:
+            stock_by_id = {
+                row.get("product_id"): row.get("stock_on_hand", 0.0)
+                for row in soh_response["results"]
+            }
+            for product in unique_products:
+                product["stock_on_hand"] = stock_by_id.get(product.get("id"), 0.0)
+        else:
+            print(f"[load_products_table] SOH unavailable: {soh_response}")
+
         # Flatten nested fields and format for table
         for product in unique_products:
             # Convert variants list to string - ensure no objects/dicts remain
@@ -3,9 +3,11 @@
 from typing import Any, Dict, List
 
 import dash_bootstrap_components as dbc
-import requests
+import httpx
 from dash import Input, Output, State, dash_table, dcc, html
 
+from app.ui.api_client import get_api_client
+
 
 class CostingPage:
     """COGS Inspection page with tree view and point-in-time costing."""
@@ -262,7 +264,7 @@ class CostingPage:
         )
 
     @staticmethod
-    def register_callbacks(app, api_base_url: str = "http://127.0.0.1:8000/api/v1"):
+    def register_callbacks(app):
         """Register callbacks for the costing page."""
 
         @app.callback(
@@ -272,9 +274,8 @@ class CostingPage:
         def update_product_options(search_value):
             """Load product options from API."""
             try:
-                url = f"{api_base_url}/products/"
                 params = {"query": search_value} if search_value else {}
-                response = requests.get(url, params=params, timeout=5)
+                response = get_api_client().get("/products/", params=params, timeout=5)
 
                 if response.status_code == 200:
                     data = response.json()
@@ -327,14 +328,15 @@ class CostingPage:
                 )
 
             try:
-                url = f"{api_base_url}/costing/inspect/{product_id}"
                 params = {}
                 if as_of_date:
                     params["as_of_date"] = as_of_date
                 if include_estimates is not None:
                     params["include_estimates"] = include_estimates
 
-                response = requests.get(url, params=params, timeout=10)
+                response = get_api_client().get(
+                    f"/costing/inspect/{product_id}", params=params, timeout=10
+                )
 
                 if response.status_code == 200:
                     data = response.json()
@@ -433,7 +435,7 @@ class CostingPage:
                         ],
                         [],
                     )
-            except requests.exceptions.ConnectionError:
+            except httpx.ConnectError:
                 return (
                     [
                         dbc.Alert(
@@ -7,11 +7,12 @@ from typing import Any, Dict, List, Optional, Set, Tuple
 
 import dash
 import dash_bootstrap_components as dbc
-import requests
 from dash import Input, Output, State, dash_table, dcc, html, no_update
 from dash.dash_table.Format import Format, Scheme
 from dash.exceptions import PreventUpdate
 
+from .api_client import get_api_client
+
 
 def safe_float(value: Optional[Any], default: Optional[float] = 0.0) -> Optional[float]:
     try:
@@ -47,7 +48,7 @@ def get_product_details(
 
     try:
         prod_url = f"{api_base_url}/products/{product_id}"
-        prod_response = requests.get(prod_url, timeout=5)
+        prod_response = get_api_client().get(prod_url, timeout=5)
         if prod_response.status_code == 200:
             product = prod_response.json()
             sku = product.get("sku", "")
@@ -321,7 +322,7 @@ def register_work_orders_callbacks(
                     return None
             else:
                 url = f"{api_base_url}/work-orders/qc-test-types"
-                response = requests.get(url, timeout=5)
+                response = get_api_client().get(url, timeout=5)
                 if response.status_code != 200:
                     return None
                 response = response.json()
@@ -386,7 +387,7 @@ def register_work_orders_callbacks(
                 params["date_to"] = date_to
 
             url = f"{api_base_url}/work-orders/"
-            response = requests.get(url, params=params, timeout=5)
+            response = get_api_client().get(url, params=params, timeout=5)
 
             if response.status_code == 200:
                 work_orders = response.json()
@@ -438,7 +439,7 @@ def register_work_orders_callbacks(
                     if product_id:
                         try:
                             product_url = f"{api_base_url}/products/{product_id}"
-                            product_response = requests.get(product_url, timeout=5)
+                            product_response = get_api_client().get(product_url, timeout=5)
                             if product_response.status_code == 200:
                                 product_data = product_response.json()
                                 product_name = f"{product_data.get('sku', '')} - {product_data.get('name', product_id)}"
@@ -559,7 +560,7 @@ def register_work_orders_callbacks(
 
         try:
             url = f"{api_base_url}/products/?is_active=true"
-            response = requests.get(url, timeout=5)
+            response = get_api_client().get(url, timeout=5)
 
             if response.status_code == 200:
                 products_data = response.json()
@@ -613,7 +614,7 @@ def register_work_orders_callbacks(
 
         try:
             url = f"{api_base_url}/work-orders/{wo_id}"
-            response = requests.get(url, timeout=5)
+            response = get_api_client().get(url, timeout=5)
             if response.status_code == 200:
                 wo = response.json()
                 _, api_options = build_input_rows(wo, api_base_url)
@@ -634,7 +635,7 @@ def register_work_orders_callbacks(
             raise PreventUpdate
 
         try:
-            response = requests.get(
+            response = get_api_client().get(
                 f"{api_base_url}/products/?is_active=true", timeout=5
             )
             if response.status_code != 200:
@@ -808,7 +809,7 @@ def register_work_orders_callbacks(
 
         try:
             url = f"{api_base_url}/work-orders/{wo_id}/inputs"
-            response = requests.post(url, json=payload, timeout=10)
+            response = get_api_client().post(url, json=payload, timeout=10)
 
             if response.status_code == 201:
                 return (
@@ -894,7 +895,7 @@ def register_work_orders_callbacks(
         try:
             data = {"planned_qty": float(planned_qty_value)}
             url = f"{api_base_url}/work-orders/{wo_id}"
-            response = requests.patch(url, json=data, timeout=10)
+            response = get_api_client().patch(url, json=data, timeout=10)
 
             if response.status_code == 200:
                 return (
@@ -1018,7 +1019,7 @@ def register_work_orders_callbacks(
                 if wo_id:
                     try:
                         url = f"{api_base_url}/work-orders/{wo_id}"
-                        response = requests.get(url, timeout=5)
+                        response = get_api_client().get(url, timeout=5)
                         if response.status_code == 200:
                             wo = response.json()
                             return build_return(
@@ -1093,7 +1094,7 @@ def register_work_orders_callbacks(
                     if wo_id:
                         try:
                             url = f"{api_base_url}/work-orders/{wo_id}"
-                            response = requests.get(url, timeout=5)
+                            response = get_api_client().get(url, timeout=5)
                             if response.status_code == 200:
                                 wo = response.json()
                                 return build_return(
@@ -1129,7 +1130,7 @@ def register_work_orders_callbacks(
                 elif current_wo_id:
                     try:
                         url = f"{api_base_url}/work-orders/{current_wo_id}"
-                        response = requests.get(url, timeout=5)
+                        response = get_api_client().get(url, timeout=5)
                         if response.status_code == 200:
                             wo = response.json()
                             return build_return(
@@ -1213,7 +1214,7 @@ def register_work_orders_callbacks(
             }
 
             url = f"{api_base_url}/work-orders/{wo_id}/issues"
-            response = requests.post(url, json=data, timeout=10)
+            response = get_api_client().post(url, json=data, timeout=10)
 
             if response.status_code == 201:
                 payload = response.json()
@@ -1469,7 +1470,7 @@ def register_work_orders_callbacks(
 
         try:
             url = f"{api_base_url}/work-orders/{wo_id}/qc/{qc_id}"
-            response = requests.delete(url, timeout=10)
+            response = get_api_client().delete(url, timeout=10)
             if response.status_code == 204:
                 return (
                     True,
@@ -1562,12 +1563,12 @@ def register_work_orders_callbacks(
         try:
             if current_qc_id:
                 url = f"{api_base_url}/work-orders/{wo_id}/qc/{current_qc_id}"
-                response = requests.patch(url, json=payload, timeout=10)
+                response = get_api_client().patch(url, json=payload, timeout=10)
                 success_code = 200
                 success_message = "QC test updated successfully"
             else:
                 url = f"{api_base_url}/work-orders/{wo_id}/qc"
-                response = requests.post(url, json=payload, timeout=10)
+                response = get_api_client().post(url, json=payload, timeout=10)
                 success_code = 201
                 success_message = "QC test recorded successfully"
 
@@ -1647,7 +1648,7 @@ def register_work_orders_callbacks(
             }
 
             url = f"{api_base_url}/work-orders/{wo_id}/complete"
-            response = requests.post(url, json=data, timeout=10)
+            response = get_api_client().post(url, json=data, timeout=10)
 
             if response.status_code == 200:
                 payload = response.json()
@@ -1709,7 +1710,7 @@ def register_work_orders_callbacks(
 
         try:
             url = f"{api_base_url}/work-orders/{wo_id}/costs"
-            response = requests.get(url, timeout=5)
+            response = get_api_client().get(url, timeout=5)
 
             if response.status_code == 200:
                 costs = response.json()
@@ -1757,7 +1758,7 @@ def register_work_orders_callbacks(
 
         try:
             url = f"{api_base_url}/work-orders/{wo_id}/genealogy"
-            response = requests.get(url, timeout=5)
+            response = get_api_client().get(url, timeout=5)
 
             if response.status_code == 200:
                 genealogy = response.json()
@@ -1838,7 +1839,7 @@ def register_work_orders_callbacks(
             else:
                 raise PreventUpdate
 
-            response = requests.post(url, json=data, timeout=10)
+            response = get_api_client().post(url, json=data, timeout=10)
 
             if response.status_code in [200, 201]:
                 return (
@@ -1988,7 +1989,7 @@ def register_work_orders_callbacks(
 
         try:
             url = f"{api_base_url}/work-orders/{wo_id}"
-            response = requests.get(url, timeout=5)
+            response = get_api_client().get(url, timeout=5)
 
             if response.status_code == 200:
                 wo = response.json()
@@ -2029,7 +2030,7 @@ def register_work_orders_callbacks(
 
         try:
             url = f"{api_base_url}/work-orders/{wo_id}"
-            response = requests.get(url, timeout=5)
+            response = get_api_client().get(url, timeout=5)
 
             if response.status_code != 200:
                 return (
@@ -2489,7 +2490,7 @@ def build_detail_tab_content(
     if wo_id:
         try:
             cost_url = f"{api_base_url}/work-orders/{wo_id}/costs"
-            cost_response = requests.get(cost_url, timeout=5)
+            cost_response = get_api_client().get(cost_url, timeout=5)
             if cost_response.status_code == 200:
                 cost_data = cost_response.json()
         except Exception:
@@ -2497,7 +2498,7 @@ def build_detail_tab_content(
 
         try:
             genealogy_url = f"{api_base_url}/work-orders/{wo_id}/genealogy"
-            genealogy_response = requests.get(genealogy_url, timeout=5)
+            genealogy_response = get_api_client().get(genealogy_url, timeout=5)
             if genealogy_response.status_code == 200:
                 genealogy_data = genealogy_response.json()
         except Exception:
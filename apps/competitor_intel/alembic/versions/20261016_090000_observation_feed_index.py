@@ -0,0 +1,63 @@
+"""covering index for observation paging and counts
+
+Revision ID: 20261016_090000
+Revises: 20251109_231500
+Create Date: 2026-10-16 09:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261016_090000"
+down_revision = "20251109_231500"
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = "ix_price_observations_live_feed"
+
+
+def _has_table(insp, name: str) -> bool:
+    return name in insp.get_table_names()
+
+
+def _has_index(insp, table: str, name: str) -> bool:
+    return any(ix["name"] == name for ix in insp.get_indexes(table))
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+
+    if not _has_table(insp, "price_observations"):
+        return
+    if _has_index(insp, "price_observations", INDEX_NAME):
+        return
+
+    op.create_index(
+        INDEX_NAME,
+        "price_observations",
+        [
+            "observation_dt",
+            "id",
+            "channel",
+            "sku_id",
+            "company_id",
+            "location_id",
+            "deleted_at",
+        ],
+        sqlite_where=sa.text("deleted_at IS NULL"),
+        postgresql_where=sa.text("deleted_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+
+    if _has_table(insp, "price_observations") and _has_index(
+        insp, "price_observations", INDEX_NAME
+    ):
+        op.drop_index(INDEX_NAME, table_name="price_observations")
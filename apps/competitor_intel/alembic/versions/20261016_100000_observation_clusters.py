@@ -0,0 +1,82 @@
+"""duplicate clusters table and hash_key/deleted_at index
+
+Revision ID: 20261016_100000
+Revises: 20261016_090000
+Create Date: 2026-10-16 10:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261016_100000"
+down_revision = "20261016_090000"
+branch_labels = None
+depends_on = None
+
+OLD_INDEX = "ix_price_observations_hash_key"
+NEW_INDEX = "ix_price_observations_hash_key_deleted_at"
+
+
+def _has_table(insp, name: str) -> bool:
+    return name in insp.get_table_names()
+
+
+def _has_index(insp, table: str, name: str) -> bool:
+    return any(ix["name"] == name for ix in insp.get_indexes(table))
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+
+    if not _has_table(insp, "price_observations"):
+        return
+
+    if not _has_index(insp, "price_observations", NEW_INDEX):
+        op.create_index(NEW_INDEX, "price_observations", ["hash_key", "deleted_at"])
+    if _has_index(insp, "price_observations", OLD_INDEX):
+        op.drop_index(OLD_INDEX, table_name="price_observations")
+
+    if not _has_table(insp, "observation_clusters"):
+        op.create_table(
+            "observation_clusters",
+            sa.Column("hash_key", sa.String(length=128), nullable=False),
+            sa.Column("observation_count", sa.Integer(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+            sa.PrimaryKeyConstraint("hash_key", name="pk_observation_clusters"),
+        )
+        op.create_index(
+            "ix_observation_clusters_observation_count",
+            "observation_clusters",
+            ["observation_count"],
+        )
+        # Seed clusters from existing live observations.
+        op.execute("""
+            INSERT INTO observation_clusters (hash_key, observation_count, updated_at)
+            SELECT hash_key, COUNT(*), CURRENT_TIMESTAMP
+            FROM price_observations
+            WHERE deleted_at IS NULL
+            GROUP BY hash_key
+            HAVING COUNT(*) > 1
+            """)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+
+    if _has_table(insp, "observation_clusters"):
+        op.drop_index(
+            "ix_observation_clusters_observation_count",
+            table_name="observation_clusters",
+        )
+        op.drop_table("observation_clusters")
+
+    if _has_table(insp, "price_observations"):
+        if not _has_index(insp, "price_observations", OLD_INDEX):
+            op.create_index(OLD_INDEX, "price_observations", ["hash_key"])
+        if _has_index(insp, "price_observations", NEW_INDEX):
+            op.drop_index(NEW_INDEX, table_name="price_observations")
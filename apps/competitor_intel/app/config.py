@@ -26,6 +26,9 @@ class AppConfig:
     default_gst_rate: float = float(os.getenv("COMPINTEL_DEFAULT_GST_RATE", "0.10"))
     default_currency: str = os.getenv("COMPINTEL_DEFAULT_CURRENCY", "AUD")
     map_enabled: bool = os.getenv("COMPINTEL_SMAP_ENABLED", "false").lower() == "true"
+    count_cache_ttl_seconds: float = float(
+        os.getenv("COMPINTEL_COUNT_CACHE_TTL_SECONDS", "30")
+    )
     requests_pathname_prefix: Optional[str] = os.getenv(
         "COMPINTEL_REQUESTS_PATHNAME_PREFIX"
     )
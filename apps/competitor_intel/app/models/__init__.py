@@ -5,6 +5,7 @@ from .carton_spec import CartonSpec
 from .company import Company
 from .location import Location
 from .location_sku import LocationSKU
+from .observation_cluster import ObservationCluster
 from .pack_spec import PackSpec
 from .package_spec import PackageSpec
 from .price_observation import PriceObservation
@@ -29,5 +30,6 @@ __all__ = [
     "Location",
     "LocationSKU",
     "PriceObservation",
+    "ObservationCluster",
     "Attachment",
 ]
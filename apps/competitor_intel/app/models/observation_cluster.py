@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class ObservationCluster(Base):
+    """Live price observations sharing a ``hash_key``, kept only for duplicates."""
+
+    __tablename__ = "observation_clusters"
+
+    hash_key: Mapped[str] = mapped_column(sa.String(128), primary_key=True)
+    observation_count: Mapped[int] = mapped_column(sa.Integer, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        sa.DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+    )
+
+    __table_args__ = (
+        sa.Index("ix_observation_clusters_observation_count", "observation_count"),
+    )
+
+
+__all__ = ["ObservationCluster"]
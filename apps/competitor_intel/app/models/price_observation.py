@@ -127,7 +127,20 @@ class PriceObservation(UUIDStringMixin, TimestampMixin, Base):
             "ix_price_observations_channel_observation_dt", "channel", "observation_dt"
         ),
         sa.Index("ix_price_observations_observation_dt", "observation_dt"),
-        sa.Index("ix_price_observations_hash_key", "hash_key"),
+        sa.Index("ix_price_observations_hash_key_deleted_at", "hash_key", "deleted_at"),
+        # Covers keyset paging and filtered counts over live observations.
+        sa.Index(
+            "ix_price_observations_live_feed",
+            "observation_dt",
+            "id",
+            "channel",
+            "sku_id",
+            "company_id",
+            "location_id",
+            "deleted_at",
+            sqlite_where=sa.text("deleted_at IS NULL"),
+            postgresql_where=sa.text("deleted_at IS NULL"),
+        ),
         sa.CheckConstraint(
             "channel IN ('distributor_to_retailer','wholesale_to_venue','retail_instore','retail_online','direct_to_consumer')",
             name="ck_price_observations_channel",
@@ -10,6 +10,8 @@ from .dedupe import (
     apply_hash_to_observation,
     compute_observation_hash,
     find_duplicate_groups,
+    refresh_clusters,
+    rehash_observations,
 )
 from .ingest_csv import ImportReport, ObservationImporter, RowError, SKUImporter
 from .location_inventory import (
@@ -22,6 +24,7 @@ from .location_inventory import (
 from .normalize import NormalizedPrices, normalize_gst_prices, normalize_price
 from .reports import (
     ObservationFilters,
+    count_observations,
     fetch_observations,
     get_duplicate_overview,
     get_filtered_counts,
@@ -32,6 +35,8 @@ from .reports import (
     get_price_outliers,
     get_price_time_series,
     get_recent_observations,
+    invalidate_observation_counts,
+    iter_observations,
 )
 
 __all__ = [
@@ -40,6 +45,8 @@ __all__ = [
     "compute_observation_hash",
     "find_duplicate_groups",
     "apply_hash_to_observation",
+    "refresh_clusters",
+    "rehash_observations",
     "SKUImporter",
     "ObservationImporter",
     "ImportReport",
@@ -58,7 +65,10 @@ __all__ = [
     "ensure_location_sku",
     "fetch_location_inventory",
     "ObservationFilters",
+    "count_observations",
     "fetch_observations",
+    "iter_observations",
+    "invalidate_observation_counts",
     "get_duplicate_overview",
     "get_filtered_counts",
     "get_kpis",
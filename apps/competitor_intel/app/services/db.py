@@ -28,9 +28,28 @@ def _create_engine() -> Engine:
             cursor.execute("PRAGMA foreign_keys=ON")
             cursor.close()
 
+        enable_sqlite_savepoints(engine)
+
     return engine
 
 
+def enable_sqlite_savepoints(engine: Engine) -> None:
+    """Let SQLAlchemy emit BEGIN itself so SAVEPOINTs work under pysqlite.
+
+    pysqlite defers BEGIN until the first DML statement, so a savepoint taken
+    before it is not inside the transaction and rolling it back can discard
+    or keep the wrong work. This is SQLAlchemy's documented workaround.
+    """
+
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_begin(dbapi_connection, connection_record):  # type: ignore[unused-variable]
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _emit_begin(conn):  # type: ignore[unused-variable]
+        conn.exec_driver_sql("BEGIN")
+
+
 ENGINE = _create_engine()
 SessionFactory = sessionmaker(
     bind=ENGINE, autoflush=False, autocommit=False, expire_on_commit=False, future=True
@@ -1,15 +1,39 @@
 from __future__ import annotations
 
+import logging
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timezone
 from decimal import Decimal
 from hashlib import sha1
-from typing import Optional
+from itertools import chain, islice
+from typing import Iterable, Optional, Sequence
 
-from sqlalchemy import func, select
+from sqlalchemy import delete, event, func, insert, inspect, select, update
+from sqlalchemy.engine import Connection
 from sqlalchemy.orm import Session
 
-from ..models import PriceObservation
+from ..models import ObservationCluster, PriceObservation
+
+logger = logging.getLogger(__name__)
+
+# Hash keys per IN clause when refreshing clusters.
+_KEY_BATCH = 500
+
+# Columns fed to compute_observation_hash, in its keyword order.
+_HASH_COLUMNS = (
+    PriceObservation.sku_id,
+    PriceObservation.company_id,
+    PriceObservation.location_id,
+    PriceObservation.observation_dt,
+    PriceObservation.channel,
+    PriceObservation.price_inc_gst_norm,
+    PriceObservation.is_carton_price,
+    PriceObservation.carton_units,
+    PriceObservation.price_context,
+)
 
 
 @dataclass(frozen=True)
@@ -49,28 +73,176 @@ def compute_observation_hash(
 def find_duplicate_groups(
     session: Session, limit: Optional[int] = None
 ) -> list[DuplicateGroup]:
-    stmt = (
-        select(
-            PriceObservation.hash_key,
-            func.count().label("dup_count"),
-            func.group_concat(PriceObservation.id, ",").label("id_concat"),
-        )
-        .where(PriceObservation.deleted_at.is_(None))
-        .group_by(PriceObservation.hash_key)
-        .having(func.count() > 1)
-        .order_by(func.count().desc())
-    )
+    """Read duplicate clusters maintained by :func:`refresh_clusters`."""
+    stmt = select(
+        ObservationCluster.hash_key, ObservationCluster.observation_count
+    ).order_by(ObservationCluster.observation_count.desc(), ObservationCluster.hash_key)
     if limit:
         stmt = stmt.limit(limit)
+    clusters = session.execute(stmt).all()
+    if not clusters:
+        return []
 
-    results = session.execute(stmt).all()
-    groups: list[DuplicateGroup] = []
-    for hash_key, count, id_concat in results:
-        id_list = id_concat.split(",") if id_concat else []
-        groups.append(
-            DuplicateGroup(hash_key=hash_key, observation_ids=id_list, count=count)
+    id_lists: dict[str, list[str]] = defaultdict(list)
+    rows = session.execute(
+        select(PriceObservation.hash_key, PriceObservation.id)
+        .where(
+            PriceObservation.hash_key.in_([hash_key for hash_key, _ in clusters]),
+            PriceObservation.deleted_at.is_(None),
         )
-    return groups
+        .order_by(PriceObservation.observation_dt, PriceObservation.id)
+    )
+    for hash_key, observation_id in rows:
+        id_lists[hash_key].append(observation_id)
+
+    return [
+        DuplicateGroup(
+            hash_key=hash_key, observation_ids=id_lists[hash_key], count=count
+        )
+        for hash_key, count in clusters
+    ]
+
+
+def refresh_clusters(connection: Connection, hash_keys: Iterable[str]) -> None:
+    """Recount live observations for ``hash_keys`` and store those with duplicates.
+
+    Runs at Core level so it is safe inside flush events; callers doing bulk
+    inserts or updates that bypass the ORM must call it themselves.
+    """
+    keys = iter(sorted({key for key in hash_keys if key}))
+    table = ObservationCluster.__table__
+    while batch := list(islice(keys, _KEY_BATCH)):
+        counts = connection.execute(
+            select(PriceObservation.hash_key, func.count())
+            .where(
+                PriceObservation.hash_key.in_(batch),
+                PriceObservation.deleted_at.is_(None),
+            )
+            .group_by(PriceObservation.hash_key)
+            .having(func.count() > 1)
+        ).all()
+        connection.execute(delete(table).where(table.c.hash_key.in_(batch)))
+        if counts:
+            now = datetime.now(timezone.utc)
+            connection.execute(
+                insert(table),
+                [
+                    {"hash_key": key, "observation_count": count, "updated_at": now}
+                    for key, count in counts
+                ],
+            )
+
+
+@event.listens_for(Session, "after_flush")
+def _refresh_flushed_clusters(session: Session, flush_context) -> None:
+    keys: set[str] = set()
+    for obj in chain(session.new, session.deleted):
+        if isinstance(obj, PriceObservation):
+            keys.add(obj.hash_key)
+    for obj in session.dirty:
+        if not isinstance(obj, PriceObservation):
+            continue
+        attrs = inspect(obj).attrs
+        hash_history = attrs.hash_key.history
+        if hash_history.has_changes() or attrs.deleted_at.history.has_changes():
+            keys.add(obj.hash_key)
+            keys.update(hash_history.deleted or ())
+    if keys:
+        refresh_clusters(session.connection(), keys)
+
+
+def _hash_rows(rows: Sequence[tuple]) -> list[str]:
+    return [
+        compute_observation_hash(
+            sku_id=sku_id,
+            company_id=company_id,
+            location_id=location_id,
+            observation_dt=observation_dt,
+            channel=channel,
+            price_inc_gst_norm=price_inc_gst_norm,
+            is_carton_price=is_carton_price,
+            carton_units=carton_units,
+            price_context=price_context,
+        )
+        for (
+            sku_id,
+            company_id,
+            location_id,
+            observation_dt,
+            channel,
+            price_inc_gst_norm,
+            is_carton_price,
+            carton_units,
+            price_context,
+        ) in rows
+    ]
+
+
+def _hash_batch(
+    rows: list[tuple], executor: Optional[ProcessPoolExecutor], workers: int
+) -> list[str]:
+    if executor is None:
+        return _hash_rows(rows)
+    size = max(1, -(-len(rows) // workers))
+    parts = [rows[start : start + size] for start in range(0, len(rows), size)]
+    return list(chain.from_iterable(executor.map(_hash_rows, parts)))
+
+
+def rehash_observations(
+    session: Session, *, batch_size: int = 5000, workers: int = 0
+) -> int:
+    """Recompute every observation's ``hash_key`` after the hashing rules change.
+
+    Observations are walked in primary-key order and hashed in a process pool
+    when ``workers > 0``. Only rows whose key changed are written, and only the
+    clusters those keys belong to are refreshed. Returns the rows updated.
+    """
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+    updated = 0
+    last_id: Optional[str] = None
+    try:
+        while True:
+            stmt = (
+                select(PriceObservation.id, PriceObservation.hash_key, *_HASH_COLUMNS)
+                .order_by(PriceObservation.id)
+                .limit(batch_size)
+            )
+            if last_id is not None:
+                stmt = stmt.where(PriceObservation.id > last_id)
+            rows = session.execute(stmt).all()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+
+            inputs = [tuple(row[2:]) for row in rows]
+            try:
+                hashes = _hash_batch(inputs, executor, workers)
+            except (BrokenProcessPool, OSError) as e:
+                logger.warning("Hash process pool failed, hashing in-process: %s", e)
+                executor.shutdown(cancel_futures=True)
+                executor = None
+                hashes = _hash_rows(inputs)
+
+            changes = [
+                (row[0], row[1], new_key)
+                for row, new_key in zip(rows, hashes)
+                if row[1] != new_key
+            ]
+            if not changes:
+                continue
+            session.execute(
+                update(PriceObservation),
+                [{"id": obs_id, "hash_key": new_key} for obs_id, _, new_key in changes],
+            )
+            refresh_clusters(
+                session.connection(),
+                chain.from_iterable((old, new) for _, old, new in changes),
+            )
+            updated += len(changes)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return updated
 
 
 def apply_hash_to_observation(observation: PriceObservation) -> None:
@@ -4,11 +4,12 @@ import csv
 from dataclasses import dataclass, field
 from datetime import date, datetime, timezone
 from decimal import Decimal, InvalidOperation
+from itertools import islice
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.orm import Session, selectinload
 
 from ..models import (
     SKU,
@@ -16,6 +17,7 @@ from ..models import (
     CartonSpec,
     Company,
     Location,
+    LocationSKU,
     PackageSpec,
     PackSpec,
     PriceObservation,
@@ -23,10 +25,29 @@ from ..models import (
     SKUCarton,
     SKUPack,
 )
+from ..models.base import generate_uuid
+from ..models.price_observation import (
+    AVAILABILITY,
+    CHANNELS,
+    PRICE_CONTEXTS,
+    SOURCE_TYPES,
+)
 from . import normalize
 from .costs import create_purchase_price
-from .dedupe import apply_hash_to_observation
-from .location_inventory import ensure_location_sku
+from .dedupe import compute_observation_hash, refresh_clusters
+from .reports import invalidate_observation_counts
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# Relationships read while normalising prices and reconciling pack/carton
+# links, loaded with the SKU so per-row work never goes back to the database.
+_SKU_LOAD_OPTIONS = (
+    selectinload(SKU.product),
+    selectinload(SKU.package_spec),
+    selectinload(SKU.pack_assignment).selectinload(SKUPack.pack_spec),
+    selectinload(SKU.carton_links),
+    selectinload(SKU.purchase_prices),
+)
 
 
 @dataclass(slots=True)
@@ -54,6 +75,201 @@ class ImportReport:
         }
 
 
+def _chunks(reader: Iterable[dict], size: int) -> Iterator[list[tuple[int, dict]]]:
+    """Yield ``(row_number, row)`` lists of at most ``size`` rows; header is row 1."""
+    numbered = enumerate(reader, start=2)
+    while chunk := list(islice(numbered, size)):
+        yield chunk
+
+
+def _package_key(
+    package_type: str, container_ml: int, can_form_factor: Optional[str]
+) -> tuple[str, int, Optional[str]]:
+    return package_type, container_ml, can_form_factor
+
+
+def _location_key(
+    company_id: str, state: str, suburb: str, store_name: Optional[str]
+) -> tuple[str, str, str, Optional[str]]:
+    return company_id, state, suburb, store_name
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # SQLite hands back naive datetimes for timezone-aware columns.
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class _Lookups:
+    """Natural-key caches for the entities an import row refers to.
+
+    ``load_*`` methods fetch every key not seen before with a single ``IN``
+    query, so priming with a whole chunk of rows costs a handful of queries
+    rather than several per row. Keys that were looked up and not found are
+    remembered as well, and importers register the entities they create.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+        self.clear()
+
+    def clear(self) -> None:
+        self.brands: dict[str, Brand] = {}
+        self.products: dict[tuple[str, str], Product] = {}
+        self.package_specs: Optional[dict[tuple, PackageSpec]] = None
+        self.skus_by_gtin: dict[str, SKU] = {}
+        self.skus: dict[tuple[str, str], SKU] = {}
+        self.companies: dict[str, Company] = {}
+        self.locations: dict[tuple, Location] = {}
+        self._brand_names: set[str] = set()
+        self._gtins: set[str] = set()
+        self._company_names: set[str] = set()
+        self._product_brands: set[str] = set()
+        self._sku_products: set[str] = set()
+        self._location_companies: set[str] = set()
+
+    def prime(self, rows: Iterable[dict]) -> None:
+        rows = list(rows)
+        self.load_skus_by_gtin(
+            (row.get("gtin") or "").strip() for row in rows if row.get("gtin")
+        )
+        self.load_brands((row.get("brand") or "").strip() for row in rows)
+        brand_ids = [brand.id for brand in self.brands.values()]
+        self.load_products(brand_ids)
+        self.load_skus_for_products(product.id for product in self.products.values())
+        self.load_companies((row.get("company") or "").strip() for row in rows)
+        self.load_locations(company.id for company in self.companies.values())
+
+    def load_brands(self, names: Iterable[str]) -> None:
+        missing = set(names) - self._brand_names
+        if missing:
+            for brand in self.session.scalars(
+                select(Brand).where(Brand.name.in_(missing))
+            ):
+                self.brands[brand.name] = brand
+            self._brand_names |= missing
+
+    def load_companies(self, names: Iterable[str]) -> None:
+        missing = set(names) - self._company_names
+        if missing:
+            for company in self.session.scalars(
+                select(Company).where(Company.name.in_(missing))
+            ):
+                self.companies[company.name] = company
+            self._company_names |= missing
+
+    def load_products(self, brand_ids: Iterable[str]) -> None:
+        missing = set(brand_ids) - self._product_brands
+        if missing:
+            for product in self.session.scalars(
+                select(Product).where(Product.brand_id.in_(missing))
+            ):
+                self.products[(product.brand_id, product.name)] = product
+            self._product_brands |= missing
+
+    def load_skus_by_gtin(self, gtins: Iterable[str]) -> None:
+        missing = set(gtins) - self._gtins
+        if missing:
+            self._add_skus(
+                self.session.scalars(
+                    select(SKU).where(SKU.gtin.in_(missing)).options(*_SKU_LOAD_OPTIONS)
+                )
+            )
+            self._gtins |= missing
+
+    def load_skus_for_products(self, product_ids: Iterable[str]) -> None:
+        missing = set(product_ids) - self._sku_products
+        if missing:
+            self._add_skus(
+                self.session.scalars(
+                    select(SKU)
+                    .where(SKU.product_id.in_(missing))
+                    .options(*_SKU_LOAD_OPTIONS)
+                )
+            )
+            self._sku_products |= missing
+
+    def load_locations(self, company_ids: Iterable[str]) -> None:
+        missing = set(company_ids) - self._location_companies
+        if missing:
+            for location in self.session.scalars(
+                select(Location).where(Location.company_id.in_(missing))
+            ):
+                self.add_location(location)
+            self._location_companies |= missing
+
+    def brand(self, name: str) -> Optional[Brand]:
+        self.load_brands([name])
+        return self.brands.get(name)
+
+    def company(self, name: str) -> Optional[Company]:
+        self.load_companies([name])
+        return self.companies.get(name)
+
+    def product(self, brand: Brand, name: str) -> Optional[Product]:
+        self.load_products([brand.id])
+        return self.products.get((brand.id, name))
+
+    def package_spec(
+        self, package_type: str, container_ml: int, can_form_factor: Optional[str]
+    ) -> Optional[PackageSpec]:
+        if self.package_specs is None:
+            self.package_specs = {}
+            for spec in self.session.scalars(select(PackageSpec)):
+                self.add_package_spec(spec)
+        return self.package_specs.get(
+            _package_key(package_type, container_ml, can_form_factor)
+        )
+
+    def sku_by_gtin(self, gtin: str) -> Optional[SKU]:
+        self.load_skus_by_gtin([gtin])
+        return self.skus_by_gtin.get(gtin)
+
+    def sku(self, product: Product, package_spec: PackageSpec) -> Optional[SKU]:
+        self.load_skus_for_products([product.id])
+        return self.skus.get((product.id, package_spec.id))
+
+    def location(
+        self,
+        company: Company,
+        state: str,
+        suburb: str,
+        store_name: Optional[str],
+    ) -> Optional[Location]:
+        self.load_locations([company.id])
+        return self.locations.get(_location_key(company.id, state, suburb, store_name))
+
+    def add_brand(self, brand: Brand) -> None:
+        self.brands[brand.name] = brand
+
+    def add_company(self, company: Company) -> None:
+        self.companies[company.name] = company
+
+    def add_product(self, product: Product) -> None:
+        self.products[(product.brand_id, product.name)] = product
+
+    def add_package_spec(self, spec: PackageSpec) -> None:
+        if self.package_specs is not None:
+            key = _package_key(spec.type, spec.container_ml, spec.can_form_factor)
+            self.package_specs[key] = spec
+
+    def add_location(self, location: Location) -> None:
+        key = _location_key(
+            location.company_id, location.state, location.suburb, location.store_name
+        )
+        self.locations[key] = location
+
+    def add_sku(self, sku: SKU) -> None:
+        self._add_skus([sku])
+
+    def _add_skus(self, skus: Iterable[SKU]) -> None:
+        for sku in skus:
+            self.skus[(sku.product_id, sku.package_spec_id)] = sku
+            if sku.gtin:
+                self.skus_by_gtin[sku.gtin] = sku
+
+
 class SKUImporter:
     REQUIRED_COLUMNS = {
         "brand",
@@ -65,9 +281,17 @@ class SKUImporter:
         "is_active",
     }
 
-    def __init__(self, session: Session, *, allow_create: bool = False):
+    def __init__(
+        self,
+        session: Session,
+        *,
+        allow_create: bool = False,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
         self.session = session
         self.allow_create = allow_create
+        self.chunk_size = chunk_size
+        self.lookups = _Lookups(session)
 
     def run(self, csv_path: Path) -> ImportReport:
         report = ImportReport()
@@ -79,20 +303,27 @@ class SKUImporter:
                     f"Missing required columns: {', '.join(sorted(missing))}"
                 )
 
-            for idx, row in enumerate(reader, start=2):  # header is row 1
-                try:
-                    created = self._process_row(row)
-                    self.session.flush()
-                except Exception as exc:  # noqa: BLE001
-                    report.add_error(idx, str(exc))
-                    self.session.rollback()
-                else:
-                    if created:
-                        report.inserted += 1
-                    else:
-                        report.updated += 1
+            for chunk in _chunks(reader, self.chunk_size):
+                self.lookups.prime(row for _, row in chunk)
+                for idx, row in chunk:
+                    self._import_row(idx, row, report)
         return report
 
+    def _import_row(self, idx: int, row: dict, report: ImportReport) -> None:
+        # A savepoint per row keeps earlier rows when one fails.
+        try:
+            with self.session.begin_nested():
+                created = self._process_row(row)
+        except Exception as exc:  # noqa: BLE001
+            report.add_error(idx, str(exc))
+            # Entities created by the failed row were discarded with it.
+            self.lookups.clear()
+        else:
+            if created:
+                report.inserted += 1
+            else:
+                report.updated += 1
+
     def _process_row(self, row: dict) -> bool:
         brand = self._get_or_create_brand(row["brand"].strip())
         product = self._get_or_create_product(brand, row)
@@ -106,11 +337,13 @@ class SKUImporter:
                 is_active=self._parse_bool(row.get("is_active")),
             )
             self.session.add(sku)
+            self.session.flush([sku])
             created = True
         else:
             sku.gtin = row.get("gtin") or sku.gtin
             sku.is_active = self._parse_bool(row.get("is_active"))
             created = False
+        self.lookups.add_sku(sku)
         if row.get("can_form_factor") and package_spec.can_form_factor is None:
             package_spec.can_form_factor = row["can_form_factor"].strip()
         pack_spec = self._handle_pack_configuration(sku, package_spec, row)
@@ -119,22 +352,19 @@ class SKUImporter:
         return created
 
     def _get_or_create_brand(self, name: str) -> Brand:
-        brand = self.session.execute(
-            select(Brand).where(Brand.name == name)
-        ).scalar_one_or_none()
+        brand = self.lookups.brand(name)
         if brand is None:
             if not self.allow_create:
                 raise ValueError(f"Brand '{name}' does not exist")
             brand = Brand(name=name)
             self.session.add(brand)
             self.session.flush([brand])
+            self.lookups.add_brand(brand)
         return brand
 
     def _get_or_create_product(self, brand: Brand, row: dict) -> Product:
         name = row["product_name"].strip()
-        product = self.session.execute(
-            select(Product).where(Product.brand == brand, Product.name == name)
-        ).scalar_one_or_none()
+        product = self.lookups.product(brand, name)
         if product is None:
             if not self.allow_create:
                 raise ValueError(f"Product '{name}' missing for brand '{brand.name}'")
@@ -146,6 +376,7 @@ class SKUImporter:
             )
             self.session.add(product)
             self.session.flush([product])
+            self.lookups.add_product(product)
         else:
             abv_value = row.get("abv_percent")
             if abv_value:
@@ -158,16 +389,7 @@ class SKUImporter:
         can_form_factor = (
             (row.get("can_form_factor") or None) if package_type == "can" else None
         )
-
-        query = select(PackageSpec).where(
-            PackageSpec.type == package_type,
-            PackageSpec.container_ml == container_ml,
-        )
-        if can_form_factor is None:
-            query = query.where(PackageSpec.can_form_factor.is_(None))
-        else:
-            query = query.where(PackageSpec.can_form_factor == can_form_factor)
-        spec = self.session.execute(query).scalar_one_or_none()
+        spec = self.lookups.package_spec(package_type, container_ml, can_form_factor)
         if spec is None:
             if not self.allow_create:
                 raise ValueError(
@@ -180,6 +402,7 @@ class SKUImporter:
             )
             self.session.add(spec)
             self.session.flush([spec])
+            self.lookups.add_package_spec(spec)
         return spec
 
     def _find_sku(
@@ -190,14 +413,10 @@ class SKUImporter:
     ) -> Optional[SKU]:
         gtin = (row.get("gtin") or "").strip()
         if gtin:
-            existing = self.session.execute(
-                select(SKU).where(SKU.gtin == gtin)
-            ).scalar_one_or_none()
+            existing = self.lookups.sku_by_gtin(gtin)
             if existing:
                 return existing
-        return self.session.execute(
-            select(SKU).where(SKU.product == product, SKU.package_spec == package_spec)
-        ).scalar_one_or_none()
+        return self.lookups.sku(product, package_spec)
 
     def _handle_pack_configuration(
         self, sku: SKU, package_spec: PackageSpec, row: dict
@@ -461,9 +680,17 @@ class ObservationImporter:
         "source_type",
     }
 
-    def __init__(self, session: Session, *, allow_create: bool = False):
+    def __init__(
+        self,
+        session: Session,
+        *,
+        allow_create: bool = False,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
         self.session = session
         self.allow_create = allow_create
+        self.chunk_size = chunk_size
+        self.lookups = _Lookups(session)
 
     def run(self, csv_path: Path) -> ImportReport:
         report = ImportReport()
@@ -475,20 +702,142 @@ class ObservationImporter:
                     f"Missing required columns: {', '.join(sorted(missing))}"
                 )
 
-            for idx, row in enumerate(reader, start=2):
-                try:
-                    duplicate = self._process_row(row)
-                except Exception as exc:  # noqa: BLE001
-                    report.add_error(idx, str(exc))
-                    self.session.rollback()
-                else:
-                    if duplicate:
-                        report.duplicates += 1
-                    else:
-                        report.inserted += 1
+            seen_hashes: set[str] = set()
+            for chunk in _chunks(reader, self.chunk_size):
+                self.lookups.prime(row for _, row in chunk)
+                pending: list[tuple[int, dict]] = []
+                for idx, row in chunk:
+                    values = self._build_row(idx, row, report)
+                    if values is not None:
+                        pending.append((idx, values))
+                self._insert_chunk(pending, seen_hashes, report)
         return report
 
-    def _process_row(self, row: dict) -> bool:
+    def _build_row(self, idx: int, row: dict, report: ImportReport) -> Optional[dict]:
+        # Brands, companies and locations created for a row live in its
+        # savepoint, so a bad row leaves the rest of the chunk untouched.
+        try:
+            with self.session.begin_nested():
+                return self._process_row(row)
+        except Exception as exc:  # noqa: BLE001
+            report.add_error(idx, str(exc))
+            self.lookups.clear()
+            return None
+
+    def _insert_chunk(
+        self,
+        pending: list[tuple[int, dict]],
+        seen_hashes: set[str],
+        report: ImportReport,
+    ) -> None:
+        hashes = {values["hash_key"] for _, values in pending} - seen_hashes
+        if hashes:
+            seen_hashes.update(
+                self.session.scalars(
+                    select(PriceObservation.hash_key).where(
+                        PriceObservation.hash_key.in_(hashes)
+                    )
+                )
+            )
+
+        candidates: list[tuple[int, dict]] = []
+        for idx, values in pending:
+            if values["hash_key"] in seen_hashes:
+                report.duplicates += 1
+                continue
+            seen_hashes.add(values["hash_key"])
+            candidates.append((idx, values))
+        if not candidates:
+            return
+
+        observations = self._insert_observations(candidates, seen_hashes, report)
+        if not observations:
+            return
+        report.inserted += len(observations)
+        # Bulk inserts skip the ORM events that keep the count cache and the
+        # duplicate clusters up to date.
+        invalidate_observation_counts()
+        refresh_clusters(
+            self.session.connection(), (values["hash_key"] for values in observations)
+        )
+        self._upsert_location_skus(observations)
+
+    def _insert_observations(
+        self,
+        candidates: list[tuple[int, dict]],
+        seen_hashes: set[str],
+        report: ImportReport,
+    ) -> list[dict]:
+        """Bulk insert the chunk; if the database rejects it, retry row by row.
+
+        The retry runs each row in its own savepoint so a rejected row is
+        reported against its CSV line and the rest of the chunk is kept.
+        """
+        observations = [values for _, values in candidates]
+        try:
+            with self.session.begin_nested():
+                self.session.execute(insert(PriceObservation), observations)
+            return observations
+        except Exception:  # noqa: BLE001
+            pass
+
+        inserted: list[dict] = []
+        for idx, values in candidates:
+            try:
+                with self.session.begin_nested():
+                    self.session.execute(insert(PriceObservation), [values])
+            except Exception as exc:  # noqa: BLE001
+                report.add_error(idx, str(getattr(exc, "orig", exc)))
+                seen_hashes.discard(values["hash_key"])
+            else:
+                inserted.append(values)
+        return inserted
+
+    def _upsert_location_skus(self, observations: list[dict]) -> None:
+        spans: dict[tuple[str, str], tuple[datetime, datetime]] = {}
+        for values in observations:
+            if values["location_id"] is None:
+                continue
+            key = (values["location_id"], values["sku_id"])
+            observed = values["observation_dt"]
+            first, last = spans.get(key, (observed, observed))
+            spans[key] = (min(first, observed), max(last, observed))
+        if not spans:
+            return
+
+        existing = self.session.scalars(
+            select(LocationSKU).where(
+                tuple_(LocationSKU.location_id, LocationSKU.sku_id).in_(list(spans)),
+                LocationSKU.deleted_at.is_(None),
+            )
+        )
+        for link in existing:
+            first, last = spans.pop((link.location_id, link.sku_id))
+            link_first = _as_utc(link.first_observed_dt)
+            link_last = _as_utc(link.last_observed_dt)
+            if link_first is None or first < link_first:
+                link.first_observed_dt = first
+            if link_last is None or last > link_last:
+                link.last_observed_dt = last
+
+        if spans:
+            self.session.execute(
+                insert(LocationSKU),
+                [
+                    {
+                        "id": generate_uuid(),
+                        "location_id": location_id,
+                        "sku_id": sku_id,
+                        "is_manual": False,
+                        "first_observed_dt": first,
+                        "last_observed_dt": last,
+                    }
+                    for (location_id, sku_id), (first, last) in spans.items()
+                ],
+            )
+        self.session.flush()
+
+    def _process_row(self, row: dict) -> dict:
         sku = self._resolve_sku(row)
         company = self._get_or_create_company(row["company"].strip())
         location = self._get_or_create_location(company, row)
@@ -517,75 +866,75 @@ class ObservationImporter:
         )
 
         observation_dt = self._parse_datetime(row.get("observation_dt"))
-
-        observation = PriceObservation(
-            sku=sku,
-            company=company,
-            location=location,
-            channel=row["channel"].strip(),
-            price_context=row["price_context"].strip(),
-            promo_name=row.get("promo_name") or None,
-            availability=row.get("availability", "unknown").strip(),
-            price_ex_gst_raw=price_ex,
-            price_inc_gst_raw=price_inc,
-            gst_rate=gst_rate,
-            currency=row.get("currency", "AUD").strip() or "AUD",
-            is_carton_price=is_carton_price,
-            carton_units=carton_units,
-            price_ex_gst_norm=normalized.price_ex_gst,
-            price_inc_gst_norm=normalized.price_inc_gst,
-            unit_price_inc_gst=normalized.unit_price_inc_gst,
-            carton_price_inc_gst=normalized.carton_price_inc_gst,
-            price_per_litre=normalized.price_per_litre,
-            price_per_unit_pure_alcohol=normalized.price_per_unit_pure_alcohol,
-            standard_drinks=normalized.standard_drinks,
-            price_basis=normalized.price_basis,
-            gp_unit_abs=normalized.gp_unit_abs,
-            gp_unit_pct=normalized.gp_unit_pct,
-            gp_pack_abs=normalized.gp_pack_abs,
-            gp_pack_pct=normalized.gp_pack_pct,
-            gp_carton_abs=normalized.gp_carton_abs,
-            gp_carton_pct=normalized.gp_carton_pct,
-            pack_price_inc_gst=normalized.pack_price_inc_gst,
-            observation_dt=observation_dt,
-            source_type=row["source_type"].strip(),
-            source_url=row.get("source_url") or None,
-            source_note=row.get("source_note") or None,
+        channel = self._parse_choice(row["channel"], CHANNELS, "channel")
+        price_context = self._parse_choice(
+            row["price_context"], PRICE_CONTEXTS, "price_context"
         )
-        apply_hash_to_observation(observation)
+        location_id = location.id if location is not None else None
 
-        existing = self.session.execute(
-            select(PriceObservation.id).where(
-                PriceObservation.hash_key == observation.hash_key
-            )
-        ).first()
-        if existing:
-            return True
-
-        self.session.add(observation)
-        if location is not None:
-            ensure_location_sku(
-                self.session,
-                location_id=location.id,
+        # Rows are bulk inserted per chunk, so check constraints are enforced
+        # here where a violation can still be reported against its own row.
+        return {
+            "id": generate_uuid(),
+            "sku_id": sku.id,
+            "company_id": company.id,
+            "location_id": location_id,
+            "channel": channel,
+            "price_context": price_context,
+            "promo_name": row.get("promo_name") or None,
+            "availability": self._parse_choice(
+                row.get("availability") or "unknown", AVAILABILITY, "availability"
+            ),
+            "price_ex_gst_raw": price_ex,
+            "price_inc_gst_raw": price_inc,
+            "gst_rate": gst_rate,
+            "currency": (row.get("currency") or "AUD").strip() or "AUD",
+            "is_carton_price": is_carton_price,
+            "carton_units": carton_units,
+            "price_ex_gst_norm": normalized.price_ex_gst,
+            "price_inc_gst_norm": normalized.price_inc_gst,
+            "unit_price_inc_gst": normalized.unit_price_inc_gst,
+            "carton_price_inc_gst": normalized.carton_price_inc_gst,
+            "price_per_litre": normalized.price_per_litre,
+            "price_per_unit_pure_alcohol": normalized.price_per_unit_pure_alcohol,
+            "standard_drinks": normalized.standard_drinks,
+            "price_basis": normalized.price_basis,
+            "gp_unit_abs": normalized.gp_unit_abs,
+            "gp_unit_pct": normalized.gp_unit_pct,
+            "gp_pack_abs": normalized.gp_pack_abs,
+            "gp_pack_pct": normalized.gp_pack_pct,
+            "gp_carton_abs": normalized.gp_carton_abs,
+            "gp_carton_pct": normalized.gp_carton_pct,
+            "pack_price_inc_gst": normalized.pack_price_inc_gst,
+            "observation_dt": observation_dt,
+            "source_type": self._parse_choice(
+                row["source_type"], SOURCE_TYPES, "source_type"
+            ),
+            "source_url": row.get("source_url") or None,
+            "source_note": row.get("source_note") or None,
+            "hash_key": compute_observation_hash(
                 sku_id=sku.id,
-                observation_dt=observation.observation_dt,
-            )
-        return False
+                company_id=company.id,
+                location_id=location_id,
+                observation_dt=observation_dt,
+                channel=channel,
+                price_inc_gst_norm=normalized.price_inc_gst,
+                is_carton_price=is_carton_price,
+                carton_units=carton_units,
+                price_context=price_context,
+            ),
+        }
 
     def _resolve_sku(self, row: dict) -> SKU:
         gtin = (row.get("gtin") or "").strip()
         if gtin:
-            sku = self.session.execute(
-                select(SKU).where(SKU.gtin == gtin)
-            ).scalar_one_or_none()
+            sku = self.lookups.sku_by_gtin(gtin)
             if sku:
                 return sku
         brand = self._get_or_create_brand(row["brand"].strip())
         product = self._get_or_create_product(brand, row)
         package_spec = self._get_package_spec(row)
-        sku = self.session.execute(
-            select(SKU).where(SKU.product == product, SKU.package_spec == package_spec)
-        ).scalar_one_or_none()
+        sku = self.lookups.sku(product, package_spec)
         if sku is None:
             raise ValueError(
                 "SKU not found for row; provide GTIN or matching product/package"
@@ -593,22 +942,19 @@ class ObservationImporter:
         return sku
 
     def _get_or_create_brand(self, name: str) -> Brand:
-        brand = self.session.execute(
-            select(Brand).where(Brand.name == name)
-        ).scalar_one_or_none()
+        brand = self.lookups.brand(name)
         if brand is None:
             if not self.allow_create:
                 raise ValueError(f"Brand '{name}' does not exist")
             brand = Brand(name=name)
             self.session.add(brand)
             self.session.flush([brand])
+            self.lookups.add_brand(brand)
         return brand
 
     def _get_or_create_product(self, brand: Brand, row: dict) -> Product:
         product_name = row["product_name"].strip()
-        product = self.session.execute(
-            select(Product).where(Product.brand == brand, Product.name == product_name)
-        ).scalar_one_or_none()
+        product = self.lookups.product(brand, product_name)
         if product is None:
             if not self.allow_create:
                 raise ValueError(
@@ -628,23 +974,19 @@ class ObservationImporter:
             )
             self.session.add(product)
             self.session.flush([product])
+            self.lookups.add_product(product)
         return product
 
     def _get_package_spec(self, row: dict) -> PackageSpec:
         package_type = row["package_type"].strip()
         container_ml = int(row["container_ml"].strip())
         can_form_factor = row.get("can_form_factor") or None
-        query = select(PackageSpec).where(
-            PackageSpec.type == package_type,
-            PackageSpec.container_ml == container_ml,
-        )
         if package_type == "can":
             if can_form_factor is None:
                 raise ValueError("Can entries must include can_form_factor")
-            query = query.where(PackageSpec.can_form_factor == can_form_factor)
         else:
-            query = query.where(PackageSpec.can_form_factor.is_(None))
-        spec = self.session.execute(query).scalar_one_or_none()
+            can_form_factor = None
+        spec = self.lookups.package_spec(package_type, container_ml, can_form_factor)
         if spec is None:
             raise ValueError(
                 "Package spec not found; import SKUs first or enable creation"
@@ -652,15 +994,14 @@ class ObservationImporter:
         return spec
 
     def _get_or_create_company(self, name: str) -> Company:
-        company = self.session.execute(
-            select(Company).where(Company.name == name)
-        ).scalar_one_or_none()
+        company = self.lookups.company(name)
         if company is None:
             if not self.allow_create:
                 raise ValueError(f"Company '{name}' not found")
             company = Company(name=name, type="retailer")
             self.session.add(company)
             self.session.flush([company])
+            self.lookups.add_company(company)
         return company
 
     def _get_or_create_location(
@@ -674,17 +1015,7 @@ class ObservationImporter:
         suburb = (suburb_raw or "").strip()
         if not state and not suburb:
             return None
-        conditions = [
-            Location.company == company,
-            Location.state == state,
-            Location.suburb == suburb,
-        ]
-        if store_name is None:
-            conditions.append(Location.store_name.is_(None))
-        else:
-            conditions.append(Location.store_name == store_name)
-        query = select(Location).where(*conditions)
-        location = self.session.execute(query).scalar_one_or_none()
+        location = self.lookups.location(company, state, suburb, store_name)
         if location is None:
             if not self.allow_create:
                 raise ValueError(
@@ -699,8 +1030,16 @@ class ObservationImporter:
             )
             self.session.add(location)
             self.session.flush([location])
+            self.lookups.add_location(location)
         return location
 
+    @staticmethod
+    def _parse_choice(value: str, choices: tuple[str, ...], field_name: str) -> str:
+        value = value.strip()
+        if value not in choices:
+            raise ValueError(f"Invalid {field_name} '{value}'")
+        return value
+
     @staticmethod
     def _optional_decimal(
         value: Optional[str], default: Optional[Decimal] = None
@@ -0,0 +1,93 @@
+"""Vectorised statistics over price observation columns.
+
+Report queries fetch the numeric columns they need in one pass, cast to float
+in SQL so no per-value Decimal conversion happens. They hand the result to
+these helpers as a DataFrame, and grouped scores and medians are computed
+column-wise with pandas/NumPy.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from typing import Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import Select
+from sqlalchemy.orm import Session
+
+# Scale factor that makes the MAD a consistent estimator of the standard
+# deviation for normally distributed data (Iglewicz & Hoaglin).
+MAD_SCALE = 0.6745
+
+
+def frame_from_select(session: Session, stmt: Select) -> pd.DataFrame:
+    """Run ``stmt`` and return its rows as a DataFrame named by column label.
+
+    Executes on the session's connection (Core), skipping ORM row handling.
+    """
+    result = session.connection().execute(stmt)
+    columns = list(result.keys())
+    return pd.DataFrame.from_records(result.all(), columns=columns, coerce_float=True)
+
+
+def grouped_zscores(
+    frame: pd.DataFrame, value: str, by: str | Sequence[str], min_count: int = 5
+) -> pd.Series:
+    """Population z-score of ``value`` within each ``by`` group.
+
+    Groups smaller than ``min_count`` or with zero spread score NaN.
+    """
+    grouped = frame.groupby(by, sort=False)[value]
+    mean = grouped.transform("mean")
+    std = grouped.transform("std", ddof=0)
+    scores = (frame[value] - mean) / std
+    return scores.where((grouped.transform("size") >= min_count) & (std > 0))
+
+
+def grouped_mad_scores(
+    frame: pd.DataFrame, value: str, by: str | Sequence[str], min_count: int = 5
+) -> pd.Series:
+    """Modified z-score, ``0.6745 * (x - median) / MAD``, within each group.
+
+    Less sensitive than :func:`grouped_zscores` to the outliers it is looking
+    for; groups smaller than ``min_count`` or with a zero MAD score NaN.
+    """
+    keys = [frame[col] for col in ([by] if isinstance(by, str) else by)]
+    values = frame[value]
+    median = values.groupby(keys, sort=False).transform("median")
+    deviation = values - median
+    mad = deviation.abs().groupby(keys, sort=False).transform("median")
+    scores = MAD_SCALE * deviation / mad
+    size = values.groupby(keys, sort=False).transform("size")
+    return scores.where((size >= min_count) & (mad > 0))
+
+
+def percentiles(
+    values: Iterable[float], q: Sequence[float] = (5, 25, 50, 75, 95)
+) -> dict[float, float | None]:
+    """Linear-interpolated percentiles of ``values``, ignoring NaN."""
+    array = np.asarray(values, dtype=float)
+    array = array[~np.isnan(array)]
+    if array.size == 0:
+        return {p: None for p in q}
+    return dict(zip(q, (float(v) for v in np.percentile(array, q))))
+
+
+def supports_window_functions(session: Session) -> bool:
+    """Whether the bound database can evaluate ``avg(...) OVER (PARTITION BY ...)``."""
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        return True
+    if dialect == "sqlite":
+        return sqlite3.sqlite_version_info >= (3, 25, 0)
+    return False
+
+
+def supports_percentile_cont(session: Session) -> bool:
+    """Whether the bound database has the ``percentile_cont`` ordered-set aggregate."""
+    return session.get_bind().dialect.name == "postgresql"
+
+
+def none_if_nan(value) -> float | None:
+    return None if value is None or pd.isna(value) else float(value)
@@ -1,15 +1,18 @@
 from __future__ import annotations
 
-from collections import defaultdict
-from dataclasses import dataclass, field
+import base64
+import threading
+import time
+import weakref
+from dataclasses import astuple, dataclass, field
 from datetime import datetime
 from decimal import Decimal
-from statistics import median
-from typing import Optional
+from typing import Iterator, Optional
 
-from sqlalchemy import Select, func, or_, select
-from sqlalchemy.orm import Session
+from sqlalchemy import Float, Select, case, cast, event, func, or_, select
+from sqlalchemy.orm import Session, selectinload
 
+from ..config import CONFIG
 from ..models import (
     SKU,
     Brand,
@@ -19,8 +22,18 @@ from ..models import (
     PriceObservation,
     Product,
     PurchasePrice,
+    SKUCarton,
+    SKUPack,
 )
 from .dedupe import find_duplicate_groups
+from .price_stats import (
+    frame_from_select,
+    grouped_mad_scores,
+    grouped_zscores,
+    none_if_nan,
+    supports_percentile_cont,
+    supports_window_functions,
+)
 
 
 @dataclass(slots=True)
@@ -62,6 +75,45 @@ def _observation_select(*columns) -> Select:
     return stmt
 
 
+def _lean_select(
+    filters: ObservationFilters, *columns, with_location: bool = False
+) -> Select:
+    """Select ``columns`` joining only the tables the filters reference.
+
+    Every observation has a SKU, product, brand, package spec and company
+    (non-null foreign keys), so skipping those inner joins leaves the rows
+    unchanged while letting counts and column scans run off the
+    price_observations indexes. ``with_location`` inner-joins locations for
+    columns that need them.
+    """
+    stmt = (
+        select(*columns)
+        .select_from(PriceObservation)
+        .where(PriceObservation.deleted_at.is_(None))
+    )
+    needs_product = bool(filters.product_ids or filters.categories)
+    needs_brand = bool(filters.brand_ids or filters.search)
+    if (
+        filters.sku_ids
+        or filters.package_types
+        or filters.can_form_factors
+        or needs_product
+        or needs_brand
+    ):
+        stmt = stmt.join(SKU, PriceObservation.sku)
+    if filters.package_types or filters.can_form_factors:
+        stmt = stmt.join(PackageSpec, SKU.package_spec)
+    if needs_product or needs_brand:
+        stmt = stmt.join(Product, SKU.product)
+    if needs_brand:
+        stmt = stmt.join(Brand, Product.brand)
+    if filters.company_ids:
+        stmt = stmt.join(Company, PriceObservation.company)
+    if with_location or filters.location_ids or filters.states or filters.suburbs:
+        stmt = stmt.join(Location, PriceObservation.location)
+    return _apply_filters(stmt, filters)
+
+
 def _apply_filters(stmt: Select, filters: ObservationFilters) -> Select:
     if filters.brand_ids:
         stmt = stmt.where(Brand.id.in_(filters.brand_ids))
@@ -176,19 +228,78 @@ def get_recent_observations(session: Session, limit: int = 15) -> list[dict]:
     return [_row_to_dict(row) for row in rows]
 
 
+# Filtered counts per engine, so the pager does not re-count the whole result on
+# every page change. Entries expire after CONFIG.count_cache_ttl_seconds and are
+# dropped whenever observations are inserted, updated or deleted.
+_count_cache: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_count_lock = threading.Lock()
+_count_generation = 0
+
+
+def invalidate_observation_counts() -> None:
+    """Forget cached observation counts (call after Core-level bulk writes)."""
+    global _count_generation
+    with _count_lock:
+        _count_generation += 1
+        _count_cache.clear()
+
+
+@event.listens_for(PriceObservation, "after_insert")
+@event.listens_for(PriceObservation, "after_update")
+@event.listens_for(PriceObservation, "after_delete")
+def _on_observation_write(mapper, connection, target) -> None:
+    invalidate_observation_counts()
+
+
+def _filters_key(filters: ObservationFilters) -> tuple:
+    return tuple(
+        tuple(value) if isinstance(value, list) else value
+        for value in astuple(filters)
+    )
+
+
 def count_observations(session: Session, filters: ObservationFilters) -> int:
-    stmt = _apply_filters(_observation_select(), filters)
-    count_stmt = select(func.count()).select_from(stmt.subquery())
-    return session.execute(count_stmt).scalar_one()
+    ttl = CONFIG.count_cache_ttl_seconds
+    bind = session.get_bind()
+    engine = getattr(bind, "engine", bind)
+    key = _filters_key(filters)
+    if ttl > 0:
+        with _count_lock:
+            generation = _count_generation
+            cached = _count_cache.get(engine, {}).get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+
+    total = session.execute(_lean_select(filters, func.count())).scalar_one()
+
+    if ttl > 0:
+        with _count_lock:
+            # Skip the store if a write invalidated the cache mid-count.
+            if generation == _count_generation:
+                _count_cache.setdefault(engine, {})[key] = (
+                    time.monotonic() + ttl,
+                    total,
+                )
+    return total
 
 
-def fetch_observations(
-    session: Session,
-    filters: ObservationFilters,
-    *,
-    page: int,
-    page_size: int,
-) -> dict:
+def encode_observation_cursor(observation_dt: datetime, observation_id: str) -> str:
+    raw = f"{observation_dt.isoformat()}|{observation_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_observation_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        observation_dt, observation_id = raw.split("|", 1)
+        return datetime.fromisoformat(observation_dt), observation_id
+    except ValueError as exc:
+        raise ValueError(f"Invalid observation cursor: {cursor!r}") from exc
+
+
+def _page_select(
+    filters: ObservationFilters, cursor: Optional[str], limit: int
+) -> Select:
     stmt = _apply_filters(
         _observation_select(
             PriceObservation,
@@ -200,18 +311,72 @@ def fetch_observations(
             PackageSpec,
         ),
         filters,
-    ).order_by(PriceObservation.observation_dt.desc())
+    )
+    if cursor:
+        after_dt, after_id = decode_observation_cursor(cursor)
+        stmt = stmt.where(
+            (PriceObservation.observation_dt < after_dt)
+            | (
+                (PriceObservation.observation_dt == after_dt)
+                & (PriceObservation.id < after_id)
+            )
+        )
+    return (
+        stmt.options(
+            selectinload(SKU.pack_assignment).selectinload(SKUPack.pack_spec),
+            selectinload(SKU.carton_links).selectinload(SKUCarton.carton_spec),
+        )
+        .order_by(PriceObservation.observation_dt.desc(), PriceObservation.id.desc())
+        .limit(limit)
+    )
 
-    offset = max(page - 1, 0) * page_size
-    stmt = stmt.offset(offset).limit(page_size)
+
+def fetch_observations(
+    session: Session,
+    filters: ObservationFilters,
+    *,
+    page: int = 1,
+    page_size: int,
+    cursor: Optional[str] = None,
+) -> dict:
+    """One page of observations, newest first by (observation_dt, id).
+
+    Pass the previous page's ``next_cursor`` as ``cursor`` to page by keyset;
+    ``page`` is only used (as an OFFSET) when no cursor is given, e.g. when
+    jumping straight to a page. ``next_cursor`` is None on the last page.
+    """
+    stmt = _page_select(filters, cursor, page_size + 1)
+    if not cursor:
+        stmt = stmt.offset(max(page - 1, 0) * page_size)
     rows = session.execute(stmt).all()
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1][0]
+        next_cursor = encode_observation_cursor(last.observation_dt, last.id)
     total = count_observations(session, filters)
     return {
         "items": [_row_to_dict(row) for row in rows],
         "total": total,
+        "next_cursor": next_cursor,
     }
 
 
+def iter_observations(
+    session: Session, filters: ObservationFilters, *, batch_size: int = 1000
+) -> Iterator[dict]:
+    """Yield every matching observation, newest first, one keyset batch at a time."""
+    cursor = None
+    while True:
+        rows = session.execute(_page_select(filters, cursor, batch_size)).all()
+        for row in rows:
+            yield _row_to_dict(row)
+        if len(rows) < batch_size:
+            return
+        last = rows[-1][0]
+        cursor = encode_observation_cursor(last.observation_dt, last.id)
+
+
 def get_price_time_series(session: Session, filters: ObservationFilters) -> list[dict]:
     time_bucket = func.strftime("%Y-%W", PriceObservation.observation_dt).label(
         "period"
@@ -273,54 +438,95 @@ def get_price_distribution(session: Session, filters: ObservationFilters) -> lis
     ]
 
 
-def get_map_summary(session: Session, filters: ObservationFilters) -> list[dict]:
-    stmt = _apply_filters(
-        _observation_select(
-            Location.state,
-            Location.suburb,
-            Location.lat,
-            Location.lon,
-            PriceObservation.price_inc_gst_norm,
-            PriceObservation.gp_unit_pct,
-        ).where(Location.id.is_not(None)),
-        filters,
+def get_map_summary(
+    session: Session,
+    filters: ObservationFilters,
+    *,
+    pushdown: Optional[bool] = None,
+) -> list[dict]:
+    """Median price, sample count and centroid per (state, suburb).
+
+    ``pushdown`` computes the medians in SQL with ``percentile_cont``
+    (PostgreSQL, where it is the default). Otherwise the columns are fetched
+    once and aggregated with pandas.
+    """
+    if pushdown is None:
+        pushdown = session.get_bind().dialect.name == "postgresql"
+    if pushdown and supports_percentile_cont(session):
+        return _map_summary_sql(session, filters)
+
+    frame = frame_from_select(
+        session,
+        _lean_select(
+            filters,
+            Location.state.label("state"),
+            Location.suburb.label("suburb"),
+            cast(Location.lat, Float).label("lat"),
+            cast(Location.lon, Float).label("lon"),
+            cast(PriceObservation.price_inc_gst_norm, Float).label("price"),
+            cast(PriceObservation.gp_unit_pct, Float).label("gp"),
+            with_location=True,
+        ),
+    ).dropna(subset=["state", "suburb", "price"])
+    if frame.empty:
+        return []
+
+    # Centroids only use locations with both coordinates.
+    has_coords = frame["lat"].notna() & frame["lon"].notna()
+    frame["lat"] = frame["lat"].where(has_coords)
+    frame["lon"] = frame["lon"].where(has_coords)
+    frame["gp"] = frame["gp"] * 100
+    grouped = frame.groupby(["state", "suburb"], sort=True).agg(
+        median_price_inc_gst=("price", "median"),
+        samples=("price", "size"),
+        lat=("lat", "mean"),
+        lon=("lon", "mean"),
+        median_gp_pct=("gp", "median"),
     )
-    rows = session.execute(stmt).all()
+    return [
+        {
+            "state": state,
+            "suburb": suburb,
+            "median_price_inc_gst": float(row.median_price_inc_gst),
+            "samples": int(row.samples),
+            "lat": none_if_nan(row.lat),
+            "lon": none_if_nan(row.lon),
+            "median_gp_pct": none_if_nan(row.median_gp_pct),
+        }
+        for (state, suburb), row in zip(grouped.index, grouped.itertuples())
+    ]
 
-    accumulator: dict[tuple[str, str], dict[str, list[float]]] = defaultdict(
-        lambda: {"prices": [], "gps": [], "lats": [], "lons": []}
-    )
-    for state, suburb, lat, lon, price, gp in rows:
-        if state is None or suburb is None or price is None:
-            continue
-        bucket = accumulator[(state, suburb)]
-        bucket["prices"].append(float(price))
-        if gp is not None:
-            bucket["gps"].append(float(gp * Decimal("100")))
-        if lat is not None and lon is not None:
-            bucket["lats"].append(float(lat))
-            bucket["lons"].append(float(lon))
-
-    summary = []
-    for (state, suburb), values in accumulator.items():
-        prices = values["prices"]
-        summary.append(
-            {
-                "state": state,
-                "suburb": suburb,
-                "median_price_inc_gst": median(prices),
-                "samples": len(prices),
-                "lat": sum(values["lats"]) / len(values["lats"])
-                if values["lats"]
-                else None,
-                "lon": sum(values["lons"]) / len(values["lons"])
-                if values["lons"]
-                else None,
-                "median_gp_pct": median(values["gps"]) if values["gps"] else None,
-            }
+
+def _map_summary_sql(session: Session, filters: ObservationFilters) -> list[dict]:
+    has_coords = Location.lat.is_not(None) & Location.lon.is_not(None)
+    stmt = (
+        _lean_select(
+            filters,
+            Location.state,
+            Location.suburb,
+            func.percentile_cont(0.5).within_group(PriceObservation.price_inc_gst_norm),
+            func.count(),
+            func.avg(case((has_coords, Location.lat))),
+            func.avg(case((has_coords, Location.lon))),
+            func.percentile_cont(0.5).within_group(PriceObservation.gp_unit_pct),
+            with_location=True,
         )
-    summary.sort(key=lambda item: (item["state"], item["suburb"]))
-    return summary
+        .where(Location.state.is_not(None), Location.suburb.is_not(None))
+        .group_by(Location.state, Location.suburb)
+        .order_by(Location.state, Location.suburb)
+    )
+    return [
+        {
+            "state": state,
+            "suburb": suburb,
+            "median_price_inc_gst": float(price),
+            "samples": samples,
+            "lat": none_if_nan(lat),
+            "lon": none_if_nan(lon),
+            "median_gp_pct": float(gp) * 100 if gp is not None else None,
+        }
+        for state, suburb, price, samples, lat, lon, gp in session.execute(stmt)
+    ]
 
 
 def get_duplicate_overview(session: Session, limit: int = 25) -> list[dict]:
@@ -360,77 +566,129 @@ def get_missing_gtins(session: Session) -> list[dict]:
 
 
 def get_price_outliers(
-    session: Session, filters: ObservationFilters, z_threshold: float = 3.0
+    session: Session,
+    filters: ObservationFilters,
+    z_threshold: float = 3.0,
+    *,
+    method: str = "zscore",
+    pushdown: Optional[bool] = None,
 ) -> list[dict]:
-    stmt = _apply_filters(
-        _observation_select(
-            PriceObservation.id,
-            SKU.id,
-            Product.name,
-            Brand.name,
-            Company.name,
-            PriceObservation.price_per_litre,
-            PriceObservation.gp_unit_pct,
-            PriceObservation.observation_dt,
-        ),
+    """Observations whose price per litre is unusual for their SKU.
+
+    ``method="zscore"`` scores against the SKU's mean and standard deviation;
+    ``method="mad"`` uses the median absolute deviation, which a few extreme
+    prices cannot drag along with them. SKUs with fewer than five
+    observations are skipped. ``pushdown`` evaluates z-scores with SQL window
+    functions, so only the outliers leave the database. It is the default on
+    PostgreSQL and works on any backend with window functions.
+    """
+    if method not in ("zscore", "mad"):
+        raise ValueError(f"Unknown outlier method: {method!r}")
+    if pushdown is None:
+        pushdown = session.get_bind().dialect.name == "postgresql"
+    if pushdown and method == "zscore" and supports_window_functions(session):
+        scored = _zscore_outliers_sql(session, filters, z_threshold)
+    else:
+        frame = frame_from_select(
+            session,
+            _lean_select(
+                filters,
+                PriceObservation.id.label("observation_id"),
+                PriceObservation.sku_id.label("sku_id"),
+                cast(PriceObservation.price_per_litre, Float).label("price"),
+            ),
+        )
+        if frame.empty:
+            return []
+        score = grouped_zscores if method == "zscore" else grouped_mad_scores
+        frame["z_score"] = score(frame, "price", "sku_id")
+        frame = frame[frame["z_score"].abs() >= z_threshold]
+        scored = list(
+            zip(frame["observation_id"], frame["sku_id"], frame["price"], frame["z_score"])
+        )
+
+    details = _outlier_details(session, [obs_id for obs_id, *_ in scored])
+    outliers = [
+        {
+            "observation_id": obs_id,
+            "sku_id": sku_id,
+            **details[obs_id],
+            "price_per_litre": float(price),
+            "z_score": round(float(z_score), 2),
+        }
+        for obs_id, sku_id, price, z_score in scored
+    ]
+    return sorted(outliers, key=lambda item: abs(item["z_score"]), reverse=True)
+
+
+def _zscore_outliers_sql(
+    session: Session, filters: ObservationFilters, z_threshold: float
+) -> list[tuple]:
+    price = cast(PriceObservation.price_per_litre, Float)
+    per_sku = {"partition_by": PriceObservation.sku_id}
+    centred = _lean_select(
         filters,
-    )
-    rows = session.execute(stmt).all()
+        PriceObservation.id.label("observation_id"),
+        PriceObservation.sku_id.label("sku_id"),
+        price.label("price"),
+        func.avg(price).over(**per_sku).label("mean"),
+        func.count().over(**per_sku).label("samples"),
+    ).subquery()
+    # Two passes: averaging squared deviations from the mean avoids the
+    # cancellation E[x^2] - E[x]^2 suffers when prices sit far from zero.
+    deviation = centred.c.price - centred.c.mean
+    scored = select(
+        centred,
+        func.avg(deviation * deviation)
+        .over(partition_by=centred.c.sku_id)
+        .label("variance"),
+    ).subquery()
+    variance = scored.c.variance
+    deviation = scored.c.price - scored.c.mean
+    # Compare squares so the backend needs no sqrt().
+    rows = session.execute(
+        select(
+            scored.c.observation_id,
+            scored.c.sku_id,
+            scored.c.price,
+            scored.c.mean,
+            variance,
+        ).where(
+            scored.c.samples >= 5,
+            variance > 0,
+            deviation * deviation >= z_threshold * z_threshold * variance,
+        )
+    ).all()
+    return [
+        (obs_id, sku_id, value, (value - mean) / var**0.5)
+        for obs_id, sku_id, value, mean, var in rows
+    ]
 
-    grouped: dict[str, list[dict]] = defaultdict(list)
-    for (
-        obs_id,
-        sku_id,
-        product_name,
-        brand_name,
-        company_name,
-        price_per_litre,
-        gp_pct,
-        obs_dt,
-    ) in rows:
-        price = float(price_per_litre)
-        grouped[sku_id].append(
-            {
-                "observation_id": obs_id,
-                "price_per_litre": price,
+
+def _outlier_details(session: Session, observation_ids: list[str]) -> dict[str, dict]:
+    details: dict[str, dict] = {}
+    for start in range(0, len(observation_ids), 500):
+        rows = session.execute(
+            _observation_select(
+                PriceObservation.id,
+                Brand.name,
+                Product.name,
+                Company.name,
+                PriceObservation.gp_unit_pct,
+                PriceObservation.observation_dt,
+            ).where(PriceObservation.id.in_(observation_ids[start : start + 500]))
+        ).all()
+        for obs_id, brand_name, product_name, company_name, gp_pct, obs_dt in rows:
+            details[obs_id] = {
                 "brand": brand_name,
                 "product": product_name,
                 "company": company_name,
                 "gp_unit_pct": float(gp_pct * Decimal("100"))
                 if gp_pct is not None
                 else None,
-                "observation_dt": obs_dt,
+                "observation_dt": obs_dt.isoformat(),
             }
-        )
-
-    outliers: list[dict] = []
-    for sku_id, observations in grouped.items():
-        if len(observations) < 5:
-            continue
-        values = [obs["price_per_litre"] for obs in observations]
-        mean_value = sum(values) / len(values)
-        variance = sum((v - mean_value) ** 2 for v in values) / len(values)
-        std_dev = variance**0.5
-        if std_dev == 0:
-            continue
-        for obs in observations:
-            z_score = (obs["price_per_litre"] - mean_value) / std_dev
-            if abs(z_score) >= z_threshold:
-                outliers.append(
-                    {
-                        "observation_id": obs["observation_id"],
-                        "sku_id": sku_id,
-                        "brand": obs["brand"],
-                        "product": obs["product"],
-                        "company": obs["company"],
-                        "price_per_litre": obs["price_per_litre"],
-                        "gp_unit_pct": obs["gp_unit_pct"],
-                        "z_score": round(z_score, 2),
-                        "observation_dt": obs["observation_dt"].isoformat(),
-                    }
-                )
-
-    return sorted(outliers, key=lambda item: abs(item["z_score"]), reverse=True)
+    return details
 
 
 def _pack_info(sku: SKU) -> Optional[dict]:
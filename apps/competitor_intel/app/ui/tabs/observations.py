@@ -1,18 +1,28 @@
 from __future__ import annotations
 
+import csv
+import io
+import json
 from datetime import datetime
 from decimal import Decimal
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import urlencode
 
 import dash
 import dash_bootstrap_components as dbc
 from dash import Input, Output, State, dcc, html, no_update
+from flask import Response, request, stream_with_context
 from sqlalchemy import select
 
 from ...models import SKU, Brand, Company, Location, PriceObservation, Product
 from ...models.product import PRODUCT_FORMATS, PRODUCT_SPIRITS, categories_for
-from ...services import ObservationFilters, ensure_location_sku, fetch_observations
-from ...services.db import session_scope
+from ...services import (
+    ObservationFilters,
+    ensure_location_sku,
+    fetch_observations,
+    iter_observations,
+)
+from ...services.db import Session, session_scope
 from ...services.dedupe import apply_hash_to_observation
 from ...services.normalize import normalize_price
 from ..components import data_table, filter_dropdown, loading_wrapper, modal_form
@@ -26,7 +36,7 @@ FILTER_FORMAT_ID = "observations-filter-format"
 TABLE_ID = "observations-table"
 PAGINATION_ID = "observations-pagination"
 STORE_ID = "observations-store"
-DOWNLOAD_ID = "observations-download"
+EXPORT_PATH = "/export/observations.csv"
 ADD_MODAL_ID = "observations-add-modal"
 
 CHANNEL_LABELS = {
@@ -50,7 +60,6 @@ def layout() -> dbc.Container:
         [
             html.H2("Observations", className="mb-4"),
             dcc.Store(id=STORE_ID, data={"page": 1, "page_size": 25}),
-            dcc.Download(id=DOWNLOAD_ID),
             dbc.Row(
                 [
                     dbc.Col(
@@ -125,6 +134,8 @@ def layout() -> dbc.Container:
                                         dbc.Button(
                                             "Export CSV",
                                             id="observations-export",
+                                            href=EXPORT_PATH,
+                                            external_link=True,
                                             color="primary",
                                             outline=True,
                                         ),
@@ -225,12 +236,16 @@ def register_callbacks(app) -> None:  # pragma: no cover - Dash wiring
         filters = _build_filters(
             brand_ids, spirits, formats, channels, bases, start_date, end_date
         )
+        trigger = dash.callback_context.triggered_id
+        if trigger != PAGINATION_ID:
+            # New filters: start again from the first page.
+            store_state["cursors"] = {}
+            active_page = 1
         page = active_page or store_state.get("page", 1)
         page_size = store_state.get("page_size", 25)
+        store_state["page"] = page
         with session_scope() as session:
-            result = fetch_observations(
-                session, filters, page=page, page_size=page_size
-            )
+            result = _fetch_page(session, filters, store_state)
         total_pages = max(1, -(-result["total"] // page_size))
         store_state.update(
             {
@@ -254,19 +269,24 @@ def register_callbacks(app) -> None:  # pragma: no cover - Dash wiring
         return result["items"], total_pages, min(page, total_pages), store_state
 
     @app.callback(
-        Output(DOWNLOAD_ID, "data"),
-        Input("observations-export", "n_clicks"),
-        State(STORE_ID, "data"),
-        prevent_initial_call=True,
+        Output("observations-export", "href"),
+        Input(STORE_ID, "data"),
     )
-    def export_csv(n_clicks, store_state):
-        if not n_clicks or not store_state:
-            return no_update
-        filters = _filters_from_store(store_state.get("filters", {}))
-        with session_scope() as session:
-            result = fetch_observations(session, filters, page=1, page_size=1000)
-        df = _rows_to_dataframe(result["items"])
-        return dcc.send_data_frame(df.to_csv, "observations.csv", index=False)
+    def update_export_link(store_state):
+        filters = (store_state or {}).get("filters", {})
+        query = urlencode({"filters": json.dumps(filters)}) if filters else ""
+        return app.get_relative_path(EXPORT_PATH) + (f"?{query}" if query else "")
+
+    @app.server.get(EXPORT_PATH)  # type: ignore[misc]
+    def export_csv():
+        filters = _filters_from_store(json.loads(request.args.get("filters") or "{}"))
+        return Response(
+            stream_with_context(_stream_csv(filters)),
+            mimetype="text/csv",
+            headers={
+                "Content-Disposition": "attachment; filename=observations.csv"
+            },
+        )
 
     @app.callback(
         Output(FILTER_BRAND_ID, "value"),
@@ -407,12 +427,7 @@ def register_callbacks(app) -> None:  # pragma: no cover - Dash wiring
             else ObservationFilters()
         )
         with session_scope() as session:
-            result = fetch_observations(
-                session,
-                filters,
-                page=store_state.get("page", 1),
-                page_size=store_state.get("page_size", 25),
-            )
+            result = _fetch_page(session, filters, store_state or {})
         return ("Observation added", "success", True, False, result["items"])
 
     @app.callback(
@@ -571,10 +586,45 @@ def _filters_from_store(data: Dict) -> ObservationFilters:
     )
 
 
-def _rows_to_dataframe(rows: List[dict]):
-    import pandas as pd  # local import to keep optional dependency scoped
+def _fetch_page(session, filters: ObservationFilters, store_state: Dict) -> dict:
+    """Fetch store_state's page, by keyset cursor when the previous page was seen.
+
+    ``store_state["cursors"]`` maps a page number to the cursor that starts it;
+    pages reached by jumping ahead fall back to an OFFSET query.
+    """
+    page = store_state.get("page", 1)
+    cursors = store_state.setdefault("cursors", {})
+    result = fetch_observations(
+        session,
+        filters,
+        page=page,
+        page_size=store_state.get("page_size", 25),
+        cursor=cursors.get(str(page)),
+    )
+    if result["next_cursor"]:
+        cursors[str(page + 1)] = result["next_cursor"]
+    return result
 
-    return pd.DataFrame(rows)
+
+def _stream_csv(filters: ObservationFilters) -> Iterator[str]:
+    """CSV text for every matching observation, a keyset batch at a time."""
+    buffer = io.StringIO()
+    writer = None
+    session = Session()
+    try:
+        for row in iter_observations(session, filters):
+            if writer is None:
+                writer = csv.DictWriter(buffer, fieldnames=list(row))
+                writer.writeheader()
+            writer.writerow(row)
+            if buffer.tell() > 64 * 1024:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+    finally:
+        session.close()
+        Session.remove()
 
 
 def _add_modal(options: Dict[str, List[dict]]) -> dbc.Modal:
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import argparse
+import json
+
+from apps.competitor_intel.app.services.db import session_scope
+from apps.competitor_intel.app.services.dedupe import rehash_observations
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Recompute price observation hash keys and duplicate clusters"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=5000,
+        help="Observations read and updated per batch",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Hashing processes (0 hashes in-process)",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    with session_scope() as session:
+        updated = rehash_observations(
+            session, batch_size=args.batch_size, workers=args.workers
+        )
+        session.commit()
+    print(json.dumps({"updated": updated}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import csv
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from apps.competitor_intel.app.models import SKU, Base, LocationSKU, PriceObservation
+from apps.competitor_intel.app.services.db import enable_sqlite_savepoints
+from apps.competitor_intel.app.services.ingest_csv import (
+    ObservationImporter,
+    SKUImporter,
+)
+
+TEMPLATES = Path(__file__).resolve().parents[1] / "data_templates"
+
+
+@pytest.fixture()
+def session():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    enable_sqlite_savepoints(engine)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _write_observations(path: Path, rows: list[dict]) -> Path:
+    with (TEMPLATES / "observations.csv").open(newline="", encoding="utf-8") as src:
+        fieldnames = csv.DictReader(src).fieldnames
+    with path.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.DictWriter(handle, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
+
+
+def _template_rows() -> list[dict]:
+    with (TEMPLATES / "observations.csv").open(newline="", encoding="utf-8") as src:
+        return list(csv.DictReader(src))
+
+
+def test_sku_import_is_idempotent(session):
+    first = SKUImporter(session, allow_create=True).run(TEMPLATES / "skus.csv")
+    session.commit()
+    second = SKUImporter(session, allow_create=True).run(TEMPLATES / "skus.csv")
+    session.commit()
+
+    assert first.errors == [] and second.errors == []
+    assert (first.inserted, second.inserted) == (3, 0)
+    assert second.updated == 3
+    assert session.scalar(select(func.count()).select_from(SKU)) == 3
+
+
+def test_observation_import_bulk_inserts_and_dedupes(session, tmp_path):
+    SKUImporter(session, allow_create=True).run(TEMPLATES / "skus.csv")
+    session.commit()
+
+    rows = _template_rows()
+    later = dict(rows[1], observation_dt="2025-03-01")
+    bad = dict(rows[0], channel="carrier_pigeon")
+    csv_path = _write_observations(
+        tmp_path / "obs.csv", [rows[0], bad, rows[1], rows[0], later]
+    )
+
+    report = ObservationImporter(session, allow_create=True, chunk_size=2).run(csv_path)
+    session.commit()
+
+    assert [error.row_number for error in report.errors] == [3]
+    assert report.inserted == 3
+    assert report.duplicates == 1
+    assert session.scalar(select(func.count()).select_from(PriceObservation)) == 3
+
+    links = session.scalars(select(LocationSKU)).all()
+    assert len(links) == 2
+    spans = sorted(
+        (
+            link.first_observed_dt.date().isoformat(),
+            link.last_observed_dt.date().isoformat(),
+        )
+        for link in links
+    )
+    assert spans == [("2025-02-05", "2025-03-01"), ("2025-02-10", "2025-02-10")]
+
+    again = ObservationImporter(session, allow_create=True).run(csv_path)
+    assert again.inserted == 0
+    assert again.duplicates == 4
+
+
+def test_observation_rows_rejected_by_database_are_reported(session, tmp_path):
+    SKUImporter(session, allow_create=True).run(TEMPLATES / "skus.csv")
+    session.connection().execute(
+        text(
+            "CREATE TRIGGER reject_promo BEFORE INSERT ON price_observations "
+            "WHEN NEW.promo_name = 'rejected' "
+            "BEGIN SELECT RAISE(ABORT, 'promo rejected'); END"
+        )
+    )
+    session.commit()
+
+    rows = _template_rows()
+    rejected = dict(rows[1], promo_name="rejected")
+    later = dict(rows[1], observation_dt="2025-03-01")
+    csv_path = _write_observations(tmp_path / "obs.csv", [rows[0], rejected, later])
+
+    report = ObservationImporter(session, allow_create=True).run(csv_path)
+    session.commit()
+
+    assert [(e.row_number, e.message) for e in report.errors] == [(3, "promo rejected")]
+    assert report.inserted == 2
+    assert session.scalar(select(func.count()).select_from(PriceObservation)) == 2
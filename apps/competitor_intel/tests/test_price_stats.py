@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import math
+
+import pandas as pd
+import pytest
+
+from apps.competitor_intel.app.services.price_stats import (
+    grouped_mad_scores,
+    grouped_zscores,
+    percentiles,
+)
+
+
+@pytest.fixture()
+def frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "sku_id": ["a"] * 6 + ["b"] * 5 + ["c"] * 2,
+            "price": [10, 11, 9, 10, 10, 40, 5, 5, 5, 5, 5, 1, 100],
+        }
+    )
+
+
+def test_grouped_zscores_match_population_formula(frame):
+    scores = grouped_zscores(frame, "price", "sku_id")
+
+    values = [10, 11, 9, 10, 10, 40]
+    mean = sum(values) / len(values)
+    std = math.sqrt(sum((v - mean) ** 2 for v in values) / len(values))
+    assert scores.iloc[5] == pytest.approx((40 - mean) / std)
+    # No spread in b, too few samples in c.
+    assert scores.iloc[6:].isna().all()
+
+
+def test_grouped_mad_scores_ignore_the_outlier_itself(frame):
+    scores = grouped_mad_scores(frame, "price", "sku_id")
+
+    # median 10, MAD 0.5 -> 0.6745 * 30 / 0.5
+    assert scores.iloc[5] == pytest.approx(40.47)
+    assert scores.iloc[6:].isna().all()
+
+
+def test_percentiles_skip_nan():
+    assert percentiles([1.0, 2.0, float("nan"), 3.0, 4.0], q=(0, 50, 100)) == {
+        0: 1.0,
+        50: 2.5,
+        100: 4.0,
+    }
+    assert percentiles([], q=(50,)) == {50: None}
@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from apps.competitor_intel.app.models import (
+    SKU,
+    Base,
+    Brand,
+    Company,
+    Location,
+    PackageSpec,
+    PriceObservation,
+    Product,
+)
+from apps.competitor_intel.app.services.dedupe import rehash_observations
+from apps.competitor_intel.app.services.reports import (
+    ObservationFilters,
+    count_observations,
+    fetch_observations,
+    get_duplicate_overview,
+    get_map_summary,
+    get_price_outliers,
+    iter_observations,
+)
+
+START = datetime(2026, 1, 1)
+
+
+@pytest.fixture()
+def session():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    spec = PackageSpec(type="bottle", container_ml=700)
+    brand = Brand(name="Brand")
+    product = Product(
+        brand=brand, name="Gin", category="gin_bottle", abv_percent=Decimal("40")
+    )
+    sku = SKU(product=product, package_spec=spec)
+    company = Company(name="Retailer", type="retailer")
+    session.add_all([spec, brand, product, sku, company])
+    session.flush()
+    for i in range(23):
+        session.add(_observation(sku, company, i))
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _observation(
+    sku, company, i: int, channel: str = "retail_instore", price=None, location=None
+):
+    price = Decimal("50.00") + i if price is None else price
+    return PriceObservation(
+        sku_id=sku.id,
+        company_id=company.id,
+        location_id=location.id if location else None,
+        channel=channel,
+        price_ex_gst_norm=price,
+        price_inc_gst_norm=price,
+        unit_price_inc_gst=price,
+        price_per_litre=price,
+        price_per_unit_pure_alcohol=price,
+        standard_drinks=Decimal("22.1"),
+        # Pairs of observations share a timestamp to exercise the id tie-break.
+        observation_dt=START + timedelta(days=i // 2),
+        source_type="web",
+        hash_key=f"hash-{channel}-{i}",
+    )
+
+
+def _record_statements(session) -> list[str]:
+    statements: list[str] = []
+    event.listen(
+        session.get_bind(),
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    return statements
+
+
+def test_cursor_pages_match_offset_pages(session):
+    filters = ObservationFilters()
+    offset_ids = [
+        item["id"]
+        for page in range(1, 5)
+        for item in fetch_observations(session, filters, page=page, page_size=7)[
+            "items"
+        ]
+    ]
+
+    cursor_ids, cursor, pages = [], None, 0
+    while True:
+        result = fetch_observations(session, filters, page_size=7, cursor=cursor)
+        cursor_ids += [item["id"] for item in result["items"]]
+        pages += 1
+        cursor = result["next_cursor"]
+        if cursor is None:
+            break
+
+    assert pages == 4
+    assert cursor_ids == offset_ids
+    assert len(set(cursor_ids)) == 23
+    assert result["total"] == 23
+    streamed = iter_observations(session, filters, batch_size=5)
+    assert [item["id"] for item in streamed] == cursor_ids
+
+
+def test_invalid_cursor_rejected(session):
+    with pytest.raises(ValueError, match="Invalid observation cursor"):
+        fetch_observations(session, ObservationFilters(), page_size=5, cursor="nope")
+
+
+def test_count_cached_until_observation_written(session):
+    filters = ObservationFilters(channels=["retail_instore"])
+    assert count_observations(session, filters) == 23
+
+    statements = _record_statements(session)
+    assert (
+        count_observations(session, ObservationFilters(channels=["retail_instore"]))
+        == 23
+    )
+    assert not statements
+
+    sku = session.query(SKU).one()
+    company = session.query(Company).one()
+    session.add(_observation(sku, company, 99))
+    session.commit()
+
+    assert count_observations(session, filters) == 24
+    assert (
+        count_observations(session, ObservationFilters(channels=["retail_online"])) == 0
+    )
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{}, {"pushdown": True}, {"method": "mad"}],
+    ids=["zscore", "window-pushdown", "mad"],
+)
+def test_price_outliers(session, options):
+    sku = session.query(SKU).one()
+    company = session.query(Company).one()
+    session.add(_observation(sku, company, 50, price=Decimal("400.00")))
+    session.commit()
+
+    outliers = get_price_outliers(session, ObservationFilters(), **options)
+
+    assert [row["price_per_litre"] for row in outliers] == [400.0]
+    assert outliers[0]["brand"] == "Brand"
+    assert outliers[0]["z_score"] > 3
+
+
+def test_price_outliers_pushdown_matches_pandas(session):
+    filters = ObservationFilters()
+    assert get_price_outliers(session, filters, 1.5) == get_price_outliers(
+        session, filters, 1.5, pushdown=True
+    )
+
+
+def test_price_outliers_pushdown_stable_for_large_prices(session):
+    sku = session.query(SKU).one()
+    company = session.query(Company).one()
+    for obs in session.query(PriceObservation):
+        obs.price_per_litre = Decimal("10000000.00") + (obs.price_per_litre - 50) / 100
+    session.add(_observation(sku, company, 50, price=Decimal("10000001.00")))
+    session.commit()
+
+    filters = ObservationFilters()
+    pushed = get_price_outliers(session, filters, pushdown=True)
+    assert [row["price_per_litre"] for row in pushed] == [10000001.0]
+    assert pushed == get_price_outliers(session, filters)
+
+
+def test_map_summary_medians_per_suburb(session):
+    sku = session.query(SKU).one()
+    company = session.query(Company).one()
+    richmond = Location(
+        company_id=company.id, state="VIC", suburb="Richmond", lat=-37.8, lon=145.0
+    )
+    fitzroy = Location(company_id=company.id, state="VIC", suburb="Fitzroy")
+    session.add_all([richmond, fitzroy])
+    session.flush()
+    for i, price in enumerate(("10", "30", "20", "90")):
+        session.add(
+            _observation(sku, company, 100 + i, price=Decimal(price), location=richmond)
+        )
+    session.add(_observation(sku, company, 200, price=Decimal("5"), location=fitzroy))
+    session.commit()
+
+    summary = get_map_summary(session, ObservationFilters())
+
+    assert [(row["suburb"], row["median_price_inc_gst"]) for row in summary] == [
+        ("Fitzroy", 5.0),
+        ("Richmond", 25.0),
+    ]
+    assert summary[1]["samples"] == 4
+    assert summary[1]["lat"] == pytest.approx(-37.8)
+    assert summary[0]["lat"] is None
+
+
+def test_duplicate_clusters_follow_inserts_and_soft_deletes(session):
+    sku = session.query(SKU).one()
+    company = session.query(Company).one()
+    first = _observation(sku, company, 100)
+    second = _observation(sku, company, 101)
+    second.hash_key = first.hash_key
+    session.add_all([first, second])
+    session.commit()
+
+    overview = get_duplicate_overview(session)
+    assert [(row["hash_key"], row["count"]) for row in overview] == [
+        (first.hash_key, 2)
+    ]
+    assert sorted(overview[0]["observation_ids"]) == sorted([first.id, second.id])
+
+    second.deleted_at = START
+    session.commit()
+    assert get_duplicate_overview(session) == []
+
+
+def test_rehash_updates_keys_and_clusters(session):
+    assert rehash_observations(session, batch_size=5) == 23
+    session.commit()
+
+    # Give one observation the same hash inputs as another.
+    rows = session.query(PriceObservation).order_by(PriceObservation.id).all()
+    rows[1].price_inc_gst_norm = rows[0].price_inc_gst_norm
+    rows[1].observation_dt = rows[0].observation_dt
+    session.commit()
+
+    assert rehash_observations(session, batch_size=5) == 1
+    session.commit()
+    assert [row["count"] for row in get_duplicate_overview(session)] == [2]
+    assert rehash_observations(session, batch_size=5) == 0
@@ -2,30 +2,38 @@
 
 from app.adapters.db.models import (
     Customer,
+    CustomerFirstOrder,
     CustomerSite,
     CustomerType,
     Pricebook,
     PricebookItem,
     SalesChannel,
+    SalesDailyOrderRollup,
+    SalesDailyRollup,
     SalesOrder,
     SalesOrderLine,
     SalesOrderSource,
     SalesOrderStatus,
     SalesOrderTag,
+    SalesRollupState,
     SalesTag,
 )
 
 __all__ = [
     "Customer",
+    "CustomerFirstOrder",
     "CustomerSite",
     "CustomerType",
     "Pricebook",
     "PricebookItem",
     "SalesChannel",
+    "SalesDailyOrderRollup",
+    "SalesDailyRollup",
     "SalesOrder",
     "SalesOrderLine",
     "SalesOrderSource",
     "SalesOrderStatus",
     "SalesOrderTag",
+    "SalesRollupState",
     "SalesTag",
 ]
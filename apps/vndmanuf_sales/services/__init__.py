@@ -1,5 +1,6 @@
 """Service layer for the VNDManuf Sales domain."""
 
+from . import customer_first_order, sales_rollup  # noqa: F401  (flush listeners)
 from .pricing import PriceComputationError, PriceResolution, PricingService
 
 __all__ = [
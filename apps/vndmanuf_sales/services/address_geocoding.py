@@ -3,15 +3,15 @@
 from __future__ import annotations
 
 import re
+import threading
 import time
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from typing import List, Optional
 
 import httpx
 
-NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
-USER_AGENT = "VNDManuf-Sales/1.0 (customer location enrichment)"
-MIN_REQUEST_INTERVAL_SEC = 1.1
+from app.settings import settings
+from apps.vndmanuf_sales.services.geocode_cache import GeocodeCache
 
 _AU_STATE_ABBR = {
     "new south wales": "NSW",
@@ -25,6 +25,11 @@ _AU_STATE_ABBR = {
 }
 
 _last_request_at: float = 0.0
+_throttle_lock = threading.Lock()
+_shared_lock = threading.Lock()
+_client: Optional[httpx.Client] = None
+_cache: Optional[GeocodeCache] = None
+_cache_loaded = False
 
 
 @dataclass
@@ -54,11 +59,69 @@ def build_search_query(
 
 
 def _throttle() -> None:
+    """Space synchronous requests to the configured request rate."""
     global _last_request_at
-    elapsed = time.monotonic() - _last_request_at
-    if elapsed < MIN_REQUEST_INTERVAL_SEC:
-        time.sleep(MIN_REQUEST_INTERVAL_SEC - elapsed)
-    _last_request_at = time.monotonic()
+    interval = 1.0 / settings.geocoding.requests_per_second
+    with _throttle_lock:
+        elapsed = time.monotonic() - _last_request_at
+        if elapsed < interval:
+            time.sleep(interval - elapsed)
+        _last_request_at = time.monotonic()
+
+
+def get_http_client() -> httpx.Client:
+    """Keep-alive client shared by all synchronous lookups."""
+    global _client
+    with _shared_lock:
+        if _client is None:
+            _client = httpx.Client(
+                timeout=settings.geocoding.timeout_seconds,
+                headers={"User-Agent": settings.geocoding.user_agent},
+            )
+        return _client
+
+
+def get_geocode_cache() -> Optional[GeocodeCache]:
+    """Process-wide geocode cache, or None when ``GEOCODE_CACHE_PATH`` is unset."""
+    global _cache, _cache_loaded
+    with _shared_lock:
+        if not _cache_loaded:
+            config = settings.geocoding
+            if config.cache_path is not None:
+                _cache = GeocodeCache(
+                    config.cache_path,
+                    ttl_days=config.cache_ttl_days,
+                    negative_ttl_days=config.negative_cache_ttl_days,
+                )
+            _cache_loaded = True
+        return _cache
+
+
+def reset_geocoding() -> None:
+    """Close the shared client and cache so the next lookup re-reads settings."""
+    global _client, _cache, _cache_loaded
+    with _shared_lock:
+        if _client is not None:
+            _client.close()
+        if _cache is not None:
+            _cache.close()
+        _client = None
+        _cache = None
+        _cache_loaded = False
+
+
+def cache_key(query: str, *, country_codes: str = "au", limit: int = 3) -> str:
+    return f"{country_codes}:{limit}:{query}"
+
+
+def search_params(query: str, *, country_codes: str = "au", limit: int = 3) -> dict:
+    return {
+        "q": query,
+        "format": "json",
+        "addressdetails": 1,
+        "limit": limit,
+        "countrycodes": country_codes,
+    }
 
 
 def _state_abbr(raw: Optional[str]) -> Optional[str]:
@@ -117,36 +180,12 @@ def _score_result(name: str, item: dict) -> float:
     return score
 
 
-def geocode_query(
-    query: str, *, country_codes: str = "au", limit: int = 3
-) -> Optional[GeocodeResult]:
-    """Search Nominatim for a single query string. Returns best AU match or None."""
-    cleaned = (query or "").strip()
-    if not cleaned:
-        return None
-
-    _throttle()
-    params = {
-        "q": cleaned,
-        "format": "json",
-        "addressdetails": 1,
-        "limit": limit,
-        "countrycodes": country_codes,
-    }
-    headers = {"User-Agent": USER_AGENT}
-
-    try:
-        with httpx.Client(timeout=20.0, headers=headers) as client:
-            response = client.get(NOMINATIM_URL, params=params)
-            response.raise_for_status()
-            items = response.json()
-    except (httpx.HTTPError, ValueError):
-        return None
-
+def parse_search_response(query: str, items) -> Optional[GeocodeResult]:
+    """Pick the best AU match from a Nominatim JSON response."""
     if not isinstance(items, list) or not items:
         return None
 
-    best = max(items, key=lambda item: _score_result(cleaned, item))
+    best = max(items, key=lambda item: _score_result(query, item))
     try:
         lat = float(best["lat"])
         lon = float(best["lon"])
@@ -157,19 +196,77 @@ def geocode_query(
     line1, suburb, state, postcode, country = _parse_address(addr)
 
     return GeocodeResult(
-        query=cleaned,
+        query=query,
         lat=lat,
         lon=lon,
-        display_name=best.get("display_name") or cleaned,
+        display_name=best.get("display_name") or query,
         address_line1=line1,
         suburb=suburb,
         state=state,
         postcode=postcode,
         country=country or "Australia",
-        confidence=_score_result(cleaned, best),
+        confidence=_score_result(query, best),
     )
 
 
+def cached_result(
+    query: str, *, country_codes: str = "au", limit: int = 3
+) -> tuple[bool, Optional[GeocodeResult]]:
+    """``(hit, result)`` from the geocode cache; a hit with None is a known miss."""
+    cache = get_geocode_cache()
+    if cache is None:
+        return False, None
+    hit, payload = cache.get(cache_key(query, country_codes=country_codes, limit=limit))
+    return hit, GeocodeResult(**payload) if payload else None
+
+
+def store_result(
+    query: str,
+    result: Optional[GeocodeResult],
+    *,
+    country_codes: str = "au",
+    limit: int = 3,
+) -> None:
+    cache = get_geocode_cache()
+    if cache is not None:
+        cache.put(
+            cache_key(query, country_codes=country_codes, limit=limit),
+            asdict(result) if result else None,
+        )
+
+
+def geocode_query(
+    query: str, *, country_codes: str = "au", limit: int = 3
+) -> Optional[GeocodeResult]:
+    """Search Nominatim for a single query string. Returns best AU match or None.
+
+    Answers (including "no match") are cached; transport and HTTP errors are
+    not, so the query is retried next time.
+    """
+    cleaned = (query or "").strip()
+    if not cleaned:
+        return None
+
+    hit, result = cached_result(cleaned, country_codes=country_codes, limit=limit)
+    if hit:
+        return result
+
+    _throttle()
+    try:
+        response = get_http_client().get(
+            settings.geocoding.nominatim_url,
+            params=search_params(cleaned, country_codes=country_codes, limit=limit),
+        )
+        response.raise_for_status()
+        items = response.json()
+    except (httpx.HTTPError, ValueError):
+        return None
+
+    result = parse_search_response(cleaned, items)
+    store_result(cleaned, result, country_codes=country_codes, limit=limit)
+    return result
+
+
 def geocode_address(
     *,
     line1: Optional[str] = None,
@@ -212,17 +309,17 @@ def geocode_customer_address(customer) -> Optional[GeocodeResult]:
     return None
 
 
-def geocode_business_name(
+def business_name_queries(
     name: str,
     *,
     suburb: Optional[str] = None,
     state: Optional[str] = None,
     country: str = "Australia",
-) -> Optional[GeocodeResult]:
-    """Try progressively broader queries until a match is found."""
+) -> List[str]:
+    """Search strings for a business, most specific first, without repeats."""
     name = (name or "").strip()
     if not name:
-        return None
+        return []
 
     queries: List[str] = []
     primary = build_search_query(name, suburb=suburb, state=state, country=country)
@@ -238,13 +335,19 @@ def geocode_business_name(
     ).strip()
     if simplified and simplified != name:
         queries.append(build_search_query(simplified, country=country))
+    return list(dict.fromkeys(queries))
+
 
-    seen = set()
+def geocode_business_name(
+    name: str,
+    *,
+    suburb: Optional[str] = None,
+    state: Optional[str] = None,
+    country: str = "Australia",
+) -> Optional[GeocodeResult]:
+    """Try progressively broader queries until a match is found."""
     best: Optional[GeocodeResult] = None
-    for q in queries:
-        if q in seen:
-            continue
-        seen.add(q)
+    for q in business_name_queries(name, suburb=suburb, state=state, country=country):
         result = geocode_query(q)
         if result and (best is None or result.confidence > best.confidence):
             best = result
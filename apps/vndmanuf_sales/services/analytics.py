@@ -7,7 +7,7 @@ from datetime import date, datetime, timedelta
 from decimal import Decimal
 from typing import Dict, List, Optional
 
-from sqlalchemy import func, select
+from sqlalchemy import and_, case, func, select
 from sqlalchemy.orm import Session
 
 from app.adapters.db.models import InventoryLot, Product
@@ -15,10 +15,14 @@ from apps.vndmanuf_sales.models import (
     Customer,
     Pricebook,
     SalesChannel,
+    SalesDailyOrderRollup,
+    SalesDailyRollup,
     SalesOrder,
     SalesOrderLine,
     SalesOrderStatus,
 )
+from apps.vndmanuf_sales.services.customer_first_order import first_order_source
+from apps.vndmanuf_sales.services.sales_rollup import use_sales_rollup
 from apps.vndmanuf_sales.services.totals import _dec, _quantize
 
 Money = Decimal
@@ -191,6 +195,26 @@ class SalesAnalyticsService:
             filters.append(SalesOrder.pricebook_id == pricebook_id)
         return filters
 
+    def _rollup_filters(
+        self,
+        model,
+        *,
+        start_date: date,
+        end_date: date,
+        channel_id: Optional[str] = None,
+        pricebook_id: Optional[str] = None,
+    ):
+        filters = [
+            model.is_archived.is_(False),
+            model.day >= start_date,
+            model.day <= end_date,
+        ]
+        if channel_id:
+            filters.append(model.channel_id == channel_id)
+        if pricebook_id:
+            filters.append(model.pricebook_id == pricebook_id)
+        return filters
+
     def get_overview(
         self,
         *,
@@ -199,6 +223,14 @@ class SalesAnalyticsService:
         channel_id: Optional[str] = None,
         pricebook_id: Optional[str] = None,
     ) -> OverviewMetrics:
+        if use_sales_rollup(self.db):
+            return self._overview_from_rollup(
+                start_date=start_date,
+                end_date=end_date,
+                channel_id=channel_id,
+                pricebook_id=pricebook_id,
+            )
+
         filters = self._base_order_filters(
             start_date=start_date,
             end_date=end_date,
@@ -207,55 +239,13 @@ class SalesAnalyticsService:
         )
 
         orders = self.db.execute(select(SalesOrder).where(*filters)).scalars().all()
-        total_orders = len(orders)
-        revenue_inc = sum(_dec(o.total_inc_gst) for o in orders)
-        revenue_inc = _quantize(revenue_inc)
-        avg_order = (
-            _quantize(revenue_inc / total_orders) if total_orders else Decimal("0")
-        )
-
-        customer_ids = {o.customer_id for o in orders}
-        repeat_customers = 0
-        new_customers = 0
-        period_start_dt = _as_datetime_start(start_date)
-
-        for cid in customer_ids:
-            first_ever = self.db.execute(
-                select(func.min(SalesOrder.order_date)).where(
-                    SalesOrder.customer_id == cid,
-                    SalesOrder.deleted_at.is_(None),
-                    SalesOrder.status != SalesOrderStatus.CANCELLED.value,
-                )
-            ).scalar_one()
-            order_count_in_period = sum(1 for o in orders if o.customer_id == cid)
-            if first_ever and first_ever >= period_start_dt:
-                new_customers += 1
-            elif order_count_in_period > 1:
-                repeat_customers += 1
-            elif (
-                order_count_in_period == 1
-                and first_ever
-                and first_ever < period_start_dt
-            ):
-                repeat_customers += 1
-
-        unique_customers = len(customer_ids)
-        repeat_rate = (
-            round(float(repeat_customers) / unique_customers * 100, 1)
-            if unique_customers
-            else 0.0
-        )
-
-        prior_customers = set(
-            self.db.execute(
-                select(SalesOrder.customer_id).where(
-                    SalesOrder.deleted_at.is_(None),
-                    SalesOrder.status != SalesOrderStatus.CANCELLED.value,
-                    SalesOrder.order_date < period_start_dt,
-                )
-            ).scalars()
+        revenue_inc = sum((_dec(o.total_inc_gst) for o in orders), Decimal("0"))
+        period_customers = (
+            select(SalesOrder.customer_id.label("customer_id"))
+            .where(*filters)
+            .distinct()
+            .subquery("period_customers")
         )
-        inactive_customers = len(prior_customers - customer_ids)
 
         trend_rows = self.db.execute(
             select(
@@ -267,14 +257,6 @@ class SalesAnalyticsService:
             .group_by(func.date(SalesOrder.order_date))
             .order_by(func.date(SalesOrder.order_date))
         ).all()
-        trend = [
-            {
-                "date": str(row.day),
-                "revenue": float(_dec(row.revenue)),
-                "orders": int(row.orders),
-            }
-            for row in trend_rows
-        ]
 
         top_sku_rows = self.db.execute(
             select(
@@ -291,15 +273,6 @@ class SalesAnalyticsService:
             .order_by(func.sum(SalesOrderLine.line_total_inc_gst).desc())
             .limit(5)
         ).all()
-        top_skus = [
-            {
-                "SKU": row.sku or "—",
-                "Name": row.name or "—",
-                "Units": float(_dec(row.units)),
-                "Revenue": f"${_quantize(_dec(row.revenue)):,.2f}",
-            }
-            for row in top_sku_rows
-        ]
 
         top_customer_rows = self.db.execute(
             select(
@@ -314,6 +287,149 @@ class SalesAnalyticsService:
             .order_by(func.sum(SalesOrder.total_inc_gst).desc())
             .limit(5)
         ).all()
+
+        return self._build_overview(
+            total_orders=len(orders),
+            revenue_inc=revenue_inc,
+            unique_customers=len({o.customer_id for o in orders}),
+            period_customers=period_customers,
+            period_start_dt=_as_datetime_start(start_date),
+            trend_rows=trend_rows,
+            top_sku_rows=top_sku_rows,
+            top_customer_rows=top_customer_rows,
+        )
+
+    def _overview_from_rollup(
+        self,
+        *,
+        start_date: date,
+        end_date: date,
+        channel_id: Optional[str] = None,
+        pricebook_id: Optional[str] = None,
+    ) -> OverviewMetrics:
+        """Overview metrics read from the daily rollup tables."""
+        order_rollup = SalesDailyOrderRollup
+        line_rollup = SalesDailyRollup
+        period = {
+            "start_date": start_date,
+            "end_date": end_date,
+            "channel_id": channel_id,
+            "pricebook_id": pricebook_id,
+        }
+        order_filters = self._rollup_filters(order_rollup, **period)
+        line_filters = self._rollup_filters(line_rollup, **period)
+
+        totals = self.db.execute(
+            select(
+                func.coalesce(func.sum(order_rollup.order_count), 0).label("orders"),
+                func.coalesce(func.sum(order_rollup.total_inc_gst), 0).label("revenue"),
+                func.count(func.distinct(order_rollup.customer_id)).label("customers"),
+            ).where(*order_filters)
+        ).one()
+        period_customers = (
+            select(order_rollup.customer_id.label("customer_id"))
+            .where(*order_filters)
+            .distinct()
+            .subquery("period_customers")
+        )
+
+        trend_rows = self.db.execute(
+            select(
+                order_rollup.day.label("day"),
+                func.sum(order_rollup.total_inc_gst).label("revenue"),
+                func.sum(order_rollup.order_count).label("orders"),
+            )
+            .where(*order_filters)
+            .group_by(order_rollup.day)
+            .order_by(order_rollup.day)
+        ).all()
+
+        top_sku_rows = self.db.execute(
+            select(
+                Product.sku,
+                Product.name,
+                func.sum(line_rollup.qty).label("units"),
+                func.sum(line_rollup.revenue_inc_gst).label("revenue"),
+            )
+            .select_from(line_rollup)
+            .join(Product, Product.id == line_rollup.product_id)
+            .where(*line_filters)
+            .group_by(Product.id, Product.sku, Product.name)
+            .order_by(func.sum(line_rollup.revenue_inc_gst).desc())
+            .limit(5)
+        ).all()
+
+        top_customer_rows = self.db.execute(
+            select(
+                Customer.name,
+                func.sum(order_rollup.order_count).label("orders"),
+                func.sum(order_rollup.total_inc_gst).label("revenue"),
+            )
+            .select_from(order_rollup)
+            .join(Customer, Customer.id == order_rollup.customer_id)
+            .where(*order_filters)
+            .group_by(Customer.id, Customer.name)
+            .order_by(func.sum(order_rollup.total_inc_gst).desc())
+            .limit(5)
+        ).all()
+
+        return self._build_overview(
+            total_orders=int(totals.orders),
+            revenue_inc=_dec(totals.revenue),
+            unique_customers=int(totals.customers),
+            period_customers=period_customers,
+            period_start_dt=_as_datetime_start(start_date),
+            trend_rows=trend_rows,
+            top_sku_rows=top_sku_rows,
+            top_customer_rows=top_customer_rows,
+        )
+
+    def _build_overview(
+        self,
+        *,
+        total_orders: int,
+        revenue_inc: Decimal,
+        unique_customers: int,
+        period_customers,
+        period_start_dt: datetime,
+        trend_rows,
+        top_sku_rows,
+        top_customer_rows,
+    ) -> OverviewMetrics:
+        revenue_inc = _quantize(revenue_inc)
+        avg_order = (
+            _quantize(revenue_inc / total_orders) if total_orders else Decimal("0")
+        )
+
+        new_customers, inactive_customers = self._classify_customers(
+            period_customers=period_customers, period_start_dt=period_start_dt
+        )
+        # Every customer ordering in the period has a first order on or before
+        # that order, so anyone who is not new must have ordered before.
+        repeat_customers = unique_customers - new_customers
+        repeat_rate = (
+            round(float(repeat_customers) / unique_customers * 100, 1)
+            if unique_customers
+            else 0.0
+        )
+
+        trend = [
+            {
+                "date": str(row.day),
+                "revenue": float(_dec(row.revenue)),
+                "orders": int(row.orders),
+            }
+            for row in trend_rows
+        ]
+        top_skus = [
+            {
+                "SKU": row.sku or "—",
+                "Name": row.name or "—",
+                "Units": float(_dec(row.units)),
+                "Revenue": f"${_quantize(_dec(row.revenue)):,.2f}",
+            }
+            for row in top_sku_rows
+        ]
         top_customers = [
             {
                 "Customer": row.name,
@@ -336,6 +452,37 @@ class SalesAnalyticsService:
             top_customers=top_customers,
         )
 
+    def _classify_customers(
+        self, *, period_customers, period_start_dt: datetime
+    ) -> tuple[int, int]:
+        """Return ``(new, inactive)`` customer counts in one grouped query.
+
+        New customers ordered in the period and have no earlier order; inactive
+        customers ordered before the period but not within it.
+        ``period_customers`` is a subquery with a ``customer_id`` column.
+        """
+        first_orders = first_order_source()
+        in_period = period_customers.c.customer_id.is_not(None)
+        first_date = first_orders.c.first_order_date
+        is_new = and_(in_period, first_date >= period_start_dt)
+        is_inactive = and_(~in_period, first_date < period_start_dt)
+        row = self.db.execute(
+            select(
+                func.coalesce(func.sum(case((is_new, 1), else_=0)), 0).label(
+                    "new_customers"
+                ),
+                func.coalesce(func.sum(case((is_inactive, 1), else_=0)), 0).label(
+                    "inactive_customers"
+                ),
+            ).select_from(
+                first_orders.outerjoin(
+                    period_customers,
+                    period_customers.c.customer_id == first_orders.c.customer_id,
+                )
+            )
+        ).one()
+        return int(row.new_customers), int(row.inactive_customers)
+
     def get_products_sold(
         self,
         *,
@@ -345,25 +492,40 @@ class SalesAnalyticsService:
         pricebook_id: Optional[str] = None,
         segment: Optional[str] = None,
     ) -> ProductSalesSummary:
-        filters = self._base_order_filters(
-            start_date=start_date,
-            end_date=end_date,
-            channel_id=channel_id,
-            pricebook_id=pricebook_id,
-        )
+        period = {
+            "start_date": start_date,
+            "end_date": end_date,
+            "channel_id": channel_id,
+            "pricebook_id": pricebook_id,
+        }
         period_start_dt = _as_datetime_start(start_date)
-
-        sales_query = (
-            select(
-                SalesOrderLine.product_id.label("product_id"),
-                func.sum(SalesOrderLine.qty).label("qty_sold"),
-                func.sum(SalesOrderLine.line_total_ex_gst).label("revenue_ex"),
-                func.sum(SalesOrderLine.line_total_inc_gst).label("revenue_inc"),
+        use_rollup = use_sales_rollup(self.db)
+
+        if use_rollup:
+            filters = self._rollup_filters(SalesDailyRollup, **period)
+            sales_query = (
+                select(
+                    SalesDailyRollup.product_id.label("product_id"),
+                    func.sum(SalesDailyRollup.qty).label("qty_sold"),
+                    func.sum(SalesDailyRollup.revenue_ex_gst).label("revenue_ex"),
+                    func.sum(SalesDailyRollup.revenue_inc_gst).label("revenue_inc"),
+                )
+                .where(*filters)
+                .group_by(SalesDailyRollup.product_id)
+            )
+        else:
+            filters = self._base_order_filters(**period)
+            sales_query = (
+                select(
+                    SalesOrderLine.product_id.label("product_id"),
+                    func.sum(SalesOrderLine.qty).label("qty_sold"),
+                    func.sum(SalesOrderLine.line_total_ex_gst).label("revenue_ex"),
+                    func.sum(SalesOrderLine.line_total_inc_gst).label("revenue_inc"),
+                )
+                .join(SalesOrder, SalesOrderLine.order_id == SalesOrder.id)
+                .where(*filters, SalesOrderLine.deleted_at.is_(None))
+                .group_by(SalesOrderLine.product_id)
             )
-            .join(SalesOrder, SalesOrderLine.order_id == SalesOrder.id)
-            .where(*filters, SalesOrderLine.deleted_at.is_(None))
-            .group_by(SalesOrderLine.product_id)
-        )
         sales_subq = sales_query.subquery()
 
         inventory_subq = (
@@ -399,7 +561,9 @@ class SalesAnalyticsService:
         rows = self.db.execute(query).all()
 
         product_ids = [r.product_id for r in rows]
-        channel_mix_map = self._channel_mix_for_products(product_ids, filters=filters)
+        channel_mix_map = self._channel_mix_for_products(
+            product_ids, filters=filters, rollup=use_rollup
+        )
         first_sale_map = self._first_sale_dates(product_ids)
 
         result_rows: List[ProductSalesRow] = []
@@ -439,25 +603,38 @@ class SalesAnalyticsService:
         )
 
     def _channel_mix_for_products(
-        self, product_ids: List[str], *, filters
+        self, product_ids: List[str], *, filters, rollup: bool = False
     ) -> Dict[str, str]:
         if not product_ids:
             return {}
-        rows = self.db.execute(
-            select(
-                SalesOrderLine.product_id,
-                SalesChannel.code,
-                func.sum(SalesOrderLine.line_total_inc_gst).label("rev"),
+        if rollup:
+            stmt = (
+                select(
+                    SalesDailyRollup.product_id,
+                    SalesChannel.code,
+                    func.sum(SalesDailyRollup.revenue_inc_gst).label("rev"),
+                )
+                .outerjoin(SalesChannel, SalesChannel.id == SalesDailyRollup.channel_id)
+                .where(*filters, SalesDailyRollup.product_id.in_(product_ids))
+                .group_by(SalesDailyRollup.product_id, SalesChannel.code)
             )
-            .join(SalesOrder, SalesOrder.id == SalesOrderLine.order_id)
-            .outerjoin(SalesChannel, SalesChannel.id == SalesOrder.channel_id)
-            .where(
-                *filters,
-                SalesOrderLine.deleted_at.is_(None),
-                SalesOrderLine.product_id.in_(product_ids),
+        else:
+            stmt = (
+                select(
+                    SalesOrderLine.product_id,
+                    SalesChannel.code,
+                    func.sum(SalesOrderLine.line_total_inc_gst).label("rev"),
+                )
+                .join(SalesOrder, SalesOrder.id == SalesOrderLine.order_id)
+                .outerjoin(SalesChannel, SalesChannel.id == SalesOrder.channel_id)
+                .where(
+                    *filters,
+                    SalesOrderLine.deleted_at.is_(None),
+                    SalesOrderLine.product_id.in_(product_ids),
+                )
+                .group_by(SalesOrderLine.product_id, SalesChannel.code)
             )
-            .group_by(SalesOrderLine.product_id, SalesChannel.code)
-        ).all()
+        rows = self.db.execute(stmt).all()
 
         by_product: Dict[str, Dict[str, Decimal]] = {}
         for row in rows:
@@ -557,22 +734,10 @@ class SalesAnalyticsService:
         today = date.today()
         month_start = _as_datetime_start(today.replace(day=1))
 
-        first_order_rows = self.db.execute(
-            select(
-                SalesOrder.customer_id,
-                func.min(SalesOrder.order_date).label("first_order"),
-            )
-            .where(
-                SalesOrder.deleted_at.is_(None),
-                SalesOrder.status != SalesOrderStatus.CANCELLED.value,
-            )
-            .group_by(SalesOrder.customer_id)
-        ).all()
-        new_this_month = sum(
-            1
-            for row in first_order_rows
-            if row.first_order and row.first_order >= month_start
-        )
+        first_orders = first_order_source()
+        new_this_month = self.db.execute(
+            select(func.count()).where(first_orders.c.first_order_date >= month_start)
+        ).scalar_one()
 
         revenues = [stats["revenue_inc_gst"] for stats in order_stats.values()]
         avg_lifetime = (
@@ -0,0 +1,134 @@
+"""First-order date per customer, computed set-based or read from a materialized table."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, event, func, inspect, literal, select
+from sqlalchemy.orm import Session
+
+from app.adapters.db.upsert import upsert
+from app.settings import settings
+from apps.vndmanuf_sales.models import (
+    CustomerFirstOrder,
+    SalesOrder,
+    SalesOrderStatus,
+)
+
+# SalesOrder attributes that can move a customer's first order date.
+_TRACKED_ATTRS = ("customer_id", "order_date", "status", "deleted_at")
+
+_REFRESH_CHUNK = 500
+
+
+def _first_order_filters():
+    return [
+        SalesOrder.deleted_at.is_(None),
+        SalesOrder.status != SalesOrderStatus.CANCELLED.value,
+    ]
+
+
+def first_order_dates_select(customer_ids: Optional[Iterable[str]] = None):
+    """Grouped ``(customer_id, first_order_date)`` over live sales orders."""
+    stmt = (
+        select(
+            SalesOrder.customer_id.label("customer_id"),
+            func.min(SalesOrder.order_date).label("first_order_date"),
+        )
+        .where(*_first_order_filters())
+        .group_by(SalesOrder.customer_id)
+    )
+    if customer_ids is not None:
+        stmt = stmt.where(SalesOrder.customer_id.in_(list(customer_ids)))
+    return stmt
+
+
+def first_order_source():
+    """Subquery of ``(customer_id, first_order_date)`` for analytics.
+
+    Reads the materialized ``customer_first_order`` table when enabled so the
+    cost scales with customers rather than total order history.
+    """
+    if settings.sales_analytics.customer_first_order_enabled:
+        return select(
+            CustomerFirstOrder.customer_id.label("customer_id"),
+            CustomerFirstOrder.first_order_date.label("first_order_date"),
+        ).subquery("first_orders")
+    return first_order_dates_select().subquery("first_orders")
+
+
+def refresh_customer_first_orders(
+    bind, customer_ids: Optional[Iterable[str]] = None
+) -> int:
+    """Recompute ``customer_first_order`` rows.
+
+    ``bind`` may be a Session or Connection. With ``customer_ids`` only those
+    customers are refreshed; otherwise the whole table is rebuilt. Returns the
+    number of customers processed.
+    """
+    table = CustomerFirstOrder.__table__
+    now = datetime.utcnow()
+
+    def _refresh(ids: Optional[list]) -> None:
+        source = first_order_dates_select(ids)
+        # Upsert rather than delete + insert: two transactions refreshing the
+        # same customer must not collide on its primary key.
+        upsert(
+            bind,
+            table,
+            [table.c.customer_id],
+            columns=["customer_id", "first_order_date", "refreshed_at"],
+            select=source.add_columns(literal(now).label("refreshed_at")),
+        )
+        # Customers left without a live order drop out of the table.
+        stale = delete(table).where(
+            table.c.customer_id.not_in(
+                first_order_dates_select(ids).with_only_columns(SalesOrder.customer_id)
+            )
+        )
+        if ids is not None:
+            stale = stale.where(table.c.customer_id.in_(ids))
+        bind.execute(stale)
+
+    if customer_ids is None:
+        _refresh(None)
+        return int(bind.execute(select(func.count()).select_from(table)).scalar_one())
+
+    ids = sorted({cid for cid in customer_ids if cid})
+    for i in range(0, len(ids), _REFRESH_CHUNK):
+        _refresh(ids[i : i + _REFRESH_CHUNK])
+    return len(ids)
+
+
+def _affected_customer_ids(session: Session) -> set:
+    affected = set()
+    for obj in session.new:
+        if isinstance(obj, SalesOrder):
+            affected.add(obj.customer_id)
+    for obj in session.deleted:
+        if isinstance(obj, SalesOrder):
+            affected.add(obj.customer_id)
+    for obj in session.dirty:
+        if not isinstance(obj, SalesOrder):
+            continue
+        state = inspect(obj)
+        for attr in _TRACKED_ATTRS:
+            history = state.attrs[attr].history
+            if not history.has_changes():
+                continue
+            affected.add(obj.customer_id)
+            if attr == "customer_id":
+                affected.update(history.deleted)
+    affected.discard(None)
+    return affected
+
+
+@event.listens_for(Session, "after_flush")
+def _maintain_customer_first_order(session: Session, flush_context) -> None:
+    """Keep ``customer_first_order`` current inside the flushing transaction."""
+    if not settings.sales_analytics.customer_first_order_enabled:
+        return
+    affected = _affected_customer_ids(session)
+    if affected:
+        refresh_customer_first_orders(session.connection(), affected)
@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
+import logging
 from dataclasses import dataclass, field
 from decimal import Decimal
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from sqlalchemy import select
 from sqlalchemy.orm import Session, joinedload
@@ -12,12 +13,17 @@ from sqlalchemy.orm import Session, joinedload
 from app.adapters.db.models import Customer, CustomerSite
 from apps.vndmanuf_sales.services.address_geocoding import (
     GeocodeResult,
+    business_name_queries,
     geocode_address,
     geocode_business_name,
     geocode_customer_address,
+    get_geocode_cache,
 )
+from apps.vndmanuf_sales.services.geocode_batch import geocode_many
 from apps.vndmanuf_sales.services.llm_address_lookup import suggest_customer_address
 
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class EnrichmentRow:
@@ -120,6 +126,24 @@ def _apply_llm_address_hints(customer: Customer, suggestion) -> None:
         customer.delivery_country = (suggestion.country or "Australia")[:100]
 
 
+def _search_terms(
+    customer: Customer,
+) -> Tuple[str, Optional[str], Optional[str], Optional[str], str]:
+    """(search_name, buying_group_name, suburb, state, country) for a customer."""
+    suburb = customer.delivery_suburb or customer.billing_suburb
+    state = customer.delivery_state or customer.billing_state
+    country = customer.delivery_country or customer.billing_country or "Australia"
+    search_name = customer.name
+    bg = customer.buying_group
+    bg_name = None
+    if bg and bg.deleted_at is None:
+        bg_name = bg.name
+        if bg.code != "NONE" and bg.name.lower() != "none":
+            if bg.name.lower() not in search_name.lower():
+                search_name = f"{bg.name} {search_name}"
+    return search_name, bg_name, suburb, state, country
+
+
 class CustomerLocationEnrichmentService:
     def __init__(self, db: Session):
         self.db = db
@@ -152,25 +176,26 @@ class CustomerLocationEnrichmentService:
         dry_run: bool = False,
         min_confidence: float = 0.55,
         use_llm: bool = False,
+        prefetch: bool = True,
+        commit_every: int = 50,
     ) -> EnrichmentSummary:
+        """Geocode candidates and apply confident matches.
+
+        With ``prefetch`` the primary query of every candidate is looked up
+        concurrently first, filling the geocode cache that the per-customer
+        pass then reads. Updates are committed every ``commit_every`` matches,
+        so a long run that stops part-way keeps its progress and a re-run only
+        picks up customers still missing a location.
+        """
         summary = EnrichmentSummary()
         candidates = self.list_candidates(customer_ids=customer_ids, limit=limit)
+        if prefetch and len(candidates) > 1:
+            self.prefetch_geocodes(candidates)
 
+        pending_commit = 0
         for customer in candidates:
             summary.processed += 1
-            suburb = customer.delivery_suburb or customer.billing_suburb
-            state = customer.delivery_state or customer.billing_state
-            country = (
-                customer.delivery_country or customer.billing_country or "Australia"
-            )
-            search_name = customer.name
-            bg = customer.buying_group
-            bg_name = None
-            if bg and bg.deleted_at is None:
-                bg_name = bg.name
-                if bg.code != "NONE" and bg.name.lower() != "none":
-                    if bg.name.lower() not in search_name.lower():
-                        search_name = f"{bg.name} {search_name}"
+            search_name, bg_name, suburb, state, country = _search_terms(customer)
 
             result: Optional[GeocodeResult] = None
             try:
@@ -282,6 +307,10 @@ class CustomerLocationEnrichmentService:
             _apply_geocode(customer, result)
             _touch_primary_site(customer, result)
             summary.updated += 1
+            pending_commit += 1
+            if commit_every and pending_commit >= commit_every:
+                self.db.commit()
+                pending_commit = 0
             summary.results.append(
                 EnrichmentRow(
                     customer_id=str(customer.id),
@@ -295,7 +324,31 @@ class CustomerLocationEnrichmentService:
                 )
             )
 
-        if not dry_run and summary.updated:
+        if not dry_run and pending_commit:
             self.db.commit()
 
         return summary
+
+    def prefetch_geocodes(self, customers: List[Customer]) -> None:
+        """Warm the geocode cache with each customer's most specific query."""
+        if get_geocode_cache() is None:
+            return
+        queries = []
+        for customer in customers:
+            search_name, _, suburb, state, country = _search_terms(customer)
+            names = business_name_queries(
+                search_name, suburb=suburb, state=state, country=country
+            )
+            if names:
+                queries.append(names[0])
+        try:
+            _, stats = geocode_many(queries)
+        except Exception as exc:  # noqa: BLE001 - lookups fall back to one by one
+            logger.warning("Batch geocoding failed: %s", exc)
+            return
+        logger.info(
+            "Prefetched geocodes: %s cached, %s fetched, %s failed",
+            stats.cached,
+            stats.fetched,
+            stats.failed,
+        )
@@ -18,10 +18,12 @@ from app.adapters.db.models import (
     Customer,
     CustomerRepAssignment,
     Pricebook,
+    SalesDailyOrderRollup,
     SalesOrder,
     SalesRep,
 )
 from apps.vndmanuf_sales.models import SalesOrderStatus
+from apps.vndmanuf_sales.services.sales_rollup import use_sales_rollup
 from apps.vndmanuf_sales.services.totals import _dec, _quantize
 
 STATE_COORDS: Dict[str, Tuple[float, float]] = {
@@ -256,19 +258,37 @@ class CustomerMapService:
         start_dt = _as_datetime_start(start_date)
         end_dt = _as_datetime_end(end_date)
 
-        revenue_rows = self.db.execute(
-            select(
-                SalesOrder.customer_id,
-                func.coalesce(func.sum(SalesOrder.total_inc_gst), 0).label("revenue"),
-            )
-            .where(
-                SalesOrder.deleted_at.is_(None),
-                SalesOrder.status != SalesOrderStatus.CANCELLED.value,
-                SalesOrder.order_date >= start_dt,
-                SalesOrder.order_date <= end_dt,
-            )
-            .group_by(SalesOrder.customer_id)
-        ).all()
+        use_rollup = use_sales_rollup(self.db)
+        if use_rollup:
+            revenue_rows = self.db.execute(
+                select(
+                    SalesDailyOrderRollup.customer_id,
+                    func.coalesce(
+                        func.sum(SalesDailyOrderRollup.total_inc_gst), 0
+                    ).label("revenue"),
+                )
+                .where(
+                    SalesDailyOrderRollup.day >= start_date,
+                    SalesDailyOrderRollup.day <= end_date,
+                )
+                .group_by(SalesDailyOrderRollup.customer_id)
+            ).all()
+        else:
+            revenue_rows = self.db.execute(
+                select(
+                    SalesOrder.customer_id,
+                    func.coalesce(func.sum(SalesOrder.total_inc_gst), 0).label(
+                        "revenue"
+                    ),
+                )
+                .where(
+                    SalesOrder.deleted_at.is_(None),
+                    SalesOrder.status != SalesOrderStatus.CANCELLED.value,
+                    SalesOrder.order_date >= start_dt,
+                    SalesOrder.order_date <= end_dt,
+                )
+                .group_by(SalesOrder.customer_id)
+            ).all()
         revenue_by_customer = {
             row.customer_id: _quantize(_dec(row.revenue)) for row in revenue_rows
         }
@@ -303,9 +323,14 @@ class CustomerMapService:
                 )
             ]
 
-        pricebook_by_customer = self._latest_pricebook_by_customer(
-            [c.id for c in customers], start_dt, end_dt
-        )
+        if use_rollup:
+            pricebook_by_customer = self._latest_pricebook_from_rollup(
+                [c.id for c in customers], start_date, end_date
+            )
+        else:
+            pricebook_by_customer = self._latest_pricebook_by_customer(
+                [c.id for c in customers], start_dt, end_dt
+            )
 
         points: List[CustomerMapPoint] = []
         legend_colors: Dict[str, dict] = {}
@@ -445,6 +470,41 @@ class CustomerMapService:
                 result[f"{cid}_pb_id"] = row.pricebook_id
         return result
 
+    def _latest_pricebook_from_rollup(
+        self,
+        customer_ids: List[str],
+        start_date: date,
+        end_date: date,
+    ) -> Dict[str, str]:
+        """Same shape as ``_latest_pricebook_by_customer`` from the daily rollup."""
+        if not customer_ids:
+            return {}
+        rows = self.db.execute(
+            select(
+                SalesDailyOrderRollup.customer_id,
+                SalesDailyOrderRollup.pricebook_id,
+                Pricebook.name,
+                SalesDailyOrderRollup.last_order_at,
+            )
+            .outerjoin(Pricebook, Pricebook.id == SalesDailyOrderRollup.pricebook_id)
+            .where(
+                SalesDailyOrderRollup.customer_id.in_(customer_ids),
+                SalesDailyOrderRollup.day >= start_date,
+                SalesDailyOrderRollup.day <= end_date,
+            )
+            .order_by(
+                SalesDailyOrderRollup.customer_id,
+                SalesDailyOrderRollup.last_order_at.desc(),
+            )
+        ).all()
+        result: Dict[str, str] = {}
+        for row in rows:
+            cid = row.customer_id
+            if cid not in result:
+                result[cid] = row.name
+                result[f"{cid}_pb_id"] = row.pricebook_id
+        return result
+
     def _resolve_coordinates(
         self, customer: Customer
     ) -> Tuple[Optional[Tuple[float, float]], str, Optional[str], Optional[str]]:
@@ -4,13 +4,18 @@ from __future__ import annotations
 
 from datetime import date, datetime
 from decimal import Decimal
-from typing import Optional, Tuple
+from typing import Iterable, Optional, Tuple
 
 from sqlalchemy import or_, select
 from sqlalchemy.orm import Session
 
 from app.adapters.db.models import Contact, Customer, CustomerPrice, Product
-from apps.vndmanuf_sales.services.pricing import PricingService, _dec, quantize_money
+from apps.vndmanuf_sales.services.pricing import (
+    PricingService,
+    _dec,
+    price_cache,
+    quantize_money,
+)
 
 PRICING_LEVELS = (
     "retail",
@@ -109,6 +114,33 @@ def is_special_price_active(cp: CustomerPrice, as_of: datetime) -> bool:
     return True
 
 
+def active_special_prices_for_products(
+    db: Session,
+    customer_id: str,
+    product_ids: Iterable[str],
+    as_of: datetime,
+) -> dict[str, CustomerPrice]:
+    """Batch :func:`find_active_special_price`: latest active price per product."""
+    rows = db.execute(
+        select(CustomerPrice)
+        .where(
+            CustomerPrice.customer_id == customer_id,
+            CustomerPrice.product_id.in_(list(product_ids)),
+            CustomerPrice.deleted_at.is_(None),
+            CustomerPrice.effective_date <= as_of,
+            or_(
+                CustomerPrice.expiry_date.is_(None),
+                CustomerPrice.expiry_date >= as_of,
+            ),
+        )
+        .order_by(CustomerPrice.effective_date.desc())
+    ).scalars()
+    by_product: dict[str, CustomerPrice] = {}
+    for cp in rows:
+        by_product.setdefault(str(cp.product_id), cp)
+    return by_product
+
+
 def resolve_customer_product_price(
     db: Session,
     customer_id: str,
@@ -118,39 +150,98 @@ def resolve_customer_product_price(
     """
     Default tier price from customer's pricing level, overridden by active special price.
     """
-    as_of_dt = _as_datetime(as_of or datetime.utcnow())
-    product = db.get(Product, product_id)
-    if not product:
-        raise ValueError(f"Product {product_id} not found")
+    return resolve_customer_product_prices(db, customer_id, [product_id], as_of)[
+        str(product_id)
+    ]
+
+
+def resolve_customer_product_prices(
+    db: Session,
+    customer_id: str,
+    product_ids: Iterable[str],
+    as_of: Optional[date | datetime] = None,
+) -> dict[str, dict]:
+    """
+    Batch :func:`resolve_customer_product_price`, keyed by ``str(product_id)``.
 
+    Cached results come from the shared price cache, keyed by the day of
+    ``as_of``; the rest cost a fixed number of queries however many products
+    are asked for.
+    """
+    as_of_dt = _as_datetime(as_of or datetime.utcnow())
+    ids = {str(pid): pid for pid in product_ids if pid}
     pricing_svc = PricingService(db)
+    use_cache = price_cache.enabled(db)
+    version = price_cache.version
+
+    def cache_key(pid: str) -> tuple:
+        return (
+            "customer",
+            str(customer_id),
+            pid,
+            as_of_dt.date(),
+            pricing_svc.default_gst_rate,
+        )
+
+    resolved: dict[str, dict] = {}
+    pending = []
+    for key, pid in ids.items():
+        hit = price_cache.get(db, cache_key(key)) if use_cache else None
+        if hit is None:
+            pending.append(pid)
+        else:
+            resolved[key] = dict(hit)
+    if not pending:
+        return resolved
+
+    products = {
+        str(product.id): product
+        for product in db.scalars(select(Product).where(Product.id.in_(pending)))
+    }
+    missing = [str(pid) for pid in pending if str(pid) not in products]
+    if missing:
+        raise ValueError(f"Product {', '.join(missing)} not found")
+
     gst_rate = (
         pricing_svc._get_customer_tax_rate(customer_id)  # noqa: SLF001
         or pricing_svc.default_gst_rate
     )
+    factor = Decimal("1") + gst_rate / Decimal("100")
     level = get_customer_pricing_level(db, customer_id)
-    ex, inc = tier_price_from_product(product, level, gst_rate)
-    source = f"tier:{level}"
-
-    special = find_active_special_price(db, customer_id, product_id, as_of_dt)
-    if special:
-        ex = quantize_money(_dec(special.unit_price_ex_tax) or Decimal("0"))
-        inc = quantize_money(ex * (Decimal("1") + gst_rate / Decimal("100")))
-        source = "customer_special"
-
-    if ex is None:
-        raise ValueError(f"No price available for product {product_id}")
-
-    if inc is None:
-        inc = quantize_money(ex * (Decimal("1") + gst_rate / Decimal("100")))
-
-    return {
-        "unit_price_ex_gst": float(ex),
-        "unit_price_inc_gst": float(inc),
-        "pricing_level": level,
-        "source": source,
-        "special_price_id": str(special.id) if special else None,
-    }
+    specials = active_special_prices_for_products(db, customer_id, pending, as_of_dt)
+
+    unpriced = []
+    for key, product in products.items():
+        ex, inc = tier_price_from_product(product, level, gst_rate)
+        source = f"tier:{level}"
+
+        special = specials.get(key)
+        if special:
+            ex = quantize_money(_dec(special.unit_price_ex_tax) or Decimal("0"))
+            inc = quantize_money(ex * factor)
+            source = "customer_special"
+
+        if ex is None:
+            unpriced.append(key)
+            continue
+
+        if inc is None:
+            inc = quantize_money(ex * factor)
+
+        result = {
+            "unit_price_ex_gst": float(ex),
+            "unit_price_inc_gst": float(inc),
+            "pricing_level": level,
+            "source": source,
+            "special_price_id": str(special.id) if special else None,
+        }
+        resolved[key] = result
+        if use_cache:
+            price_cache.put(db, cache_key(key), dict(result), version)
+
+    if unpriced:
+        raise ValueError(f"No price available for product {', '.join(unpriced)}")
+    return resolved
 
 
 def list_tier_prices_for_level(db: Session, pricing_level: str) -> list[dict]:
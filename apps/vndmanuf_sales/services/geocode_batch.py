@@ -0,0 +1,183 @@
+"""Concurrent, rate-limited Nominatim lookups for bulk customer enrichment."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+
+import httpx
+
+from app.settings import settings
+from apps.vndmanuf_sales.services.address_geocoding import (
+    GeocodeResult,
+    cached_result,
+    parse_search_response,
+    search_params,
+    store_result,
+)
+
+logger = logging.getLogger(__name__)
+
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Async token bucket: ``rate`` requests per second with bursts of ``burst``."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+@dataclass
+class BatchGeocodeStats:
+    requested: int = 0
+    cached: int = 0
+    fetched: int = 0
+    not_found: int = 0
+    failed: int = 0
+
+
+class BatchGeocoder:
+    """Geocode many queries with bounded concurrency, a token bucket and retries.
+
+    Each answer is written to the geocode cache as soon as it arrives, so an
+    interrupted run resumes from where it stopped. Queries that still fail
+    after ``max_retries`` are reported as None and left uncached.
+    """
+
+    def __init__(
+        self,
+        *,
+        country_codes: str = "au",
+        limit: int = 3,
+        requests_per_second: Optional[float] = None,
+        burst: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        retry_backoff_seconds: Optional[float] = None,
+    ):
+        config = settings.geocoding
+        self.country_codes = country_codes
+        self.limit = limit
+        self.requests_per_second = requests_per_second or config.requests_per_second
+        self.burst = burst or config.burst
+        self.max_concurrency = max_concurrency or config.max_concurrency
+        self.max_retries = config.max_retries if max_retries is None else max_retries
+        self.retry_backoff_seconds = (
+            config.retry_backoff_seconds
+            if retry_backoff_seconds is None
+            else retry_backoff_seconds
+        )
+        self.stats = BatchGeocodeStats()
+
+    async def geocode_many(
+        self, queries: Iterable[str]
+    ) -> Dict[str, Optional[GeocodeResult]]:
+        results: Dict[str, Optional[GeocodeResult]] = {}
+        pending = []
+        for query in dict.fromkeys((q or "").strip() for q in queries):
+            if not query:
+                continue
+            self.stats.requested += 1
+            hit, result = cached_result(
+                query, country_codes=self.country_codes, limit=self.limit
+            )
+            if hit:
+                self.stats.cached += 1
+                results[query] = result
+            else:
+                pending.append(query)
+        if not pending:
+            return results
+
+        bucket = TokenBucket(self.requests_per_second, self.burst)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        config = settings.geocoding
+        async with httpx.AsyncClient(
+            timeout=config.timeout_seconds,
+            headers={"User-Agent": config.user_agent},
+            limits=httpx.Limits(max_keepalive_connections=self.max_concurrency),
+        ) as client:
+
+            async def run(query: str) -> None:
+                async with semaphore:
+                    results[query] = await self._fetch(client, bucket, query)
+
+            await asyncio.gather(*(run(query) for query in pending))
+        return results
+
+    async def _fetch(
+        self, client: httpx.AsyncClient, bucket: TokenBucket, query: str
+    ) -> Optional[GeocodeResult]:
+        params = search_params(
+            query, country_codes=self.country_codes, limit=self.limit
+        )
+        for attempt in range(self.max_retries + 1):
+            await bucket.acquire()
+            delay = self.retry_backoff_seconds * (2**attempt)
+            try:
+                response = await client.get(
+                    settings.geocoding.nominatim_url, params=params
+                )
+                response.raise_for_status()
+                items = response.json()
+            except httpx.HTTPStatusError as exc:
+                status_code = exc.response.status_code
+                if status_code in _RETRY_STATUSES and attempt < self.max_retries:
+                    retry_after = exc.response.headers.get("Retry-After", "")
+                    if retry_after.isdigit():
+                        delay = max(delay, float(retry_after))
+                    await asyncio.sleep(delay)
+                    continue
+                return self._failed(query, exc)
+            except httpx.TransportError as exc:
+                if attempt < self.max_retries:
+                    await asyncio.sleep(delay)
+                    continue
+                return self._failed(query, exc)
+            except ValueError as exc:
+                return self._failed(query, exc)
+
+            result = parse_search_response(query, items)
+            store_result(
+                query, result, country_codes=self.country_codes, limit=self.limit
+            )
+            self.stats.fetched += 1
+            if result is None:
+                self.stats.not_found += 1
+            return result
+        return None
+
+    def _failed(self, query: str, exc: Exception) -> None:
+        logger.warning("Geocoding %r failed: %s", query, exc)
+        self.stats.failed += 1
+        return None
+
+
+def geocode_many(
+    queries: Iterable[str], **kwargs
+) -> tuple[Dict[str, Optional[GeocodeResult]], BatchGeocodeStats]:
+    """Run :class:`BatchGeocoder` from synchronous code (no running event loop)."""
+    geocoder = BatchGeocoder(**kwargs)
+    results = asyncio.run(geocoder.geocode_many(queries))
+    return results, geocoder.stats
@@ -0,0 +1,95 @@
+"""SQLite-backed cache of Nominatim lookups keyed by normalised query."""
+
+from __future__ import annotations
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS geocode_cache (
+    query_key TEXT PRIMARY KEY,
+    query TEXT NOT NULL,
+    result_json TEXT,
+    fetched_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+)
+"""
+
+_DAY = 86400.0
+
+
+def normalize_query(query: str) -> str:
+    """Cache key for a query: case-folded, single-spaced, tidy commas."""
+    text = re.sub(r"\s+", " ", (query or "").strip()).casefold()
+    return re.sub(r"\s*,\s*", ", ", text)
+
+
+class GeocodeCache:
+    """Geocode results (and misses) as JSON dicts, safe to share between threads.
+
+    ``get`` returns ``(hit, payload)``: ``(True, None)`` is a cached miss, which
+    is kept for ``negative_ttl_days`` so re-runs do not ask Nominatim again for
+    names it could not find.
+    """
+
+    def __init__(
+        self,
+        path: Path | str,
+        *,
+        ttl_days: float = 180,
+        negative_ttl_days: float = 14,
+    ):
+        self.path = Path(path)
+        self.ttl = ttl_days * _DAY
+        self.negative_ttl = negative_ttl_days * _DAY
+        self._lock = threading.Lock()
+        if str(path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            str(path), check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute(_SCHEMA)
+
+    def get(self, query: str) -> Tuple[bool, Optional[dict]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result_json, expires_at FROM geocode_cache WHERE query_key = ?",
+                (normalize_query(query),),
+            ).fetchone()
+        if row is None or row[1] < time.time():
+            return False, None
+        if row[0] is None:
+            return True, None
+        return True, json.loads(row[0])
+
+    def put(self, query: str, result: Optional[dict]) -> None:
+        now = time.time()
+        ttl = self.ttl if result is not None else self.negative_ttl
+        if ttl <= 0:
+            return
+        payload = json.dumps(result) if result is not None else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO geocode_cache "
+                "(query_key, query, result_json, fetched_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (normalize_query(query), query, payload, now, now + ttl),
+            )
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM geocode_cache WHERE expires_at < ?", (time.time(),)
+            )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -5,7 +5,7 @@ from __future__ import annotations
 import csv
 import io
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
 from enum import Enum
 from pathlib import Path
@@ -33,7 +33,11 @@ from apps.vndmanuf_sales.services.customer_mapping import (
     names_refer_to_same_entity,
     normalize_customer_key,
 )
-from apps.vndmanuf_sales.services.pricing import PriceResolution, PricingService
+from apps.vndmanuf_sales.services.pricing import (
+    PriceComputationError,
+    PriceResolution,
+    PricingService,
+)
 from apps.vndmanuf_sales.services.totals import TotalsService
 
 SALES_REQUIRED_COLUMNS = {
@@ -814,16 +818,26 @@ class SalesCSVImporter:
     ) -> int:
         if order.lines:
             order.lines.clear()
-        count = 0
-        for row in rows:
-            product = self._lookup_product(
-                row.product_code, description=row.raw.get("description")
+        priced_rows = [
+            (
+                row,
+                self._lookup_product(
+                    row.product_code, description=row.raw.get("description")
+                ),
             )
+            for row in rows
+        ]
+        prefetched = self._prefetch_prices(
+            priced_rows, pricebook_id=pricebook_id, customer_id=order.customer_id
+        )
+        count = 0
+        for row, product in priced_rows:
             resolution = self._resolve_price(
                 product_id=product.id,
                 row=row,
                 pricebook_id=pricebook_id,
                 customer_id=order.customer_id,
+                prefetched=prefetched,
             )
             line_totals = self.totals.compute_line_totals(
                 qty=row.qty,
@@ -1024,6 +1038,37 @@ class SalesCSVImporter:
             raise ValueError(f"Product with code '{code}' not found")
         return product
 
+    def _prefetch_prices(
+        self,
+        priced_rows: List[Tuple[ImportRow, Product]],
+        *,
+        pricebook_id: Optional[str],
+        customer_id: Optional[str],
+    ) -> Dict[Tuple[date, str], PriceResolution]:
+        """Batch-resolve lines without CSV prices, one lookup per order date.
+
+        Lines the batch cannot price are left out so ``_resolve_price`` reports
+        them individually.
+        """
+        by_date: Dict[date, list] = {}
+        for row, product in priced_rows:
+            if not (row.unit_price_ex_gst or row.unit_price_inc_gst):
+                by_date.setdefault(row.order_date.date(), []).append(product.id)
+        prefetched: Dict[Tuple[date, str], PriceResolution] = {}
+        for order_date, product_ids in by_date.items():
+            try:
+                resolved = self.pricing.resolve_prices(
+                    product_ids,
+                    order_date=order_date,
+                    pricebook_id=pricebook_id,
+                    customer_id=customer_id,
+                )
+            except PriceComputationError:
+                continue
+            for product_id, resolution in resolved.items():
+                prefetched[(order_date, product_id)] = resolution
+        return prefetched
+
     def _resolve_price(
         self,
         *,
@@ -1031,6 +1076,7 @@ class SalesCSVImporter:
         row: ImportRow,
         pricebook_id: Optional[str],
         customer_id: Optional[str],
+        prefetched: Optional[Dict[Tuple[date, str], PriceResolution]] = None,
     ) -> PriceResolution:
         if row.unit_price_ex_gst or row.unit_price_inc_gst:
             ex_price = row.unit_price_ex_gst
@@ -1047,6 +1093,9 @@ class SalesCSVImporter:
                 source="csv_override",
             )
 
+        resolution = (prefetched or {}).get((row.order_date.date(), str(product_id)))
+        if resolution:
+            return resolution
         return self.pricing.resolve_price(
             product_id,
             order_date=row.order_date.date(),
@@ -2,15 +2,19 @@
 
 from __future__ import annotations
 
+import threading
+import time
+import weakref
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import date, datetime
 from decimal import ROUND_HALF_UP, Decimal
-from typing import Optional, Tuple
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
 
-from sqlalchemy import and_, or_, select
+from sqlalchemy import and_, event, inspect, or_, select
 from sqlalchemy.orm import Session
 
-from app.adapters.db.models import Product
+from app.adapters.db.models import Contact, CustomerPrice, Product
 from app.settings import settings
 from apps.vndmanuf_sales.models import (
     Customer,
@@ -49,6 +53,127 @@ class PriceComputationError(RuntimeError):
     """Raised when pricing cannot be resolved."""
 
 
+# Columns whose change can move a resolved price, per model. ``None`` means
+# any change to the row counts.
+_PRICE_TRACKED_ATTRS: Dict[type, Optional[Tuple[str, ...]]] = {
+    Pricebook: None,
+    PricebookItem: None,
+    CustomerPrice: None,
+    Product: tuple(
+        column.key
+        for column in Product.__table__.columns
+        if column.key.endswith(("_price_ex_gst", "_price_inc_gst"))
+    )
+    + ("deleted_at",),
+    Customer: ("tax_rate", "customer_type", "contact_id"),
+    Contact: ("default_pricing_level",),
+}
+
+_PRICES_DIRTY = "vndmanuf_sales.prices_dirty"
+
+
+class PriceCache:
+    """Versioned in-process LRU of resolved prices, one per database engine.
+
+    Any flush that touches pricebooks, customer special prices, customer tax or
+    tier settings or product price columns bumps the version and drops every
+    entry; it is bumped again when that transaction ends, so values read
+    while the change was uncommitted never outlive it. Sessions holding
+    flushed-but-uncommitted price changes bypass the cache altogether.
+
+    Those events only fire in this process, so entries also expire after
+    ``business.price_cache_ttl_seconds``; that bounds how long a price changed
+    by another worker can be served stale.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._version = 0
+        self._entries: "weakref.WeakKeyDictionary[Any, OrderedDict]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+
+    def enabled(self, db: Session) -> bool:
+        return settings.business.price_cache_size > 0 and not db.info.get(_PRICES_DIRTY)
+
+    def get(self, db: Session, key: Hashable) -> Any:
+        with self._lock:
+            entries = self._entries.get(db.get_bind().engine)
+            if entries is None or key not in entries:
+                return None
+            value, expires_at = entries[key]
+            if expires_at <= time.monotonic():
+                del entries[key]
+                return None
+            entries.move_to_end(key)
+            return value
+
+    def put(self, db: Session, key: Hashable, value: Any, version: int) -> None:
+        """Store ``value`` unless prices changed since ``version`` was read."""
+        max_entries = settings.business.price_cache_size
+        expires_at = time.monotonic() + settings.business.price_cache_ttl_seconds
+        with self._lock:
+            if version != self._version:
+                return
+            entries = self._entries.setdefault(db.get_bind().engine, OrderedDict())
+            entries[key] = (value, expires_at)
+            entries.move_to_end(key)
+            while len(entries) > max_entries:
+                entries.popitem(last=False)
+
+
+price_cache = PriceCache()
+
+
+def invalidate_price_cache() -> None:
+    """Drop cached prices, e.g. after bulk SQL that bypasses the ORM."""
+    price_cache.invalidate()
+
+
+def _touches_prices(session: Session) -> bool:
+    # New products, customers or contacts cannot have cached prices yet.
+    for obj in session.new:
+        if (
+            type(obj) in _PRICE_TRACKED_ATTRS
+            and _PRICE_TRACKED_ATTRS[type(obj)] is None
+        ):
+            return True
+    for obj in session.deleted:
+        if type(obj) in _PRICE_TRACKED_ATTRS:
+            return True
+    for obj in session.dirty:
+        attrs = _PRICE_TRACKED_ATTRS.get(type(obj), ())
+        if attrs is None:
+            return True
+        state = inspect(obj)
+        if any(state.attrs[attr].history.has_changes() for attr in attrs):
+            return True
+    return False
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_prices_on_flush(session: Session, flush_context) -> None:
+    if _touches_prices(session):
+        session.info[_PRICES_DIRTY] = True
+        price_cache.invalidate()
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _invalidate_prices_on_end(session: Session) -> None:
+    if session.info.pop(_PRICES_DIRTY, False):
+        price_cache.invalidate()
+
+
 class PricingService:
     """Resolve pricing for sales orders using pricebooks and customer defaults."""
 
@@ -79,60 +204,93 @@ class PricingService:
             3. Customer channel defaults (future extension hook)
             4. Product fallback pricing (retail/wholesale fields) if available
         """
-        product = self._get_product(product_id)
+        return self.resolve_prices(
+            [product_id],
+            order_date=order_date,
+            pricebook_id=pricebook_id,
+            customer_id=customer_id,
+            override_gst_rate=override_gst_rate,
+        )[str(product_id)]
+
+    def resolve_prices(
+        self,
+        product_ids: Iterable[str],
+        *,
+        order_date: Optional[date] = None,
+        pricebook_id: Optional[str] = None,
+        customer_id: Optional[str] = None,
+        override_gst_rate: Optional[Decimal] = None,
+    ) -> Dict[str, PriceResolution]:
+        """
+        Resolve many products at once, keyed by ``str(product_id)``.
+
+        Same precedence as :meth:`resolve_price`, answered from
+        :data:`price_cache` where possible and otherwise with a fixed number
+        of queries however many products are asked for. Products that cannot
+        be priced raise one PriceComputationError naming all of them; the
+        others are still cached.
+        """
+        ids = {str(pid): pid for pid in product_ids if pid}
+        order_date = order_date or datetime.utcnow().date()
+        override = _dec(override_gst_rate)
+        use_cache = price_cache.enabled(self.db)
+        version = price_cache.version
+
+        def cache_key(pid: str) -> tuple:
+            return (
+                "pricebook",
+                pid,
+                order_date,
+                str(pricebook_id) if pricebook_id else None,
+                str(customer_id) if customer_id else None,
+                override,
+                self.default_gst_rate,
+            )
+
+        resolved: Dict[str, PriceResolution] = {}
+        pending = []
+        for key, pid in ids.items():
+            hit = price_cache.get(self.db, cache_key(key)) if use_cache else None
+            if hit is None:
+                pending.append(pid)
+            else:
+                resolved[key] = hit
+        if not pending:
+            return resolved
+
+        products = self._get_products(pending)
         gst_rate = (
-            _dec(override_gst_rate)
+            override
             or (self._get_customer_tax_rate(customer_id) if customer_id else None)
             or self.default_gst_rate
         )
 
-        order_date = order_date or datetime.utcnow().date()
-
         # Step 1 / 2 - pricebook pricing
-        pricebook_item, resolved_pricebook_id = self._resolve_pricebook_item(
-            product_id=product_id,
+        pricebook_items = self._resolve_pricebook_items(
+            product_ids=pending,
             order_date=order_date,
             pricebook_id=pricebook_id,
         )
-        if pricebook_item:
-            ex, inc = self._pair_prices(
-                pricebook_item.unit_price_ex_gst,
-                pricebook_item.unit_price_inc_gst,
-                gst_rate,
-            )
-            return PriceResolution(
-                unit_price_ex_gst=ex,
-                unit_price_inc_gst=inc,
-                gst_rate=gst_rate,
-                source="pricebook_item",
-                pricebook_id=resolved_pricebook_id,
-            )
 
-        # Step 4 - product fallback
-        ex = (
-            _dec(product.retail_price_ex_gst)
-            or _dec(product.wholesale_price_ex_gst)
-            or _dec(product.distributor_price_ex_gst)
-        )
-        inc = (
-            _dec(product.retail_price_inc_gst)
-            or _dec(product.wholesale_price_inc_gst)
-            or _dec(product.distributor_price_inc_gst)
-        )
-        if ex is not None or inc is not None:
-            ex_val, inc_val = self._pair_prices(ex, inc, gst_rate)
-            return PriceResolution(
-                unit_price_ex_gst=ex_val,
-                unit_price_inc_gst=inc_val,
-                gst_rate=gst_rate,
-                source="product_fallback",
-                pricebook_id=None,
+        unpriced = []
+        for pid in pending:
+            key = str(pid)
+            resolution = self._resolve_one(
+                products[key], pricebook_items.get(key), gst_rate
             )
-
-        raise PriceComputationError(
-            f"Unable to resolve pricing for product {product_id}. "
-            "No pricebook item or fallback price available."
-        )
+            if resolution is None:
+                unpriced.append(key)
+                continue
+            resolved[key] = resolution
+            if use_cache:
+                price_cache.put(self.db, cache_key(key), resolution, version)
+
+        if unpriced:
+            raise PriceComputationError(
+                f"Unable to resolve pricing for product {', '.join(unpriced)}. "
+                "No pricebook item or fallback price available."
+            )
+        return resolved
 
     def compute_inc_gst(
         self,
@@ -151,11 +309,17 @@ class PricingService:
     # ------------------------------------------------------------------ #
     # Internal helpers
     # ------------------------------------------------------------------ #
-    def _get_product(self, product_id: str) -> Product:
-        product = self.db.get(Product, product_id)
-        if not product:
-            raise PriceComputationError(f"Product {product_id} not found")
-        return product
+    def _get_products(self, product_ids: list) -> Dict[str, Product]:
+        products = {
+            str(product.id): product
+            for product in self.db.scalars(
+                select(Product).where(Product.id.in_(product_ids))
+            )
+        }
+        missing = [str(pid) for pid in product_ids if str(pid) not in products]
+        if missing:
+            raise PriceComputationError(f"Product {', '.join(missing)} not found")
+        return products
 
     def _get_customer_tax_rate(self, customer_id: str) -> Optional[Decimal]:
         customer = self.db.get(Customer, customer_id)
@@ -168,15 +332,15 @@ class PricingService:
             return _dec(customer.tax_rate)
         return _dec(customer.tax_rate) if customer.tax_rate is not None else None
 
-    def _resolve_pricebook_item(
+    def _resolve_pricebook_items(
         self,
         *,
-        product_id: str,
+        product_ids: list,
         order_date: date,
         pricebook_id: Optional[str],
-    ) -> Tuple[Optional[PricebookItem], Optional[str]]:
+    ) -> Dict[str, Tuple[PricebookItem, str]]:
         """
-        Return matching pricebook item and the pricebook_id used.
+        Return the matching pricebook item and pricebook_id used, per product.
         """
         query = select(PricebookItem, Pricebook.id.label("pb_id")).join(Pricebook)
 
@@ -190,16 +354,59 @@ class PricingService:
 
         query = query.where(
             and_(
-                PricebookItem.product_id == product_id,
+                PricebookItem.product_id.in_(product_ids),
                 Pricebook.deleted_at.is_(None),
                 PricebookItem.deleted_at.is_(None),
             )
         ).order_by(Pricebook.active_from.desc(), PricebookItem.updated_at.desc())
 
-        row = self.db.execute(query).first()
-        if row:
-            return row[0], row[1]
-        return None, None
+        matches: Dict[str, Tuple[PricebookItem, str]] = {}
+        for item, pb_id in self.db.execute(query):
+            matches.setdefault(str(item.product_id), (item, pb_id))
+        return matches
+
+    def _resolve_one(
+        self,
+        product: Product,
+        pricebook_match: Optional[Tuple[PricebookItem, str]],
+        gst_rate: Decimal,
+    ) -> Optional[PriceResolution]:
+        if pricebook_match:
+            pricebook_item, resolved_pricebook_id = pricebook_match
+            ex, inc = self._pair_prices(
+                pricebook_item.unit_price_ex_gst,
+                pricebook_item.unit_price_inc_gst,
+                gst_rate,
+            )
+            return PriceResolution(
+                unit_price_ex_gst=ex,
+                unit_price_inc_gst=inc,
+                gst_rate=gst_rate,
+                source="pricebook_item",
+                pricebook_id=resolved_pricebook_id,
+            )
+
+        # Step 4 - product fallback
+        ex = (
+            _dec(product.retail_price_ex_gst)
+            or _dec(product.wholesale_price_ex_gst)
+            or _dec(product.distributor_price_ex_gst)
+        )
+        inc = (
+            _dec(product.retail_price_inc_gst)
+            or _dec(product.wholesale_price_inc_gst)
+            or _dec(product.distributor_price_inc_gst)
+        )
+        if ex is None and inc is None:
+            return None
+        ex_val, inc_val = self._pair_prices(ex, inc, gst_rate)
+        return PriceResolution(
+            unit_price_ex_gst=ex_val,
+            unit_price_inc_gst=inc_val,
+            gst_rate=gst_rate,
+            source="product_fallback",
+            pricebook_id=None,
+        )
 
     def _pair_prices(
         self,
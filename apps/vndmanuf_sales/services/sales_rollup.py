@@ -0,0 +1,417 @@
+"""Daily sales rollup maintenance for analytics and the customer map."""
+
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import (
+    delete,
+    event,
+    func,
+    insert,
+    inspect,
+    literal_column,
+    select,
+    update,
+)
+from sqlalchemy.orm import Session
+
+from app.adapters.db.upsert import upsert
+from app.settings import settings
+from apps.vndmanuf_sales.models import (
+    SalesDailyOrderRollup,
+    SalesDailyRollup,
+    SalesOrder,
+    SalesOrderLine,
+    SalesOrderStatus,
+    SalesRollupState,
+)
+
+ROLLUP_NAME = "sales_daily"
+
+# SalesOrder attributes that change which rollup slice an order lands in or
+# what it contributes.
+_TRACKED_ORDER_ATTRS = (
+    "customer_id",
+    "order_date",
+    "status",
+    "deleted_at",
+    "archived_at",
+    "channel_id",
+    "pricebook_id",
+    "total_ex_gst",
+    "total_inc_gst",
+)
+
+_REFRESH_CHUNK = 500
+
+_LINE_COLUMNS = [
+    "day",
+    "customer_id",
+    "product_id",
+    "channel_id",
+    "pricebook_id",
+    "is_archived",
+    "order_count",
+    "qty",
+    "revenue_ex_gst",
+    "revenue_inc_gst",
+]
+
+_ORDER_COLUMNS = [
+    "day",
+    "customer_id",
+    "channel_id",
+    "pricebook_id",
+    "is_archived",
+    "order_count",
+    "total_ex_gst",
+    "total_inc_gst",
+    "last_order_at",
+]
+
+# Slice keys, matching the unique indexes on the rollup tables.
+_LINE_KEY = ("day", "customer_id", "product_id", "channel_id", "pricebook_id")
+_ORDER_KEY = ("day", "customer_id", "channel_id", "pricebook_id")
+
+
+def _day_start(d: date) -> datetime:
+    return datetime.combine(d, datetime.min.time())
+
+
+def _day_end(d: date) -> datetime:
+    return datetime.combine(d, datetime.max.time())
+
+
+def _source_filters(
+    customer_ids: Optional[list] = None,
+    start_day: Optional[date] = None,
+    end_day: Optional[date] = None,
+):
+    filters = [
+        SalesOrder.deleted_at.is_(None),
+        SalesOrder.status != SalesOrderStatus.CANCELLED.value,
+    ]
+    if customer_ids is not None:
+        filters.append(SalesOrder.customer_id.in_(customer_ids))
+    if start_day is not None:
+        filters.append(SalesOrder.order_date >= _day_start(start_day))
+    if end_day is not None:
+        filters.append(SalesOrder.order_date <= _day_end(end_day))
+    return filters
+
+
+def _line_rollup_select(**window):
+    day = func.date(SalesOrder.order_date)
+    is_archived = SalesOrder.archived_at.is_not(None)
+    return (
+        select(
+            day.label("day"),
+            SalesOrder.customer_id,
+            SalesOrderLine.product_id,
+            SalesOrder.channel_id,
+            SalesOrder.pricebook_id,
+            is_archived.label("is_archived"),
+            func.count(func.distinct(SalesOrder.id)),
+            func.coalesce(func.sum(SalesOrderLine.qty), 0),
+            func.coalesce(func.sum(SalesOrderLine.line_total_ex_gst), 0),
+            func.coalesce(func.sum(SalesOrderLine.line_total_inc_gst), 0),
+        )
+        .select_from(SalesOrderLine)
+        .join(SalesOrder, SalesOrder.id == SalesOrderLine.order_id)
+        .where(*_source_filters(**window), SalesOrderLine.deleted_at.is_(None))
+        .group_by(
+            day,
+            SalesOrder.customer_id,
+            SalesOrderLine.product_id,
+            SalesOrder.channel_id,
+            SalesOrder.pricebook_id,
+            is_archived,
+        )
+    )
+
+
+def _order_rollup_select(**window):
+    day = func.date(SalesOrder.order_date)
+    is_archived = SalesOrder.archived_at.is_not(None)
+    return (
+        select(
+            day.label("day"),
+            SalesOrder.customer_id,
+            SalesOrder.channel_id,
+            SalesOrder.pricebook_id,
+            is_archived.label("is_archived"),
+            func.count(SalesOrder.id),
+            func.coalesce(func.sum(SalesOrder.total_ex_gst), 0),
+            func.coalesce(func.sum(SalesOrder.total_inc_gst), 0),
+            func.max(SalesOrder.order_date),
+        )
+        .where(*_source_filters(**window))
+        .group_by(
+            day,
+            SalesOrder.customer_id,
+            SalesOrder.channel_id,
+            SalesOrder.pricebook_id,
+            is_archived,
+        )
+    )
+
+
+def _latest_source_update(bind, exclude_order_ids=None) -> Optional[datetime]:
+    stmt = select(func.max(SalesOrder.updated_at))
+    if exclude_order_ids:
+        stmt = stmt.where(SalesOrder.id.not_in(list(exclude_order_ids)))
+    return bind.execute(stmt).scalar_one_or_none()
+
+
+def _write_state(bind, *, rebuilt: bool, covered_order_ids=None) -> None:
+    """Record a refresh and, when it is safe, advance the source watermark.
+
+    A rebuild covers every order. An incremental refresh only covers the
+    orders it was given, so the watermark moves only if no other order changed
+    since it was set; otherwise a write the listener never saw (bulk insert,
+    raw SQL, another process) would be marked fresh and never rebuilt.
+    """
+    table = SalesRollupState.__table__
+    now = datetime.utcnow()
+    values = {"refreshed_at": now}
+    state = bind.execute(
+        select(table.c.source_watermark).where(table.c.name == ROLLUP_NAME)
+    ).first()
+    if rebuilt:
+        values["rebuilt_at"] = now
+        values["source_watermark"] = _latest_source_update(bind)
+    elif state is not None and covered_order_ids:
+        watermark = state.source_watermark
+        others = _latest_source_update(bind, covered_order_ids)
+        if others is None or (watermark is not None and others <= watermark):
+            values["source_watermark"] = _latest_source_update(bind)
+    if state is not None:
+        bind.execute(update(table).where(table.c.name == ROLLUP_NAME).values(values))
+    elif rebuilt:
+        bind.execute(insert(table).values(name=ROLLUP_NAME, **values))
+
+
+def rebuild_sales_rollup(bind) -> dict:
+    """Rebuild both daily rollup tables from scratch and reset the watermark."""
+    line_table = SalesDailyRollup.__table__
+    order_table = SalesDailyOrderRollup.__table__
+    bind.execute(delete(line_table))
+    bind.execute(delete(order_table))
+    bind.execute(insert(line_table).from_select(_LINE_COLUMNS, _line_rollup_select()))
+    bind.execute(
+        insert(order_table).from_select(_ORDER_COLUMNS, _order_rollup_select())
+    )
+    _write_state(bind, rebuilt=True)
+    return {
+        "line_rows": bind.execute(
+            select(func.count()).select_from(line_table)
+        ).scalar_one(),
+        "order_rows": bind.execute(
+            select(func.count()).select_from(order_table)
+        ).scalar_one(),
+    }
+
+
+def _slice_key(table, *names) -> list:
+    """Columns of a rollup slice key, matching its unique index."""
+    key = []
+    for name in names:
+        column = table.c[name]
+        if name in ("channel_id", "pricebook_id"):
+            column = func.coalesce(column, literal_column("''"))
+        key.append(column)
+    return key
+
+
+def _refresh_slices(bind, table, columns, key_names, source, chunk, start_day, end_day):
+    """Upsert ``source`` into ``table`` and drop window rows it no longer yields."""
+    key_names = (*key_names, "is_archived")
+    upsert(
+        bind,
+        table,
+        _slice_key(table, *key_names),
+        columns=columns,
+        select=source,
+    )
+    src = source.subquery()
+    still_present = (
+        select(literal_column("1"))
+        .select_from(src)
+        .where(*(src.c[name].is_not_distinct_from(table.c[name]) for name in key_names))
+    )
+    bind.execute(
+        delete(table).where(
+            table.c.customer_id.in_(chunk),
+            table.c.day >= start_day,
+            table.c.day <= end_day,
+            ~still_present.exists(),
+        )
+    )
+
+
+def refresh_sales_rollup(
+    bind,
+    customer_ids: Iterable[str],
+    start_day: date,
+    end_day: date,
+    covered_order_ids: Optional[Iterable[str]] = None,
+) -> int:
+    """Recompute rollup rows for ``customer_ids`` between two days (inclusive).
+
+    Slices are upserted, so concurrent refreshes of one customer do not
+    collide. ``covered_order_ids`` are the orders whose changes prompted the
+    refresh; the freshness watermark advances only when they account for
+    every change since it was last set. Returns the number of customers
+    refreshed.
+    """
+    line_table = SalesDailyRollup.__table__
+    order_table = SalesDailyOrderRollup.__table__
+    ids = sorted({cid for cid in customer_ids if cid})
+    for i in range(0, len(ids), _REFRESH_CHUNK):
+        chunk = ids[i : i + _REFRESH_CHUNK]
+        window = {"customer_ids": chunk, "start_day": start_day, "end_day": end_day}
+        _refresh_slices(
+            bind,
+            line_table,
+            _LINE_COLUMNS,
+            _LINE_KEY,
+            _line_rollup_select(**window),
+            chunk,
+            start_day,
+            end_day,
+        )
+        _refresh_slices(
+            bind,
+            order_table,
+            _ORDER_COLUMNS,
+            _ORDER_KEY,
+            _order_rollup_select(**window),
+            chunk,
+            start_day,
+            end_day,
+        )
+    if ids:
+        _write_state(
+            bind,
+            rebuilt=False,
+            covered_order_ids=set(covered_order_ids or ()),
+        )
+    return len(ids)
+
+
+def rollup_status(db: Session) -> dict:
+    """Describe the rollup watermark against the latest sales order change."""
+    table = SalesRollupState.__table__
+    # Core read: the state row is written through the connection, not the ORM.
+    state = db.execute(select(table).where(table.c.name == ROLLUP_NAME)).first()
+    latest = _latest_source_update(db)
+    watermark = state.source_watermark if state else None
+    fresh = state is not None and (
+        latest is None or (watermark is not None and watermark >= latest)
+    )
+    return {
+        "name": ROLLUP_NAME,
+        "rebuilt_at": state.rebuilt_at if state else None,
+        "refreshed_at": state.refreshed_at if state else None,
+        "source_watermark": watermark,
+        "latest_source_update": latest,
+        "fresh": fresh,
+    }
+
+
+def rollup_is_fresh(db: Session) -> bool:
+    return rollup_status(db)["fresh"]
+
+
+def use_sales_rollup(db: Session) -> bool:
+    """True when dashboards should read from the daily rollup tables."""
+    if not settings.sales_analytics.daily_rollup_enabled:
+        return False
+    return rollup_is_fresh(db)
+
+
+def _affected_slices(session: Session) -> tuple[set, set]:
+    """Collect ``(customer_id, order_date)`` slices touched by this flush.
+
+    Returns known slices plus order ids whose current slice must be read back.
+    """
+    slices = set()
+    order_ids = set()
+    for obj in session.deleted:
+        if isinstance(obj, SalesOrder):
+            slices.add((obj.customer_id, obj.order_date))
+        elif isinstance(obj, SalesOrderLine):
+            order_ids.add(obj.order_id)
+    for obj in session.new:
+        if isinstance(obj, SalesOrder):
+            order_ids.add(obj.id)
+        elif isinstance(obj, SalesOrderLine):
+            order_ids.add(obj.order_id)
+    for obj in session.dirty:
+        if isinstance(obj, SalesOrderLine):
+            if session.is_modified(obj, include_collections=False):
+                order_ids.add(obj.order_id)
+                order_ids.update(inspect(obj).attrs["order_id"].history.deleted)
+            continue
+        if not isinstance(obj, SalesOrder):
+            continue
+        state = inspect(obj)
+        if not any(
+            state.attrs[attr].history.has_changes() for attr in _TRACKED_ORDER_ATTRS
+        ):
+            continue
+        order_ids.add(obj.id)
+        old_customers = state.attrs["customer_id"].history.deleted or [obj.customer_id]
+        old_dates = state.attrs["order_date"].history.deleted or [obj.order_date]
+        for cid in old_customers:
+            for when in old_dates:
+                slices.add((cid, when))
+    order_ids.discard(None)
+    return slices, order_ids
+
+
+def _written_order_ids(session: Session) -> set:
+    """Ids of sales orders this flush inserted or updated (moving updated_at)."""
+    written = {obj.id for obj in session.new if isinstance(obj, SalesOrder)}
+    written.update(
+        obj.id
+        for obj in session.dirty
+        if isinstance(obj, SalesOrder)
+        and session.is_modified(obj, include_collections=False)
+    )
+    written.discard(None)
+    return written
+
+
+@event.listens_for(Session, "after_flush")
+def _maintain_sales_rollup(session: Session, flush_context) -> None:
+    """Refresh the rollup slices touched by a flush inside the same transaction."""
+    if not settings.sales_analytics.daily_rollup_enabled:
+        return
+    slices, order_ids = _affected_slices(session)
+    written = _written_order_ids(session)
+    if order_ids:
+        conn = session.connection()
+        ids = list(order_ids)
+        for i in range(0, len(ids), _REFRESH_CHUNK):
+            rows = conn.execute(
+                select(SalesOrder.customer_id, SalesOrder.order_date).where(
+                    SalesOrder.id.in_(ids[i : i + _REFRESH_CHUNK])
+                )
+            ).all()
+            slices.update((row.customer_id, row.order_date) for row in rows)
+    days = [when.date() for _, when in slices if when is not None]
+    if not days:
+        if written:
+            # Orders changed without moving any slice; keep the watermark level.
+            _write_state(session.connection(), rebuilt=False, covered_order_ids=written)
+        return
+    refresh_sales_rollup(
+        session.connection(),
+        {cid for cid, _ in slices},
+        min(days),
+        max(days),
+        covered_order_ids=written,
+    )
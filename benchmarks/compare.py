@@ -0,0 +1,96 @@
+"""Compare a pytest-benchmark JSON run against a stored baseline.
+
+Usage:
+    python -m benchmarks.compare benchmarks/results/current.json \
+        --baseline benchmarks/results/baseline.json --tolerance 0.25
+
+Exits 1 when any benchmark's median is more than ``tolerance`` slower than
+its baseline. With no baseline file it prints a hint and exits 0, so CI can
+run the suite before a baseline has been recorded on that machine.
+"""
+
+import argparse
+import json
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+DEFAULT_BASELINE = Path(__file__).parent / "results" / "baseline.json"
+
+
+@dataclass
+class Comparison:
+    name: str
+    baseline: Optional[float]
+    current: float
+
+    @property
+    def ratio(self) -> Optional[float]:
+        if not self.baseline:
+            return None
+        return self.current / self.baseline
+
+    def regressed(self, tolerance: float) -> bool:
+        return self.ratio is not None and self.ratio > 1 + tolerance
+
+
+def load_medians(path: Path) -> Dict[str, float]:
+    """Median seconds per benchmark, keyed by its full pytest node id."""
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    return {
+        bench.get("fullname") or bench["name"]: float(bench["stats"]["median"])
+        for bench in data.get("benchmarks", [])
+    }
+
+
+def compare(current: Dict[str, float], baseline: Dict[str, float]) -> List[Comparison]:
+    return [
+        Comparison(name=name, baseline=baseline.get(name), current=median)
+        for name, median in sorted(current.items())
+    ]
+
+
+def _format(row: Comparison, tolerance: float) -> str:
+    if row.ratio is None:
+        change, flag = "new", ""
+    else:
+        change = f"{(row.ratio - 1) * 100:+.1f}%"
+        flag = "  REGRESSION" if row.regressed(tolerance) else ""
+    baseline = f"{row.baseline * 1000:10.2f}" if row.baseline else f"{'-':>10}"
+    return f"{baseline} {row.current * 1000:10.2f} {change:>8}  {row.name}{flag}"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("current", type=Path, help="pytest --benchmark-json output")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown of the median as a fraction (default 0.25)",
+    )
+    args = parser.parse_args(argv)
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; record one with `make bench-baseline`.")
+        return 0
+
+    rows = compare(load_medians(args.current), load_medians(args.baseline))
+    print(f"{'base ms':>10} {'now ms':>10} {'change':>8}  benchmark")
+    for row in rows:
+        print(_format(row, args.tolerance))
+
+    regressions = [row for row in rows if row.regressed(args.tolerance)]
+    if regressions:
+        print(
+            f"{len(regressions)} benchmark(s) slower than baseline by more than "
+            f"{args.tolerance:.0%}"
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
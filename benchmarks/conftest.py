@@ -0,0 +1,74 @@
+"""Fixtures for the performance suite: one synthetic database per run.
+
+BENCH_SCALE (default 0.1) scales every volume in ``synthetic.Volumes``; use
+BENCH_SCALE=1 for production-sized data. BENCH_SEED changes the data set.
+"""
+
+import os
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.adapters.db import Base
+from app.adapters.db.session import get_engine
+from apps.competitor_intel.app.models import Base as CompetitorBase
+from benchmarks.synthetic import Volumes, generate_competitor, generate_manufacturing
+
+
+@pytest.fixture(scope="session")
+def volumes() -> Volumes:
+    return Volumes().scaled(float(os.getenv("BENCH_SCALE", "0.1")))
+
+
+@pytest.fixture(scope="session")
+def seed() -> int:
+    return int(os.getenv("BENCH_SEED", "42"))
+
+
+@pytest.fixture(scope="session")
+def mfg_engine(tmp_path_factory):
+    engine = get_engine(url=f"sqlite:///{tmp_path_factory.mktemp('bench') / 'mfg.db'}")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def mfg_data(mfg_engine, volumes, seed):
+    session = sessionmaker(bind=mfg_engine)()
+    try:
+        return generate_manufacturing(session, volumes, seed)
+    finally:
+        session.close()
+
+
+@pytest.fixture()
+def mfg_session(mfg_engine, mfg_data):
+    """Session on the synthetic database; anything a benchmark writes is rolled back."""
+    session = sessionmaker(bind=mfg_engine)()
+    yield session
+    session.rollback()
+    session.close()
+
+
+@pytest.fixture(scope="session")
+def competitor_engine(tmp_path_factory, volumes, seed):
+    engine = get_engine(
+        url=f"sqlite:///{tmp_path_factory.mktemp('bench') / 'competitor.db'}"
+    )
+    CompetitorBase.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        generate_competitor(session, volumes, seed)
+    finally:
+        session.close()
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture()
+def competitor_session(competitor_engine):
+    session = sessionmaker(bind=competitor_engine)()
+    yield session
+    session.rollback()
+    session.close()
@@ -0,0 +1,432 @@
+"""Seeded synthetic data for the performance suite.
+
+``Volumes()`` matches a large production site: 10k products, 200k inventory lots
+and transactions, 500k sales order lines, three-level assemblies and 100k
+competitor price observations. ``Volumes().scaled(f)`` shrinks every count for
+quicker runs. Rows are bulk-inserted with explicit ids, so the same seed and
+scale always build the same database.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import uuid
+from dataclasses import dataclass, field, fields, replace
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from random import Random
+from typing import Iterable, List
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.adapters.db.models import (
+    Customer,
+    DeliveryDocket,
+    DeliveryDocketLine,
+    InventoryLot,
+    InventoryTxn,
+    Product,
+    SalesChannel,
+    SalesOrder,
+    SalesOrderLine,
+)
+from app.adapters.db.models_assemblies_shopify import Assembly, AssemblyLine
+from apps.competitor_intel.app import models as ci
+from apps.competitor_intel.app.models.product import PRODUCT_CATEGORIES
+
+CHUNK = 5000
+START = datetime(2024, 7, 1)
+DAYS = 730
+CHANNELS = ("RETAIL", "WHOLESALE", "ONLINE", "DIRECT")
+STATES = ("NSW", "VIC", "QLD", "SA", "WA", "TAS")
+SUBURBS = ("Richmond", "Fitzroy", "Newtown", "Paddington", "Subiaco", "Glenelg")
+
+
+@dataclass(frozen=True)
+class Volumes:
+    products: int = 10_000
+    lots: int = 200_000
+    customers: int = 2_000
+    order_lines: int = 500_000
+    lines_per_order: int = 5
+    dockets: int = 2_000
+    competitor_skus: int = 600
+    observations: int = 100_000
+
+    def scaled(self, factor: float) -> "Volumes":
+        counts = {
+            f.name: max(1, int(getattr(self, f.name) * factor))
+            for f in fields(self)
+            if f.name != "lines_per_order"
+        }
+        # Keep enough products for every tier of the assembly graph.
+        counts["products"] = max(counts["products"], 20)
+        return replace(self, **counts)
+
+
+@dataclass
+class ManufacturingData:
+    raw_ids: List[str] = field(default_factory=list)
+    wip_ids: List[str] = field(default_factory=list)
+    finished_ids: List[str] = field(default_factory=list)
+    finished_skus: List[str] = field(default_factory=list)
+    customer_ids: List[str] = field(default_factory=list)
+    customer_names: List[str] = field(default_factory=list)
+    docket_ids: List[str] = field(default_factory=list)
+    lot_product_id: str = ""
+    lot_product_qty: Decimal = Decimal("0")
+    start: datetime = START
+    end: datetime = START + timedelta(days=DAYS)
+
+
+def _id(rng: Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _money(value: float) -> Decimal:
+    return Decimal(str(round(value, 2)))
+
+
+def _bulk(session: Session, model, rows: Iterable[dict]) -> None:
+    batch: List[dict] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= CHUNK:
+            session.execute(insert(model), batch)
+            batch = []
+    if batch:
+        session.execute(insert(model), batch)
+
+
+def generate_manufacturing(
+    session: Session, volumes: Volumes = Volumes(), seed: int = 42
+) -> ManufacturingData:
+    """Products, lots, assemblies, customers, orders and dockets in the main schema."""
+    rng = Random(seed)
+    data = ManufacturingData()
+
+    n_raw = int(volumes.products * 0.6)
+    n_wip = int(volumes.products * 0.15)
+    products = []
+    for i in range(volumes.products):
+        tier = "RAW" if i < n_raw else "WIP" if i < n_raw + n_wip else "FINISHED"
+        pid = _id(rng)
+        cost = rng.uniform(0.5, 60)
+        products.append(
+            {
+                "id": pid,
+                "sku": f"SYN-{i:06d}",
+                "name": f"{tier.title()} item {i}",
+                "product_type": tier,
+                "base_unit": "KG" if tier == "RAW" else "EA",
+                "is_purchase": tier == "RAW",
+                "is_assemble": tier != "RAW",
+                "is_sell": tier == "FINISHED",
+                "sellable": tier == "FINISHED",
+                "standard_cost": _money(cost),
+                "purchase_cost_ex_gst": _money(cost),
+                "retail_price_ex_gst": _money(cost * 2.5),
+                "retail_price_inc_gst": _money(cost * 2.75),
+            }
+        )
+        {"RAW": data.raw_ids, "WIP": data.wip_ids, "FINISHED": data.finished_ids}[
+            tier
+        ].append(pid)
+        if tier == "FINISHED":
+            data.finished_skus.append(products[-1]["sku"])
+    _bulk(session, Product, products)
+
+    # Three-level BOM: finished goods from WIP + raw, WIP from raw.
+    assemblies, lines = [], []
+    for parent_ids, pools in (
+        (data.wip_ids, (data.raw_ids,)),
+        (data.finished_ids, (data.wip_ids, data.raw_ids)),
+    ):
+        for parent in parent_ids:
+            aid = _id(rng)
+            assemblies.append(
+                {
+                    "id": aid,
+                    "parent_product_id": parent,
+                    "assembly_code": f"ASM-{len(assemblies):06d}",
+                    "assembly_name": "Synthetic assembly",
+                    "is_active": True,
+                    "is_primary": True,
+                }
+            )
+            components = {rng.choice(pool) for pool in pools for _ in range(2)}
+            for seq, component in enumerate(sorted(components), start=1):
+                lines.append(
+                    {
+                        "id": _id(rng),
+                        "assembly_id": aid,
+                        "component_product_id": component,
+                        "quantity": Decimal(str(round(rng.uniform(0.1, 5), 3))),
+                        "sequence": seq,
+                    }
+                )
+    _bulk(session, Assembly, assemblies)
+    _bulk(session, AssemblyLine, lines)
+
+    # Lots are skewed: one hot raw material carries ~1% of them for FIFO benches.
+    stocked = data.raw_ids + data.wip_ids
+    data.lot_product_id = stocked[0]
+    hot_lots = max(1, volumes.lots // 100)
+    lot_rows, txn_rows = [], []
+    for i in range(volumes.lots):
+        product_id = data.lot_product_id if i < hot_lots else rng.choice(stocked)
+        qty = Decimal(str(round(rng.uniform(1, 500), 3)))
+        cost = _money(rng.uniform(0.5, 60))
+        received = START + timedelta(minutes=rng.randrange(DAYS * 24 * 60))
+        lot_id = _id(rng)
+        if product_id == data.lot_product_id:
+            data.lot_product_qty += qty
+        lot_rows.append(
+            {
+                "id": lot_id,
+                "product_id": product_id,
+                "lot_code": f"L{i:07d}",
+                "quantity_kg": qty,
+                "unit_cost": cost,
+                "original_unit_cost": cost,
+                "current_unit_cost": cost,
+                "received_at": received,
+                "is_active": True,
+            }
+        )
+        txn_rows.append(
+            {
+                "id": _id(rng),
+                "lot_id": lot_id,
+                "transaction_type": "RECEIPT",
+                "quantity_kg": qty,
+                "unit_cost": cost,
+                "extended_cost": _money(float(qty * cost)),
+                "cost_source": "ACTUAL",
+                "reference_type": "PURCHASE_ORDER",
+                "created_at": received,
+            }
+        )
+    _bulk(session, InventoryLot, lot_rows)
+    _bulk(session, InventoryTxn, txn_rows)
+
+    channel_ids = []
+    for code in CHANNELS:
+        channel_ids.append(_id(rng))
+        session.execute(
+            insert(SalesChannel),
+            [{"id": channel_ids[-1], "code": code, "name": code.title()}],
+        )
+
+    customers = []
+    for i in range(volumes.customers):
+        data.customer_ids.append(_id(rng))
+        data.customer_names.append(f"Synthetic Customer {i:05d}")
+        customers.append(
+            {
+                "id": data.customer_ids[-1],
+                "code": f"SYNC-{i:05d}",
+                "name": data.customer_names[-1],
+                "delivery_address_line1": f"{i} Synthetic St",
+                "delivery_suburb": rng.choice(SUBURBS),
+                "delivery_state": rng.choice(STATES),
+                "delivery_postcode": f"{rng.randrange(2000, 7000)}",
+                "latitude": Decimal(str(round(rng.uniform(-38, -27), 6))),
+                "longitude": Decimal(str(round(rng.uniform(138, 153), 6))),
+            }
+        )
+    _bulk(session, Customer, customers)
+
+    n_orders = max(1, volumes.order_lines // volumes.lines_per_order)
+    order_rows, line_rows, order_lines = [], [], {}
+    for i in range(n_orders):
+        oid = _id(rng)
+        total_ex = Decimal("0")
+        order_lines[oid] = []
+        for seq in range(1, volumes.lines_per_order + 1):
+            product_id = rng.choice(data.finished_ids)
+            qty = Decimal(rng.randrange(1, 24))
+            price = _money(rng.uniform(10, 80))
+            line_ex = qty * price
+            total_ex += line_ex
+            order_lines[oid].append((product_id, qty, price))
+            line_rows.append(
+                {
+                    "id": _id(rng),
+                    "order_id": oid,
+                    "product_id": product_id,
+                    "qty": qty,
+                    "unit_price_ex_gst": price,
+                    "unit_price_inc_gst": _money(float(price) * 1.1),
+                    "line_total_ex_gst": line_ex,
+                    "line_total_inc_gst": _money(float(line_ex) * 1.1),
+                    "sequence": seq,
+                }
+            )
+        order_rows.append(
+            {
+                "id": oid,
+                "customer_id": rng.choice(data.customer_ids),
+                "channel_id": rng.choice(channel_ids),
+                "order_ref": f"SYN-SO-{i:07d}",
+                "status": "confirmed",
+                "source": "imported",
+                "order_date": START + timedelta(minutes=rng.randrange(DAYS * 24 * 60)),
+                "total_ex_gst": total_ex,
+                "total_inc_gst": _money(float(total_ex) * 1.1),
+            }
+        )
+    _bulk(session, SalesOrder, order_rows)
+    _bulk(session, SalesOrderLine, line_rows)
+
+    docket_rows, docket_line_rows = [], []
+    for i, order in enumerate(rng.sample(order_rows, min(volumes.dockets, n_orders))):
+        did = _id(rng)
+        data.docket_ids.append(did)
+        docket_rows.append(
+            {
+                "id": did,
+                "customer_id": order["customer_id"],
+                "sales_order_id": order["id"],
+                "docket_number": f"SYN-DD-{i:06d}",
+                "docket_date": order["order_date"],
+                "status": "DELIVERED",
+            }
+        )
+        for seq, (product_id, qty, price) in enumerate(order_lines[order["id"]], 1):
+            docket_line_rows.append(
+                {
+                    "id": _id(rng),
+                    "docket_id": did,
+                    "product_id": product_id,
+                    "quantity": qty,
+                    "unit_price": price,
+                    "sequence": seq,
+                }
+            )
+    _bulk(session, DeliveryDocket, docket_rows)
+    _bulk(session, DeliveryDocketLine, docket_line_rows)
+    session.commit()
+
+    from apps.vndmanuf_sales.services.customer_first_order import (
+        refresh_customer_first_orders,
+    )
+
+    refresh_customer_first_orders(session)
+    session.commit()
+    return data
+
+
+def generate_competitor(
+    session: Session, volumes: Volumes = Volumes(), seed: int = 42
+) -> List[str]:
+    """Brands, SKUs, outlets and price observations in the competitor_intel schema.
+
+    Returns the SKU ids.
+    """
+    rng = Random(seed + 1)
+    now = datetime(2026, 6, 30, tzinfo=timezone.utc)
+
+    specs = []
+    for ml in (700, 1000):
+        specs.append({"id": _id(rng), "type": "bottle", "container_ml": ml})
+    for ml in (250, 330, 375):
+        specs.append(
+            {
+                "id": _id(rng),
+                "type": "can",
+                "container_ml": ml,
+                "can_form_factor": "slim",
+            }
+        )
+    _bulk(session, ci.PackageSpec, specs)
+
+    n_brands = max(1, volumes.competitor_skus // 12)
+    brands = [{"id": _id(rng), "name": f"Brand {i:03d}"} for i in range(n_brands)]
+    _bulk(session, ci.Brand, brands)
+
+    products, skus, sku_meta = [], [], []
+    for i in range(max(1, volumes.competitor_skus // 2)):
+        category = rng.choice(PRODUCT_CATEGORIES)
+        abv = Decimal("37.5") if category.endswith("bottle") else Decimal("5.0")
+        products.append(
+            {
+                "id": _id(rng),
+                "brand_id": rng.choice(brands)["id"],
+                "name": f"Product {i:04d}",
+                "category": category,
+                "abv_percent": abv,
+            }
+        )
+        pool = [
+            s for s in specs if (s["type"] == "bottle") == category.endswith("bottle")
+        ]
+        for spec in rng.sample(pool, min(2, len(pool))):
+            skus.append(
+                {
+                    "id": _id(rng),
+                    "product_id": products[-1]["id"],
+                    "package_spec_id": spec["id"],
+                }
+            )
+            sku_meta.append((spec["container_ml"], float(abv)))
+    _bulk(session, ci.Product, products)
+    _bulk(session, ci.SKU, skus)
+
+    companies = [
+        {"id": _id(rng), "name": f"Retailer {i:02d}", "type": "retailer"}
+        for i in range(20)
+    ]
+    _bulk(session, ci.Company, companies)
+    locations = [
+        {
+            "id": _id(rng),
+            "company_id": rng.choice(companies)["id"],
+            "store_name": f"Store {i:03d}",
+            "state": rng.choice(STATES),
+            "suburb": rng.choice(SUBURBS),
+        }
+        for i in range(200)
+    ]
+    _bulk(session, ci.Location, locations)
+
+    channels = ("retail_instore", "retail_online", "distributor_to_retailer")
+    rows = []
+    for i in range(volumes.observations):
+        k = rng.randrange(len(skus))
+        ml, abv = sku_meta[k]
+        # A few observations are far off the SKU's usual price (outliers).
+        base = 20 + (k % 40) * 1.5
+        price = base * (
+            rng.uniform(2.5, 4) if rng.random() < 0.01 else rng.gauss(1, 0.08)
+        )
+        price = max(price, 1.0)
+        litres = ml / 1000
+        location = rng.choice(locations)
+        rows.append(
+            {
+                "id": _id(rng),
+                "sku_id": skus[k]["id"],
+                "company_id": location["company_id"],
+                "location_id": location["id"],
+                "channel": rng.choice(channels),
+                "price_inc_gst_raw": _money(price),
+                "price_ex_gst_norm": _money(price / 1.1),
+                "price_inc_gst_norm": _money(price),
+                "unit_price_inc_gst": Decimal(str(round(price, 4))),
+                "price_per_litre": Decimal(str(round(price / litres, 4))),
+                "price_per_unit_pure_alcohol": Decimal(
+                    str(round(price / (litres * abv / 100), 4))
+                ),
+                "standard_drinks": Decimal(str(round(ml * abv / 100 * 0.789 / 10, 4))),
+                "gp_unit_pct": Decimal(str(round(rng.uniform(15, 45), 4))),
+                "observation_dt": now
+                - timedelta(minutes=rng.randrange(DAYS * 24 * 60)),
+                "source_type": "in_store",
+                "hash_key": hashlib.sha1(f"{seed}-{i}".encode()).hexdigest(),
+            }
+        )
+    _bulk(session, ci.PriceObservation, rows)
+    session.commit()
+    return [s["id"] for s in skus]
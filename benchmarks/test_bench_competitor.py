@@ -0,0 +1,31 @@
+"""Competitor price observation listing and outlier detection."""
+
+import pytest
+
+from apps.competitor_intel.app.services.reports import (
+    ObservationFilters,
+    fetch_observations,
+    get_price_outliers,
+)
+
+pytest.importorskip("pytest_benchmark")
+
+
+@pytest.mark.parametrize("depth", ["first", "middle"])
+def test_fetch_observations(benchmark, competitor_session, volumes, depth):
+    page = 1 if depth == "first" else max(1, volumes.observations // 100)
+    result = benchmark(
+        fetch_observations,
+        competitor_session,
+        ObservationFilters(),
+        page=page,
+        page_size=50,
+    )
+
+    assert result["items"]
+
+
+def test_price_outliers(benchmark, competitor_session):
+    outliers = benchmark(get_price_outliers, competitor_session, ObservationFilters())
+
+    assert outliers
@@ -0,0 +1,72 @@
+"""Inventory FIFO, BOM costing and document context hot paths."""
+
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from app.adapters.db.models import InventoryLot
+from app.documents.context_builder import build_contexts_from_delivery_dockets
+from app.domain.rules import fifo_issue
+from app.services.costing import CostingService
+from app.services.inventory import InventoryService
+
+pytest.importorskip("pytest_benchmark")
+
+
+def test_fifo_issue(benchmark, mfg_session, mfg_data):
+    lots = (
+        mfg_session.execute(
+            select(InventoryLot)
+            .where(InventoryLot.product_id == mfg_data.lot_product_id)
+            .order_by(InventoryLot.received_at)
+        )
+        .scalars()
+        .all()
+    )
+    required = (mfg_data.lot_product_qty * Decimal("0.9")).quantize(Decimal("0.001"))
+
+    issues = benchmark(fifo_issue, lots, required)
+
+    assert sum(i.quantity_kg for i in issues) == required
+
+
+def test_consume_lots_fifo(benchmark, mfg_session, mfg_data):
+    svc = InventoryService(mfg_session)
+    required = (mfg_data.lot_product_qty / 2).quantize(Decimal("0.001"))
+
+    def _consume():
+        return svc.consume_lots_fifo(
+            mfg_data.lot_product_id, required, "Benchmark", "BENCH", None
+        )
+
+    issues = benchmark.pedantic(
+        _consume, setup=mfg_session.rollback, rounds=10, iterations=1
+    )
+
+    assert issues
+
+
+def test_build_bom_tree(benchmark, mfg_session, mfg_data):
+    svc = CostingService(mfg_session)
+    root = mfg_data.finished_ids[0]
+
+    tree = benchmark(svc.build_bom_tree, root)
+
+    assert tree["children"]
+
+
+def test_rollup_costs_all_finished(benchmark, mfg_session, mfg_data):
+    svc = CostingService(mfg_session)
+
+    costs = benchmark(svc.rollup_costs, mfg_data.finished_ids)
+
+    assert len(costs) == len(mfg_data.finished_ids)
+
+
+def test_build_docket_contexts(benchmark, mfg_session, mfg_data):
+    docket_ids = mfg_data.docket_ids[:200]
+
+    contexts = benchmark(build_contexts_from_delivery_dockets, mfg_session, docket_ids)
+
+    assert len(contexts) == len(docket_ids)
@@ -0,0 +1,70 @@
+"""Sales dashboards and CSV import."""
+
+from decimal import Decimal
+from random import Random
+
+import pytest
+
+from apps.vndmanuf_sales.services.analytics import SalesAnalyticsService
+from apps.vndmanuf_sales.services.customer_map import CustomerMapService
+from apps.vndmanuf_sales.services.import_sales_csv import ImportRow, SalesCSVImporter
+from benchmarks.synthetic import CHANNELS
+
+pytest.importorskip("pytest_benchmark")
+
+
+def _period(mfg_data) -> dict:
+    return {"start_date": mfg_data.start.date(), "end_date": mfg_data.end.date()}
+
+
+def test_analytics_overview(benchmark, mfg_session, mfg_data):
+    svc = SalesAnalyticsService(mfg_session)
+
+    overview = benchmark(svc.get_overview, **_period(mfg_data))
+
+    assert overview.total_orders > 0
+
+
+def test_customer_map(benchmark, mfg_session, mfg_data):
+    svc = CustomerMapService(mfg_session)
+
+    summary = benchmark(svc.get_map, **_period(mfg_data))
+
+    assert summary.points
+
+
+def test_csv_import_rows(benchmark, mfg_session, mfg_data, seed):
+    rng = Random(seed)
+    rounds = iter(range(1000))
+
+    def _rows():
+        # pysqlite commits on RELEASE SAVEPOINT, so the importer's nested
+        # transactions survive rollback; give each round its own order refs.
+        batch = next(rounds)
+        rows = []
+        for n in range(200):
+            customer = rng.choice(mfg_data.customer_names)
+            for _ in range(5):
+                rows.append(
+                    ImportRow(
+                        raw={},
+                        order_date=mfg_data.start,
+                        channel=rng.choice(CHANNELS),
+                        customer=customer,
+                        site_name=None,
+                        product_code=rng.choice(mfg_data.finished_skus),
+                        qty=Decimal(rng.randrange(1, 12)),
+                        unit_price_ex_gst=Decimal("25.00"),
+                        unit_price_inc_gst=Decimal("27.50"),
+                        order_ref=f"BENCH-{batch:03d}-{n:04d}",
+                    )
+                )
+        return (rows,), {}
+
+    def _import(rows):
+        return SalesCSVImporter(mfg_session).import_rows(rows, allow_create=True)
+
+    summary = benchmark.pedantic(_import, setup=_rows, rounds=5, iterations=1)
+
+    assert not summary.errors
+    assert summary.orders_inserted == 200
@@ -0,0 +1,87 @@
+"""Index assembly cost dependencies and add the cost revaluation queue.
+
+Revision ID: 20261016_cost_invalidation
+Revises: 20261016_stock_summary
+Create Date: 2026-10-16
+
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261016_cost_invalidation"
+down_revision: Union[str, None] = "20261016_stock_summary"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_DEPENDENCY_INDEXES = (
+    ("ix_assembly_cost_dep_consumed", ["consumed_lot_id", "produced_lot_id"]),
+    ("ix_assembly_cost_dep_produced", ["produced_lot_id"]),
+)
+
+
+def _has_index(insp, table: str, name: str) -> bool:
+    if not insp.has_table(table):
+        return False
+    return any(ix["name"] == name for ix in insp.get_indexes(table))
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        bind.execute(sa.text("PRAGMA foreign_keys=ON"))
+    insp = sa.inspect(bind)
+
+    for name, columns in _DEPENDENCY_INDEXES:
+        if insp.has_table("assembly_cost_dependencies") and not _has_index(
+            insp, "assembly_cost_dependencies", name
+        ):
+            op.create_index(name, "assembly_cost_dependencies", columns, unique=False)
+
+    if insp.has_table("cost_revaluation_queue"):
+        return
+
+    op.create_table(
+        "cost_revaluation_queue",
+        sa.Column("id", sa.String(36), nullable=False),
+        sa.Column("source_lot_id", sa.String(36), nullable=False),
+        sa.Column("reason", sa.Text(), nullable=False),
+        sa.Column("revalued_by", sa.String(100), nullable=False),
+        sa.Column("queued_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["source_lot_id"],
+            ["inventory_lots.id"],
+            name="fk_cost_revaluation_queue__source_lot_id__inventory_lots",
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id", name="pk_cost_revaluation_queue"),
+    )
+    op.create_index(
+        "ix_cost_revaluation_queue_queued",
+        "cost_revaluation_queue",
+        ["queued_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        bind.execute(sa.text("PRAGMA foreign_keys=ON"))
+    insp = sa.inspect(bind)
+    if insp.has_table("cost_revaluation_queue"):
+        if _has_index(
+            insp, "cost_revaluation_queue", "ix_cost_revaluation_queue_queued"
+        ):
+            op.drop_index(
+                "ix_cost_revaluation_queue_queued",
+                table_name="cost_revaluation_queue",
+            )
+        op.drop_table("cost_revaluation_queue")
+    for name, _ in _DEPENDENCY_INDEXES:
+        if _has_index(insp, "assembly_cost_dependencies", name):
+            op.drop_index(name, table_name="assembly_cost_dependencies")
@@ -0,0 +1,74 @@
+"""Add customer_first_order materialized table for sales analytics.
+
+Revision ID: 20261016_cust_first_order
+Revises: 20250626_contacts_geo
+Create Date: 2026-10-16
+
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261016_cust_first_order"
+down_revision: Union[str, None] = "20250626_contacts_geo"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        bind.execute(sa.text("PRAGMA foreign_keys=ON"))
+    insp = sa.inspect(bind)
+    if insp.has_table("customer_first_order"):
+        return
+
+    op.create_table(
+        "customer_first_order",
+        sa.Column("customer_id", sa.String(36), nullable=False),
+        sa.Column("first_order_date", sa.DateTime(), nullable=False),
+        sa.Column("refreshed_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["customer_id"],
+            ["customers.id"],
+            name="fk_customer_first_order__customer_id__customers",
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("customer_id", name="pk_customer_first_order"),
+    )
+    op.create_index(
+        "ix_customer_first_order_date",
+        "customer_first_order",
+        ["first_order_date"],
+        unique=False,
+    )
+
+    if insp.has_table("sales_orders"):
+        bind.execute(
+            sa.text(
+                "INSERT INTO customer_first_order "
+                "(customer_id, first_order_date, refreshed_at) "
+                "SELECT customer_id, MIN(order_date), CURRENT_TIMESTAMP "
+                "FROM sales_orders "
+                "WHERE deleted_at IS NULL AND status != 'cancelled' "
+                "GROUP BY customer_id"
+            )
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        bind.execute(sa.text("PRAGMA foreign_keys=ON"))
+    insp = sa.inspect(bind)
+    if not insp.has_table("customer_first_order"):
+        return
+    try:
+        op.drop_index("ix_customer_first_order_date", table_name="customer_first_order")
+    except Exception:
+        pass
+    op.drop_table("customer_first_order")
@@ -0,0 +1,78 @@
+"""Record render cache usage on generated_documents.
+
+Revision ID: 20261016_docgen_cache
+Revises: 20261016_cost_invalidation
+Create Date: 2026-10-16
+
+content_hash keys the output cache (template + context); cache_hit and
+template_cache_hit record whether the PDF / parsed template was reused.
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261016_docgen_cache"
+down_revision: Union[str, None] = "20261016_cost_invalidation"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_COLUMNS = (
+    ("content_hash", sa.String(64)),
+    ("cache_hit", sa.Boolean()),
+    ("template_cache_hit", sa.Boolean()),
+)
+_INDEX = "ix_generated_documents_content_hash"
+
+
+def _has_column(insp: sa.engine.reflection.Inspector, table: str, column: str) -> bool:
+    if not insp.has_table(table):
+        return False
+    return any(c["name"] == column for c in insp.get_columns(table))
+
+
+def _has_index(insp, table: str, name: str) -> bool:
+    if not insp.has_table(table):
+        return False
+    return any(ix["name"] == name for ix in insp.get_indexes(table))
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    if not insp.has_table("generated_documents"):
+        return
+
+    missing = [
+        (name, type_)
+        for name, type_ in _COLUMNS
+        if not _has_column(insp, "generated_documents", name)
+    ]
+    if missing:
+        with op.batch_alter_table("generated_documents", schema=None) as batch:
+            for name, type_ in missing:
+                batch.add_column(sa.Column(name, type_, nullable=True))
+
+    insp = sa.inspect(bind)
+    if not _has_index(insp, "generated_documents", _INDEX):
+        op.create_index(_INDEX, "generated_documents", ["content_hash"], unique=False)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    if not insp.has_table("generated_documents"):
+        return
+
+    if _has_index(insp, "generated_documents", _INDEX):
+        op.drop_index(_INDEX, table_name="generated_documents")
+    present = [
+        name for name, _ in _COLUMNS if _has_column(insp, "generated_documents", name)
+    ]
+    if present:
+        with op.batch_alter_table("generated_documents", schema=None) as batch:
+            for name in present:
+                batch.drop_column(name)
@@ -0,0 +1,44 @@
+"""Record Shopify orders that failed to import on the import checkpoint.
+
+Revision ID: 20261016_import_ckpt_failed_ids
+Revises: 20261016_rollup_slice_keys
+Create Date: 2026-10-16
+
+ShopifyOrderImportService.import_historical_orders stores the ids of orders
+that could not be built as a JSON list, and retries them when the job runs
+again.
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261016_import_ckpt_failed_ids"
+down_revision: Union[str, None] = "20261016_rollup_slice_keys"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_TABLE = "shopify_import_checkpoints"
+_COLUMN = "failed_order_ids"
+
+
+def _has_column(insp) -> bool:
+    if not insp.has_table(_TABLE):
+        return False
+    return any(col["name"] == _COLUMN for col in insp.get_columns(_TABLE))
+
+
+def upgrade() -> None:
+    insp = sa.inspect(op.get_bind())
+    if not insp.has_table(_TABLE) or _has_column(insp):
+        return
+    op.add_column(_TABLE, sa.Column(_COLUMN, sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    if _has_column(sa.inspect(op.get_bind())):
+        with op.batch_alter_table(_TABLE) as batch_op:
+            batch_op.drop_column(_COLUMN)
@@ -0,0 +1,97 @@
+"""Add FIFO lot index and per-product inventory stock summary.
+
+Revision ID: 20261016_stock_summary
+Revises: 20261016_sales_rollup
+Create Date: 2026-10-16
+
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261016_stock_summary"
+down_revision: Union[str, None] = "20261016_sales_rollup"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_index(insp, table: str, name: str) -> bool:
+    if not insp.has_table(table):
+        return False
+    return any(ix["name"] == name for ix in insp.get_indexes(table))
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        bind.execute(sa.text("PRAGMA foreign_keys=ON"))
+    insp = sa.inspect(bind)
+
+    if insp.has_table("inventory_lots") and not _has_index(
+        insp, "inventory_lots", "ix_lot_product_active_received"
+    ):
+        op.create_index(
+            "ix_lot_product_active_received",
+            "inventory_lots",
+            ["product_id", "is_active", "received_at"],
+            unique=False,
+        )
+
+    if insp.has_table("inventory_stock_summary"):
+        return
+
+    op.create_table(
+        "inventory_stock_summary",
+        sa.Column("product_id", sa.String(36), nullable=False),
+        sa.Column("on_hand_qty", sa.Numeric(14, 3), nullable=False, server_default="0"),
+        sa.Column(
+            "reserved_qty", sa.Numeric(18, 6), nullable=False, server_default="0"
+        ),
+        sa.Column("active_lot_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("refreshed_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["product_id"],
+            ["products.id"],
+            name="fk_inventory_stock_summary__product_id__products",
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("product_id", name="pk_inventory_stock_summary"),
+    )
+
+    if not (
+        insp.has_table("inventory_lots") and insp.has_table("inventory_reservations")
+    ):
+        return
+    bind.execute(
+        sa.text(
+            "INSERT INTO inventory_stock_summary "
+            "(product_id, on_hand_qty, reserved_qty, active_lot_count, refreshed_at) "
+            "SELECT p.id, COALESCE(l.qty, 0), COALESCE(r.qty, 0), "
+            "COALESCE(l.lot_count, 0), CURRENT_TIMESTAMP "
+            "FROM products p "
+            "LEFT JOIN (SELECT product_id, SUM(quantity_kg) AS qty, "
+            "COUNT(*) AS lot_count FROM inventory_lots "
+            "WHERE is_active = :active GROUP BY product_id) l "
+            "ON l.product_id = p.id "
+            "LEFT JOIN (SELECT product_id, SUM(qty_canonical) AS qty "
+            "FROM inventory_reservations WHERE status = 'ACTIVE' "
+            "GROUP BY product_id) r "
+            "ON r.product_id = p.id "
+            "WHERE l.product_id IS NOT NULL OR r.product_id IS NOT NULL"
+        ).bindparams(active=True)
+    )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        bind.execute(sa.text("PRAGMA foreign_keys=ON"))
+    insp = sa.inspect(bind)
+    if insp.has_table("inventory_stock_summary"):
+        op.drop_table("inventory_stock_summary")
+    if _has_index(insp, "inventory_lots", "ix_lot_product_active_received"):
+        op.drop_index("ix_lot_product_active_received", table_name="inventory_lots")
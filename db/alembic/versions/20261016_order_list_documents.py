@@ -0,0 +1,88 @@
+"""Stored PDF presence on generated_documents and order list keyset index.
+
+Revision ID: 20261016_order_list_docs
+Revises: 20261016_docgen_cache
+Create Date: 2026-10-16
+
+GET /sales/orders reads generated_documents.pdf_exists instead of checking each
+file; scripts/verify_generated_documents.py keeps it current. Completed rows
+with a pdf_path start as present. ix_sales_orders_order_date_id serves the
+(order_date, id) keyset pagination.
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261016_order_list_docs"
+down_revision: Union[str, None] = "20261016_docgen_cache"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_COLUMNS = (
+    ("pdf_exists", sa.Boolean()),
+    ("file_checked_at", sa.DateTime()),
+)
+_ORDER_INDEX = "ix_sales_orders_order_date_id"
+
+
+def _has_column(insp: sa.engine.reflection.Inspector, table: str, column: str) -> bool:
+    if not insp.has_table(table):
+        return False
+    return any(c["name"] == column for c in insp.get_columns(table))
+
+
+def _has_index(insp, table: str, name: str) -> bool:
+    if not insp.has_table(table):
+        return False
+    return any(ix["name"] == name for ix in insp.get_indexes(table))
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+
+    if insp.has_table("generated_documents"):
+        missing = [
+            (name, type_)
+            for name, type_ in _COLUMNS
+            if not _has_column(insp, "generated_documents", name)
+        ]
+        if missing:
+            with op.batch_alter_table("generated_documents", schema=None) as batch:
+                for name, type_ in missing:
+                    batch.add_column(sa.Column(name, type_, nullable=True))
+            bind.execute(
+                sa.text(
+                    "UPDATE generated_documents SET pdf_exists = :present "
+                    "WHERE status = 'completed' AND pdf_path IS NOT NULL "
+                    "AND pdf_exists IS NULL"
+                ),
+                {"present": True},
+            )
+
+    if insp.has_table("sales_orders") and not _has_index(
+        insp, "sales_orders", _ORDER_INDEX
+    ):
+        op.create_index(
+            _ORDER_INDEX, "sales_orders", ["order_date", "id"], unique=False
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+
+    if _has_index(insp, "sales_orders", _ORDER_INDEX):
+        op.drop_index(_ORDER_INDEX, table_name="sales_orders")
+
+    present = [
+        name for name, _ in _COLUMNS if _has_column(insp, "generated_documents", name)
+    ]
+    if present:
+        with op.batch_alter_table("generated_documents", schema=None) as batch:
+            for name in present:
+                batch.drop_column(name)
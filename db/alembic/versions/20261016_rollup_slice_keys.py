@@ -0,0 +1,74 @@
+"""Unique slice keys on the daily sales rollup tables.
+
+Revision ID: 20261016_rollup_slice_keys
+Revises: 20261016_shopify_import_ckpt
+Create Date: 2026-10-16
+
+Rollup slices are now upserted, which needs a unique key. Existing rollup rows
+may hold duplicate slices, so they are cleared along with the rollup state;
+dashboards read sales_orders until scripts/rebuild_sales_analytics.py
+--daily-rollup is run again.
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261016_rollup_slice_keys"
+down_revision: Union[str, None] = "20261016_shopify_import_ckpt"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_INDEXES = {
+    "sales_daily_rollup": (
+        "ux_sales_daily_rollup_slice",
+        [
+            "day",
+            "customer_id",
+            "product_id",
+            sa.text("coalesce(channel_id, '')"),
+            sa.text("coalesce(pricebook_id, '')"),
+            "is_archived",
+        ],
+    ),
+    "sales_daily_order_rollup": (
+        "ux_sales_daily_order_rollup_slice",
+        [
+            "day",
+            "customer_id",
+            sa.text("coalesce(channel_id, '')"),
+            sa.text("coalesce(pricebook_id, '')"),
+            "is_archived",
+        ],
+    ),
+}
+
+
+def _has_index(insp, table: str, name: str) -> bool:
+    if not insp.has_table(table):
+        return False
+    return any(ix["name"] == name for ix in insp.get_indexes(table))
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    cleared = False
+    for table, (name, columns) in _INDEXES.items():
+        if not insp.has_table(table) or _has_index(insp, table, name):
+            continue
+        op.execute(sa.text(f"DELETE FROM {table}"))
+        op.create_index(name, table, columns, unique=True)
+        cleared = True
+    if cleared and insp.has_table("sales_rollup_state"):
+        op.execute(sa.text("DELETE FROM sales_rollup_state WHERE name = 'sales_daily'"))
+
+
+def downgrade() -> None:
+    insp = sa.inspect(op.get_bind())
+    for table, (name, _) in _INDEXES.items():
+        if _has_index(insp, table, name):
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,160 @@
+"""Add daily sales rollup tables and rollup watermark state.
+
+Revision ID: 20261016_sales_rollup
+Revises: 20261016_cust_first_order
+Create Date: 2026-10-16
+
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261016_sales_rollup"
+down_revision: Union[str, None] = "20261016_cust_first_order"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_index(insp, table: str, name: str) -> bool:
+    if not insp.has_table(table):
+        return False
+    return any(ix["name"] == name for ix in insp.get_indexes(table))
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        bind.execute(sa.text("PRAGMA foreign_keys=ON"))
+    insp = sa.inspect(bind)
+
+    if not insp.has_table("sales_daily_rollup"):
+        op.create_table(
+            "sales_daily_rollup",
+            sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column("day", sa.Date(), nullable=False),
+            sa.Column("customer_id", sa.String(36), nullable=False),
+            sa.Column("product_id", sa.String(36), nullable=False),
+            sa.Column("channel_id", sa.String(36), nullable=True),
+            sa.Column("pricebook_id", sa.String(36), nullable=True),
+            sa.Column(
+                "is_archived", sa.Boolean(), nullable=False, server_default=sa.false()
+            ),
+            sa.Column("order_count", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("qty", sa.Numeric(14, 3), nullable=False, server_default="0"),
+            sa.Column(
+                "revenue_ex_gst", sa.Numeric(14, 2), nullable=False, server_default="0"
+            ),
+            sa.Column(
+                "revenue_inc_gst", sa.Numeric(14, 2), nullable=False, server_default="0"
+            ),
+            sa.ForeignKeyConstraint(
+                ["customer_id"],
+                ["customers.id"],
+                name="fk_sales_daily_rollup__customer_id__customers",
+            ),
+            sa.ForeignKeyConstraint(
+                ["product_id"],
+                ["products.id"],
+                name="fk_sales_daily_rollup__product_id__products",
+            ),
+            sa.PrimaryKeyConstraint("id", name="pk_sales_daily_rollup"),
+        )
+        op.create_index(
+            "ix_sales_daily_rollup_day_customer",
+            "sales_daily_rollup",
+            ["day", "customer_id"],
+            unique=False,
+        )
+        op.create_index(
+            "ix_sales_daily_rollup_product_day",
+            "sales_daily_rollup",
+            ["product_id", "day"],
+            unique=False,
+        )
+
+    if not insp.has_table("sales_daily_order_rollup"):
+        op.create_table(
+            "sales_daily_order_rollup",
+            sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column("day", sa.Date(), nullable=False),
+            sa.Column("customer_id", sa.String(36), nullable=False),
+            sa.Column("channel_id", sa.String(36), nullable=True),
+            sa.Column("pricebook_id", sa.String(36), nullable=True),
+            sa.Column(
+                "is_archived", sa.Boolean(), nullable=False, server_default=sa.false()
+            ),
+            sa.Column("order_count", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column(
+                "total_ex_gst", sa.Numeric(14, 2), nullable=False, server_default="0"
+            ),
+            sa.Column(
+                "total_inc_gst", sa.Numeric(14, 2), nullable=False, server_default="0"
+            ),
+            sa.Column("last_order_at", sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(
+                ["customer_id"],
+                ["customers.id"],
+                name="fk_sales_daily_order_rollup__customer_id__customers",
+            ),
+            sa.PrimaryKeyConstraint("id", name="pk_sales_daily_order_rollup"),
+        )
+        op.create_index(
+            "ix_sales_daily_order_rollup_day_customer",
+            "sales_daily_order_rollup",
+            ["day", "customer_id"],
+            unique=False,
+        )
+
+    if not insp.has_table("sales_rollup_state"):
+        op.create_table(
+            "sales_rollup_state",
+            sa.Column("name", sa.String(50), nullable=False),
+            sa.Column("rebuilt_at", sa.DateTime(), nullable=True),
+            sa.Column("refreshed_at", sa.DateTime(), nullable=True),
+            sa.Column("source_watermark", sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint("name", name="pk_sales_rollup_state"),
+        )
+
+    # Staleness checks read max(sales_orders.updated_at) on every dashboard load.
+    if insp.has_table("sales_orders") and not _has_index(
+        insp, "sales_orders", "ix_sales_orders_updated_at"
+    ):
+        op.create_index(
+            "ix_sales_orders_updated_at",
+            "sales_orders",
+            ["updated_at"],
+            unique=False,
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        bind.execute(sa.text("PRAGMA foreign_keys=ON"))
+    insp = sa.inspect(bind)
+    if _has_index(insp, "sales_orders", "ix_sales_orders_updated_at"):
+        op.drop_index("ix_sales_orders_updated_at", table_name="sales_orders")
+    if insp.has_table("sales_rollup_state"):
+        op.drop_table("sales_rollup_state")
+    for table, indexes in (
+        ("sales_daily_order_rollup", ("ix_sales_daily_order_rollup_day_customer",)),
+        (
+            "sales_daily_rollup",
+            (
+                "ix_sales_daily_rollup_product_day",
+                "ix_sales_daily_rollup_day_customer",
+            ),
+        ),
+    ):
+        if not insp.has_table(table):
+            continue
+        for ix in indexes:
+            try:
+                op.drop_index(ix, table_name=table)
+            except Exception:
+                pass
+        op.drop_table(table)
@@ -0,0 +1,58 @@
+"""Add Shopify order import checkpoints.
+
+Revision ID: 20261016_shopify_import_ckpt
+Revises: 20261016_shopify_push_state
+Create Date: 2026-10-16
+
+ShopifyOrderImportService.import_historical_orders records the next page
+cursor after each committed page and resumes from it.
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261016_shopify_import_ckpt"
+down_revision: Union[str, None] = "20261016_shopify_push_state"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_TABLE = "shopify_import_checkpoints"
+
+
+def upgrade() -> None:
+    insp = sa.inspect(op.get_bind())
+    if insp.has_table(_TABLE):
+        return
+    op.create_table(
+        _TABLE,
+        sa.Column("id", sa.String(36), nullable=False),
+        sa.Column("job_key", sa.String(128), nullable=False),
+        sa.Column("since_date", sa.DateTime(), nullable=True),
+        sa.Column("until_date", sa.DateTime(), nullable=True),
+        sa.Column("next_page_info", sa.Text(), nullable=True),
+        sa.Column("status", sa.String(16), nullable=False),
+        sa.Column("pages", sa.Integer(), nullable=False),
+        sa.Column("orders_seen", sa.Integer(), nullable=False),
+        sa.Column("created_count", sa.Integer(), nullable=False),
+        sa.Column("existing_count", sa.Integer(), nullable=False),
+        sa.Column("error_count", sa.Integer(), nullable=False),
+        sa.Column("last_order_id", sa.String(64), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("started_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("completed_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id", name="pk_shopify_import_checkpoints"),
+        sa.UniqueConstraint(
+            "job_key", name="uq_shopify_import_checkpoints__job_key"
+        ),
+    )
+
+
+def downgrade() -> None:
+    insp = sa.inspect(op.get_bind())
+    if insp.has_table(_TABLE):
+        op.drop_table(_TABLE)
@@ -0,0 +1,57 @@
+"""Cached Shopify inventory item id and last pushed level per channel link.
+
+Revision ID: 20261016_shopify_push_state
+Revises: 20261016_shopify_inbox
+Create Date: 2026-10-16
+
+ShopifySyncService.reconcile_all compares available-to-sell with
+last_pushed_available and only pushes drifted products; the inventory item id
+is kept so pushes skip the variant lookup.
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261016_shopify_push_state"
+down_revision: Union[str, None] = "20261016_shopify_inbox"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_TABLE = "product_channel_links"
+_COLUMNS = (
+    ("shopify_inventory_item_id", sa.String(64)),
+    ("last_pushed_available", sa.Integer()),
+    ("last_pushed_at", sa.DateTime()),
+)
+
+
+def _has_column(insp: sa.engine.reflection.Inspector, table: str, column: str) -> bool:
+    if not insp.has_table(table):
+        return False
+    return any(c["name"] == column for c in insp.get_columns(table))
+
+
+def upgrade() -> None:
+    insp = sa.inspect(op.get_bind())
+    if not insp.has_table(_TABLE):
+        return
+    missing = [
+        (name, type_) for name, type_ in _COLUMNS if not _has_column(insp, _TABLE, name)
+    ]
+    if missing:
+        with op.batch_alter_table(_TABLE, schema=None) as batch:
+            for name, type_ in missing:
+                batch.add_column(sa.Column(name, type_, nullable=True))
+
+
+def downgrade() -> None:
+    insp = sa.inspect(op.get_bind())
+    present = [name for name, _ in _COLUMNS if _has_column(insp, _TABLE, name)]
+    if present:
+        with op.batch_alter_table(_TABLE, schema=None) as batch:
+            for name in present:
+                batch.drop_column(name)
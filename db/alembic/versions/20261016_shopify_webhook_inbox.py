@@ -0,0 +1,74 @@
+"""Add the Shopify webhook inbox.
+
+Revision ID: 20261016_shopify_inbox
+Revises: 20261016_order_list_docs
+Create Date: 2026-10-16
+
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261016_shopify_inbox"
+down_revision: Union[str, None] = "20261016_order_list_docs"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_TABLE = "shopify_webhook_inbox"
+
+_INDEXES = (
+    ("ix_shopify_webhook_inbox_status_received", ["status", "received_at"]),
+    ("ix_shopify_webhook_inbox_order_received", ["order_id", "received_at"]),
+)
+
+
+def _has_index(insp, table: str, name: str) -> bool:
+    if not insp.has_table(table):
+        return False
+    return any(ix["name"] == name for ix in insp.get_indexes(table))
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+
+    if not insp.has_table(_TABLE):
+        op.create_table(
+            _TABLE,
+            sa.Column("id", sa.String(36), nullable=False),
+            sa.Column("idempotency_key", sa.String(128), nullable=False),
+            sa.Column("topic", sa.String(64), nullable=False),
+            sa.Column("order_id", sa.String(64), nullable=False),
+            sa.Column("payload", sa.Text(), nullable=False),
+            sa.Column("status", sa.String(16), nullable=False),
+            sa.Column("attempts", sa.Integer(), nullable=False),
+            sa.Column("last_error", sa.Text(), nullable=True),
+            sa.Column("claimed_by", sa.String(36), nullable=True),
+            sa.Column("received_at", sa.DateTime(), nullable=False),
+            sa.Column("claimed_at", sa.DateTime(), nullable=True),
+            sa.Column("processed_at", sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint("id", name="pk_shopify_webhook_inbox"),
+            sa.UniqueConstraint(
+                "idempotency_key", name="uq_shopify_webhook_inbox__idempotency_key"
+            ),
+        )
+        insp = sa.inspect(bind)
+
+    for name, columns in _INDEXES:
+        if not _has_index(insp, _TABLE, name):
+            op.create_index(name, _TABLE, columns, unique=False)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    if not insp.has_table(_TABLE):
+        return
+    for name, _ in _INDEXES:
+        if _has_index(insp, _TABLE, name):
+            op.drop_index(name, table_name=_TABLE)
+    op.drop_table(_TABLE)
@@ -1,18 +1,52 @@
 """
+Push drifted Shopify inventory levels (products whose available-to-sell changed
+since the last push).
+
 Example cron entry:
 */60 * * * * /usr/bin/python -m scripts.cron_reconcile_shopify
 """
 
-# from app.adapters.db import SessionLocal
-# from app.services.shopify_sync import ShopifySyncService
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.adapters.db import get_session  # noqa: E402
+from app.services.shopify_sync import ShopifySyncService  # noqa: E402
+
 
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Push every mapped product, not only those that drifted",
+    )
+    parser.add_argument(
+        "--verbose", action="store_true", help="Include per-product results"
+    )
+    args = parser.parse_args()
 
-def main():
-    # db = SessionLocal()
-    # svc = ShopifySyncService(db)
-    # print(svc.reconcile_all())
-    print({"ok": True, "note": "stub reconcile"})
+    session = get_session()
+    try:
+        summary = ShopifySyncService(session).reconcile_all(force=args.force)
+        if not args.verbose:
+            summary = {k: v for k, v in summary.items() if k != "results"}
+        print(json.dumps(summary, indent=2))
+        return 0
+    except Exception as exc:  # noqa: BLE001
+        session.rollback()
+        print(f"Shopify reconcile failed: {exc}", file=sys.stderr)
+        return 1
+    finally:
+        session.close()
 
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+"""Apply queued Shopify webhooks once (for deployments without the API worker)."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.adapters.db import get_session  # noqa: E402
+from app.services.shopify_webhooks import (  # noqa: E402
+    ShopifyWebhookProcessor,
+    purge_webhook_inbox,
+)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Drain the Shopify webhook inbox until no pending events remain."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Orders applied in parallel; default SHOPIFY_WEBHOOK_WORKERS",
+    )
+    parser.add_argument(
+        "--purge",
+        action="store_true",
+        help="Also delete applied events older than SHOPIFY_WEBHOOK_RETENTION_DAYS",
+    )
+    args = parser.parse_args()
+
+    processor = ShopifyWebhookProcessor(max_workers=args.workers)
+    totals = {"orders": 0, "done": 0, "coalesced": 0, "failed": 0, "retried": 0}
+    try:
+        while True:
+            stats = processor.drain()
+            for key in totals:
+                totals[key] += stats[key]
+            if stats["orders"] < processor.batch_orders or stats["retried"]:
+                break
+        if args.purge:
+            session = get_session()
+            try:
+                totals["purged"] = purge_webhook_inbox(session)
+                session.commit()
+            finally:
+                session.close()
+    except Exception as exc:  # noqa: BLE001
+        print(f"Webhook drain failed: {exc}", file=sys.stderr)
+        return 1
+    print(json.dumps(totals, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+"""Geocode customers missing coordinates or a delivery address (resumable)."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.adapters.db import get_session  # noqa: E402
+from apps.vndmanuf_sales.services.customer_location_enrichment import (  # noqa: E402
+    CustomerLocationEnrichmentService,
+)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Enrich customer locations via Nominatim. Results are cached "
+        "and committed as they go, so an interrupted run can simply be re-run."
+    )
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--min-confidence", type=float, default=0.55)
+    parser.add_argument("--commit-every", type=int, default=50)
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--use-llm", action="store_true")
+    parser.add_argument(
+        "--no-prefetch",
+        action="store_true",
+        help="Look customers up one at a time instead of batching first",
+    )
+    args = parser.parse_args()
+
+    session = get_session()
+    try:
+        summary = CustomerLocationEnrichmentService(session).enrich(
+            limit=args.limit,
+            dry_run=args.dry_run,
+            min_confidence=args.min_confidence,
+            use_llm=args.use_llm,
+            prefetch=not args.no_prefetch,
+            commit_every=args.commit_every,
+        )
+        print(
+            json.dumps(
+                {
+                    "processed": summary.processed,
+                    "updated": summary.updated,
+                    "skipped": summary.skipped,
+                    "not_found": summary.not_found,
+                    "failed": summary.failed,
+                },
+                indent=2,
+            )
+        )
+        return 0
+    except Exception as exc:  # noqa: BLE001
+        session.rollback()
+        print(f"Enrichment failed: {exc}", file=sys.stderr)
+        return 1
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
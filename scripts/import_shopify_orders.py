@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+"""Import historical Shopify orders, resuming an interrupted run by default."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.adapters.db import get_session  # noqa: E402
+from app.services.shopify_order_import import ShopifyOrderImportService  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--since", type=datetime.fromisoformat, help="Start date (ISO 8601)"
+    )
+    parser.add_argument("--until", type=datetime.fromisoformat, help="End date")
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Ignore the checkpoint for this date range and start from page one",
+    )
+    args = parser.parse_args()
+
+    session = get_session()
+    try:
+        summary = ShopifyOrderImportService(session).import_historical_orders(
+            since_date=args.since, until_date=args.until, resume=not args.restart
+        )
+        summary["error_details"] = summary["error_details"][:20]
+        print(json.dumps(summary, indent=2, default=str))
+        return 0 if summary["status"] == "COMPLETED" else 1
+    except Exception as exc:  # noqa: BLE001
+        session.rollback()
+        print(f"Shopify order import failed: {exc}", file=sys.stderr)
+        return 1
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
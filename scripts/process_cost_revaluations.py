@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+"""Propagate queued lot revaluations to downstream produced lots."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.adapters.db import get_session  # noqa: E402
+from app.services.costing import CostingService  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Process the cost revaluation queue (revalue_lot with defer)."
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=None,
+        help="Maximum queue entries to process (oldest first); default is all",
+    )
+    args = parser.parse_args()
+
+    session = get_session()
+    try:
+        summary = CostingService(session).process_revaluation_queue(args.limit)
+        session.commit()
+        print(json.dumps(summary, indent=2))
+        return 0
+    except Exception as exc:  # noqa: BLE001
+        session.rollback()
+        print(f"Revaluation propagation failed: {exc}", file=sys.stderr)
+        return 1
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+"""Rebuild materialized sales analytics tables from sales_orders."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.adapters.db import get_session  # noqa: E402
+from apps.vndmanuf_sales.services.customer_first_order import (  # noqa: E402
+    refresh_customer_first_orders,
+)
+from apps.vndmanuf_sales.services.sales_rollup import (  # noqa: E402
+    rebuild_sales_rollup,
+    rollup_status,
+)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Rebuild materialized sales analytics tables."
+    )
+    parser.add_argument(
+        "--customer-first-order",
+        action="store_true",
+        help="Rebuild customer_first_order (first non-cancelled order per customer)",
+    )
+    parser.add_argument(
+        "--daily-rollup",
+        action="store_true",
+        help="Rebuild sales_daily_rollup and sales_daily_order_rollup",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Report whether the daily rollup is current; exit 2 when stale",
+    )
+    args = parser.parse_args()
+
+    if not (args.customer_first_order or args.daily_rollup or args.check):
+        parser.error(
+            "nothing to do; pass --customer-first-order, --daily-rollup or --check"
+        )
+
+    session = get_session()
+    try:
+        summary = {}
+        if args.customer_first_order:
+            summary["customer_first_order"] = refresh_customer_first_orders(session)
+        if args.daily_rollup:
+            summary["daily_rollup"] = rebuild_sales_rollup(session)
+        session.commit()
+        status = rollup_status(session)
+        if args.check or args.daily_rollup:
+            summary["daily_rollup_status"] = status
+        print(json.dumps(summary, indent=2, default=str))
+        if args.check and not status["fresh"]:
+            return 2
+        return 0
+    except Exception as exc:  # noqa: BLE001
+        session.rollback()
+        print(f"Rebuild failed: {exc}", file=sys.stderr)
+        return 1
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+"""Rebuild inventory_stock_summary from inventory lots and reservations."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.adapters.db import get_session  # noqa: E402
+from app.services.stock_summary import refresh_stock_summary  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Rebuild the per-product inventory stock summary."
+    )
+    parser.add_argument(
+        "--product-id",
+        action="append",
+        dest="product_ids",
+        help="Only refresh this product (repeatable); default is every product",
+    )
+    args = parser.parse_args()
+
+    session = get_session()
+    try:
+        rows = refresh_stock_summary(session, args.product_ids)
+        session.commit()
+        print(json.dumps({"inventory_stock_summary": rows}, indent=2))
+        return 0
+    except Exception as exc:  # noqa: BLE001
+        session.rollback()
+        print(f"Rebuild failed: {exc}", file=sys.stderr)
+        return 1
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
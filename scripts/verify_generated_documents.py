@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+"""Refresh GeneratedDocument.pdf_exists from the files on disk.
+
+Order lists trust the stored flag instead of checking every PDF, so run this
+periodically (cron/scheduler) to catch files that were moved or deleted.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.adapters.db import get_session  # noqa: E402
+from app.documents.repository import verify_document_files  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Re-check that completed generated documents still have a PDF."
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=500,
+        help="Documents checked and updated per batch (default 500)",
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=None,
+        help="Maximum documents to check; default is all",
+    )
+    args = parser.parse_args()
+
+    session = get_session()
+    try:
+        summary = verify_document_files(session, args.batch_size, args.limit)
+        session.commit()
+        print(json.dumps(summary, indent=2))
+        return 0
+    except Exception as exc:  # noqa: BLE001
+        session.rollback()
+        print(f"Document file check failed: {exc}", file=sys.stderr)
+        return 1
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,6 +3,7 @@
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
 from app.adapters.db import Base  # This import ensures all models are registered
 
@@ -10,9 +11,13 @@ from app.adapters.db import Base  # This import ensures all models are registere
 @pytest.fixture(scope="function")
 def db_session():
     """Create a test database session."""
-    # Use in-memory SQLite for testing
+    # Use in-memory SQLite for testing; StaticPool shares the one database with
+    # TestClient's worker threads.
     engine = create_engine(
-        "sqlite:///:memory:", connect_args={"check_same_thread": False}, echo=False
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+        echo=False,
     )
     Base.metadata.create_all(engine)
 
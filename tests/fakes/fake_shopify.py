@@ -2,11 +2,16 @@ class FakeShopifyClient:
     def __init__(self):
         self.inventory_sets = []
 
-    def set_inventory_level(self, variant_id: str, location_id: str, available: int):
-        self.inventory_sets.append((variant_id, location_id, available))
+    def get_inventory_item_id(self, variant_id: str):
+        return f"inv-{variant_id}"
+
+    def set_inventory_level(
+        self, inventory_item_id: str, location_id: str, available: int
+    ):
+        self.inventory_sets.append((inventory_item_id, location_id, available))
         return {
             "ok": True,
-            "variant_id": variant_id,
+            "inventory_item_id": inventory_item_id,
             "location_id": location_id,
             "available": available,
         }
@@ -0,0 +1,88 @@
+import ast
+import asyncio
+import time
+from pathlib import Path
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.adapters.db import Base
+from app.adapters.db.session import get_db
+from app.api import units
+
+API_DIR = Path(__file__).resolve().parents[1] / "app" / "api"
+ROUTE_METHODS = {"get", "post", "put", "patch", "delete"}
+
+
+def _uses_get_db(node: ast.AST) -> bool:
+    return any(isinstance(n, ast.Name) and n.id == "get_db" for n in ast.walk(node))
+
+
+def test_db_routes_are_sync_handlers():
+    """Routes that take a sync Session must be plain ``def`` so FastAPI runs them
+    in its threadpool instead of on the event loop."""
+    offenders = []
+    for path in sorted(API_DIR.glob("*.py")):
+        for node in ast.walk(ast.parse(path.read_text())):
+            if not isinstance(node, ast.AsyncFunctionDef):
+                continue
+            routed = any(
+                isinstance(d, ast.Call)
+                and isinstance(d.func, ast.Attribute)
+                and d.func.attr in ROUTE_METHODS
+                for d in node.decorator_list
+            )
+            if routed and _uses_get_db(node.args):
+                offenders.append(f"{path.name}:{node.lineno} {node.name}")
+    assert offenders == []
+
+
+def test_slow_db_requests_run_concurrently(tmp_path: Path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'units.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.tables["units"].create(engine)
+    SessionLocal = sessionmaker(bind=engine)
+    delay = 0.3
+    requests = 6
+
+    # Stands in for a slow query: blocks the calling thread like a real driver.
+    @event.listens_for(engine, "before_cursor_execute")
+    def _slow(*args):
+        time.sleep(delay)
+
+    def _db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(units.router, prefix="/api/v1")
+    app.dependency_overrides[get_db] = _db
+
+    async def _fire(count: int):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            return await asyncio.gather(
+                *(client.get("/api/v1/units/") for _ in range(count))
+            )
+
+    started = time.perf_counter()
+    asyncio.run(_fire(1))
+    single = time.perf_counter() - started
+
+    started = time.perf_counter()
+    responses = asyncio.run(_fire(requests))
+    elapsed = time.perf_counter() - started
+
+    assert [r.status_code for r in responses] == [200] * requests
+    # Serialised on the event loop this would take requests * single.
+    assert elapsed < requests * single / 2
+    engine.dispose()
@@ -0,0 +1,106 @@
+import json
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.adapters.db import Base
+from app.adapters.db.models import InventoryLot, Product, SalesOrderLine
+from app.services.costing import CostingService
+from apps.competitor_intel.app.models import Base as CompetitorBase
+from apps.competitor_intel.app.models import PriceObservation
+from apps.competitor_intel.app.services.reports import (
+    ObservationFilters,
+    get_price_outliers,
+)
+from benchmarks import compare
+from benchmarks.synthetic import Volumes, generate_competitor, generate_manufacturing
+
+TINY = Volumes().scaled(0.002)
+
+
+def _session(metadata) -> Session:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    metadata.create_all(engine)
+    return sessionmaker(bind=engine)()
+
+
+def _count(session: Session, model) -> int:
+    return session.scalar(select(func.count()).select_from(model))
+
+
+def test_scaled_volumes_keep_assembly_tiers():
+    assert TINY.products == 20
+    assert TINY.lines_per_order == Volumes().lines_per_order
+    assert Volumes().scaled(0.5).order_lines == 250_000
+
+
+def test_generate_manufacturing_is_seeded():
+    first, second = _session(Base.metadata), _session(Base.metadata)
+    try:
+        data = generate_manufacturing(first, TINY, seed=7)
+        again = generate_manufacturing(second, TINY, seed=7)
+
+        assert data.finished_ids == again.finished_ids
+        assert _count(first, Product) == TINY.products
+        assert _count(first, InventoryLot) == TINY.lots
+        assert _count(first, SalesOrderLine) == TINY.order_lines
+
+        tree = CostingService(first).build_bom_tree(data.finished_ids[0])
+        assert tree["children"]
+    finally:
+        first.close()
+        second.close()
+
+
+def test_generate_competitor_has_outliers():
+    session = _session(CompetitorBase.metadata)
+    try:
+        sku_ids = generate_competitor(session, Volumes().scaled(0.01), seed=7)
+
+        assert sku_ids
+        assert _count(session, PriceObservation) == 1000
+        assert get_price_outliers(session, ObservationFilters())
+    finally:
+        session.close()
+
+
+def _bench_json(path, medians):
+    path.write_text(
+        json.dumps(
+            {
+                "benchmarks": [
+                    {"fullname": name, "name": name, "stats": {"median": median}}
+                    for name, median in medians.items()
+                ]
+            }
+        )
+    )
+    return path
+
+
+def test_compare_flags_regressions(tmp_path, capsys):
+    baseline = _bench_json(tmp_path / "base.json", {"a": 0.010, "b": 0.020})
+    current = _bench_json(tmp_path / "now.json", {"a": 0.011, "b": 0.030, "c": 0.001})
+
+    rows = compare.compare(
+        compare.load_medians(current), compare.load_medians(baseline)
+    )
+    assert [r.name for r in rows if r.regressed(0.25)] == ["b"]
+    assert rows[2].ratio is None
+
+    args = [str(current), "--baseline", str(baseline)]
+    assert compare.main(args) == 1
+    assert compare.main(args + ["--tolerance", "0.6"]) == 0
+    assert "REGRESSION" in capsys.readouterr().out
+
+
+def test_compare_without_baseline_passes(tmp_path, capsys):
+    current = _bench_json(tmp_path / "now.json", {"a": 0.01})
+
+    assert compare.main([str(current), "--baseline", str(tmp_path / "none")]) == 0
+    assert "make bench-baseline" in capsys.readouterr().out
@@ -0,0 +1,140 @@
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.adapters.db.models import InventoryLot, InventoryTxn, Product
+from app.adapters.db.models_assemblies_shopify import (
+    AssemblyCostDependency,
+    CostRevaluationQueue,
+    Revaluation,
+)
+from app.services.costing import CostingService
+
+
+def _lot(session: Session, sku: str, qty: str, cost: str) -> InventoryLot:
+    product = Product(sku=sku, name=f"Product {sku}", base_unit="KG")
+    session.add(product)
+    session.flush()
+    lot = InventoryLot(
+        product_id=product.id,
+        lot_code=f"LOT-{sku}",
+        quantity_kg=Decimal(qty),
+        unit_cost=Decimal(cost),
+        current_unit_cost=Decimal(cost),
+    )
+    session.add(lot)
+    session.flush()
+    return lot
+
+
+def _produce(session: Session, produced: InventoryLot, *consumed) -> None:
+    produce_txn = InventoryTxn(
+        lot_id=produced.id,
+        transaction_type="RECEIPT",
+        quantity_kg=produced.quantity_kg,
+    )
+    session.add(produce_txn)
+    for lot, qty in consumed:
+        issue_txn = InventoryTxn(
+            lot_id=lot.id,
+            transaction_type="ISSUE",
+            quantity_kg=-Decimal(qty),
+            unit_cost=lot.unit_cost,
+        )
+        session.add(issue_txn)
+        session.flush()
+        session.add(
+            AssemblyCostDependency(
+                consumed_lot_id=lot.id,
+                produced_lot_id=produced.id,
+                consumed_txn_id=issue_txn.id,
+                produced_txn_id=produce_txn.id,
+                dependency_ts=datetime(2025, 1, 1),
+            )
+        )
+    session.flush()
+
+
+def _chain(session: Session):
+    """Raw -> WIP -> finished, with a second raw input on the finished lot."""
+    raw = _lot(session, "RAW", "100", "10.00")
+    other_raw = _lot(session, "OTHER", "100", "2.00")
+    wip = _lot(session, "WIP", "50", "10.00")
+    finished = _lot(session, "FG", "50", "6.00")
+    unrelated = _lot(session, "UNRELATED", "10", "3.00")
+    _produce(session, wip, (raw, "50"))
+    _produce(session, finished, (wip, "25"), (other_raw, "25"))
+    _produce(session, unrelated, (other_raw, "10"))
+    session.commit()
+    return raw, wip, finished, unrelated
+
+
+def test_revalue_lot_propagates_through_all_levels(db_session: Session):
+    raw, wip, finished, unrelated = _chain(db_session)
+
+    statements = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        reval = CostingService(db_session).revalue_lot(
+            raw.id, Decimal("12.00"), "Supplier credit note", "tester"
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+    db_session.commit()
+
+    assert reval.propagated_to_assemblies is True
+    assert wip.current_unit_cost == Decimal("12.00")
+    assert finished.current_unit_cost == Decimal("7.00")  # (25*12 + 25*2) / 50
+    assert unrelated.current_unit_cost == Decimal("3.00")
+
+    propagated = db_session.execute(
+        select(Revaluation).where(Revaluation.propagated_to_assemblies.is_(True))
+    ).scalars()
+    by_lot = {row.lot_id: row for row in propagated}
+    assert set(by_lot) == {raw.id, wip.id, finished.id}
+    assert by_lot[finished.id].delta_extended_cost == Decimal("50.00")
+    assert by_lot[finished.id].reason == (
+        "Propagated from lot LOT-RAW: Supplier credit note"
+    )
+    reval_inserts = [
+        sql for sql in statements if sql.startswith("INSERT INTO revaluations")
+    ]
+    assert len(reval_inserts) == 2  # root record + one batch for downstream lots
+
+
+def test_unchanged_lot_stops_propagation(db_session: Session):
+    raw, _, finished, _ = _chain(db_session)
+    # Re-keying the same cost leaves WIP unchanged, so FG is never recomputed.
+    CostingService(db_session).revalue_lot(
+        raw.id, Decimal("10.00"), "No change", "tester"
+    )
+    db_session.commit()
+
+    assert finished.current_unit_cost == Decimal("6.00")
+    lots = db_session.execute(select(Revaluation.lot_id)).scalars().all()
+    assert lots == [raw.id]
+
+
+def test_deferred_revaluation_is_queued_and_processed(db_session: Session):
+    raw, wip, finished, _ = _chain(db_session)
+    service = CostingService(db_session)
+
+    service.revalue_lot(raw.id, Decimal("14.00"), "Landed cost", "tester", defer=True)
+    db_session.commit()
+    assert wip.current_unit_cost == Decimal("10.00")
+    assert len(db_session.execute(select(CostRevaluationQueue)).all()) == 1
+
+    summary = service.process_revaluation_queue()
+    db_session.commit()
+
+    assert summary == {"processed": 1, "revalued_lots": 2}
+    assert wip.current_unit_cost == Decimal("14.00")
+    assert finished.current_unit_cost == Decimal("8.00")
+    assert db_session.execute(select(CostRevaluationQueue)).all() == []
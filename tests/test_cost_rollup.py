@@ -0,0 +1,185 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.adapters.db.models import InventoryLot, Product
+from app.adapters.db.models_assemblies_shopify import Assembly, AssemblyLine
+from app.domain.rules import CostSource
+from app.services.costing import CostingService
+
+
+def _product(session: Session, sku: str, **kwargs) -> Product:
+    product = Product(sku=sku, name=f"Product {sku}", base_unit="KG", **kwargs)
+    session.add(product)
+    session.flush()
+    return product
+
+
+def _lot(session: Session, product: Product, cost: str, received_at: datetime):
+    session.add(
+        InventoryLot(
+            product_id=product.id,
+            lot_code=f"{product.sku}-{received_at:%Y%m%d}",
+            quantity_kg=Decimal("100"),
+            unit_cost=Decimal(cost),
+            received_at=received_at,
+        )
+    )
+
+
+def _assembly(session: Session, parent: Product, lines, **kwargs) -> Assembly:
+    code = kwargs.pop("code", f"ASM-{parent.sku}")
+    assembly = Assembly(
+        parent_product_id=parent.id,
+        assembly_code=code,
+        assembly_name=code,
+        is_active=True,
+        **kwargs,
+    )
+    session.add(assembly)
+    session.flush()
+    for seq, (component, qty) in enumerate(lines, 1):
+        session.add(
+            AssemblyLine(
+                assembly_id=assembly.id,
+                component_product_id=component.id,
+                quantity=Decimal(qty),
+                sequence=seq,
+            )
+        )
+    session.flush()
+    return assembly
+
+
+def _catalogue(session: Session):
+    spirit = _product(session, "SPIRIT", is_purchase=True)
+    botanical = _product(
+        session,
+        "BOTANICAL",
+        is_purchase=True,
+        estimated_cost=Decimal("4.00"),
+        estimate_reason="Supplier quote",
+    )
+    bottle = _product(session, "BOTTLE", is_purchase=True, standard_cost=Decimal("1.5"))
+    _lot(session, spirit, "10.00", datetime(2025, 1, 1))
+    _lot(session, spirit, "12.00", datetime(2025, 3, 1))
+    base = _product(session, "GIN-BASE")
+    _assembly(session, base, [(spirit, "8"), (botanical, "2")], yield_factor=10)
+    finished = [
+        _product(session, f"GIN-{size}", is_assemble=True) for size in ("700", "200")
+    ]
+    _assembly(session, finished[0], [(base, "0.7"), (bottle, "1")])
+    _assembly(session, finished[1], [(base, "0.2"), (bottle, "1")])
+    session.commit()
+    return base, finished
+
+
+def test_build_bom_tree_rolls_up_shared_subassembly(db_session: Session):
+    base, (gin_700, _) = _catalogue(db_session)
+
+    tree = CostingService(db_session).build_bom_tree(gin_700.id)
+
+    # GIN-BASE per kg: (8 * 10.00 + 2 * 4.00) / 10 = 8.80
+    base_node, bottle_node = tree["children"]
+    assert base_node["sku"] == "GIN-BASE"
+    assert base_node["level"] == 1
+    assert base_node["unit_cost"] == Decimal("8.80")
+    assert base_node["qty_per_parent"] == Decimal("0.700")
+    assert base_node["extended_cost"] == Decimal("6.16")
+    assert base_node["cost_source"] == CostSource.ESTIMATED.value
+    assert [c["qty_per_parent"] for c in base_node["children"]] == [
+        Decimal("0.800"),
+        Decimal("0.200"),
+    ]
+    assert base_node["children"][0]["cost_source"] == CostSource.FIFO_ACTUAL.value
+    assert bottle_node["cost_source"] == CostSource.STANDARD.value
+
+    assert tree["unit_cost"] == Decimal("7.66")
+    assert tree["product_type"] == "FINISHED"
+    assert tree["has_estimate"] is True
+    assert tree["estimate_reason"] == (
+        "Contains estimated components: GIN-BASE: Contains estimated components: "
+        "BOTANICAL: Supplier quote"
+    )
+
+
+def test_rollup_costs_uses_fixed_queries_per_level(db_session: Session):
+    base, finished = _catalogue(db_session)
+    extra = []
+    for i in range(20):
+        product = _product(db_session, f"GIN-GIFT-{i}", is_assemble=True)
+        _assembly(db_session, product, [(finished[i % 2], "1"), (base, "0.05")])
+        extra.append(product)
+    db_session.commit()
+    ids = [p.id for p in extra]
+
+    statements = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        costs = CostingService(db_session).rollup_costs(ids + ["missing"])
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+
+    assert "missing" not in costs
+    assert costs[ids[0]]["unit_cost"] == Decimal("8.10")  # 7.66 + 0.05 * 8.80
+    assert costs[ids[1]]["unit_cost"] == Decimal("3.70")  # 3.26 + 0.44
+    # Four levels deep: products, assemblies and lines per level plus one lot load.
+    assert len(statements) <= 4 * 3 + 1
+    assert sum("FROM inventory_lots" in sql for sql in statements) == 1
+
+
+def test_rollup_respects_effective_dates(db_session: Session):
+    raw = _product(db_session, "RAW")
+    _lot(db_session, raw, "5.00", datetime(2025, 1, 1))
+    _lot(db_session, raw, "7.00", datetime(2025, 6, 1))
+    parent = _product(db_session, "PARENT")
+    _assembly(
+        db_session,
+        parent,
+        [(raw, "1")],
+        code="OLD",
+        effective_from=datetime(2024, 1, 1),
+        effective_to=datetime(2025, 3, 31),
+    )
+    _assembly(
+        db_session,
+        parent,
+        [(raw, "2")],
+        code="NEW",
+        effective_from=datetime(2025, 4, 1),
+    )
+    db_session.commit()
+    service = CostingService(db_session)
+
+    early = service.rollup_costs([parent.id], as_of_date=datetime(2025, 2, 1))
+    assert early[parent.id]["unit_cost"] == Decimal("5.00")
+
+    # The first lot is used up; only the later lot is left to cost from.
+    db_session.query(InventoryLot).filter(InventoryLot.unit_cost == 5).update(
+        {"is_active": False}
+    )
+    late = service.rollup_costs([parent.id], as_of_date=datetime(2025, 7, 1))
+    assert late[parent.id]["unit_cost"] == Decimal("14.00")
+
+
+def test_rollup_detects_cycles(db_session: Session):
+    a = _product(db_session, "A")
+    b = _product(db_session, "B")
+    c = _product(db_session, "C")
+    _assembly(db_session, a, [(b, "1")])
+    _assembly(db_session, b, [(c, "1")])
+    _assembly(db_session, c, [(a, "1")])
+    db_session.commit()
+
+    with pytest.raises(
+        ValueError, match=r"Circular BOM detected at A \(path: A → B → C\)"
+    ):
+        CostingService(db_session).build_bom_tree(a.id)
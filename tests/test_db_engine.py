@@ -0,0 +1,93 @@
+import threading
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from app.adapters.db.session import get_engine
+from app.settings import settings
+
+
+def _pragma(conn, name: str):
+    return conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+
+def test_sqlite_file_engine_pools_connections_with_pragmas(tmp_path: Path):
+    engine = get_engine(url=f"sqlite:///{tmp_path / 'app.db'}")
+    cfg = settings.database
+    assert isinstance(engine.pool, QueuePool)
+    assert engine.pool.size() == cfg.pool_size
+    assert engine.pool._timeout == cfg.pool_timeout
+    assert engine.pool._recycle == cfg.pool_recycle
+
+    with engine.connect() as conn:
+        assert _pragma(conn, "journal_mode") == "wal"
+        assert _pragma(conn, "synchronous") == 1  # NORMAL
+        assert _pragma(conn, "busy_timeout") == cfg.sqlite_busy_timeout_ms
+        assert _pragma(conn, "cache_size") == -cfg.sqlite_cache_size_kib
+        assert _pragma(conn, "query_only") == 0
+
+    # Threads check out their own connections instead of sharing one.
+    seen = []
+    barrier = threading.Barrier(2)
+
+    def _worker():
+        with engine.connect() as conn:
+            seen.append(id(conn.connection.dbapi_connection))
+            barrier.wait()
+
+    threads = [threading.Thread(target=_worker) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(seen)) == 2
+    engine.dispose()
+
+
+def test_read_only_engine_reads_during_open_write(tmp_path: Path):
+    url = f"sqlite:///{tmp_path / 'app.db'}"
+    writer = get_engine(url=url)
+    reader = get_engine(url=url, read_only=True)
+    with writer.begin() as conn:
+        conn.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY, v TEXT)"))
+        conn.execute(text("INSERT INTO t (v) VALUES ('a')"))
+
+    with writer.connect() as wconn:
+        wconn.execute(text("INSERT INTO t (v) VALUES ('b')"))  # not committed
+        with reader.connect() as rconn:
+            assert rconn.execute(text("SELECT count(*) FROM t")).scalar() == 1
+        wconn.commit()
+
+    with reader.connect() as rconn:
+        assert rconn.execute(text("SELECT count(*) FROM t")).scalar() == 2
+        with pytest.raises(OperationalError, match="readonly"):
+            rconn.execute(text("INSERT INTO t (v) VALUES ('c')"))
+    writer.dispose()
+    reader.dispose()
+
+
+def test_sqlite_memory_engine_shares_one_connection():
+    engine = get_engine(url="sqlite://")
+    assert isinstance(engine.pool, StaticPool)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (id INTEGER)"))
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM t")).scalar() == 0
+
+
+def test_server_engine_applies_pool_settings():
+    pytest.importorskip("psycopg2")
+    url = "postgresql+psycopg2://user:pw@localhost/tpmanuf"
+    engine = get_engine(url=url)
+    cfg = settings.database
+    assert engine.pool.size() == cfg.pool_size
+    assert engine.pool._max_overflow == cfg.max_overflow
+    assert engine.pool._timeout == cfg.pool_timeout
+    assert engine.pool._recycle == cfg.pool_recycle
+    assert "postgresql_readonly" not in engine.get_execution_options()
+
+    reader = get_engine(url=url, read_only=True)
+    assert reader.get_execution_options()["postgresql_readonly"] is True
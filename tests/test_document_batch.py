@@ -0,0 +1,188 @@
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.adapters.db.models import (
+    Customer,
+    DeliveryDocket,
+    DeliveryDocketLine,
+    GeneratedDocument,
+    Product,
+    SalesOrder,
+    SalesOrderLine,
+)
+from app.documents import service as service_module
+from app.documents.context_builder import build_contexts_from_delivery_dockets
+from app.documents.service import BatchDocumentRequest, DocumentGenerationService
+
+
+@pytest.fixture()
+def fake_convert(monkeypatch):
+    """Record conversion batches and write placeholder PDFs."""
+    calls = []
+
+    def _convert(pairs, **kwargs):
+        calls.append(list(pairs))
+        results = []
+        for docx, pdf in pairs:
+            if "FAIL" in docx.name:
+                results.append((False, "converter crashed"))
+                continue
+            pdf.parent.mkdir(parents=True, exist_ok=True)
+            pdf.write_bytes(b"%PDF-1.4 " + docx.name.encode())
+            results.append((True, ""))
+        return results
+
+    monkeypatch.setattr(service_module, "convert_many_to_pdf", _convert)
+    return calls
+
+
+def _dockets(session: Session, count: int, prefix: str = "DD") -> list:
+    product = Product(sku="GIN-700", name="Gin 700ml", base_unit="EA")
+    session.add(product)
+    session.flush()
+    dockets = []
+    for i in range(count):
+        customer = Customer(code=f"C{i}", name=f"Bottle Shop {i}")
+        session.add(customer)
+        session.flush()
+        docket = DeliveryDocket(
+            customer_id=customer.id, docket_number=f"{prefix}-{i:03d}"
+        )
+        session.add(docket)
+        session.flush()
+        for seq in range(1, 3):
+            session.add(
+                DeliveryDocketLine(
+                    docket_id=docket.id,
+                    product_id=product.id,
+                    quantity=Decimal("6"),
+                    unit_price=Decimal("45.00"),
+                    sequence=seq,
+                )
+            )
+        dockets.append(docket)
+    session.commit()
+    return dockets
+
+
+def _docket(session: Session, docket_number: str) -> DeliveryDocket:
+    customer = Customer(code=docket_number, name="Failing Customer")
+    session.add(customer)
+    session.flush()
+    docket = DeliveryDocket(customer_id=customer.id, docket_number=docket_number)
+    session.add(docket)
+    session.commit()
+    return docket
+
+
+def _service(session: Session, tmp_path: Path) -> DocumentGenerationService:
+    return DocumentGenerationService(session, output_dir=tmp_path / "out")
+
+
+def test_docket_contexts_use_fixed_queries(db_session: Session):
+    dockets = _dockets(db_session, 12)
+    ids = [d.id for d in dockets]
+    db_session.expire_all()
+
+    statements = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        contexts = build_contexts_from_delivery_dockets(db_session, ids + ["missing"])
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+
+    assert set(contexts) == set(ids)
+    assert contexts[ids[3]].contact.name == "Bottle Shop 3"
+    assert [li.sku for li in contexts[ids[3]].line_items[:2]] == ["GIN-700"] * 2
+    # dockets, lines, products, customers
+    assert len(statements) == 4
+
+
+def test_generate_batch_records_status_per_document(
+    db_session: Session, tmp_path: Path, fake_convert
+):
+    dockets = _dockets(db_session, 3)
+    customer = db_session.get(Customer, dockets[0].customer_id)
+    product = db_session.query(Product).one()
+    order = SalesOrder(customer_id=customer.id, order_ref="SO-42")
+    db_session.add(order)
+    db_session.flush()
+    db_session.add(
+        SalesOrderLine(
+            order_id=order.id,
+            product_id=product.id,
+            qty=Decimal("2"),
+            unit_price_ex_gst=Decimal("40.00"),
+            line_total_ex_gst=Decimal("80.00"),
+            line_total_inc_gst=Decimal("88.00"),
+            sequence=1,
+        )
+    )
+    db_session.commit()
+
+    requests = [
+        BatchDocumentRequest("Delivery_Docket.docx", delivery_docket_id=d.id)
+        for d in dockets
+    ]
+    requests += [
+        BatchDocumentRequest("Invoice.docx", doc_type="invoice", quote_id=order.id),
+        BatchDocumentRequest("Delivery_Docket.docx", delivery_docket_id="missing"),
+        BatchDocumentRequest("Nope.docx", delivery_docket_id=dockets[0].id),
+    ]
+    batch = _service(db_session, tmp_path).generate_batch(requests, render_workers=2)
+
+    assert len(fake_convert) == 1 and len(fake_convert[0]) == 4
+    done = batch.results[:4]
+    assert all(r.error == "" and r.pdf_path.exists() for r in done)
+    assert {r.document.status for r in done} == {"completed"}
+    assert {r.document.job_id for r in done} == {batch.batch_id}
+    assert done[3].document.doc_number == "SO-42"
+    assert done[3].document.sales_order_id == order.id
+    for docket, result in zip(dockets, done):
+        db_session.refresh(docket)
+        assert docket.generated_document_id == result.document.id
+
+    missing, no_template = batch.results[4:]
+    assert missing.document is None
+    assert missing.error == "DeliveryDocket not found: missing"
+    assert no_template.error.startswith("Template not found")
+    assert db_session.query(GeneratedDocument).count() == 4
+
+
+def test_generate_batch_merges_completed_pdfs(
+    db_session: Session, tmp_path: Path, fake_convert, monkeypatch
+):
+    dockets = _dockets(db_session, 2)
+    failing = _docket(db_session, "FAIL-001")
+    merged_inputs = []
+
+    def _merge(pdf_paths, output_path):
+        merged_inputs.extend(pdf_paths)
+        output_path.write_bytes(b"%PDF-1.4 merged")
+
+    monkeypatch.setattr(service_module, "merge_pdfs", _merge)
+    requests = [
+        BatchDocumentRequest("Delivery_Docket.docx", delivery_docket_id=d.id)
+        for d in [dockets[0], failing, dockets[1]]
+    ]
+    batch = _service(db_session, tmp_path).generate_batch(
+        requests, merge=True, render_workers=0
+    )
+
+    assert batch.results[1].document.status == "failed"
+    assert batch.results[1].document.error_message == "converter crashed"
+    assert merged_inputs == [batch.results[0].pdf_path, batch.results[2].pdf_path]
+    assert batch.merge_error == ""
+    assert batch.merged.doc_type == "batch_merge"
+    assert batch.merged.status == "completed"
+    assert batch.merged.job_id == batch.batch_id
+    assert Path(batch.merged.pdf_path).read_bytes() == b"%PDF-1.4 merged"
@@ -0,0 +1,191 @@
+import io
+import os
+import shutil
+import zipfile
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from docxtpl import DocxTemplate
+from jinja2 import Environment
+from sqlalchemy.orm import Session
+
+from app.adapters.db.models import (
+    Customer,
+    DeliveryDocket,
+    DeliveryDocketLine,
+    Product,
+)
+from app.documents import renderer
+from app.documents import service as service_module
+from app.documents.contracts import (
+    ContactContext,
+    DocumentContext,
+    DocumentHeaderContext,
+    LineItemContext,
+)
+from app.documents.service import BatchDocumentRequest, DocumentGenerationService
+
+TEMPLATES = Path(__file__).resolve().parents[1] / "templates"
+
+
+@pytest.fixture()
+def conversions(monkeypatch):
+    """Count PDF conversions; write the DOCX bytes as a stand-in PDF."""
+    calls = []
+
+    def _convert(docx_path, pdf_path, **kwargs):
+        calls.append(pdf_path)
+        pdf_path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy(docx_path, pdf_path)
+        return True, ""
+
+    def _convert_many(pairs, **kwargs):
+        return [_convert(docx, pdf) for docx, pdf in pairs]
+
+    monkeypatch.setattr(service_module, "convert_to_pdf", _convert)
+    monkeypatch.setattr(service_module, "convert_many_to_pdf", _convert_many)
+    return calls
+
+
+def _context(notes: str = "") -> DocumentContext:
+    return DocumentContext(
+        contact=ContactContext(name="Bottle Shop", code="BS1", address="1 Main St"),
+        document=DocumentHeaderContext(
+            doc_type="invoice", doc_number="INV-1", date="2026-10-16", notes=notes
+        ),
+        line_items=[
+            LineItemContext(
+                description=f"Item {i}",
+                sku=f"SKU-{i}",
+                quantity="1",
+                uom="EA",
+                unit_price="2.00",
+                line_total="2.00",
+            )
+            for i in range(3)
+        ],
+    )
+
+
+def _parts(docx) -> dict:
+    with zipfile.ZipFile(docx) as archive:
+        return {name: archive.read(name) for name in archive.namelist()}
+
+
+def test_cached_template_renders_like_docxtpl(tmp_path: Path, monkeypatch):
+    template = tmp_path / "Invoice.docx"
+    shutil.copy(TEMPLATES / "Invoice.docx", template)
+    renderer.clear_template_cache()
+
+    assert renderer.render_docx(template, _context(), tmp_path / "a.docx") is False
+    compiles = []
+    real_compile = Environment.compile
+
+    def _compile(self, *args, **kwargs):
+        compiles.append(args)
+        return real_compile(self, *args, **kwargs)
+
+    monkeypatch.setattr(Environment, "compile", _compile)
+    assert renderer.render_docx(template, _context(), tmp_path / "b.docx") is True
+    assert compiles == []
+
+    plain = DocxTemplate(str(template))
+    plain.render(_context().to_dict())
+    expected = io.BytesIO()
+    plain.save(expected)
+    assert _parts(tmp_path / "b.docx") == _parts(expected)
+
+    # A newer template file is picked up.
+    stat = template.stat()
+    os.utime(template, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert renderer.render_docx(template, _context(), tmp_path / "c.docx") is False
+
+
+def test_output_cache_key_tracks_context_and_template(tmp_path: Path):
+    template = tmp_path / "Invoice.docx"
+    shutil.copy(TEMPLATES / "Invoice.docx", template)
+    key = renderer.output_cache_key(template, _context())
+
+    assert renderer.output_cache_key(template, _context()) == key
+    assert renderer.output_cache_key(template, _context(notes="Rush")) != key
+    shutil.copy(TEMPLATES / "Delivery_Docket.docx", template)
+    assert renderer.output_cache_key(template, _context()) != key
+
+
+def _docket(session: Session) -> DeliveryDocket:
+    product = Product(sku="GIN-700", name="Gin 700ml", base_unit="EA")
+    customer = Customer(code="C1", name="Bottle Shop")
+    session.add_all([product, customer])
+    session.flush()
+    docket = DeliveryDocket(customer_id=customer.id, docket_number="DD-001")
+    session.add(docket)
+    session.flush()
+    session.add(
+        DeliveryDocketLine(
+            docket_id=docket.id,
+            product_id=product.id,
+            quantity=Decimal("6"),
+            unit_price=Decimal("45.00"),
+            sequence=1,
+        )
+    )
+    session.commit()
+    return docket
+
+
+def test_reprint_reuses_pdf_until_docket_changes(
+    db_session: Session, tmp_path: Path, conversions
+):
+    docket = _docket(db_session)
+    svc = DocumentGenerationService(db_session, output_dir=tmp_path)
+
+    def _print():
+        doc, pdf_path, _, err = svc.generate(
+            "Delivery_Docket.docx",
+            "delivery_docket",
+            "",
+            delivery_docket_id=docket.id,
+        )
+        assert err == ""
+        return doc, pdf_path
+
+    first, pdf_path = _print()
+    reprint, reprint_path = _print()
+    assert first.cache_hit is False
+    assert reprint.cache_hit is True
+    assert reprint.content_hash == first.content_hash
+    assert reprint_path == pdf_path
+    assert len(conversions) == 1
+    db_session.refresh(docket)
+    assert docket.generated_document_id == reprint.id
+
+    docket.notes = "Leave at back door"
+    db_session.commit()
+    edited, _ = _print()
+    assert edited.cache_hit is False
+    assert edited.template_cache_hit is True
+
+    # Same data as the first print, but its PDF has since been overwritten.
+    docket.notes = None
+    db_session.commit()
+    reverted, _ = _print()
+    assert reverted.cache_hit is False
+    assert len(conversions) == 3
+
+
+def test_batch_reuses_cached_outputs(db_session: Session, tmp_path: Path, conversions):
+    docket = _docket(db_session)
+    svc = DocumentGenerationService(db_session, output_dir=tmp_path)
+    requests = [
+        BatchDocumentRequest("Delivery_Docket.docx", delivery_docket_id=docket.id)
+    ]
+
+    first = svc.generate_batch(requests, render_workers=0)
+    again = svc.generate_batch(requests, render_workers=0)
+
+    assert first.results[0].document.cache_hit is False
+    assert again.results[0].document.cache_hit is True
+    assert again.results[0].document.status == "completed"
+    assert again.results[0].pdf_path == first.results[0].pdf_path
+    assert len(conversions) == 1
@@ -0,0 +1,120 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from app.settings import settings
+from apps.vndmanuf_sales.services import address_geocoding
+from apps.vndmanuf_sales.services.geocode_batch import BatchGeocodeStats, geocode_many
+from apps.vndmanuf_sales.services.geocode_cache import GeocodeCache, normalize_query
+
+
+def _place(query: str) -> dict:
+    return {
+        "lat": "-33.89",
+        "lon": "151.27",
+        "display_name": f"{query}, Bondi, New South Wales, Australia",
+        "type": "alcohol",
+        "address": {
+            "house_number": "1",
+            "road": "Campbell Parade",
+            "suburb": "Bondi",
+            "state": "New South Wales",
+            "postcode": "2026",
+            "country": "Australia",
+        },
+    }
+
+
+class StubNominatim(BaseHTTPRequestHandler):
+    """Answers /search like Nominatim; "Nowhere" has no match, "Flaky" 503s once."""
+
+    requests: list = []
+    flaky_failures = 1
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)["q"][0]
+        type(self).requests.append(query)
+        if query.startswith("Flaky") and type(self).flaky_failures:
+            type(self).flaky_failures -= 1
+            self.send_response(503)
+            self.end_headers()
+            return
+        body = [] if query.startswith("Nowhere") else [_place(query)]
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def nominatim(tmp_path, monkeypatch):
+    StubNominatim.requests = []
+    StubNominatim.flaky_failures = 1
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubNominatim)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    config = settings.geocoding
+    monkeypatch.setattr(
+        config, "nominatim_url", f"http://127.0.0.1:{server.server_port}/search"
+    )
+    monkeypatch.setattr(config, "cache_path", tmp_path / "geocode.sqlite3")
+    monkeypatch.setattr(config, "requests_per_second", 50.0)
+    monkeypatch.setattr(config, "retry_backoff_seconds", 0.0)
+    address_geocoding.reset_geocoding()
+    yield StubNominatim
+    address_geocoding.reset_geocoding()
+    server.shutdown()
+    server.server_close()
+
+
+def test_normalize_query():
+    assert (
+        normalize_query("  Bondi  Cellars ,Bondi,NSW ") == "bondi cellars, bondi, nsw"
+    )
+
+
+def test_cache_remembers_misses(tmp_path):
+    cache = GeocodeCache(tmp_path / "c.sqlite3", negative_ttl_days=0)
+    cache.put("Nowhere", None)
+    assert cache.get("Nowhere") == (False, None)
+
+    cache = GeocodeCache(tmp_path / "c.sqlite3")
+    cache.put("Nowhere", None)
+    cache.put("Bondi", {"lat": 1.0})
+    assert cache.get("nowhere") == (True, None)
+    assert cache.get("BONDI") == (True, {"lat": 1.0})
+
+
+def test_geocode_query_uses_cache(nominatim):
+    first = address_geocoding.geocode_query("Bondi Cellars, NSW")
+    again = address_geocoding.geocode_query("bondi cellars,  NSW")
+    miss = address_geocoding.geocode_query("Nowhere Liquor")
+    assert address_geocoding.geocode_query("Nowhere Liquor") is None
+
+    assert first == again
+    assert first.state == "NSW" and first.address_line1 == "1 Campbell Parade"
+    assert miss is None
+    assert nominatim.requests == ["Bondi Cellars, NSW", "Nowhere Liquor"]
+
+
+def test_batch_geocoder_retries_and_checkpoints(nominatim):
+    queries = ["Bondi Cellars", "Nowhere Liquor", "Flaky Bottle-O", "Bondi Cellars"]
+    results, stats = geocode_many(queries, max_concurrency=3)
+
+    assert results["Bondi Cellars"].suburb == "Bondi"
+    assert results["Nowhere Liquor"] is None
+    assert results["Flaky Bottle-O"] is not None
+    assert stats == BatchGeocodeStats(requested=3, fetched=3, not_found=1)
+    assert nominatim.requests.count("Flaky Bottle-O") == 2
+
+    _, stats = geocode_many(queries)
+    assert stats.cached == 3 and stats.fetched == 0
+    assert len(nominatim.requests) == 4
@@ -0,0 +1,410 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.adapters.db import get_db
+from app.adapters.db.models import (
+    InventoryLot,
+    InventoryMovement,
+    InventoryStockSummary,
+    InventoryTxn,
+    Product,
+    WorkOrder,
+    WorkOrderLine,
+)
+from app.api import inventory as inventory_api
+from app.logging_config import query_budget
+from app.services.inventory import FifoRequest, InventoryService
+from app.services.stock_summary import compute_stock_totals, refresh_stock_summary
+from app.services.work_orders import MaterialIssue, WorkOrderService
+
+
+def _product(session: Session, sku: str = "INV-001") -> Product:
+    product = Product(sku=sku, name=f"Product {sku}", base_unit="KG")
+    session.add(product)
+    session.flush()
+    return product
+
+
+def _summary(session: Session, product_id: str) -> InventoryStockSummary:
+    session.expire_all()
+    return session.get(InventoryStockSummary, product_id)
+
+
+def test_stock_summary_follows_inventory_writes(db_session: Session):
+    product = _product(db_session)
+    inventory = InventoryService(db_session)
+
+    inventory.add_lot(product.id, "LOT-A", Decimal("100"), Decimal("5"))
+    lot_b = inventory.add_lot(product.id, "LOT-B", Decimal("50"), Decimal("6"))
+    summary = _summary(db_session, product.id)
+    assert summary.on_hand_qty == Decimal("150")
+    assert summary.active_lot_count == 2
+
+    inventory.consume_lots_fifo(product.id, Decimal("30"), "TEST", "TEST", None)
+    assert _summary(db_session, product.id).on_hand_qty == Decimal("120")
+
+    inventory.adjust_inventory(
+        product.id, "DECREASE", Decimal("10"), lot_id=lot_b.id, notes="count"
+    )
+    inventory.write_off(product.id, Decimal("5"), "DAMAGED")
+    assert inventory.get_stock_on_hand(product.id) == Decimal("105")
+
+    committed = inventory.reserve_inventory(product.id, Decimal("20"), "shopify", "A")
+    released = inventory.reserve_inventory(product.id, Decimal("7"), "shopify", "B")
+    assert _summary(db_session, product.id).reserved_qty == Decimal("27")
+    assert inventory.available_to_sell(product.id) == Decimal("78")
+
+    inventory.release_reservation(released.id)
+    inventory.commit_reservation(committed.id)
+    summary = _summary(db_session, product.id)
+    assert summary.on_hand_qty == Decimal("85")
+    assert summary.reserved_qty == Decimal("0")
+    db_session.commit()
+
+    expected = compute_stock_totals(db_session, [product.id])[product.id]
+    assert inventory.get_stock_summary(product.id) == expected
+
+
+def test_stock_summary_rolls_back_with_inventory_write(db_session: Session):
+    product = _product(db_session)
+    inventory = InventoryService(db_session)
+    inventory.add_lot(product.id, "LOT-A", Decimal("40"), Decimal("5"))
+    db_session.commit()
+
+    inventory.write_off(product.id, Decimal("15"), "LOST")
+    assert inventory.get_stock_on_hand(product.id) == Decimal("25")
+    db_session.rollback()
+
+    assert inventory.get_stock_on_hand(product.id) == Decimal("40")
+
+
+def test_stock_reads_include_unflushed_lot_changes(db_session: Session):
+    db_session.autoflush = False  # as sessions from app.adapters.db run
+    product = _product(db_session)
+    inventory = InventoryService(db_session)
+    lot = inventory.add_lot(product.id, "LOT-A", Decimal("40"), Decimal("5"))
+    db_session.commit()
+
+    lot.quantity_kg = Decimal("15")
+    db_session.add(
+        InventoryLot(product_id=product.id, lot_code="L2", quantity_kg=Decimal("5"))
+    )
+    assert inventory.get_stock_on_hand(product.id) == Decimal("20")
+    assert inventory.get_stock_summary(product.id)["active_lot_count"] == 2
+
+
+def test_stock_reads_fall_back_without_summary_row(db_session: Session):
+    product = _product(db_session)
+    other = _product(db_session, sku="INV-002")
+    db_session.add(
+        InventoryLot(product_id=product.id, lot_code="L1", quantity_kg=Decimal("12"))
+    )
+    db_session.commit()
+    db_session.query(InventoryStockSummary).delete()
+    db_session.commit()
+
+    inventory = InventoryService(db_session)
+    assert inventory.get_stock_on_hand(product.id) == Decimal("12")
+    assert inventory.available_to_sell(other.id) == Decimal("0")
+
+    assert refresh_stock_summary(db_session) == 1
+    assert _summary(db_session, product.id).active_lot_count == 1
+
+
+def test_get_stock_levels_reads_in_bulk(db_session: Session):
+    stocked = _product(db_session, "INV-A")
+    unstocked = _product(db_session, "INV-B")
+    unsummarised = _product(db_session, "INV-C")
+    inventory = InventoryService(db_session)
+    inventory.add_lot(stocked.id, "LOT-A", Decimal("30"), Decimal("5"))
+    inventory.reserve_inventory(stocked.id, Decimal("8"), "shopify", "A")
+    inventory.add_lot(unsummarised.id, "LOT-C", Decimal("4"), Decimal("5"))
+    db_session.commit()
+    db_session.query(InventoryStockSummary).filter_by(
+        product_id=unsummarised.id
+    ).delete()
+    db_session.commit()
+    product_ids = [stocked.id, unstocked.id, unsummarised.id]
+
+    with query_budget(3, engine=db_session.get_bind()):
+        levels = inventory.get_stock_levels(product_ids)
+
+    assert levels[stocked.id] == {
+        "on_hand_qty": Decimal("30"),
+        "reserved_qty": Decimal("8"),
+        "available_qty": Decimal("22"),
+    }
+    assert levels[unstocked.id]["available_qty"] == Decimal("0")
+    assert levels[unsummarised.id]["on_hand_qty"] == Decimal("4")
+    assert set(inventory.get_stock_levels()) == {stocked.id}
+
+
+def test_soh_endpoints_use_bulk_levels(db_session: Session):
+    products = [_product(db_session, f"STK-{i}") for i in range(5)]
+    for product in products:
+        product.is_purchase = True
+        InventoryService(db_session).add_lot(
+            product.id, f"LOT-{product.sku}", Decimal("2.5"), Decimal("1")
+        )
+    db_session.commit()
+    app = FastAPI()
+    app.include_router(inventory_api.router)
+    app.dependency_overrides[get_db] = lambda: db_session
+    client = TestClient(app)
+
+    with query_budget(3, engine=db_session.get_bind()):
+        response = client.get(
+            "/inventory/products/soh",
+            params={"product_ids": f"{products[0].id},missing"},
+        )
+    results = response.json()["results"]
+    assert results[0]["available"] == 2.5
+    assert results[1]["error"] == "Product not found"
+    assert len(client.get("/inventory/products/soh").json()["results"]) == 5
+
+    with query_budget(3, engine=db_session.get_bind()):
+        sheet = client.get("/inventory/stocktake/sheet", params={"format": "csv"})
+    assert sheet.headers["content-type"].startswith("text/csv")
+    lines = sheet.text.strip().splitlines()
+    assert lines[0].startswith("product_id,code,desc1")
+    assert len(lines) == 6 and ",2.5,2.5," in lines[1]
+
+    # Products are read and written out a chunk at a time.
+    pieces = list(
+        inventory_api._stocktake_csv(
+            inventory_api._stocktake_rows(db_session, True, chunk_size=2),
+            chunk_size=2,
+        )
+    )
+    assert len(pieces) == 3
+    assert "".join(pieces).strip().splitlines() == lines
+
+
+def _stock(session: Session, product: Product, *lots: tuple) -> None:
+    inventory = InventoryService(session)
+    start = datetime(2025, 1, 1)
+    for days, (qty, cost) in enumerate(lots):
+        inventory.add_lot(
+            product.id,
+            f"{product.sku}-{days}",
+            Decimal(qty),
+            Decimal(cost),
+            received_at=start + timedelta(days=days),
+        )
+
+
+def test_consume_many_fifo_batches_products(db_session: Session):
+    gin = _product(db_session, "GIN")
+    tonic = _product(db_session, "TONIC")
+    _stock(db_session, gin, ("10", "2"), ("10", "3"))
+    _stock(db_session, tonic, ("5", "1"))
+    db_session.commit()
+
+    inventory = InventoryService(db_session)
+    results = inventory.consume_many_fifo(
+        [
+            FifoRequest(gin.id, Decimal("6"), "BOM", "TEST", "REF-1"),
+            FifoRequest(
+                tonic.id, Decimal("8"), "BOM", "TEST", "REF-1", allow_negative=True
+            ),
+            FifoRequest(gin.id, Decimal("6"), "BOM", "TEST", "REF-1"),
+        ]
+    )
+    db_session.commit()
+
+    assert [issue.quantity_kg for issue in results[0]] == [Decimal("6")]
+    # The second gin request starts where the first one left off.
+    assert [(i.quantity_kg, i.unit_cost) for i in results[2]] == [
+        (Decimal("4"), Decimal("2")),
+        (Decimal("2"), Decimal("3")),
+    ]
+    assert inventory.get_stock_on_hand(gin.id) == Decimal("8")
+    assert inventory.get_stock_on_hand(tonic.id) == Decimal("-3")
+
+    txns = db_session.execute(
+        select(InventoryTxn).where(InventoryTxn.reference_id == "REF-1")
+    ).scalars()
+    assert sorted(txn.quantity_kg for txn in txns) == sorted(
+        -issue.quantity_kg for issues in results for issue in issues
+    )
+
+
+def test_consume_many_fifo_is_all_or_nothing(db_session: Session):
+    gin = _product(db_session, "GIN")
+    tonic = _product(db_session, "TONIC")
+    _stock(db_session, gin, ("10", "2"))
+    _stock(db_session, tonic, ("1", "1"))
+    db_session.commit()
+
+    inventory = InventoryService(db_session)
+    with pytest.raises(ValueError, match="Insufficient stock"):
+        inventory.consume_many_fifo(
+            [
+                FifoRequest(gin.id, Decimal("4"), "BOM", "TEST", None),
+                FifoRequest(tonic.id, Decimal("2"), "BOM", "TEST", None),
+            ]
+        )
+    assert inventory.get_stock_on_hand(gin.id) == Decimal("10")
+    assert db_session.execute(select(InventoryTxn.id)).all() != []  # receipts only
+    assert (
+        db_session.execute(
+            select(InventoryTxn).where(InventoryTxn.transaction_type == "ISSUE")
+        ).first()
+        is None
+    )
+
+
+def test_issue_materials_posts_bom_in_fixed_queries(db_session: Session):
+    finished = _product(db_session, "FG")
+    components = [_product(db_session, f"RM-{i}") for i in range(12)]
+    work_order = WorkOrder(
+        code="WO-BULK",
+        product_id=finished.id,
+        quantity_kg=Decimal("100"),
+        status="released",
+    )
+    db_session.add(work_order)
+    db_session.flush()
+    for seq, component in enumerate(components, 1):
+        _stock(db_session, component, ("3", "1"), ("3", "2"))
+        db_session.add(
+            WorkOrderLine(
+                work_order_id=work_order.id,
+                component_product_id=component.id,
+                line_type="material",
+                uom="KG",
+                sequence=seq,
+            )
+        )
+    db_session.commit()
+
+    statements = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        move_ids = WorkOrderService(db_session).issue_materials(
+            work_order.id,
+            [MaterialIssue(component.id, Decimal("4")) for component in components],
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+    db_session.commit()
+
+    assert len(move_ids) == len(components)
+    fifo_loads = [sql for sql in statements if "inventory_lots.received_at" in sql]
+    txn_inserts = [
+        sql for sql in statements if sql.startswith("INSERT INTO inventory_txns")
+    ]
+    assert len(fifo_loads) == 1
+    assert len(txn_inserts) == 1
+    for component in components:
+        assert InventoryService(db_session).get_stock_on_hand(component.id) == Decimal(
+            "2"
+        )
+    lines = db_session.execute(
+        select(WorkOrderLine).where(WorkOrderLine.work_order_id == work_order.id)
+    ).scalars()
+    assert {line.actual_qty for line in lines} == {Decimal("4")}
+
+
+def test_issue_materials_repeated_component_costs_and_returns(db_session: Session):
+    finished = _product(db_session, "FG")
+    gin = _product(db_session, "GIN")
+    _stock(db_session, gin, ("3", "1"), ("10", "2"))
+    work_order = WorkOrder(
+        code="WO-REPEAT",
+        product_id=finished.id,
+        quantity_kg=Decimal("10"),
+        status="released",
+    )
+    db_session.add(work_order)
+    db_session.flush()
+    line = WorkOrderLine(
+        work_order_id=work_order.id,
+        component_product_id=gin.id,
+        line_type="material",
+        uom="KG",
+        sequence=1,
+    )
+    db_session.add(line)
+    db_session.commit()
+    service = WorkOrderService(db_session)
+
+    # A return may only undo issues made earlier in the same batch.
+    with pytest.raises(ValueError, match="Cannot return more"):
+        service.issue_materials(
+            work_order.id,
+            [MaterialIssue(gin.id, Decimal("-1")), MaterialIssue(gin.id, Decimal("2"))],
+        )
+
+    move_ids = service.issue_materials(
+        work_order.id,
+        [
+            MaterialIssue(gin.id, Decimal("3")),
+            MaterialIssue(gin.id, Decimal("2")),
+            MaterialIssue(gin.id, Decimal("-1")),
+        ],
+    )
+    db_session.commit()
+
+    moves = {move.id: move for move in db_session.query(InventoryMovement)}
+    # The second issue finds the first lot already consumed.
+    assert [moves[move_id].unit_cost for move_id in move_ids[:2]] == [
+        Decimal("1"),
+        Decimal("2"),
+    ]
+    db_session.refresh(line)
+    assert line.actual_qty == Decimal("4")
+
+
+def test_issue_materials_return_then_issue_keeps_input_order(db_session: Session):
+    finished = _product(db_session, "FG")
+    gin = _product(db_session, "GIN")
+    gin.allow_negative_inventory = False
+    _stock(db_session, gin, ("8", "1"))
+    work_order = WorkOrder(
+        code="WO-MIXED",
+        product_id=finished.id,
+        quantity_kg=Decimal("10"),
+        status="released",
+    )
+    db_session.add(work_order)
+    db_session.flush()
+    line = WorkOrderLine(
+        work_order_id=work_order.id,
+        component_product_id=gin.id,
+        line_type="material",
+        uom="KG",
+        sequence=1,
+    )
+    db_session.add(line)
+    db_session.commit()
+    service = WorkOrderService(db_session)
+    service.issue_materials(work_order.id, [MaterialIssue(gin.id, Decimal("5"))])
+    db_session.commit()
+
+    # Only 3 kg is on hand until the returned 4 kg is back in stock.
+    move_ids = service.issue_materials(
+        work_order.id,
+        [MaterialIssue(gin.id, Decimal("-4")), MaterialIssue(gin.id, Decimal("6"))],
+    )
+    db_session.commit()
+
+    moves = {move.id: move for move in db_session.query(InventoryMovement)}
+    assert [moves[move_id].move_type for move_id in move_ids] == [
+        "wo_return",
+        "wo_issue",
+    ]
+    assert InventoryService(db_session).get_stock_on_hand(gin.id) == Decimal("1")
+    db_session.refresh(line)
+    assert line.actual_qty == Decimal("7")
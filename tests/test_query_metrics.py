@@ -0,0 +1,122 @@
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import logging_config
+from app.logging_config import (
+    QueryMetricsMiddleware,
+    RequestIDMiddleware,
+    count_queries,
+    query_budget,
+    query_metrics_snapshot,
+)
+from app.settings import settings
+
+
+@pytest.fixture()
+def engine():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+        conn.execute(text("INSERT INTO items (name) VALUES ('a'), ('b'), ('c')"))
+    yield engine
+    engine.dispose()
+
+
+def _logged(caplog, message: str) -> list:
+    return [
+        {"request_id": getattr(r, "request_id", None), **r.extra_fields}
+        for r in caplog.records
+        if r.name == "tpmanuf" and r.getMessage() == message
+    ]
+
+
+def test_middleware_reports_queries_per_request(engine, caplog):
+    SessionLocal = sessionmaker(bind=engine)
+
+    def _db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.add_middleware(QueryMetricsMiddleware)
+    app.add_middleware(RequestIDMiddleware)
+
+    @app.get("/items")
+    def items(db: Session = Depends(_db)):
+        names = [
+            db.execute(text(f"SELECT name FROM items WHERE id = {i}")).scalar()
+            for i in (1, 2, 3)
+        ]
+        return {"names": names}
+
+    response = TestClient(app).get("/items", headers={"X-Request-ID": "req-1"})
+
+    assert response.json() == {"names": ["a", "b", "c"]}
+    assert "db;dur=" in response.headers["Server-Timing"]
+    assert 'desc="3 queries"' in response.headers["Server-Timing"]
+    latest = query_metrics_snapshot()["recent"][-1]
+    assert latest["path"] == "/items"
+    assert latest["query_count"] == 3
+    assert len(latest["slowest"]) == 3
+    assert query_metrics_snapshot()["routes"]["GET /items"]["requests"] >= 1
+
+    logged = _logged(caplog, "request queries")
+    assert logged[-1]["request_id"] == "req-1"
+    assert logged[-1]["query_count"] == 3
+
+
+def test_slow_queries_log_plan(engine, caplog, monkeypatch):
+    monkeypatch.setattr(settings.logging, "slow_query_ms", 0.0)
+    with count_queries() as stats:
+        with engine.connect() as conn:
+            rows = conn.execute(
+                text("SELECT name FROM items WHERE name = :name"), {"name": "b"}
+            ).all()
+
+    assert rows == [("b",)]
+    assert stats.count == 1
+    slow = _logged(caplog, "slow query")
+    assert slow[-1]["statement"].startswith("SELECT name FROM items")
+    assert any("SCAN" in step for step in slow[-1]["plan"])
+
+    # Outside development EXPLAIN is off unless asked for.
+    monkeypatch.setattr(settings, "environment", "production")
+    with count_queries():
+        with engine.connect() as conn:
+            conn.execute(text("SELECT name FROM items")).all()
+    assert "plan" not in _logged(caplog, "slow query")[-1]
+
+
+def test_failed_statement_releases_timing(engine):
+    with count_queries() as stats:
+        with engine.connect() as conn:
+            with pytest.raises(Exception):
+                conn.execute(text("SELECT missing FROM items"))
+            assert conn.info.get("query_start") == []
+            conn.execute(text("SELECT 1"))
+    assert stats.count == 1
+
+
+def test_query_budget(engine):
+    with query_budget(2, engine=engine) as stats:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    assert stats.count == 1
+
+    with pytest.raises(AssertionError, match="at most 1 queries, ran 2"):
+        with query_budget(1, engine=engine):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT 2"))
+    assert engine not in logging_config._engine_stats
@@ -0,0 +1,186 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.adapters.db import get_db
+from app.adapters.db.models import (
+    Customer,
+    DeliveryDocket,
+    GeneratedDocument,
+    Invoice,
+    Product,
+    SalesOrder,
+    SalesOrderLine,
+)
+from app.api import sales
+from app.documents.repository import mark_completed, verify_document_files
+from app.logging_config import query_budget
+
+
+@pytest.fixture()
+def client(db_session: Session):
+    app = FastAPI()
+    app.include_router(sales.router, prefix="/api/v1")
+    app.dependency_overrides[get_db] = lambda: db_session
+    return TestClient(app)
+
+
+def _document(session: Session, pdf_path: Path) -> GeneratedDocument:
+    doc = GeneratedDocument(doc_type="invoice", template_name="Invoice.docx")
+    session.add(doc)
+    session.flush()
+    pdf_path.write_bytes(b"%PDF-1.4")
+    mark_completed(session, doc.id, str(pdf_path))
+    return doc
+
+
+def _orders(session: Session, tmp_path: Path, count: int) -> list:
+    customer = Customer(code="C1", name="Bottle Shop")
+    product = Product(sku="GIN-700", name="Gin 700ml", base_unit="EA")
+    session.add_all([customer, product])
+    session.flush()
+    start = datetime(2026, 1, 1)
+    orders = []
+    for i in range(count):
+        # Pairs of orders share a date so the id tie-break is exercised.
+        order = SalesOrder(
+            customer_id=customer.id,
+            order_ref=f"SO-{i:03d}",
+            order_date=start + timedelta(days=i // 2),
+        )
+        session.add(order)
+        session.flush()
+        session.add(
+            SalesOrderLine(
+                order_id=order.id,
+                product_id=product.id,
+                qty=Decimal("1"),
+                unit_price_ex_gst=Decimal("10.00"),
+                line_total_ex_gst=Decimal("10.00"),
+                line_total_inc_gst=Decimal("11.00"),
+                sequence=1,
+            )
+        )
+        if i % 2 == 0:
+            docket = DeliveryDocket(
+                customer_id=customer.id,
+                sales_order_id=order.id,
+                docket_number=f"DD-{i:03d}",
+                generated_document_id=_document(session, tmp_path / f"dd-{i}.pdf").id,
+            )
+            session.add(docket)
+        if i % 3 == 0:
+            session.add(
+                Invoice(
+                    customer_id=customer.id,
+                    sales_order_id=order.id,
+                    invoice_number=f"INV-{i:03d}",
+                    paid=i % 2 == 0,
+                    subtotal_ex_tax=Decimal("10.00"),
+                    total_tax=Decimal("1.00"),
+                    total_inc_tax=Decimal("11.00"),
+                    generated_document_id=_document(
+                        session, tmp_path / f"inv-{i}.pdf"
+                    ).id,
+                )
+            )
+        orders.append(order)
+    session.commit()
+    return orders
+
+
+def test_list_orders_uses_fixed_queries_and_stored_file_flag(
+    db_session: Session, client: TestClient, tmp_path: Path
+):
+    _orders(db_session, tmp_path, 30)
+    # orders, lines, dockets, invoices and one load per document relationship
+    with query_budget(6, engine=db_session.get_bind()):
+        response = client.get("/api/v1/sales/orders")
+
+    assert response.status_code == 200
+    rows = {row["order_ref"]: row for row in response.json()}
+    assert len(rows) == 30
+    assert rows["SO-000"]["delivery_docket_document"]["pdf_path"].endswith("dd-0.pdf")
+    assert rows["SO-003"]["invoice_document"]["pdf_path"].endswith("inv-3.pdf")
+    assert rows["SO-001"]["delivery_docket_document"] is None
+
+    # A deleted PDF is only hidden once the verifier has run.
+    (tmp_path / "dd-0.pdf").unlink()
+    assert verify_document_files(db_session) == {
+        "checked": 25,
+        "missing": 1,
+        "restored": 0,
+    }
+    db_session.commit()
+    rows = {row["order_ref"]: row for row in client.get("/api/v1/sales/orders").json()}
+    assert rows["SO-000"]["delivery_docket_document"] is None
+
+
+def test_list_orders_keyset_pagination(
+    db_session: Session, client: TestClient, tmp_path: Path
+):
+    _orders(db_session, tmp_path, 7)
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/v1/sales/orders", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page) <= 3
+        seen.extend(row["order_ref"] for row in page)
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    everything = [row["order_ref"] for row in client.get("/api/v1/sales/orders").json()]
+    assert seen == everything
+    assert sorted(seen) == [f"SO-{i:03d}" for i in range(7)]
+
+    bad = client.get("/api/v1/sales/orders", params={"cursor": "not-a-cursor"})
+    assert bad.status_code == 400
+
+
+def test_list_orders_document_filters_run_in_sql(
+    db_session: Session, client: TestClient, tmp_path: Path
+):
+    _orders(db_session, tmp_path, 7)
+
+    def _refs(**params):
+        response = client.get("/api/v1/sales/orders", params=params)
+        return sorted(row["order_ref"] for row in response.json())
+
+    assert _refs(has_delivery=True) == ["SO-000", "SO-002", "SO-004", "SO-006"]
+    assert _refs(has_invoice=False) == ["SO-001", "SO-002", "SO-004", "SO-005"]
+    assert _refs(paid=True) == ["SO-000", "SO-006"]
+    assert _refs(has_delivery=True, paid=False, limit=5) == ["SO-002", "SO-004"]
+
+    # Only the first live invoice counts, matching the list's paid flag.
+    first = db_session.query(Invoice).filter_by(invoice_number="INV-003").one()
+    db_session.add(
+        Invoice(
+            customer_id=first.customer_id,
+            sales_order_id=first.sales_order_id,
+            invoice_number="INV-003B",
+            paid=True,
+            subtotal_ex_tax=Decimal("10.00"),
+            total_tax=Decimal("1.00"),
+            total_inc_tax=Decimal("11.00"),
+            created_at=first.created_at + timedelta(days=1),
+        )
+    )
+    db_session.commit()
+    assert _refs(paid=True) == ["SO-000", "SO-006"]
+    rows = {row["order_ref"]: row for row in client.get("/api/v1/sales/orders").json()}
+    assert rows["SO-003"]["paid"] is False
+
+    first.deleted_at = datetime(2026, 2, 1)
+    db_session.commit()
+    assert _refs(paid=True) == ["SO-000", "SO-003", "SO-006"]
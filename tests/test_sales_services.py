@@ -2,12 +2,12 @@ from datetime import date, datetime
 from decimal import Decimal
 
 import pytest
-from sqlalchemy import create_engine, select
-from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
 
-from app.adapters.db import Base
 from app.adapters.db.models import (
     Customer,
+    CustomerPrice,
     CustomerSite,
     DeliveryDocket,
     InventoryLot,
@@ -19,6 +19,7 @@ from app.adapters.db.models import (
     SalesOrderLine,
 )
 from apps.vndmanuf_sales.models import SalesOrderSource, SalesOrderStatus
+from apps.vndmanuf_sales.services import pricing as pricing_module
 from apps.vndmanuf_sales.services.analytics import (
     SalesAnalyticsService,
     current_financial_year_period,
@@ -31,6 +32,9 @@ from apps.vndmanuf_sales.services.customer_mapping import (
     CustomerMappingService,
     names_refer_to_same_entity,
 )
+from apps.vndmanuf_sales.services.customer_pricing import (
+    resolve_customer_product_prices,
+)
 from apps.vndmanuf_sales.services.import_sales_csv import (
     ImportFormat,
     ImportRow,
@@ -38,31 +42,10 @@ from apps.vndmanuf_sales.services.import_sales_csv import (
     decode_csv_bytes,
     detect_csv_format,
 )
-from apps.vndmanuf_sales.services.pricing import PricingService
+from apps.vndmanuf_sales.services.pricing import PriceComputationError, PricingService
 from apps.vndmanuf_sales.services.totals import TotalsService
 
 
-@pytest.fixture()
-def db_session() -> Session:
-    engine = create_engine("sqlite:///:memory:")
-    _dedupe_indexes(Base.metadata)
-    Base.metadata.create_all(engine)
-    SessionLocal = sessionmaker(bind=engine)
-    session = SessionLocal()
-    yield session
-    session.close()
-
-
-def _dedupe_indexes(metadata):
-    for table in metadata.tables.values():
-        seen = set()
-        for index in list(table.indexes):
-            if index.name in seen:
-                table.indexes.remove(index)
-            else:
-                seen.add(index.name)
-
-
 def create_product(
     session: Session, sku: str = "SKU-1", name: str = "Sample Product"
 ) -> Product:
@@ -153,6 +136,104 @@ def test_pricing_resolves_from_pricebook(db_session: Session):
     assert result.source == "pricebook_item"
 
 
+def _count_queries(session: Session) -> list:
+    statements = []
+    event.listen(
+        session.get_bind(),
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    return statements
+
+
+def test_resolve_prices_batches_and_caches(db_session: Session):
+    priced = create_product(db_session, sku="SKU-PB")
+    fallback = create_product(db_session, sku="SKU-FB")
+    unpriced = Product(sku="SKU-NONE", name="No price", product_type="FINISHED")
+    db_session.add(unpriced)
+    db_session.commit()
+    pricebook = create_pricebook_with_item(db_session, priced)
+    customer = create_customer(db_session)
+    product_ids = [priced.id, fallback.id]
+
+    service = PricingService(db_session)
+    statements = _count_queries(db_session)
+    first = service.resolve_prices(
+        product_ids, order_date=date(2025, 2, 1), customer_id=customer.id
+    )
+    assert len(statements) <= 3
+    assert first[str(priced.id)].source == "pricebook_item"
+    assert first[str(priced.id)].pricebook_id == pricebook.id
+    assert first[str(fallback.id)].source == "product_fallback"
+    assert first[str(fallback.id)].unit_price_ex_gst == Decimal("40.00")
+
+    statements.clear()
+    again = service.resolve_prices(
+        product_ids, order_date=date(2025, 2, 1), customer_id=customer.id
+    )
+    assert again == first
+    assert statements == []
+
+    item = db_session.scalars(select(PricebookItem)).one()
+    item.unit_price_ex_gst = Decimal("36.00")
+    db_session.commit()
+    updated = service.resolve_price(
+        priced.id, order_date=date(2025, 2, 1), customer_id=customer.id
+    )
+    assert updated.unit_price_ex_gst == Decimal("36.00")
+
+    with pytest.raises(PriceComputationError, match=str(unpriced.id)):
+        service.resolve_prices([priced.id, unpriced.id], order_date=date(2025, 2, 1))
+
+
+def test_customer_prices_batch_special_overrides_tier(db_session: Session):
+    plain = create_product(db_session, sku="SKU-TIER")
+    special = create_product(db_session, sku="SKU-SPECIAL")
+    customer = create_customer(db_session)
+    db_session.add(
+        CustomerPrice(
+            customer_id=customer.id,
+            product_id=special.id,
+            unit_price_ex_tax=Decimal("30.00"),
+            effective_date=datetime(2025, 1, 1),
+        )
+    )
+    db_session.commit()
+
+    prices = resolve_customer_product_prices(
+        db_session, customer.id, [plain.id, special.id], date(2025, 2, 1)
+    )
+    assert prices[str(plain.id)]["source"] == "tier:retail"
+    assert prices[str(plain.id)]["unit_price_ex_gst"] == 40.0
+    assert prices[str(special.id)]["source"] == "customer_special"
+    assert prices[str(special.id)]["unit_price_inc_gst"] == 33.0
+
+    cp = db_session.scalars(select(CustomerPrice)).one()
+    cp.unit_price_ex_tax = Decimal("25.00")
+    db_session.commit()
+    prices = resolve_customer_product_prices(
+        db_session, customer.id, [special.id], date(2025, 2, 1)
+    )
+    assert prices[str(special.id)]["unit_price_ex_gst"] == 25.0
+
+
+def test_customer_prices_cached_per_day_until_expiry(db_session: Session, monkeypatch):
+    product = create_product(db_session, sku="SKU-TODAY")
+    customer = create_customer(db_session)
+    first = resolve_customer_product_prices(db_session, customer.id, [product.id])
+
+    statements = _count_queries(db_session)
+    assert (
+        resolve_customer_product_prices(db_session, customer.id, [product.id]) == first
+    )
+    assert statements == []
+
+    clock = pricing_module.time.monotonic() + 301
+    monkeypatch.setattr(pricing_module.time, "monotonic", lambda: clock)
+    resolve_customer_product_prices(db_session, customer.id, [product.id])
+    assert statements
+
+
 def test_totals_refreshes_order(db_session: Session):
     product = create_product(db_session)
     customer = create_customer(db_session)
@@ -585,3 +666,232 @@ DD250116,2025-11-18,2025-11-18,Bannockburn Cellarbrations,Michael Smith,Bannockb
     assert docket.sales_order_id == order.id
     assert len(docket.lines) == 2
     assert {line.product_id for line in docket.lines} == {nsc.id, npc.id}
+
+
+def _add_order(
+    session: Session,
+    customer: Customer,
+    order_date: datetime,
+    *,
+    ref: str,
+    status: str = "confirmed",
+) -> SalesOrder:
+    order = SalesOrder(
+        customer_id=customer.id,
+        order_ref=ref,
+        order_date=order_date,
+        status=status,
+        source="manual",
+        total_ex_gst=Decimal("100.00"),
+        total_inc_gst=Decimal("110.00"),
+    )
+    session.add(order)
+    session.commit()
+    return order
+
+
+def _seed_customer_history(session: Session) -> dict:
+    returning = create_customer(session, "Returning Bar")
+    fresh = create_customer(session, "Fresh Bottle Shop")
+    lapsed = create_customer(session, "Lapsed Venue")
+    cancelled_only = create_customer(session, "Cancelled Cafe")
+
+    _add_order(session, returning, datetime(2024, 3, 1), ref="SO-R1")
+    _add_order(session, returning, datetime(2025, 2, 1), ref="SO-R2")
+    _add_order(session, fresh, datetime(2025, 3, 1), ref="SO-F1")
+    _add_order(session, fresh, datetime(2025, 4, 1), ref="SO-F2")
+    _add_order(session, lapsed, datetime(2024, 6, 1), ref="SO-L1")
+    # A cancelled history must not make the customer look like a repeat buyer.
+    _add_order(
+        session, cancelled_only, datetime(2024, 1, 1), ref="SO-C0", status="cancelled"
+    )
+    _add_order(session, cancelled_only, datetime(2025, 5, 1), ref="SO-C1")
+    return {
+        "returning": returning,
+        "fresh": fresh,
+        "lapsed": lapsed,
+        "cancelled_only": cancelled_only,
+    }
+
+
+@pytest.mark.parametrize("materialized", [False, True])
+def test_analytics_overview_classifies_customers(
+    db_session: Session, monkeypatch, materialized: bool
+):
+    from app.settings import settings
+    from apps.vndmanuf_sales.services.customer_first_order import (
+        refresh_customer_first_orders,
+    )
+
+    monkeypatch.setattr(
+        settings.sales_analytics, "customer_first_order_enabled", materialized
+    )
+    _seed_customer_history(db_session)
+    if materialized:
+        refresh_customer_first_orders(db_session)
+        db_session.commit()
+
+    overview = SalesAnalyticsService(db_session).get_overview(
+        start_date=date(2025, 1, 1),
+        end_date=date(2025, 12, 31),
+    )
+    assert overview.total_orders == 4
+    assert overview.new_customers == 2
+    assert overview.repeat_customers == 1
+    assert overview.inactive_customers == 1
+    assert overview.repeat_rate_pct == pytest.approx(33.3)
+
+
+def test_customer_first_order_maintained_on_create_and_cancel(
+    db_session: Session, monkeypatch
+):
+    from app.settings import settings
+    from apps.vndmanuf_sales.models import CustomerFirstOrder
+
+    monkeypatch.setattr(settings.sales_analytics, "customer_first_order_enabled", True)
+    customer = create_customer(db_session)
+    later = _add_order(db_session, customer, datetime(2025, 3, 1), ref="SO-1")
+    row = db_session.get(CustomerFirstOrder, customer.id)
+    assert row.first_order_date == datetime(2025, 3, 1)
+
+    earlier = _add_order(db_session, customer, datetime(2025, 1, 1), ref="SO-0")
+    db_session.refresh(row)
+    assert row.first_order_date == datetime(2025, 1, 1)
+
+    earlier.status = SalesOrderStatus.CANCELLED.value
+    db_session.commit()
+    db_session.refresh(row)
+    assert row.first_order_date == datetime(2025, 3, 1)
+
+    later.deleted_at = datetime(2025, 6, 1)
+    db_session.commit()
+    db_session.expire_all()
+    assert db_session.get(CustomerFirstOrder, customer.id) is None
+
+
+def _add_line(session: Session, order: SalesOrder, product: Product, qty: str) -> None:
+    unit_inc = Decimal("11.00")
+    session.add(
+        SalesOrderLine(
+            order_id=order.id,
+            product_id=product.id,
+            qty=Decimal(qty),
+            uom="unit",
+            unit_price_ex_gst=Decimal("10.00"),
+            unit_price_inc_gst=unit_inc,
+            line_total_ex_gst=Decimal("10.00") * Decimal(qty),
+            line_total_inc_gst=unit_inc * Decimal(qty),
+            sequence=1,
+        )
+    )
+    session.commit()
+
+
+def _dashboard_snapshot(session: Session) -> dict:
+    from apps.vndmanuf_sales.services.customer_map import CustomerMapService
+
+    period = {"start_date": date(2025, 1, 1), "end_date": date(2025, 12, 31)}
+    svc = SalesAnalyticsService(session)
+    overview = svc.get_overview(**period)
+    products = svc.get_products_sold(**period)
+    summary = CustomerMapService(session).get_map(**period)
+    return {
+        "orders": overview.total_orders,
+        "revenue": overview.revenue_inc_gst,
+        "new": overview.new_customers,
+        "repeat": overview.repeat_customers,
+        "trend": overview.trend,
+        "top_skus": overview.top_skus,
+        "top_customers": overview.top_customers,
+        "products": [
+            (r.sku, r.units, r.revenue_inc_gst, r.channel_mix, r.first_sale_in_period)
+            for r in products.rows
+        ],
+        "map": sorted((p["name"], p["period_revenue"]) for p in summary.points),
+    }
+
+
+def _seed_rollup_history(session: Session) -> dict:
+    customers = _seed_customer_history(session)
+    gin = create_product(session, sku="GIN", name="Gin")
+    vodka = create_product(session, sku="VOD", name="Vodka")
+    for customer in customers.values():
+        customer.latitude = Decimal("-33.86")
+        customer.longitude = Decimal("151.20")
+    session.commit()
+    orders = session.execute(select(SalesOrder)).scalars().all()
+    for order in orders:
+        _add_line(session, order, gin, "2")
+        if order.order_ref.startswith("SO-F"):
+            _add_line(session, order, vodka, "5")
+    return {"customers": customers, "gin": gin, "vodka": vodka}
+
+
+def test_daily_rollup_matches_raw_dashboards(db_session: Session, monkeypatch):
+    from app.settings import settings
+    from apps.vndmanuf_sales.services.sales_rollup import (
+        rebuild_sales_rollup,
+        use_sales_rollup,
+    )
+
+    seeded = _seed_rollup_history(db_session)
+    archived = _add_order(
+        db_session, seeded["customers"]["fresh"], datetime(2025, 4, 2), ref="SO-A1"
+    )
+    archived.archived_at = datetime(2025, 6, 1)
+    db_session.commit()
+
+    raw = _dashboard_snapshot(db_session)
+
+    monkeypatch.setattr(settings.sales_analytics, "daily_rollup_enabled", True)
+    assert not use_sales_rollup(db_session)
+    rebuild_sales_rollup(db_session)
+    db_session.commit()
+    assert use_sales_rollup(db_session)
+
+    assert _dashboard_snapshot(db_session) == raw
+
+
+def test_daily_rollup_refreshes_incrementally(db_session: Session, monkeypatch):
+    from app.settings import settings
+    from apps.vndmanuf_sales.models import SalesDailyRollup
+    from apps.vndmanuf_sales.services.sales_rollup import (
+        rebuild_sales_rollup,
+        rollup_status,
+    )
+
+    seeded = _seed_rollup_history(db_session)
+    monkeypatch.setattr(settings.sales_analytics, "daily_rollup_enabled", True)
+    rebuild_sales_rollup(db_session)
+    db_session.commit()
+
+    fresh = seeded["customers"]["fresh"]
+    order = _add_order(db_session, fresh, datetime(2025, 7, 1), ref="SO-F3")
+    _add_line(db_session, order, seeded["vodka"], "4")
+    assert rollup_status(db_session)["fresh"]
+    assert _dashboard_snapshot(db_session)["orders"] == 5
+
+    order.status = SalesOrderStatus.CANCELLED.value
+    db_session.commit()
+    rows = (
+        db_session.execute(
+            select(SalesDailyRollup).where(SalesDailyRollup.day == date(2025, 7, 1))
+        )
+        .scalars()
+        .all()
+    )
+    assert rows == []
+
+    # Writes that bypass the listener leave the rollup stale, so dashboards
+    # fall back to sales_orders until the next rebuild.
+    monkeypatch.setattr(settings.sales_analytics, "daily_rollup_enabled", False)
+    order.status = SalesOrderStatus.CONFIRMED.value
+    order.updated_at = datetime.utcnow()
+    db_session.commit()
+    monkeypatch.setattr(settings.sales_analytics, "daily_rollup_enabled", True)
+    assert not rollup_status(db_session)["fresh"]
+    assert _dashboard_snapshot(db_session)["orders"] == 5
+
+    # A later write the listener does see must not mark the missed one fresh.
+    _add_order(db_session, fresh, datetime(2025, 8, 1), ref="SO-F4")
+    assert not rollup_status(db_session)["fresh"]
@@ -0,0 +1,195 @@
+from decimal import Decimal
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.adapters.db.models import Customer, Product
+from app.adapters.db.models_assemblies_shopify import (
+    ProductChannelLink,
+    ShopifyImportCheckpoint,
+)
+from app.services.shopify_order_import import ShopifyOrderImportService
+from apps.vndmanuf_sales.models import SalesOrder, SalesOrderLine
+
+
+def _order(order_id, customer, items):
+    return {
+        "id": order_id,
+        "created_at": "2024-03-0%dT10:00:00Z" % order_id,
+        "customer": customer,
+        "line_items": items,
+    }
+
+
+ANN = {"id": 71, "email": "ann@example.com", "first_name": "Ann", "last_name": "Lee"}
+SHOP = {"id": 72, "email": "SHOP@example.com"}
+
+PAGES = {
+    None: (
+        [
+            _order(1, ANN, [{"sku": "tp-red", "quantity": 2, "price": "11.00"}]),
+            _order(
+                2,
+                SHOP,
+                [
+                    {"variant_id": 222, "quantity": 1, "price": "22.00"},
+                    {"sku": "UNKNOWN", "quantity": 1, "price": "5.00"},
+                ],
+            ),
+        ],
+        "c2",
+    ),
+    "c2": (
+        [
+            _order(3, SHOP, [{"sku": "TP-RED", "quantity": 1, "price": "11.00"}]),
+            _order(4, ANN, [{"sku": "TP-RED", "quantity": 3, "price": "11.00"}]),
+        ],
+        "c3",
+    ),
+    "c3": ([_order(5, None, [{"variant_id": 222, "quantity": 4}])], None),
+}
+
+
+class PagedOrdersClient:
+    """get_orders over fixed cursor pages; ``fail_cursor`` answers with an error."""
+
+    def __init__(self, fail_cursor=None):
+        self.fail_cursor = fail_cursor
+        self.calls = []
+
+    def get_orders(self, limit=250, page_info=None, **filters):
+        self.calls.append(page_info or filters)
+        if page_info and page_info == self.fail_cursor:
+            return {"ok": False, "error": "HTTP 502", "orders": []}
+        orders, next_page_info = PAGES[page_info]
+        return {
+            "ok": True,
+            "orders": orders,
+            "has_next": next_page_info is not None,
+            "next_page_info": next_page_info,
+        }
+
+    def get_order_by_id(self, order_id):
+        return next(
+            order
+            for orders, _ in PAGES.values()
+            for order in orders
+            if str(order["id"]) == order_id
+        )
+
+
+def _seed(db: Session) -> None:
+    red = Product(sku="TP-RED", name="Red", base_unit="KG")
+    blue = Product(sku="TP-BLUE", name="Blue", base_unit="KG")
+    db.add_all([red, blue])
+    db.flush()
+    db.add(
+        ProductChannelLink(
+            product_id=blue.id, channel="shopify", shopify_variant_id="222"
+        )
+    )
+    db.add(
+        Customer(
+            code="C-1",
+            name="Shop",
+            email="shop@example.com",
+            customer_type="direct_customer",
+        )
+    )
+    db.commit()
+
+
+def test_historical_import_resumes_from_checkpoint(db_session: Session):
+    _seed(db_session)
+    single = ShopifyOrderImportService(db_session, client=PagedOrdersClient())
+    assert single.import_order_by_id("3")["created"] is True
+
+    flaky = PagedOrdersClient(fail_cursor="c2")
+    first = ShopifyOrderImportService(
+        db_session, client=flaky
+    ).import_historical_orders()
+    assert (first["status"], first["created"], first["errors"]) == ("FAILED", 2, 1)
+    checkpoint = db_session.execute(select(ShopifyImportCheckpoint)).scalar_one()
+    assert (checkpoint.next_page_info, checkpoint.pages) == ("c2", 1)
+    assert flaky.calls[0]["status"] == "any"
+
+    client = PagedOrdersClient()
+    second = ShopifyOrderImportService(
+        db_session, client=client
+    ).import_historical_orders()
+    assert second["resumed"] is True and client.calls[0] == "c2"
+    assert (second["status"], second["created"], second["updated"]) == (
+        "COMPLETED",
+        2,
+        1,
+    )
+
+    orders = {
+        order.order_ref: order for order in db_session.scalars(select(SalesOrder))
+    }
+    assert len(orders) == 5
+    assert orders["SHOPIFY-1"].customer_id == orders["SHOPIFY-4"].customer_id
+    assert (
+        db_session.scalar(
+            select(func.count()).select_from(Customer).where(Customer.code == "C-1")
+        )
+        == 1
+    )
+    assert orders["SHOPIFY-2"].customer.code == "C-1"
+    assert orders["SHOPIFY-1"].total_inc_gst == Decimal("22.00")
+    lines = db_session.scalars(
+        select(SalesOrderLine).where(SalesOrderLine.order_id == orders["SHOPIFY-2"].id)
+    ).all()
+    assert [line.qty for line in lines] == [Decimal("1")]
+
+    # A finished range starts again from page one; everything already exists
+    client = PagedOrdersClient()
+    again = ShopifyOrderImportService(
+        db_session, client=client
+    ).import_historical_orders()
+    assert again["resumed"] is False and client.calls[0]["status"] == "any"
+    assert (again["created"], again["updated"], again["pages"]) == (0, 5, 3)
+
+
+class BadOrderClient(PagedOrdersClient):
+    """Serves order 3 with an unparseable price on its page."""
+
+    def get_orders(self, limit=250, page_info=None, **filters):
+        result = super().get_orders(limit, page_info, **filters)
+        result["orders"] = [
+            (
+                _order(3, SHOP, [{"sku": "TP-RED", "quantity": 1, "price": "n/a"}])
+                if order["id"] == 3
+                else order
+            )
+            for order in result["orders"]
+        ]
+        return result
+
+
+def test_historical_import_retries_failed_orders(db_session: Session):
+    _seed(db_session)
+    first = ShopifyOrderImportService(
+        db_session, client=BadOrderClient()
+    ).import_historical_orders()
+    assert (first["status"], first["created"], first["errors"]) == ("COMPLETED", 4, 1)
+    assert first["failed_order_ids"] == ["3"]
+    checkpoint = db_session.execute(select(ShopifyImportCheckpoint)).scalar_one()
+    assert checkpoint.failed_order_ids == '["3"]'
+
+    # Resuming a finished run only refetches the failed order
+    client = PagedOrdersClient()
+    retry = ShopifyOrderImportService(
+        db_session, client=client
+    ).import_historical_orders()
+    assert client.calls == []
+    assert (retry["resumed"], retry["status"], retry["created"]) == (
+        True,
+        "COMPLETED",
+        1,
+    )
+    assert retry["failed_order_ids"] == []
+    db_session.refresh(checkpoint)
+    assert checkpoint.failed_order_ids is None
+    refs = set(db_session.scalars(select(SalesOrder.order_ref)))
+    assert "SHOPIFY-3" in refs and len(refs) == 5
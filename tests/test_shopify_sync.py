@@ -1,15 +1,39 @@
-from datetime import datetime
+import base64
+import hashlib
+import hmac
+import json
+from datetime import datetime, timedelta
 from decimal import Decimal
 from unittest.mock import patch
 
-from sqlalchemy.orm import Session
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
 
+from app.adapters.db import Base, get_db
 from app.adapters.db.models import InventoryLot, Product
 from app.adapters.db.models_assemblies_shopify import (
     InventoryReservation,
     ProductChannelLink,
+    ShopifyWebhookInbox,
 )
+from app.adapters.shopify_client import (
+    AsyncShopifyInventoryClient,
+    ShopifyCallLimiter,
+)
+from app.api import shopify as shopify_api
+from app.services.inventory import InventoryService
 from app.services.shopify_sync import ShopifySyncService
+from app.services.shopify_webhooks import (
+    ShopifyWebhookProcessor,
+    enqueue_webhook,
+    webhook_inbox_metrics,
+)
+from app.settings import settings
+from tests.fakes.fake_shopify import FakeShopifyClient
 
 
 def test_available_to_sell_basic(db_session: Session):
@@ -267,3 +291,327 @@ def test_shopify_webhook_order_create(db_session: Session):
     )
 
     assert len(reservations) == 2
+
+
+@pytest.fixture()
+def file_sessions(tmp_path):
+    """File-backed SQLite so worker threads share one database."""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'inbox.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+    yield factory
+    engine.dispose()
+
+
+def _stock_shopify_products(db: Session, count: int) -> None:
+    for i in range(count):
+        product = Product(sku=f"WH-{i}", name=f"Webhook {i}", base_unit="KG")
+        db.add(product)
+        db.flush()
+        db.add(
+            ProductChannelLink(
+                product_id=product.id,
+                channel="shopify",
+                shopify_variant_id=f"v{i}",
+                shopify_location_id="loc1",
+            )
+        )
+        db.add(
+            InventoryLot(
+                product_id=product.id,
+                lot_code=f"WL-{i}",
+                quantity_kg=Decimal("50.0"),
+                unit_cost=Decimal("5.0"),
+                received_at=datetime.utcnow(),
+                is_active=True,
+            )
+        )
+    db.commit()
+
+
+def _sign(raw: bytes, secret: str) -> str:
+    digest = hmac.new(secret.encode(), raw, hashlib.sha256).digest()
+    return base64.b64encode(digest).decode()
+
+
+def _webhook_client(file_sessions) -> TestClient:
+    app = FastAPI()
+    app.include_router(shopify_api.router)
+
+    def _get_db():
+        db = file_sessions()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = _get_db
+    return TestClient(app)
+
+
+def test_webhook_endpoint_enqueues_once(file_sessions, monkeypatch):
+    monkeypatch.setattr(settings.shopify, "webhook_secret", "shh")
+    client = _webhook_client(file_sessions)
+
+    raw = json.dumps({"id": 555, "line_items": []}).encode()
+    headers = {
+        "X-Shopify-Hmac-Sha256": _sign(raw, "shh"),
+        "X-Shopify-Webhook-Id": "wh-1",
+    }
+    first = client.post("/shopify/webhooks/orders_create", content=raw, headers=headers)
+    again = client.post("/shopify/webhooks/orders_create", content=raw, headers=headers)
+    forged = client.post(
+        "/shopify/webhooks/orders_create",
+        content=raw,
+        headers={"X-Shopify-Hmac-Sha256": _sign(raw, "wrong")},
+    )
+
+    assert first.status_code == 200 and first.json()["queued"] is True
+    assert again.status_code == 200 and again.json()["duplicate"] is True
+    assert forged.status_code == 401
+
+    not_object = b"[1, 2]"
+    rejected = client.post(
+        "/shopify/webhooks/orders_create",
+        content=not_object,
+        headers={"X-Shopify-Hmac-Sha256": _sign(not_object, "shh")},
+    )
+    assert rejected.status_code == 400
+
+    db = file_sessions()
+    entries = db.query(ShopifyWebhookInbox).all()
+    assert [(e.topic, e.order_id, e.status) for e in entries] == [
+        ("orders_create", "555", "PENDING")
+    ]
+    assert client.get("/shopify/webhooks/metrics").json()["pending"] == 1
+    db.close()
+
+
+@pytest.mark.parametrize("secret", [None, ""])
+def test_webhook_endpoint_rejects_when_secret_unset(file_sessions, monkeypatch, secret):
+    monkeypatch.setattr(settings.shopify, "webhook_secret", secret)
+    client = _webhook_client(file_sessions)
+
+    raw = json.dumps({"id": 556, "line_items": []}).encode()
+    response = client.post(
+        "/shopify/webhooks/orders_create",
+        content=raw,
+        headers={"X-Shopify-Hmac-Sha256": _sign(raw, "")},
+    )
+
+    assert response.status_code == 503
+    db = file_sessions()
+    assert db.query(ShopifyWebhookInbox).count() == 0
+    db.close()
+
+
+def test_drain_applies_in_order_and_coalesces(file_sessions):
+    db = file_sessions()
+    _stock_shopify_products(db, 2)
+    received = datetime.utcnow()
+    events = [
+        (
+            "orders_create",
+            {"id": 1, "line_items": [{"variant_id": "v0", "quantity": 5}]},
+        ),
+        (
+            "orders_create",
+            {"id": 2, "line_items": [{"variant_id": "v1", "quantity": 3}]},
+        ),
+        (
+            "orders_create",
+            {"id": 1, "line_items": [{"variant_id": "v0", "quantity": 5}]},
+        ),
+        ("fulfillments_create", {"order_id": 1}),
+    ]
+    for i, (topic, payload) in enumerate(events):
+        entry, created = enqueue_webhook(
+            db, topic, json.dumps(payload).encode(), webhook_id=f"wh-{i}"
+        )
+        assert created
+        entry.received_at = received + timedelta(seconds=i)
+        db.commit()
+    db.close()
+
+    shopify = FakeShopifyClient()
+    processor = ShopifyWebhookProcessor(
+        file_sessions, client_factory=lambda: shopify, max_workers=2
+    )
+    stats = processor.drain()
+
+    assert stats == {"orders": 2, "done": 3, "coalesced": 1, "failed": 0, "retried": 0}
+    assert processor.drain()["orders"] == 0
+
+    db = file_sessions()
+    statuses = {
+        (e.order_id, e.topic, e.status) for e in db.query(ShopifyWebhookInbox).all()
+    }
+    assert ("1", "orders_create", "COALESCED") in statuses
+    assert ("1", "fulfillments_create", "DONE") in statuses
+    reservations = {
+        r.reference_id: r.status for r in db.query(InventoryReservation).all()
+    }
+    assert reservations == {"1": "COMMITTED", "2": "ACTIVE"}
+    assert shopify.inventory_sets == [("inv-v0", "loc1", 45)]
+
+    metrics = webhook_inbox_metrics(db)
+    assert metrics["done"] == 3 and metrics["coalesced"] == 1
+    assert metrics["pending"] == 0 and metrics["oldest_pending_age_seconds"] is None
+    db.close()
+
+
+def test_drain_applies_distinct_events_of_one_topic(file_sessions):
+    db = file_sessions()
+    _stock_shopify_products(db, 1)
+    received = datetime.utcnow()
+    for i, quantity in enumerate((2, 2, 4)):
+        entry, _ = enqueue_webhook(
+            db,
+            "refunds_create",
+            json.dumps({"order_id": 7, "id": quantity}).encode(),
+            webhook_id=f"refund-{i}",
+        )
+        entry.received_at = received + timedelta(seconds=i)
+        db.commit()
+    db.close()
+
+    stats = ShopifyWebhookProcessor(file_sessions, max_workers=1).drain()
+
+    assert stats["coalesced"] == 1
+    assert stats["done"] + stats["failed"] == 2
+
+
+def test_contested_claim_stays_with_oldest_event(file_sessions):
+    db = file_sessions()
+    received = datetime.utcnow()
+    for i, order_id in enumerate((1, 1, 2)):
+        entry, _ = enqueue_webhook(
+            db,
+            "orders_create",
+            json.dumps({"id": order_id, "n": i}).encode(),
+            webhook_id=f"wh-{i}",
+        )
+        entry.received_at = received + timedelta(seconds=i)
+        entry.status = "PROCESSING"
+        # Another drainer claimed order 1's first event while we took the rest.
+        entry.claimed_by = "other" if i == 0 else "mine"
+        entry.claimed_at = received
+    db.commit()
+
+    processor = ShopifyWebhookProcessor(file_sessions)
+    assert processor._settle_claims(db, "mine", ["1", "2"]) == ["2"]
+    assert processor._settle_claims(db, "other", ["1"]) == ["1"]
+    statuses = [
+        (e.order_id, e.status, e.claimed_by)
+        for e in db.query(ShopifyWebhookInbox)
+        .populate_existing()
+        .order_by(ShopifyWebhookInbox.received_at)
+    ]
+    assert statuses == [
+        ("1", "PROCESSING", "other"),
+        ("1", "PENDING", None),
+        ("2", "PROCESSING", "mine"),
+    ]
+    db.close()
+
+
+class StubShopifyInventory:
+    """MockTransport handler for variant lookups and inventory_levels/set."""
+
+    def __init__(self):
+        self.requests = []
+        self.levels = {}
+        self.throttle_next_set = True
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append((request.method, request.url.path))
+        headers = {"X-Shopify-Shop-Api-Call-Limit": "39/40"}
+        if request.method == "GET":
+            variant_id = request.url.path.rsplit("/", 1)[-1].split(".")[0]
+            body = {"variant": {"inventory_item_id": f"item-{variant_id}"}}
+            return httpx.Response(200, json=body, headers=headers)
+        if self.throttle_next_set:
+            self.throttle_next_set = False
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        payload = json.loads(request.content)
+        self.levels[payload["inventory_item_id"]] = payload["available"]
+        return httpx.Response(200, json={"inventory_level": payload}, headers=headers)
+
+
+def test_reconcile_pushes_only_drift(file_sessions):
+    db = file_sessions()
+    _stock_shopify_products(db, 3)
+    stub = StubShopifyInventory()
+
+    def reconcile():
+        client = AsyncShopifyInventoryClient(
+            "https://test.myshopify.com",
+            "token",
+            limiter=ShopifyCallLimiter(40, leak_rate=1000.0),
+            transport=httpx.MockTransport(stub),
+        )
+        return ShopifySyncService(db, client=FakeShopifyClient()).reconcile_all(
+            push_client=client
+        )
+
+    first = reconcile()
+    assert (first["pushed"], first["successful"], first["unchanged"]) == (3, 3, 0)
+    assert first["throttled"] == 1 and first["http_requests"] == 7
+    assert stub.levels == {"item-v0": 50, "item-v1": 50, "item-v2": 50}
+
+    second = reconcile()
+    assert (second["pushed"], second["unchanged"], second["http_requests"]) == (
+        0,
+        3,
+        0,
+    )
+
+    product_id = (
+        db.query(ProductChannelLink).filter_by(shopify_variant_id="v0").one().product_id
+    )
+    InventoryService(db).reserve_inventory(
+        product_id=product_id, qty_kg=Decimal("5"), source="shopify", reference_id="9"
+    )
+    db.commit()
+    stub.requests.clear()
+
+    third = reconcile()
+    assert (third["pushed"], third["successful"]) == (1, 1)
+    assert stub.requests == [("POST", "/admin/api/2024-10/inventory_levels/set.json")]
+    assert stub.levels["item-v0"] == 45
+    db.close()
+
+
+def test_reconcile_records_other_links_when_a_lookup_fails(file_sessions, monkeypatch):
+    monkeypatch.setattr(settings.shopify, "api_max_retries", 0)
+    db = file_sessions()
+    _stock_shopify_products(db, 3)
+    stub = StubShopifyInventory()
+    stub.throttle_next_set = False
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/variants/v1.json"):
+            raise httpx.ConnectError("connection refused", request=request)
+        return stub(request)
+
+    client = AsyncShopifyInventoryClient(
+        "https://test.myshopify.com",
+        "token",
+        limiter=ShopifyCallLimiter(40, leak_rate=1000.0),
+        transport=httpx.MockTransport(handler),
+    )
+    summary = ShopifySyncService(db, client=FakeShopifyClient()).reconcile_all(
+        push_client=client
+    )
+
+    assert (summary["pushed"], summary["successful"], summary["failed"]) == (3, 2, 1)
+    assert stub.levels == {"item-v0": 50, "item-v2": 50}
+    pushed = {
+        link.shopify_variant_id: link.last_pushed_available
+        for link in db.query(ProductChannelLink).populate_existing()
+    }
+    assert pushed == {"v0": 50, "v1": None, "v2": 50}
+    db.close()
@@ -0,0 +1,111 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from app.documents.soffice_pool import LibreOfficePool
+
+# Stand-in for ``soffice --accept=socket,host=...,port=N;urp;...``: listens on N.
+FAKE_SOFFICE = """
+import socket, sys, time
+port = next(int(a.split("port=")[1].split(";")[0]) for a in sys.argv if "port=" in a)
+server = socket.socket()
+server.bind(("127.0.0.1", port))
+server.listen()
+while True:
+    server.accept()[0].close()
+"""
+
+
+def _pool(convert_fn, **kwargs) -> LibreOfficePool:
+    return LibreOfficePool(
+        command=[sys.executable, "-c", FAKE_SOFFICE],
+        convert_fn=convert_fn,
+        start_timeout=10,
+        **kwargs,
+    )
+
+
+def _write_pdf(port: int, docx_path: Path, pdf_path: Path) -> None:
+    pdf_path.write_bytes(b"%PDF-1.4 " + str(port).encode())
+
+
+@pytest.fixture()
+def docx(tmp_path: Path) -> Path:
+    path = tmp_path / "in.docx"
+    path.write_bytes(b"docx")
+    return path
+
+
+def test_pool_reuses_listener_and_recycles(tmp_path: Path, docx: Path):
+    pool = _pool(_write_pdf, size=1, max_conversions=2)
+    try:
+        ports = []
+        for i in range(3):
+            pdf = tmp_path / f"out{i}.pdf"
+            assert pool.convert(docx, pdf) == (True, "")
+            ports.append(pdf.read_bytes())
+        # Two conversions on the first listener, then a fresh one.
+        assert ports[0] == ports[1]
+        assert ports[2] != ports[1]
+    finally:
+        pool.shutdown()
+    assert pool._listeners == []
+
+
+def test_pool_replaces_dead_listener(tmp_path: Path, docx: Path):
+    pool = _pool(_write_pdf, size=1)
+    try:
+        assert pool.convert(docx, tmp_path / "a.pdf")[0]
+        pool._listeners[0].process.kill()
+        pool._listeners[0].process.wait()
+
+        assert pool.convert(docx, tmp_path / "b.pdf") == (True, "")
+        assert len(pool._listeners) == 1
+        assert pool._listeners[0].healthy()
+    finally:
+        pool.shutdown()
+
+
+def test_pool_times_out_and_restarts_listener(tmp_path: Path, docx: Path):
+    def _hang(port, docx_path, pdf_path):
+        time.sleep(3)
+
+    pool = _pool(_hang, size=1)
+    try:
+        ok, err = pool.convert(docx, tmp_path / "a.pdf", timeout_seconds=0.5)
+        assert not ok and err.startswith("Timeout")
+        assert pool._listeners == []
+
+        pool.convert_fn = _write_pdf
+        assert pool.convert(docx, tmp_path / "b.pdf") == (True, "")
+    finally:
+        pool.shutdown()
+
+
+def test_pool_rejects_when_queue_full(tmp_path: Path, docx: Path):
+    release = threading.Event()
+
+    def _blocking(port, docx_path, pdf_path):
+        release.wait(5)
+        _write_pdf(port, docx_path, pdf_path)
+
+    pool = _pool(_blocking, size=1, max_queue=0)
+    try:
+        busy = threading.Thread(target=pool.convert, args=(docx, tmp_path / "a.pdf"))
+        busy.start()
+        while not pool._listeners:
+            time.sleep(0.05)
+
+        assert pool.convert(docx, tmp_path / "b.pdf") == (
+            False,
+            "LibreOffice conversion queue is full",
+        )
+        release.set()
+        busy.join()
+        assert (tmp_path / "a.pdf").exists()
+    finally:
+        release.set()
+        pool.shutdown()
@@ -0,0 +1,115 @@
+import threading
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException
+
+from app.ui import api_client
+from app.ui.api_client import ApiClient, InProcessAsgiTransport, set_api_client
+
+
+def _api():
+    app = FastAPI()
+    calls = []
+
+    @app.get("/api/v1/slow")
+    def slow(q: str = "x"):
+        calls.append(q)
+        time.sleep(0.2)
+        return {"q": q}
+
+    @app.post("/api/v1/echo")
+    def echo(payload: dict):
+        return payload
+
+    @app.get("/api/v1/missing")
+    def missing():
+        raise HTTPException(status_code=404, detail="Nope")
+
+    return app, calls
+
+
+def test_inprocess_client_coalesces_identical_gets():
+    app, calls = _api()
+    client = ApiClient(InProcessAsgiTransport(app), coalesce_gets=True)
+    try:
+        barrier = threading.Barrier(4)
+        results = []
+
+        def fetch():
+            barrier.wait()
+            response = client.get("/slow", params={"q": "a", "unused": None})
+            results.append(response.json())
+
+        threads = [threading.Thread(target=fetch) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == [{"q": "a"}] * 4
+        assert calls == ["a"]
+        assert (client.stats["requests"], client.stats["coalesced"]) == (1, 3)
+
+        absolute = client.get("http://127.0.0.1:8000/api/v1/slow?q=b")
+        assert absolute.json() == {"q": "b"}
+        assert client.post("/echo", json={"a": 1}).json() == {"a": 1}
+    finally:
+        client.close()
+
+
+def test_absolute_urls_keep_their_host(monkeypatch):
+    sent = []
+
+    class RecordingTransport:
+        def __init__(self, base_url=None, pool_size=None):
+            self.base_url = base_url
+
+        def request(self, method, path, **kwargs):
+            sent.append((self.base_url, path))
+            return httpx.Response(200, json={})
+
+        def close(self):
+            sent.append((self.base_url, "closed"))
+
+    monkeypatch.setattr(api_client, "PooledHttpTransport", RecordingTransport)
+    app, calls = _api()
+    client = ApiClient(InProcessAsgiTransport(app), coalesce_gets=False)
+    try:
+        client.get("http://reports.internal:9000/api/v1/slow?q=r")
+        client.get("http://REPORTS.internal:9000/api/v1/slow?q=s")
+        assert client.get("/slow", params={"q": "t"}).json() == {"q": "t"}
+    finally:
+        client.close()
+
+    assert sent == [
+        ("http://reports.internal:9000", "/api/v1/slow?q=r"),
+        ("http://reports.internal:9000", "/api/v1/slow?q=s"),
+        ("http://reports.internal:9000", "closed"),
+    ]
+    assert calls == ["t"]
+
+
+def test_inprocess_requests_honour_timeout():
+    app, _ = _api()
+    client = ApiClient(InProcessAsgiTransport(app))
+    try:
+        with pytest.raises(httpx.TimeoutException):
+            client.get("/slow", timeout=0.05)
+        assert client.get("/slow", params={"q": "d"}, timeout=5).json() == {"q": "d"}
+    finally:
+        client.close()
+
+
+def test_make_api_request_uses_shared_client():
+    from app.ui.app import make_api_request
+
+    app, _ = _api()
+    set_api_client(ApiClient(InProcessAsgiTransport(app)))
+    try:
+        assert make_api_request("GET", "/slow", {"q": "c"}) == {"q": "c"}
+        assert make_api_request("POST", "/echo", {"b": 2}) == {"b": 2}
+        assert "Nope" in make_api_request("GET", "/missing")["error"]
+    finally:
+        set_api_client(None)
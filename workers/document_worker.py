@@ -13,6 +13,9 @@ Worker process:
   - Runs app.documents.worker.run_document_generation_job for each job
   - Each job gets a fresh DB session (get_session), runs generation, returns document_id
   - Timeout per job: 5 minutes (set in enqueue_generation_job)
+  - With the LibreOffice backend and a pool (DOCGEN_LIBREOFFICE_POOL_SIZE > 0),
+    jobs run in this process (SimpleWorker) so the soffice listeners are reused
+    across jobs instead of dying with a forked work horse
 """
 
 import os
@@ -26,15 +29,17 @@ if _project_root not in sys.path:
 
 def main():
     from redis import Redis
-    from rq import Worker
+    from rq import SimpleWorker, Worker
 
+    from app.documents.worker import prepare_worker_process
     from app.settings import settings
 
     redis_url = settings.docgen.redis_url
     queue_name = settings.docgen.queue_name
     conn = Redis.from_url(redis_url)
     queues = [queue_name]
-    w = Worker(queues, connection=conn)
+    worker_cls = SimpleWorker if prepare_worker_process() else Worker
+    w = worker_cls(queues, connection=conn)
     w.work()
 
 